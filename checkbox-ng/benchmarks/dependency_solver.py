@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark solving job dependencies with broken jobs.
+
+A synthetic graph of jobs is generated where a fraction of the jobs depend
+on jobs that do not exist (or form dependency cycles). The graph is solved
+with error recovery in a single pass and, optionally, by solving the graph
+again after each error, as SessionState used to do.
+"""
+import argparse
+import random
+import time
+
+from plainbox.impl.depmgr import DependencySolver
+from plainbox.impl.testing_utils import make_job
+
+
+def make_job_list(size, broken_ratio, seed):
+    rng = random.Random(seed)
+    job_list = []
+    for index in range(size):
+        depends = set()
+        # Keep the graph shallow enough for the recursive solver
+        for _ in range(rng.randint(0, 3)):
+            if index:
+                depends.add('job-{}'.format(
+                    rng.randint(max(0, index - 50), index - 1)))
+        if rng.random() < broken_ratio:
+            if rng.random() < 0.5:
+                depends.add('missing-{}'.format(index))
+            elif index:
+                # Depending on a job that comes later makes a cycle likely
+                depends.add('job-{}'.format(
+                    rng.randint(index, min(size - 1, index + 50))))
+        job_list.append(make_job(
+            'job-{}'.format(index), depends=' '.join(sorted(depends)) or None))
+    return job_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--broken", type=float, default=0.01,
+                        help="fraction of jobs with a broken dependency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loop", action="store_true",
+                        help="also time (and compare with) the retry loop")
+    args = parser.parse_args()
+    job_list = make_job_list(args.jobs, args.broken, args.seed)
+    start = time.perf_counter()
+    result = DependencySolver.resolve_dependencies_with_recovery(
+        job_list, job_list)
+    print("single pass: {:.3f}s ({} jobs to run, {} problems)".format(
+        time.perf_counter() - start, len(result[0]), len(result[2])))
+    if args.loop:
+        start = time.perf_counter()
+        loop_result = DependencySolver._resolve_dependencies_in_loop(
+            job_list, job_list)
+        print("retry loop: {:.3f}s".format(time.perf_counter() - start))
+        assert result[0] == loop_result[0]
+        assert result[1] == loop_result[1]
+        assert [str(p) for p in result[2]] == [str(p) for p in loop_result[2]]
+
+
+if __name__ == "__main__":
+    main()
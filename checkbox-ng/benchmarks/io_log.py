@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark writing and reading I/O logs in the gzip and binary formats.
+
+A log of the given size is written in both formats, then read back as a
+whole, filtered to stderr only and sliced to its last second.
+"""
+import argparse
+import gzip
+import io
+import os
+import tempfile
+import time
+
+from plainbox.impl.result import BinaryIOLogRecordWriter
+from plainbox.impl.result import DiskJobResult
+from plainbox.impl.result import IOLogRecord
+from plainbox.impl.result import IOLogRecordWriter
+
+
+def make_record_list(size, line_size):
+    line = b"x" * (line_size - 1) + b"\n"
+    return [
+        IOLogRecord(0.001, "stderr" if index % 10 == 0 else "stdout", line)
+        for index in range(size // line_size)]
+
+
+def write_gzip(path, record_list):
+    with gzip.open(path, mode="wb") as gzip_stream, io.TextIOWrapper(
+            gzip_stream, encoding="UTF-8") as record_stream:
+        writer = IOLogRecordWriter(record_stream)
+        for record in record_list:
+            writer.write_record(record)
+
+
+def write_binary(path, record_list):
+    with open(path, mode="wb") as record_stream:
+        writer = BinaryIOLogRecordWriter(record_stream)
+        for record in record_list:
+            writer.write_record(record)
+        writer.flush()
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print("{:<24} {:.3f}s".format(label, time.perf_counter() - start))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=64,
+                        help="size of the log in MiB")
+    parser.add_argument("--line-size", type=int, default=80)
+    args = parser.parse_args()
+    record_list = make_record_list(args.size << 20, args.line_size)
+    duration = sum(record.delay for record in record_list)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, write in (("gz", write_gzip), ("bin", write_binary)):
+            path = os.path.join(tmp, "job.record.{}".format(fmt))
+            timed("{} write".format(fmt), write, path, record_list)
+            print("{:<24} {:.1f}MiB".format(
+                "{} size".format(fmt), os.path.getsize(path) / (1 << 20)))
+            result = DiskJobResult({"io_log_filename": path})
+            timed("{} read all".format(fmt), lambda: sum(
+                1 for _ in result.get_io_log()))
+            timed("{} read stderr".format(fmt), lambda: sum(
+                1 for _ in result.get_io_log_slice(stream_name="stderr")))
+            timed("{} read last second".format(fmt), lambda: sum(
+                1 for _ in result.get_io_log_slice(start=duration - 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark supervising the processes of short jobs.
+
+Many short commands are run the way UnifiedRunner runs job commands, with
+their standard streams pumped by a single thread and a selector, or by a
+thread for each stream (and one forwarding the input).
+"""
+import argparse
+import os
+import subprocess
+import time
+from unittest import mock
+
+from plainbox.impl.execution import UnifiedRunner
+from plainbox.vendor import extcmd
+
+
+def run_jobs(runner, threaded, count, command):
+    supervise = (runner._supervise_with_threads if threaded
+                 else runner._supervise_with_selector)
+    # Nothing is ever typed, like on a terminal left alone
+    stdin_r, stdin_w = os.pipe()
+    with open(stdin_r) as stdin:
+        for _ in range(count):
+            ecmd = extcmd.ExternalCommandWithDelegate(extcmd.DelegateBase())
+            in_r, in_w = os.pipe()
+            kwargs = {'stdin': in_r, 'stdout': subprocess.PIPE,
+                      'stderr': subprocess.PIPE, 'start_new_session': True}
+            supervise(ecmd, (['sh', '-c', command],), kwargs, in_r, in_w,
+                      stdin, None)
+    os.close(stdin_w)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--command", default="echo output; echo error >&2")
+    args = parser.parse_args()
+
+    with mock.patch('plainbox.impl.execution.ResourceJobCache'):
+        runner = UnifiedRunner('benchmark', [], os.devnull)
+    for threaded, name in ((True, "threads"), (False, "selector")):
+        start = time.perf_counter()
+        run_jobs(runner, threaded, args.jobs, args.command)
+        elapsed = time.perf_counter() - start
+        print("{}: {} jobs in {:.2f}s ({:.1f}ms per job)".format(
+            name, args.jobs, elapsed, elapsed * 1000 / args.jobs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark merging submission tarballs.
+
+Synthetic submissions with many jobs and large attachment files are merged
+with the merge-submissions command. Reading submission.json, presenting the
+results to the session and writing the merged tarball are compared with
+extracting the whole tarballs, presenting the results one by one and
+repacking the extracted files, as the command used to do.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tarfile
+import time
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+from checkbox_ng.launcher.merge_submissions import MergeSubmissions
+from plainbox.impl.session import SessionManager
+
+
+def make_log(size):
+    # Attachments are mostly logs, which compress well but not trivially
+    rng = random.Random(size)
+    lines = []
+    length = 0
+    while length < size:
+        line = "[{:12.6f}] device-{}: event {:08x}\n".format(
+            length / 1000, rng.randint(0, 99), rng.getrandbits(32))
+        lines.append(line)
+        length += len(line)
+    return "".join(lines).encode("UTF-8")[:size]
+
+
+def make_submission(path, index, jobs, attachment_size):
+    data = {
+        "title": "submission {}".format(index),
+        "results": [], "resource-results": [], "attachment-results": [],
+        "category_map": {"cat": "Category"},
+    }
+    for job in range(jobs):
+        data["results"].append({
+            "id": "job-{}-{}".format(index, job), "name": "job",
+            "outcome": "pass", "io_log": "output\n" * 20, "comments": "",
+            "duration": 1.0, "category_id": "cat"})
+    data["resource-results"].append({
+        "id": "resource-{}".format(index), "name": "resource",
+        "outcome": "pass", "io_log": "attr: value\n\n" * 50,
+        "comments": "", "duration": 1.0})
+    data["attachment-results"].append({
+        "id": "attachment-{}".format(index), "name": "attachment",
+        "outcome": "pass", "io_log": "", "comments": "", "duration": 1.0})
+    with tarfile.open(path, "w:xz", preset=0) as tar:
+        members = [
+            ("submission.json", json.dumps(data).encode("UTF-8")),
+            ("attachment_files/attachment-{}".format(index),
+             make_log(attachment_size)),
+        ]
+        for name, payload in members:
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = len(payload)
+            tar.addfile(tarinfo, io.BytesIO(payload))
+
+
+def legacy_load(submission_list):
+    for submission in submission_list:
+        with TemporaryDirectory() as tmpdir:
+            with tarfile.open(submission) as tar:
+                tar.extractall(tmpdir)
+            with open(os.path.join(tmpdir, "submission.json")) as stream:
+                json.load(stream)
+
+
+def legacy_write(command, manager, submission_list, output):
+    with TemporaryDirectory() as tmpdir:
+        for submission in submission_list:
+            with tarfile.open(submission) as tar:
+                tar.extractall(tmpdir)
+        exporter = command._create_exporter("com.canonical.plainbox::tar")
+        with open(output, "wb") as stream:
+            exporter.dump_from_session_manager(manager, stream)
+        with tarfile.open(output) as tar:
+            tar.extractall(tmpdir)
+        with tarfile.open(output, mode="w:xz") as tar:
+            tar.add(tmpdir, arcname="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submissions", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1000,
+                        help="number of jobs in each submission")
+    parser.add_argument("--attachment-size", type=int, default=4,
+                        help="size of the attachment of each submission, MiB")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdir:
+        submission_list = []
+        for index in range(args.submissions):
+            path = os.path.join(tmpdir, "submission{}.tar.xz".format(index))
+            make_submission(
+                path, index, args.jobs, args.attachment_size * 1024 * 1024)
+            submission_list.append(path)
+        command = MergeSubmissions()
+
+        start = time.perf_counter()
+        legacy_load(submission_list)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for submission in submission_list:
+            command._load_submission_json(submission)
+        stream_time = time.perf_counter() - start
+        print("read submission.json: extract {:.2f}s, stream {:.2f}s".format(
+            legacy_time, stream_time))
+
+        command.job_dict = {}
+        command.category_dict = {}
+        for submission in submission_list:
+            command._parse_submission(submission, mode="dict")
+        unit_list = (list(command.job_dict.values()) +
+                     list(command.category_dict.values()))
+        job_result_list = [(job, command._get_job_result(job))
+                           for job in command.job_dict.values()]
+        manager = SessionManager.create_with_unit_list(unit_list)
+        start = time.perf_counter()
+        for job, result in job_result_list:
+            manager.state.update_job_result(job, result)
+        single_time = time.perf_counter() - start
+        manager = SessionManager.create_with_unit_list(unit_list)
+        start = time.perf_counter()
+        manager.state.update_job_result_list(job_result_list)
+        bulk_time = time.perf_counter() - start
+        print("present {} results: one by one {:.2f}s, bulk {:.2f}s".format(
+            len(job_result_list), single_time, bulk_time))
+
+        output = os.path.join(tmpdir, "merged.tar.xz")
+        start = time.perf_counter()
+        legacy_write(command, manager, submission_list, output)
+        legacy_time = time.perf_counter() - start
+        ctx = SimpleNamespace(args=SimpleNamespace(
+            submission=submission_list, output_file=output, title=None))
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            command.invoked(ctx)
+            merge_time = time.perf_counter() - start
+        print("write merged tarball: extract and repack {:.2f}s".format(
+            legacy_time))
+        print("merge-submissions (all steps): {:.2f}s".format(merge_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark applying the field overrides of a test plan to its jobs.
+
+A test plan includes many jobs with in-line overrides and has category and
+certification status overrides, for some single jobs and some patterns.
+Matching each job against the set of all the patterns at once is compared
+with trying every pattern on every job, for the field overrides applied to
+the session and for the effective category map.
+"""
+import argparse
+import re
+import time
+
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.session.state import SessionDeviceContext
+from plainbox.impl.unit.job import JobDefinition
+from plainbox.impl.unit.testplan import TestPlanUnit
+
+
+class Provider:
+    namespace = "com.canonical.certification"
+
+
+def make_units(jobs, groups):
+    origin = Origin.get_caller_origin()
+    job_list = [
+        JobDefinition({
+            'id': 'group{}/job{}'.format(index % groups, index),
+            'plugin': 'shell', 'command': 'true'},
+            origin, provider=Provider())
+        for index in range(jobs)]
+    include = "\n".join(
+        "group{}/job{} certification-status=blocker".format(
+            index % groups, index)
+        for index in range(0, jobs, 2))
+    category_overrides = "\n".join(
+        ["apply group{0} to group{0}/.*".format(group)
+         for group in range(groups)] +
+        ["apply special to group{}/job{}".format(index % groups, index)
+         for index in range(0, jobs, 3)])
+    certification_status_overrides = "\n".join(
+        "apply non-blocker to group{}/job{}".format(index % groups, index)
+        for index in range(0, jobs, 5))
+    test_plan = TestPlanUnit({
+        'id': 'test-plan', 'include': include + "\ngroup.*",
+        'category_overrides': category_overrides,
+        'certification_status_overrides': certification_status_overrides,
+    }, provider=Provider())
+    return job_list, test_plan
+
+
+def legacy_bulk_override_update(ctx):
+    for job_state in ctx.state.job_state_map.values():
+        job = job_state.job
+        for pattern, override_list in ctx.override_map.items():
+            if re.match(pattern, job.id):
+                job_state.apply_overrides(override_list)
+
+
+def legacy_get_effective_category_map(test_plan, job_list):
+    effective_map = {job.id: job.category_id for job in job_list}
+    overrides_gen = test_plan.parse_category_overrides(
+        test_plan.category_overrides)
+    for lineno_offset, category_id, pattern in overrides_gen:
+        for job in job_list:
+            if re.match(pattern, job.id):
+                effective_map[job.id] = category_id
+    return effective_map
+
+
+def get_overrides(ctx):
+    return {job_id: (job_state.effective_category_id,
+                     job_state.effective_certification_status)
+            for job_id, job_state in ctx.state.job_state_map.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=50)
+    args = parser.parse_args()
+
+    job_list, test_plan = make_units(args.jobs, args.groups)
+    test_plan.parse_category_overrides(test_plan.category_overrides)
+    override_list = []
+    for legacy in (True, False):
+        ctx = SessionDeviceContext()
+        for job in job_list:
+            ctx.add_unit(job)
+        ctx._test_plan_list = [test_plan]
+        ctx._invalidate_override_map()
+        # Parsing the test plan is not measured
+        ctx.override_map
+        start = time.perf_counter()
+        if legacy:
+            legacy_bulk_override_update(ctx)
+        else:
+            ctx._bulk_override_update()
+        elapsed = time.perf_counter() - start
+        override_list.append(get_overrides(ctx))
+        print("field overrides, {}: {} patterns, {} jobs in {:.2f}s".format(
+            "every pattern" if legacy else "pattern set",
+            len(ctx.override_map), len(job_list), elapsed))
+    assert override_list[0] == override_list[1]
+
+    start = time.perf_counter()
+    legacy_map = legacy_get_effective_category_map(test_plan, job_list)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    category_map = test_plan.get_effective_category_map(job_list)
+    elapsed = time.perf_counter() - start
+    print("category map: every pattern {:.2f}s, pattern set {:.2f}s".format(
+        legacy_time, elapsed))
+    assert legacy_map == category_map
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark running parallel-safe jobs.
+
+A session made of info-gathering jobs (commands that mostly wait) is run one
+job at a time and with SessionAssistant.run_jobs_in_parallel(), like the
+launcher does depending on the max_parallel_jobs option.
+"""
+import argparse
+import subprocess
+import time
+from unittest import mock
+
+from plainbox.impl.developer import UsageExpectation
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.session.assistant import SessionAssistant
+from plainbox.impl.session.state import SessionState
+from plainbox.impl.testing_utils import make_job
+
+
+class Runner:
+
+    def get_worker(self):
+        return self
+
+    def get_warm_up_sequence(self, job_list):
+        return []
+
+    def run_job(self, job, job_state, environ=None, ui=None):
+        proc = subprocess.run(
+            ["sh", "-c", job.command], stdout=subprocess.PIPE)
+        return MemoryJobResult({
+            "outcome": "pass" if proc.returncode == 0 else "fail",
+            "return_code": proc.returncode,
+            "io_log": [(0, "stdout", proc.stdout)]})
+
+
+def make_session_assistant(jobs, command):
+    job_list = [
+        make_job("job-{}".format(index), plugin="shell", command=command,
+                 flags="parallel-safe")
+        for index in range(jobs)]
+    state = SessionState(job_list)
+    state.update_desired_job_list(job_list)
+    sa = SessionAssistant("benchmark", "1.0", "0.99", [])
+    sa._context = mock.Mock(state=state)
+    sa._context.get_unit.side_effect = (
+        lambda job_id, kind: state.job_state_map[job_id].job)
+    sa._manager = mock.Mock()
+    sa._config = mock.Mock(environment={})
+    sa._config.get_value.return_value = False
+    sa._metadata = mock.Mock()
+    sa._restart_strategy = None
+    sa._runner = Runner()
+    UsageExpectation.of(sa).allowed_calls = (
+        sa._get_allowed_calls_in_normal_state())
+    return sa, [job.id for job in state.run_list]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--command", default="sleep 0.05; echo info")
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    sa, job_id_list = make_session_assistant(args.jobs, args.command)
+    start = time.perf_counter()
+    for job_id in job_id_list:
+        builder = sa.run_job(job_id, "silent", False)
+        sa.use_job_result(job_id, builder.get_result())
+    serial_time = time.perf_counter() - start
+
+    sa, job_id_list = make_session_assistant(args.jobs, args.command)
+    start = time.perf_counter()
+    for job_id, builder in sa.run_jobs_in_parallel(
+            job_id_list, args.max_workers):
+        if builder is None:
+            builder = sa.run_job(job_id, "silent", False)
+        sa.use_job_result(job_id, builder.get_result())
+    parallel_time = time.perf_counter() - start
+    print("{} jobs: one at a time {:.2f}s, {} workers {:.2f}s".format(
+        args.jobs, serial_time, args.max_workers, parallel_time))
+
+
+if __name__ == "__main__":
+    main()
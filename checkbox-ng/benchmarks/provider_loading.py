@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark loading the units of providers from source.
+
+The providers are loaded twice: first with an empty unit cache and then
+again once the cache is populated, as when checkbox is started again.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from plainbox.impl.secure.providers.v1 import Provider1
+from plainbox.impl.secure.providers.v1 import Provider1Definition
+from plainbox.impl.unitcache import unit_cache
+
+PROVIDERS_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "providers")
+
+
+def load_providers(path_list):
+    unit_count = 0
+    for path in path_list:
+        name = os.path.basename(os.path.normpath(path))
+        definition = Provider1Definition()
+        definition.location = path
+        definition.name = "checkbox-provider-{}".format(name)
+        definition.namespace = "com.canonical.certification"
+        definition.version = "1.0"
+        definition.description = name
+        definition.gettext_domain = definition.name
+        provider = Provider1.from_definition(definition, secure=False)
+        unit_count += len(provider.unit_list)
+    return unit_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "providers", nargs="*", metavar="PROVIDER",
+        default=[os.path.join(PROVIDERS_DIR, name) for name in (
+            "base", "resource", "certification-client")],
+        help="provider source directories (default: %(default)s)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as cache_path:
+        unit_cache._cache_path = cache_path
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            unit_count = load_providers(args.providers)
+            print("{}: {} units: {:.3f}s".format(
+                label, unit_count, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
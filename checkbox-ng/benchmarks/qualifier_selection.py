@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark selecting the jobs of a test plan.
+
+A test plan with as many include patterns as the synthetic providers have
+categories of jobs, most of them designating jobs by their id and the others
+all the jobs of a category, selects its jobs with select_jobs(). This is
+compared with trying every qualifier on every job, as select_jobs() used to.
+"""
+import argparse
+import time
+
+from plainbox.abc import IJobQualifier
+from plainbox.impl.job import JobDefinition
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.secure.qualifiers import RegExpJobQualifier
+from plainbox.impl.secure.qualifiers import select_jobs
+
+
+def select_jobs_without_index(job_list, qualifier_list):
+    included_list = []
+    included_set = set()
+    excluded_set = set()
+    for qualifier in qualifier_list:
+        for j_index, job in enumerate(job_list):
+            vote = qualifier.get_vote(job)
+            if vote == IJobQualifier.VOTE_INCLUDE:
+                if j_index not in included_set:
+                    included_set.add(j_index)
+                    included_list.append(j_index)
+            elif vote == IJobQualifier.VOTE_EXCLUDE:
+                excluded_set.add(j_index)
+    return [job_list[index] for index in included_list
+            if index not in excluded_set]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--patterns", type=int, default=2000)
+    args = parser.parse_args()
+
+    origin = Origin.get_caller_origin()
+    job_list = [JobDefinition({
+        'id': 'com.canonical.certification::category{}/job{}'.format(
+            index % args.categories, index)}, origin)
+        for index in range(args.jobs)]
+    # Identifiers are computed on first use, don't time that
+    for job in job_list:
+        job.id
+    qualifier_list = []
+    for index in range(args.patterns):
+        if index % 10:
+            pattern = '^com.canonical.certification::category{}/job{}$'
+            pattern = pattern.format(index % args.categories, index)
+        else:
+            pattern = '^com.canonical.certification::category{}/.*$'
+            pattern = pattern.format(index % args.categories)
+        qualifier_list.append(RegExpJobQualifier(pattern, origin))
+
+    start = time.perf_counter()
+    indexed = select_jobs(job_list, qualifier_list)
+    indexed_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = select_jobs_without_index(job_list, qualifier_list)
+    full_time = time.perf_counter() - start
+    assert indexed == expected
+    print("{} patterns, {} jobs, {} selected: every job {:.2f}s, "
+          "indexed {:.3f}s".format(args.patterns, args.jobs, len(expected),
+                                   full_time, indexed_time))
+
+
+if __name__ == "__main__":
+    main()
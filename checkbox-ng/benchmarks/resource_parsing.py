@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark parsing the output of resource jobs.
+
+Synthetic outputs shaped like those of the package, dpkg and udev resource
+jobs, several megabytes each, are parsed from the I/O log of a result with
+the record parser used for unit definitions and with the one for resources.
+"""
+import argparse
+import time
+from unittest import mock
+
+from plainbox.impl.ctrl import gen_resource_data_from_io_log
+from plainbox.impl.ctrl import gen_rfc822_records_from_io_log
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.unit.job import JobDefinition
+
+
+def make_package(index):
+    return (
+        "name: package{0}\n"
+        "version: 1.{0}-0ubuntu1\n"
+        "modalias: pci:v0000{1:04X}d*sv*sd*bc*sc*i*\n"
+        "\n").format(index, index % 0xffff)
+
+
+def make_dpkg(index):
+    return (
+        "package: package{0}\n"
+        "status: install ok installed\n"
+        "architecture: amd64\n"
+        "version: 1.{0}-0ubuntu1\n"
+        "description: Package number {0}\n"
+        " This package does something useful, as described in this long\n"
+        " description spanning a few lines.\n"
+        " .\n"
+        " It is here to make the output larger.\n"
+        "\n").format(index)
+
+
+def make_udev(index):
+    return (
+        "path: /devices/pci0000:00/0000:00:{0:02x}.0/usb{0}/{0}-1\n"
+        "name: device{0}\n"
+        "bus: usb\n"
+        "category: OTHER\n"
+        "driver: usb\n"
+        "product_id: {1}\n"
+        "vendor_id: {2}\n"
+        "product: Product {0}\n"
+        "vendor: Vendor {0}\n"
+        "product_slug: Product_{0}\n"
+        "vendor_slug: Vendor_{0}\n"
+        "\n").format(index % 256, index % 65536, (index * 7) % 65536)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=8,
+                        help="size of each output, MiB")
+    args = parser.parse_args()
+
+    job = mock.Mock(spec=JobDefinition, id="resource")
+    for name, make_record in (("package", make_package), ("dpkg", make_dpkg),
+                              ("udev", make_udev)):
+        io_log = []
+        size = 0
+        index = 0
+        while size < args.size * 1024 * 1024:
+            for line in make_record(index).splitlines(True):
+                io_log.append((0, 'stdout', line.encode("UTF-8")))
+                size += len(line)
+            index += 1
+        result = MemoryJobResult({'io_log': io_log})
+
+        start = time.perf_counter()
+        expected = [record.data
+                    for record in gen_rfc822_records_from_io_log(job, result)]
+        records_time = time.perf_counter() - start
+        start = time.perf_counter()
+        data_list = list(gen_resource_data_from_io_log(job, result))
+        data_time = time.perf_counter() - start
+        assert data_list == expected
+        print("{}: {} records, {:.1f}MiB: records {:.2f}s, data {:.2f}s".format(
+            name, len(data_list), size / 1024 / 1024, records_time,
+            data_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark building and evaluating resource programs.
+
+This mimics what happens when a large test plan is loaded: every job (and
+every job instantiated from a template) gets a resource program that is
+compiled and then evaluated against the output of the resource jobs.
+"""
+import argparse
+import time
+
+from plainbox.impl.resource import Resource
+from plainbox.impl.resource import ResourceProgram
+
+PROGRAM_TEMPLATES = [
+    "device.category == 'NETWORK'",
+    "device.category == 'WIRELESS' and device.driver != 'none'",
+    "package.name == 'fwts' or package.name == 'fwts-efi'",
+    "cpuinfo.platform in ('i386', 'x86_64') and cpuinfo.count > '1'",
+    "module.name == 'kvm' and cpuinfo.platform == 'x86_64' or"
+    " module.name == 'kvm_amd'",
+    "device.category == 'DISK'\npackage.name == 'smartmontools'",
+]
+
+
+def make_resource_map(size):
+    return {
+        'com.canonical.certification::device': [
+            Resource({
+                'category': ('NETWORK', 'WIRELESS', 'DISK', 'USB')[i % 4],
+                'driver': 'drv{}'.format(i),
+                'path': '/devices/pci0000:00/{}'.format(i)})
+            for i in range(size)],
+        'com.canonical.certification::package': [
+            Resource({'name': 'pkg{}'.format(i), 'version': '1.0'})
+            for i in range(size * 4)] + [Resource({'name': 'fwts'})],
+        'com.canonical.certification::cpuinfo': [
+            Resource({'platform': 'x86_64', 'count': '8'})],
+        'com.canonical.certification::module': [
+            Resource({'name': 'mod{}'.format(i)}) for i in range(size)],
+    }
+
+
+def make_program_text_list(count):
+    # Template instances usually differ only in a literal value
+    return [
+        PROGRAM_TEMPLATES[i % len(PROGRAM_TEMPLATES)].replace(
+            "'none'", "'drv{}'".format(i % 50))
+        for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--programs", type=int, default=5000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    resource_map = make_resource_map(args.resources)
+    text_list = make_program_text_list(args.programs)
+    for round_no in range(args.rounds):
+        start = time.perf_counter()
+        program_list = [
+            ResourceProgram(text, "com.canonical.certification")
+            for text in text_list]
+        built = time.perf_counter()
+        for program in program_list:
+            try:
+                program.evaluate_or_raise(resource_map)
+            except Exception:
+                pass
+        done = time.perf_counter()
+        print("round {}: build {:.3f}s, evaluate {:.3f}s".format(
+            round_no, built - start, done - built))
+
+
+if __name__ == "__main__":
+    main()
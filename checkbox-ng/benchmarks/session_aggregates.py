@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark querying the outcome aggregates of a session.
+
+A session with many jobs is run, and after each result the outcome
+statistics, category maps and global outcomes are queried, as the progress
+display and the exporters do. The aggregates maintained by the session are
+compared with scanning all the jobs for every query, as the session used to
+do.
+"""
+import argparse
+import collections
+import time
+
+from plainbox.abc import IJobResult
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.session import SessionState
+from plainbox.impl.testing_utils import make_job
+from plainbox.impl.unit.category import CategoryUnit
+
+SPECIAL = ("resource", "attachment")
+OUTCOMES = (IJobResult.OUTCOME_PASS, IJobResult.OUTCOME_FAIL,
+            IJobResult.OUTCOME_SKIP, IJobResult.OUTCOME_CRASH)
+
+
+def reduce_outcomes(outcome_list):
+    outcome_list = set(outcome_list)
+    if outcome_list & {IJobResult.OUTCOME_FAIL, IJobResult.OUTCOME_CRASH}:
+        return IJobResult.OUTCOME_FAIL
+    if IJobResult.OUTCOME_PASS in outcome_list:
+        return IJobResult.OUTCOME_PASS
+    return IJobResult.OUTCOME_SKIP
+
+
+def legacy_query(session):
+    state_list = list(session.job_state_map.values())
+    stats = collections.Counter(
+        s.result.outcome for s in state_list if s.result.outcome)
+    test_stats = collections.Counter(
+        s.result.outcome for s in state_list
+        if s.result.outcome and s.job.plugin not in SPECIAL)
+    wanted = {s.effective_category_id for s in state_list
+              if s.result.outcome is not None}
+    wanted_lite = {s.effective_category_id for s in state_list
+                   if s.result.outcome is not None
+                   and s.job.plugin not in SPECIAL}
+    category_map = {u.id: u.tr_name() for u in session.unit_list
+                    if u.Meta.name == 'category' and u.id in wanted}
+    category_map_lite = {u.id: u.tr_name() for u in session.unit_list
+                         if u.Meta.name == 'category' and u.id in wanted_lite}
+    outcome_map = collections.defaultdict(list)
+    for s in state_list:
+        if s.job.plugin not in SPECIAL and s.effective_category_id in wanted:
+            outcome_map[s.effective_category_id].append(s.result.outcome)
+    global_outcomes = tuple(
+        reduce_outcomes(s.result.outcome for s in state_list
+                        if s.job.plugin == plugin and s.result.outcome)
+        for plugin in SPECIAL)
+    return (dict(stats), dict(test_stats), category_map, category_map_lite,
+            {c: reduce_outcomes(o) for c, o in outcome_map.items()},
+            global_outcomes)
+
+
+def query(session):
+    return (dict(session.get_outcome_stats()),
+            dict(session.get_test_outcome_stats()),
+            session.category_map, session.category_map_lite,
+            session.category_outcome_map,
+            (session.resource_global_outcome,
+             session.attachment_global_outcome))
+
+
+def run(query_fn, unit_list, job_list):
+    session = SessionState(unit_list)
+    start = time.perf_counter()
+    for index, job in enumerate(job_list):
+        session.update_job_result(job, MemoryJobResult(
+            {'outcome': OUTCOMES[index % len(OUTCOMES)]}))
+        result = query_fn(session)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=3000)
+    parser.add_argument("--categories", type=int, default=50)
+    args = parser.parse_args()
+
+    category_list = [
+        CategoryUnit({'id': 'cat-{}'.format(index),
+                      'name': 'Category {}'.format(index)})
+        for index in range(args.categories)]
+    job_list = [
+        make_job('job-{}'.format(index),
+                 plugin=('shell', 'resource', 'attachment')[index % 3],
+                 category_id='cat-{}'.format(index % args.categories))
+        for index in range(args.jobs)]
+    unit_list = job_list + category_list
+    legacy_time, legacy_result = run(legacy_query, unit_list, job_list)
+    time_, result = run(query, unit_list, job_list)
+    assert result == legacy_result
+    print("query aggregates after each of {} results: scan {:.2f}s,"
+          " incremental {:.2f}s".format(args.jobs, legacy_time, time_))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark discovering the sessions saved in the session repository.
+
+Many sessions with results for many jobs are saved, then the meta-data of
+all of them is read the way the resume prompt does. Loading and peeking at
+every checkpoint is compared with reading the meta-data saved next to it
+(the first pass saves it, as it happens for sessions saved by older
+versions).
+"""
+import argparse
+import time
+from tempfile import TemporaryDirectory
+
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.session.resume import SessionPeekHelper
+from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.storage import SessionStorage
+from plainbox.impl.session.storage import WellKnownDirsHelper
+from plainbox.impl.session.suspend import SessionSuspendHelper
+from plainbox.impl.unit.job import JobDefinition
+
+
+def make_checkpoint(jobs):
+    origin = Origin.get_caller_origin()
+    session = SessionState([
+        JobDefinition({'id': 'job{}'.format(index), 'plugin': 'shell',
+                       'command': 'true'}, origin)
+        for index in range(jobs)])
+    for job in session.job_list:
+        session.update_job_result(job, MemoryJobResult({
+            'outcome': 'pass', 'comments': 'comment',
+            'io_log': [(0.0, 'stdout', b'output line\n')] * 10}))
+    session.update_desired_job_list(session.job_list)
+    session.metadata.app_id = 'benchmark'
+    session.metadata.flags = {'incomplete'}
+    session.metadata.last_job_start_time = time.time()
+    return SessionSuspendHelper().suspend(session)
+
+
+def peek_checkpoints():
+    metadata_list = []
+    for storage in WellKnownDirsHelper.get_storage_list():
+        data = storage.load_checkpoint()
+        metadata_list.append(SessionPeekHelper().peek(
+            data, storage.load_journal(data)))
+    return metadata_list
+
+
+def peek_storages():
+    return [SessionPeekHelper().peek_storage(storage)
+            for storage in WellKnownDirsHelper.get_storage_list()]
+
+
+def summarize(metadata_list):
+    return [(metadata.app_id, metadata.flags, metadata.title,
+             metadata.running_job_name) for metadata in metadata_list]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=1000,
+                        help="number of jobs with a result in each session")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdir:
+        WellKnownDirsHelper.base_of_everything = tmpdir
+        data = make_checkpoint(args.jobs)
+        for index in range(args.sessions):
+            storage = SessionStorage.create('benchmark-{}-'.format(index))
+            storage.save_checkpoint(data)
+            storage.reset_journal(data)
+        result_list = []
+        for name, peek in (("load checkpoints", peek_checkpoints),
+                           ("first pass, save meta-data", peek_storages),
+                           ("saved meta-data", peek_storages)):
+            start = time.perf_counter()
+            result_list.append(summarize(peek()))
+            elapsed = time.perf_counter() - start
+            print("{}: {} sessions in {:.2f}s".format(
+                name, args.sessions, elapsed))
+        assert all(result == result_list[0] for result in result_list)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark the memory used by the job states of a large session.
+
+A session is created with many jobs, like instantiated template jobs that
+depend on a few common jobs and require resources that are not there yet.
+Half of them are selected to run. The memory allocated for the session
+state (job states and readiness inhibitors) is reported, along with the
+time taken to recompute the readiness of all jobs and by a full garbage
+collection.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from plainbox.impl.session import SessionState
+from plainbox.impl.testing_utils import make_job
+
+
+def make_job_list(count):
+    job_list = [make_job('setup-{}'.format(index)) for index in range(10)]
+    job_list.append(make_job('device', plugin='resource'))
+    for index in range(count):
+        job_list.append(make_job(
+            'job-{}'.format(index), plugin='shell',
+            depends='setup-{}'.format(index % 10),
+            requires='device.index == "{}"'.format(index)))
+    return job_list
+
+
+def make_session(job_list):
+    session = SessionState(job_list)
+    session.update_desired_job_list(job_list[::2])
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=30000)
+    parser.add_argument("--passes", type=int, default=5,
+                        help="number of readiness recomputations")
+    args = parser.parse_args()
+
+    job_list = make_job_list(args.jobs)
+    # Resolve dependencies and resource programs before measuring, they are
+    # cached in the job definitions
+    make_session(job_list)
+    gc.collect()
+    tracemalloc.start()
+    session = make_session(job_list)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    session._recompute_job_readiness()
+    peak = tracemalloc.get_traced_memory()[1] - size
+    tracemalloc.stop()
+    print("session state: {:.1f} MiB ({} bytes per job)".format(
+        size / 1024 / 1024, size // len(job_list)))
+    print("allocated while recomputing readiness: {:.1f} MiB".format(
+        peak / 1024 / 1024))
+
+    start = time.perf_counter()
+    for _ in range(args.passes):
+        session._recompute_job_readiness()
+    elapsed = time.perf_counter() - start
+    print("recompute readiness: {:.2f}s per pass".format(
+        elapsed / args.passes))
+    start = time.perf_counter()
+    gc.collect()
+    print("full garbage collection: {:.3f}s".format(
+        time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
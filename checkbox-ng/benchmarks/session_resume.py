@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark resuming a session with thousands of jobs.
+
+A session with resource jobs, jobs requiring their resources, jobs generated
+from a template and results for all of them is suspended and then resumed
+the way it is after a reboot. Restoring the jobs and results in bulk, with
+readiness computed once, is compared with restoring them one by one.
+"""
+import argparse
+import time
+
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.session.resume import SessionResumeHelper
+from plainbox.impl.session.resume import SessionResumeHelper1
+from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.suspend import SessionSuspendHelper
+from plainbox.impl.unit.job import JobDefinition
+from plainbox.impl.unit.template import TemplateUnit
+
+
+def make_units(jobs, resources, generated):
+    origin = Origin.get_caller_origin()
+    unit_list = []
+    for index in range(resources):
+        unit_list.append(JobDefinition({
+            'id': 'resource{}'.format(index), 'plugin': 'resource',
+            'command': 'true'}, origin))
+    unit_list.append(JobDefinition({
+        'id': 'devices', 'plugin': 'resource', 'command': 'true'}, origin))
+    unit_list.append(TemplateUnit({
+        'template-resource': 'devices', 'id': 'device/{name}',
+        'plugin': 'shell', 'command': 'true'}, origin))
+    for index in range(jobs):
+        unit_list.append(JobDefinition({
+            'id': 'job{}'.format(index), 'plugin': 'shell',
+            'command': 'true',
+            'requires': 'resource{}.state == "on"'.format(index % resources),
+            'depends': 'job{}'.format(index - 1) if index % 10 else '',
+        }, origin))
+    devices = "".join(
+        "name: dev{}\n\n".format(index) for index in range(generated))
+    return unit_list, devices.encode("UTF-8")
+
+
+def make_session(unit_list, devices):
+    session = SessionState(unit_list)
+    for job in list(session.job_list):
+        if job.plugin == 'resource':
+            output = devices if job.id == 'devices' else b'state: on\n'
+            io_log = [(0.0, 'stdout', output)]
+        else:
+            io_log = []
+        session.update_job_result(job, MemoryJobResult(
+            {'outcome': 'pass', 'io_log': io_log}))
+    # Generated jobs get their results too
+    for job in session.job_list:
+        if job.id.startswith('device/'):
+            session.update_job_result(
+                job, MemoryJobResult({'outcome': 'pass'}))
+    session.update_desired_job_list(session.job_list)
+    session.metadata.last_job_start_time = time.time()
+    return session
+
+
+def get_state(session):
+    return (
+        [job.id for job in session.job_list],
+        [job.id for job in session.run_list],
+        {job_id: (job_state.result.outcome,
+                  [str(inhibitor)
+                   for inhibitor in job_state.readiness_inhibitor_list])
+         for job_id, job_state in session.job_state_map.items()},
+        session.resource_map)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--resources", type=int, default=50)
+    parser.add_argument("--generated", type=int, default=500)
+    args = parser.parse_args()
+
+    unit_list, devices = make_units(
+        args.jobs, args.resources, args.generated)
+    session = make_session(unit_list, devices)
+    data = SessionSuspendHelper().suspend(session)
+    state_list = []
+    for bulk_resume in (False, True):
+        SessionResumeHelper1.bulk_resume = bulk_resume
+        start = time.perf_counter()
+        resumed = SessionResumeHelper(unit_list, None, None).resume(data)
+        elapsed = time.perf_counter() - start
+        state_list.append(get_state(resumed))
+        print("{}: {} jobs in {:.2f}s".format(
+            "bulk" if bulk_resume else "one by one",
+            len(resumed.job_list), elapsed))
+    assert state_list[0] == state_list[1]
+
+
+if __name__ == "__main__":
+    main()
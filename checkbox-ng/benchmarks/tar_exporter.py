@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark exporting a session to the submission tarball.
+
+A session with many jobs that have on-disk I/O logs is exported with the
+TAR exporter, which renders the html, json and junit reports.
+"""
+import argparse
+import io
+import tempfile
+import time
+
+from plainbox.abc import IJobResult
+from plainbox.impl.exporter import tar as tar_module
+from plainbox.impl.providers.special import get_categories
+from plainbox.impl.result import DiskJobResult
+from plainbox.impl.result import get_io_log_stream_filename
+from plainbox.impl.session import SessionManager
+from plainbox.impl.testing_utils import make_io_log
+from plainbox.impl.unit.job import JobDefinition
+
+
+def make_session(job_count, line_count, io_log_dir):
+    manager = SessionManager.create()
+    manager.add_local_device_context()
+    state = manager.default_device_context.state
+    for unit in get_categories().unit_list:
+        state.add_unit(unit)
+    io_log = [
+        (0.01, "stdout", "line {} of the output\n".format(index).encode())
+        for index in range(line_count)]
+    for index in range(job_count):
+        job = JobDefinition({
+            "id": "job_{}".format(index),
+            "_summary": "job {}".format(index),
+            "plugin": "attachment" if index % 10 == 0 else "shell",
+        })
+        state.add_unit(job)
+        io_log_filename = make_io_log(io_log, io_log_dir, binary=True)
+        # The runner always leaves the raw stdout next to the record
+        with open(get_io_log_stream_filename(
+                io_log_filename, "stdout"), "wb") as stream:
+            stream.writelines(record[2] for record in io_log)
+        state.update_job_result(job, DiskJobResult({
+            "outcome": IJobResult.OUTCOME_PASS,
+            "io_log_filename": io_log_filename,
+        }))
+    return manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--no-view", action="store_true",
+                        help="render each report from the session directly")
+    args = parser.parse_args()
+    if args.no_view:
+        tar_module._SessionManagerView = lambda manager: manager
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_session(args.jobs, args.lines, tmp)
+        try:
+            exporter = tar_module.TARSessionStateExporter()
+            start = time.perf_counter()
+            exporter.dump_from_session_manager(manager, io.BytesIO())
+            print("{} jobs: {:.3f}s".format(
+                args.jobs, time.perf_counter() - start))
+        finally:
+            manager.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark instantiating and rendering jinja2 template units.
+
+A jinja2 template unit is instantiated once for each resource record and the
+fields that are typically looked at when listing, selecting and exporting
+jobs are rendered.
+"""
+import argparse
+import time
+
+from jinja2 import Template
+
+from plainbox.impl.resource import Resource
+from plainbox.impl.unit import unit as unit_module
+from plainbox.impl.unit.template import TemplateUnit
+
+TEMPLATE_DATA = {
+    "template-engine": "jinja2",
+    "template-resource": "device",
+    "template-unit": "job",
+    "unit": "template",
+    "plugin": "shell",
+    "id": "disk/stats_{{ name }}",
+    "_summary": "Disk statistics for {{ product_slug }}",
+    "_description": (
+        "This test checks disk stats, generally for changes in stats after "
+        "transferring data to {{ name }} ({{ vendor }} {{ product }})."),
+    "requires": "block_device.{{ name }}_state != 'removable'",
+    "user": "root",
+    "command": (
+        "{% if __on_ubuntucore__ %}disk_stats_test {{ name }}"
+        "{% else %}disk_stats_test.sh {{ name }}{% endif %}"),
+    "category_id": "com.canonical.plainbox::disk",
+    "estimated_duration": "10.0",
+}
+
+FIELDS = ("id", "summary", "description", "requires", "command", "user")
+
+
+def render_all(count):
+    template = TemplateUnit(TEMPLATE_DATA)
+    resource_list = [
+        Resource({
+            "name": "sd{}".format(index),
+            "vendor": "Vendor {}".format(index % 7),
+            "product": "Disk {}".format(index),
+            "product_slug": "disk_{}".format(index),
+        })
+        for index in range(count)]
+    unit_list = list(template.instantiate_all(resource_list))
+    for unit in unit_list:
+        for field in FIELDS:
+            unit.get_record_value(field)
+            unit.get_translated_record_value(field)
+    return unit_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="compile each template again, as before")
+    args = parser.parse_args()
+    if args.no_cache:
+        unit_module.get_jinja2_template = Template
+    start = time.perf_counter()
+    render_all(args.units)
+    print("{} units: {:.3f}s".format(
+        args.units, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
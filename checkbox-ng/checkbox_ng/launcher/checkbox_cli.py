@@ -21,61 +21,77 @@ Checkbox Launcher Interpreter Application
 """
 
 import gettext
+import importlib
 import logging
 import os
 import subprocess
 import sys
 
-from plainbox.impl.jobcache import ResourceJobCache
-from plainbox.impl.session.assistant import SessionAssistant
-
-from checkbox_ng.config import load_configs
-from checkbox_ng.launcher.subcommands import (
-    Launcher,
-    List,
-    Run,
-    StartProvider,
-    Submit,
-    ListBootstrapped,
-    TestPlanExport,
-    Show,
-)
-from checkbox_ng.launcher.check_config import CheckConfig
-from checkbox_ng.launcher.merge_reports import MergeReports
-from checkbox_ng.launcher.merge_submissions import MergeSubmissions
-from checkbox_ng.launcher.controller import RemoteController
-from checkbox_ng.launcher.agent import RemoteAgent
-
 
 _ = gettext.gettext
 
 _logger = logging.getLogger("checkbox-cli")
 
+# Implementations of the subcommands, as "module:class". They are only
+# imported when dispatched, importing all of them (and everything they need)
+# would make each invocation of checkbox-cli pay for the slowest one.
+SUBCOMMANDS = {
+    "check-config": "checkbox_ng.launcher.check_config:CheckConfig",
+    "launcher": "checkbox_ng.launcher.subcommands:Launcher",
+    "list": "checkbox_ng.launcher.subcommands:List",
+    "run": "checkbox_ng.launcher.subcommands:Run",
+    "startprovider": "checkbox_ng.launcher.subcommands:StartProvider",
+    "submit": "checkbox_ng.launcher.subcommands:Submit",
+    "show": "checkbox_ng.launcher.subcommands:Show",
+    "list-bootstrapped": "checkbox_ng.launcher.subcommands:ListBootstrapped",
+    "merge-reports": "checkbox_ng.launcher.merge_reports:MergeReports",
+    "merge-submissions":
+        "checkbox_ng.launcher.merge_submissions:MergeSubmissions",
+    "tp-export": "checkbox_ng.launcher.subcommands:TestPlanExport",
+    "run-agent": "checkbox_ng.launcher.agent:RemoteAgent",
+    "control": "checkbox_ng.launcher.controller:RemoteController",
+}
+
+
+def load_subcommand(name):
+    """
+    Import the class implementing a subcommand.
+
+    :param name:
+        Name of the subcommand, as typed on the command line
+    :returns:
+        The class implementing it
+    :raises KeyError:
+        If there is no such subcommand
+    """
+    module_name, class_name = SUBCOMMANDS[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
 
 class Context:
-    def __init__(self, args, sa):
+    def __init__(self, args, sa=None):
         self.args = args
-        self.sa = sa
+        self._sa = sa
+
+    @property
+    def sa(self):
+        # Created on first use, many subcommands don't need a session
+        if self._sa is None:
+            from plainbox.impl.session.assistant import SessionAssistant
+
+            self._sa = SessionAssistant(
+                "com.canonical:checkbox-cli",
+                "0.99",
+                "0.99",
+                ["restartable"],
+            )
+        return self._sa
 
 
 def main():
     import argparse
 
-    commands = {
-        "check-config": CheckConfig,
-        "launcher": Launcher,
-        "list": List,
-        "run": Run,
-        "startprovider": StartProvider,
-        "submit": Submit,
-        "show": Show,
-        "list-bootstrapped": ListBootstrapped,
-        "merge-reports": MergeReports,
-        "merge-submissions": MergeSubmissions,
-        "tp-export": TestPlanExport,
-        "run-agent": RemoteAgent,
-        "control": RemoteController,
-    }
+    commands = SUBCOMMANDS
     deprecated_commands = {
         "slave": "run-agent",
         "service": "run-agent",
@@ -138,25 +154,21 @@ def main():
             break
     args = top_parser.parse_args(sys.argv[1 : subcmd_index + 1])
     subcmd_parser = argparse.ArgumentParser()
-    subcmd = commands[args.subcommand]()
+    subcmd = load_subcommand(args.subcommand)()
     subcmd.register_arguments(subcmd_parser)
     sub_args = subcmd_parser.parse_args(sys.argv[subcmd_index + 1 :])
-    sa = SessionAssistant(
-        "com.canonical:checkbox-cli",
-        "0.99",
-        "0.99",
-        ["restartable"],
-    )
-    ctx = Context(sub_args, sa)
+    ctx = Context(sub_args)
     try:
         socket.getaddrinfo("localhost", 443)  # 443 for HTTPS
     except Exception:
         pass
     if "--clear-cache" in sys.argv:
+        from plainbox.impl.jobcache import ResourceJobCache
+
         ResourceJobCache().clear()
     if "--clear-old-sessions" in sys.argv:
-        old_sessions = [s[0] for s in sa.get_old_sessions()]
-        sa.delete_sessions(old_sessions)
+        old_sessions = [s[0] for s in ctx.sa.get_old_sessions()]
+        ctx.sa.delete_sessions(old_sessions)
     if args.verbose:
         logging_level = logging.INFO
         logging.basicConfig(level=logging_level)
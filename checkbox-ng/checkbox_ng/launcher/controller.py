@@ -22,6 +22,7 @@ functionality.
 import contextlib
 import getpass
 import gettext
+import hashlib
 import ipaddress
 import json
 import logging
@@ -32,6 +33,7 @@ import time
 import signal
 import sys
 import itertools
+import zlib
 
 from collections import namedtuple
 from functools import partial
@@ -41,6 +43,7 @@ from plainbox.abc import IJobResult
 from plainbox.impl.color import Colorizer
 from plainbox.impl.config import Configuration
 from plainbox.impl.session.remote_assistant import RemoteSessionAssistant
+from plainbox.impl.session.remote_assistant import REPORT_TRANSFER_CODECS
 from plainbox.vendor import rpyc
 from checkbox_ng.urwid_ui import TestPlanBrowser
 from checkbox_ng.urwid_ui import CategoryBrowser
@@ -111,6 +114,13 @@ class RemoteController(ReportsStage, MainLoopStage):
 
     name = "remote-control"
 
+    # Reports are pulled from the agent in frames of up to this many bytes
+    REPORT_FRAME_SIZE = 4 * 1024 * 1024
+    # Codec used to compress the frames, see REPORT_TRANSFER_CODECS
+    REPORT_TRANSFER_CODEC = "zlib"
+    # How many times in a row a frame is requested before giving up
+    REPORT_TRANSFER_ATTEMPTS = 5
+
     @property
     def is_interactive(self):
         return (
@@ -583,31 +593,54 @@ class RemoteController(ReportsStage, MainLoopStage):
 
     def wait_for_job(self, dont_finish=False):
         _logger.info("controller: Waiting for job to finish.")
+        self._poll_job()
+        if dont_finish:
+            return
+        self.finish_job()
+
+    def _poll_job(self):
+        try:
+            wait_job_output = self.sa.wait_job_output
+        except AttributeError:
+            # TODO: REMOTE API RAPI: Remove this fallback on the next RAPI
+            # bump, agents without wait_job_output() can only be polled
+            wait_job_output = None
         while True:
-            state, payload = self.sa.monitor_job()
+            if wait_job_output is not None:
+                # Returns as soon as the job prints something or finishes
+                state, payload = wait_job_output(0.5)
+            else:
+                state, payload = self.sa.monitor_job()
             if payload and not self._is_bootstrapping:
-                for line in payload.splitlines():
-                    if line.startswith("stderr"):
-                        SimpleUI.red_text(line[6:])
-                    elif line.startswith("stdout"):
-                        SimpleUI.green_text(line[6:])
-                    else:
-                        SimpleUI.black_text(line[6:])
-            if state == "running":
+                self._print_job_output(payload)
+            if state != "running":
+                break
+            if wait_job_output is None:
                 time.sleep(0.5)
-                while True:
-                    res = select.select([sys.stdin], [], [], 0)
-                    if not res[0]:
-                        break
-                    # XXX: this assumes that sys.stdin is chunked in lines
-                    buff = res[0][0].readline()
-                    self.sa.transmit_input(buff)
-                    if not buff:
-                        break
+            for buff in self._read_job_input():
+                self.sa.transmit_input(buff)
+
+    @staticmethod
+    def _print_job_output(payload):
+        for line in payload.splitlines():
+            if line.startswith("stderr"):
+                SimpleUI.red_text(line[6:])
+            elif line.startswith("stdout"):
+                SimpleUI.green_text(line[6:])
             else:
-                if dont_finish:
-                    return
-                self.finish_job()
+                SimpleUI.black_text(line[6:])
+
+    @staticmethod
+    def _read_job_input():
+        """Generate the lines already typed by the operator."""
+        while True:
+            res = select.select([sys.stdin], [], [], 0)
+            if not res[0]:
+                break
+            # XXX: this assumes that sys.stdin is chunked in lines
+            buff = res[0][0].readline()
+            yield buff
+            if not buff:
                 break
 
     def finish_job(self, result=None):
@@ -628,6 +661,23 @@ class RemoteController(ReportsStage, MainLoopStage):
 
     def local_export(self, exporter_id, transport, options=()):
         _logger.info("controller: Exporting locally'")
+        try:
+            prepare_report_transfer = self.sa.prepare_report_transfer
+        except AttributeError:
+            # TODO: REMOTE API RAPI: Remove this fallback on the next RAPI
+            # bump, older agents can only hand out the cached report file
+            exported_stream = self._read_cached_report(
+                exporter_id, transport, options
+            )
+        else:
+            exported_stream = self._transfer_report(
+                prepare_report_transfer, exporter_id, transport, options
+            )
+        exported_stream.seek(0)
+        result = transport.send(exported_stream)
+        return result
+
+    def _read_cached_report(self, exporter_id, transport, options):
         rf = self.sa.cache_report(exporter_id, options)
         exported_stream = SpooledTemporaryFile(max_size=102400, mode="w+b")
         chunk_size = 16384
@@ -646,9 +696,59 @@ class RemoteController(ReportsStage, MainLoopStage):
                 if not buf:
                     break
                 exported_stream.write(buf)
-        exported_stream.seek(0)
-        result = transport.send(exported_stream)
-        return result
+        return exported_stream
+
+    def _transfer_report(
+        self, prepare_report_transfer, exporter_id, transport, options
+    ):
+        """
+        Pull a report from the agent in large, compressed frames.
+
+        A frame that times out is requested again from the same offset, up to
+        REPORT_TRANSFER_ATTEMPTS times in a row.
+        """
+        size, digest = prepare_report_transfer(exporter_id, options)
+        exported_stream = SpooledTemporaryFile(max_size=102400, mode="w+b")
+        checksum = hashlib.sha256()
+        offset = 0
+        with tqdm(
+            total=size,
+            unit="B",
+            unit_scale=True,
+            unit_divisor=1024,
+            disable=not self.is_interactive,
+            postfix={"file": transport.url},
+        ) as pbar:
+            while offset < size:
+                for attempt in range(1, self.REPORT_TRANSFER_ATTEMPTS + 1):
+                    try:
+                        codec, data, crc = self.sa.read_report_frame(
+                            digest,
+                            offset,
+                            self.REPORT_FRAME_SIZE,
+                            self.REPORT_TRANSFER_CODEC,
+                        )
+                        break
+                    except TimeoutError:
+                        if attempt == self.REPORT_TRANSFER_ATTEMPTS:
+                            raise
+                        _logger.warning(
+                            "controller: Report transfer timed out at %d, "
+                            "resuming",
+                            offset,
+                        )
+                data = REPORT_TRANSFER_CODECS[codec][1](data)
+                if not data:
+                    break
+                if zlib.crc32(data) != crc:
+                    raise SystemExit(_("Corrupted report frame received"))
+                exported_stream.write(data)
+                checksum.update(data)
+                offset += len(data)
+                pbar.update(len(data))
+        if offset != size or checksum.hexdigest() != digest:
+            raise SystemExit(_("Incomplete or corrupted report received"))
+        return exported_stream
 
     def _maybe_auto_rerun_jobs(self):
         # create a list of jobs that qualify for rerunning
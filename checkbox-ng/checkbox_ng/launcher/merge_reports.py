@@ -23,13 +23,14 @@
 import json
 import os
 import tarfile
-from tempfile import TemporaryDirectory
 
-from plainbox.impl.ctrl import gen_rfc822_records_from_io_log
+from plainbox.impl.ctrl import gen_resource_data_from_io_log
 from plainbox.impl.providers.special import get_exporters
 from plainbox.impl.resource import Resource
 from plainbox.impl.result import IOLogRecord
 from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.secure.origin import FileTextSource
+from plainbox.impl.secure.origin import Origin
 from plainbox.impl.session import SessionManager
 from plainbox.impl.unit.category import CategoryUnit
 from plainbox.impl.unit.job import JobDefinition
@@ -48,13 +49,29 @@ class MergeReports():
             '-o', '--output-file', metavar='FILE', required=True,
             help='save combined test results to the specified FILE')
 
-    def _parse_submission(self, submission, tmpdir, mode="list"):
+    @staticmethod
+    def _load_submission_json(submission):
+        """
+        Load submission.json straight out of a submission tarball.
+
+        The tarball is read as a stream and only decompressed up to
+        submission.json, nothing gets extracted to the disk.
+        """
+        with tarfile.open(submission, mode='r|*') as tar:
+            for member in tar:
+                if os.path.normpath(member.name) == 'submission.json':
+                    # json.loads() only accepts bytes since Python 3.6
+                    with tar.extractfile(member) as stream:
+                        return json.loads(stream.read().decode('UTF-8'))
+        raise SystemExit(
+            "{}: submission.json not found".format(submission))
+
+    def _parse_submission(self, submission, mode="list"):
         try:
-            with tarfile.open(submission) as tar:
-                tar.extractall(tmpdir.name)
-                with open(os.path.join(
-                          tmpdir.name, 'submission.json')) as f:
-                    data = json.load(f)
+            data = self._load_submission_json(submission)
+            # Passing the origin explicitly spares inspecting the stack to
+            # find one for each unit
+            origin = Origin(FileTextSource(submission))
             for result in data['results']:
                 result['plugin'] = 'shell'  # Required so default to shell
                 result['summary'] = result['name']
@@ -63,9 +80,10 @@ class MergeReports():
                 if "::" not in result['id']:
                     result['id'] = CERTIFICATION_NS + result['id']
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result['id']] = JobDefinition(result)
+                    self.job_dict[result['id']] = JobDefinition(
+                        result, origin=origin)
             for result in data['resource-results']:
                 result['plugin'] = 'resource'
                 result['summary'] = result['name']
@@ -74,9 +92,10 @@ class MergeReports():
                 if "::" not in result['id']:
                     result['id'] = CERTIFICATION_NS + result['id']
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result['id']] = JobDefinition(result)
+                    self.job_dict[result['id']] = JobDefinition(
+                        result, origin=origin)
             for result in data['attachment-results']:
                 result['plugin'] = 'attachment'
                 result['summary'] = result['name']
@@ -85,51 +104,57 @@ class MergeReports():
                 if "::" not in result['id']:
                     result['id'] = CERTIFICATION_NS + result['id']
                 if mode == "list":
-                    self.job_list.append(JobDefinition(result))
+                    self.job_list.append(JobDefinition(result, origin=origin))
                 elif mode == "dict":
-                    self.job_dict[result['id']] = JobDefinition(result)
+                    self.job_dict[result['id']] = JobDefinition(
+                        result, origin=origin)
             for cat_id, cat_name in data['category_map'].items():
                 if mode == "list":
-                    self.category_list.append(
-                        CategoryUnit({'id': cat_id, 'name': cat_name}))
+                    self.category_list.append(CategoryUnit(
+                        {'id': cat_id, 'name': cat_name}, origin=origin))
                 elif mode == "dict":
                     self.category_dict[cat_id] = CategoryUnit(
-                        {'id': cat_id, 'name': cat_name})
-        except OSError as e:
+                        {'id': cat_id, 'name': cat_name}, origin=origin)
+        except (OSError, tarfile.TarError) as e:
             raise SystemExit(e)
         except KeyError as e:
             self._output_potential_action(str(e))
             raise SystemExit(e)
         return data['title']
 
-    def _populate_session_state(self, job, state):
+    def _get_job_result(self, job):
         io_log = [
             IOLogRecord(count, 'stdout', line.encode('utf-8'))
             for count, line in enumerate(
                 job.get_record_value('io_log').splitlines(
                     keepends=True))
         ]
-        result = MemoryJobResult({
+        return MemoryJobResult({
             'outcome': job.get_record_value('outcome',
                                             job.get_record_value('status')),
             'comments': job.get_record_value('comments'),
             'execution_duration': job.get_record_value('duration'),
             'io_log': io_log,
         })
-        state.update_job_result(job, result)
-        if job.plugin == 'resource':
-            new_resource_list = []
-            for record in gen_rfc822_records_from_io_log(job, result):
-                resource = Resource(record.data)
-                new_resource_list.append(resource)
-            if not new_resource_list:
-                new_resource_list = [Resource({})]
-            state.set_resource_list(job.id, new_resource_list)
-        job_state = state.job_state_map[job.id]
-        job_state.effective_category_id = job.get_record_value(
-            'category_id', 'com.canonical.plainbox::uncategorised')
-        job_state.effective_certification_status = job.get_record_value(
-            'certification_status', 'unspecified')
+
+    def _populate_session_state(self, job_list, state):
+        job_result_list = [(job, self._get_job_result(job))
+                           for job in job_list]
+        # Readiness is only recomputed once for the whole session
+        state.update_job_result_list(job_result_list)
+        for job, result in job_result_list:
+            if job.plugin == 'resource':
+                new_resource_list = [
+                    Resource(data)
+                    for data in gen_resource_data_from_io_log(job, result)]
+                if not new_resource_list:
+                    new_resource_list = [Resource({})]
+                state.set_resource_list(job.id, new_resource_list)
+            job_state = state.job_state_map[job.id]
+            job_state.effective_category_id = job.get_record_value(
+                'category_id', 'com.canonical.plainbox::uncategorised')
+            job_state.effective_certification_status = job.get_record_value(
+                'certification_status', 'unspecified')
 
     def _create_exporter(self, exporter_id):
         exporter_map = {}
@@ -158,15 +183,13 @@ class MergeReports():
     def invoked(self, ctx):
         manager_list = []
         for submission in ctx.args.submission:
-            tmpdir = TemporaryDirectory()
             self.job_list = []
             self.category_list = []
-            session_title = self._parse_submission(submission, tmpdir)
+            session_title = self._parse_submission(submission)
             manager = SessionManager.create_with_unit_list(
                 self.job_list + self.category_list)
             manager.state.metadata.title = session_title
-            for job in self.job_list:
-                self._populate_session_state(job, manager.state)
+            self._populate_session_state(self.job_list, manager.state)
             manager_list.append(manager)
         exporter = self._create_exporter(
             'com.canonical.plainbox::html-multi-page')
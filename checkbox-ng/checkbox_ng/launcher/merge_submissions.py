@@ -20,8 +20,8 @@
 :mod:`checkbox-ng.launcher.merge_submissions` -- merge-submissions sub-command
 ==============================================================================
 """
+import os
 import tarfile
-from tempfile import TemporaryDirectory
 
 from checkbox_ng.launcher.merge_reports import MergeReports
 from plainbox.impl.session import SessionManager
@@ -41,24 +41,54 @@ class MergeSubmissions(MergeReports):
             '--title', action='store', metavar='SESSION_NAME',
             help='title of the session to use')
 
+    def _copy_members(self, submission, tar, seen):
+        """
+        Copy the members of a submission tarball to another tarball.
+
+        Members are streamed from one archive to the other without being
+        extracted to the disk.
+
+        :param submission:
+            Path of the submission tarball to copy from
+        :param tar:
+            TarFile opened for writing
+        :param seen:
+            Set of normalized names of the members already in ``tar``, members
+            with those names are skipped. It is updated with the copied ones.
+        """
+        try:
+            with tarfile.open(submission, mode='r|*') as src:
+                for member in src:
+                    name = os.path.normpath(member.name)
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    if member.isfile():
+                        tar.addfile(member, src.extractfile(member))
+                    else:
+                        tar.addfile(member)
+        except (OSError, tarfile.TarError) as e:
+            raise SystemExit(e)
+
     def invoked(self, ctx):
-        tmpdir = TemporaryDirectory()
         self.job_dict = {}
         self.category_dict = {}
         for submission in ctx.args.submission:
-            session_title = self._parse_submission(
-                submission, tmpdir, mode='dict')
+            session_title = self._parse_submission(submission, mode='dict')
         manager = SessionManager.create_with_unit_list(
             list(self.job_dict.values()) + list(self.category_dict.values()))
         manager.state.metadata.title = ctx.args.title or session_title
-        for job in self.job_dict.values():
-            self._populate_session_state(job, manager.state)
+        self._populate_session_state(
+            list(self.job_dict.values()), manager.state)
         exporter = self._create_exporter(
             'com.canonical.plainbox::tar')
-        with open(ctx.args.output_file, 'wb') as stream:
-            exporter.dump_from_session_manager(manager, stream)
-        with tarfile.open(ctx.args.output_file) as tar:
-            tar.extractall(tmpdir.name)
-        with tarfile.open(ctx.args.output_file, mode='w:xz') as tar:
-            tar.add(tmpdir.name, arcname='')
+        with tarfile.open(ctx.args.output_file, mode='w:xz',
+                          preset=exporter.get_preset()) as tar:
+            exporter.dump_to_tarfile(manager, tar)
+            # The merged reports replace the ones of the submissions. Other
+            # members (e.g. attachment files) are copied as they are, the
+            # ones from later submissions win when names clash.
+            seen = {os.path.normpath(name) for name in tar.getnames()}
+            for submission in reversed(ctx.args.submission):
+                self._copy_members(submission, tar, seen)
         print(ctx.args.output_file)
@@ -93,11 +93,14 @@ class MainLoopStage(CheckboxUiStage):
         """
         self._auto_submission_retries = 3
 
-    def _run_single_job_with_ui_loop(self, job, ui):
-        job_state = self.sa.get_job_state(job.id)
+    def _print_job_details(self, job, job_state):
         print(self.C.header(job.tr_summary(), fill="-"))
         print(_("ID: {0}").format(job.id))
         print(_("Category: {0}").format(job_state.effective_category_id))
+
+    def _run_single_job_with_ui_loop(self, job, ui):
+        job_state = self.sa.get_job_state(job.id)
+        self._print_job_details(job, job_state)
         comments = ""
         while True:
             if job.plugin in (
@@ -345,7 +348,7 @@ class MainLoopStage(CheckboxUiStage):
             show_out = False
         return CheckboxUI(self.C.c, show_cmd_output=show_out)
 
-    def _run_jobs(self, jobs_to_run):
+    def _run_jobs(self, jobs_to_run, max_workers=1):
         # some jobs that are planned to be run don't have an
         # estimated_duration defined, but we still want to keep track of
         # the ones that do.  if any of the job doesn't have it we have to
@@ -359,7 +362,9 @@ class MainLoopStage(CheckboxUiStage):
             else:
                 had_unknown_time = True
         header = _("Running job {} / {}. Estimated time left{}: {}")
-        for job_no, job_id in enumerate(jobs_to_run, start=1):
+        job_no = 1
+
+        def print_header():
             print(
                 self.C.header(
                     header.format(
@@ -371,16 +376,35 @@ class MainLoopStage(CheckboxUiStage):
                     )
                 )
             )
-            job = self.sa.get_job(job_id)
-            builder = self._run_single_job_with_ui_loop(
-                job, self._get_ui_for_job(job)
+
+        def get_ui(job):
+            # Called when the turn of a job run in parallel comes
+            print_header()
+            self._print_job_details(job, self.sa.get_job_state(job.id))
+            return self._get_ui_for_job(job)
+
+        if max_workers > 1:
+            job_results = self.sa.run_jobs_in_parallel(
+                jobs_to_run, max_workers, get_ui
             )
+        else:
+            job_results = ((job_id, None) for job_id in jobs_to_run)
+        for job_id, builder in job_results:
+            job = self.sa.get_job(job_id)
+            if builder is None:
+                print_header()
+                builder = self._run_single_job_with_ui_loop(
+                    job, self._get_ui_for_job(job)
+                )
             result = builder.get_result()
             self.sa.use_job_result(job_id, result)
             estimated_time -= job.estimated_duration or 0
+            job_no += 1
+
+    def _run_bootstrap_jobs(self, jobs_to_run, max_workers=1):
+        job_no = 1
 
-    def _run_bootstrap_jobs(self, jobs_to_run):
-        for job_no, job_id in enumerate(jobs_to_run, start=1):
+        def print_header(job_id):
             print(
                 self.C.header(
                     _("Bootstrap {} ({}/{})").format(
@@ -388,8 +412,24 @@ class MainLoopStage(CheckboxUiStage):
                     )
                 )
             )
-            result_builder = self.sa.run_job(job_id, "piano", False)
+
+        def get_ui(job):
+            # Called when the turn of a job run in parallel comes
+            print_header(job.id)
+            return "piano"
+
+        if max_workers > 1:
+            job_results = self.sa.run_bootstrap_jobs_in_parallel(
+                jobs_to_run, max_workers, get_ui
+            )
+        else:
+            job_results = ((job_id, None) for job_id in jobs_to_run)
+        for job_id, result_builder in job_results:
+            if result_builder is None:
+                print_header(job_id)
+                result_builder = self.sa.run_job(job_id, "piano", False)
             self.sa.use_job_result(job_id, result_builder.get_result())
+            job_no += 1
 
     def _generate_job_infos(self, job_list):
         test_info_list = tuple()
@@ -61,10 +61,6 @@ from checkbox_ng.launcher.startprovider import (
 )
 from checkbox_ng.launcher.run import Action
 from checkbox_ng.launcher.run import NormalUI
-from checkbox_ng.urwid_ui import CategoryBrowser
-from checkbox_ng.urwid_ui import ManifestBrowser
-from checkbox_ng.urwid_ui import ReRunBrowser
-from checkbox_ng.urwid_ui import TestPlanBrowser
 
 _ = gettext.gettext
 
@@ -258,7 +254,10 @@ class Launcher(MainLoopStage, ReportsStage):
                     "ui", "max_attempts"
                 )
             # ... before running them
-            self._run_jobs(self.ctx.sa.get_dynamic_todo_list())
+            self._run_jobs(
+                self.ctx.sa.get_dynamic_todo_list(),
+                self.configuration.get_value("ui", "max_parallel_jobs"),
+            )
             if self.is_interactive and not self.configuration.get_value(
                 "ui", "auto_retry"
             ):
@@ -377,6 +376,17 @@ class Launcher(MainLoopStage, ReportsStage):
             self.ctx.sa.select_test_plan(test_plan_id)
             self.ctx.sa.bootstrap()
         last_job = metadata.running_job_name
+        # Jobs running concurrently with it have no result, they are run again
+        other_jobs = [
+            job_id for job_id in metadata.running_job_list
+            if job_id != last_job
+        ]
+        if other_jobs:
+            print(
+                _("Jobs that were running at the same time: {}").format(
+                    ", ".join(other_jobs)
+                )
+            )
         # If we resumed maybe not rerun the same, probably broken job
         self._handle_last_job_after_resume(last_job)
 
@@ -432,7 +442,10 @@ class Launcher(MainLoopStage, ReportsStage):
             ).encode("UTF-8")
         )
         bs_jobs = self.ctx.sa.get_bootstrap_todo_list()
-        self._run_bootstrap_jobs(bs_jobs)
+        self._run_bootstrap_jobs(
+            bs_jobs,
+            self.configuration.get_value("ui", "max_parallel_bootstrap_jobs"),
+        )
         self.ctx.sa.finish_bootstrap()
 
     def _delete_old_sessions(self, ids):
@@ -448,6 +461,9 @@ class Launcher(MainLoopStage, ReportsStage):
         if not tp_info_list:
             print(self.C.RED(_("There were no test plans to select from!")))
             return
+        # urwid is slow to import, only do it when a text UI is needed
+        from checkbox_ng.urwid_ui import TestPlanBrowser
+
         selected_tp = TestPlanBrowser(
             _("Select test plan"),
             tp_info_list,
@@ -465,6 +481,8 @@ class Launcher(MainLoopStage, ReportsStage):
             return
         if interactive:
             # Ask the user the values
+            from checkbox_ng.urwid_ui import ManifestBrowser
+
             to_save_manifest = ManifestBrowser(
                 "System Manifest:", manifest_repr
             ).run()
@@ -497,6 +515,8 @@ class Launcher(MainLoopStage, ReportsStage):
             print(self.C.RED(_("There were no tests to select from!")))
             return
         test_info_list = self._generate_job_infos(job_list)
+        from checkbox_ng.urwid_ui import CategoryBrowser
+
         wanted_set = CategoryBrowser(
             _("Choose tests to run on your system:"), test_info_list
         ).run()
@@ -672,6 +692,8 @@ class Launcher(MainLoopStage, ReportsStage):
         if not rerun_candidates:
             return False
         test_info_list = self._generate_job_infos(rerun_candidates)
+        from checkbox_ng.urwid_ui import ReRunBrowser
+
         wanted_set = ReRunBrowser(
             _("Select jobs to re-run"), test_info_list, rerun_candidates
         ).run()
@@ -16,16 +16,21 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import subprocess
+import sys
 from collections import namedtuple
-from unittest import TestCase, mock
+from unittest import TestCase, mock, skipIf
 
+from checkbox_ng.launcher.checkbox_cli import Context
+from checkbox_ng.launcher.checkbox_cli import SUBCOMMANDS
+from checkbox_ng.launcher.checkbox_cli import load_subcommand
 from checkbox_ng.launcher.checkbox_cli import main
 
 
 class CheckboxCliTests(TestCase):
     @mock.patch("sys.argv")
     @mock.patch("argparse.ArgumentParser")
-    @mock.patch("checkbox_ng.launcher.checkbox_cli.Launcher")
+    @mock.patch("checkbox_ng.launcher.subcommands.Launcher")
     def test_launcher_ok(
         self,
         launcher_mock,
@@ -47,3 +52,85 @@ class CheckboxCliTests(TestCase):
 
         self.assertTrue(launcher_mock.called)
         self.assertTrue(launcher_mock.invoked.called)
+
+    def test_load_subcommand(self):
+        for name in SUBCOMMANDS:
+            cls = load_subcommand(name)
+            self.assertTrue(callable(cls.register_arguments), name)
+            self.assertTrue(callable(cls.invoked), name)
+        with self.assertRaises(KeyError):
+            load_subcommand("not-a-command")
+
+    @mock.patch("plainbox.impl.session.assistant.SessionAssistant")
+    def test_context_sa_created_on_use(self, sa_mock):
+        ctx = Context(mock.sentinel.args)
+        sa_mock.assert_not_called()
+        self.assertIs(ctx.sa, sa_mock.return_value)
+        self.assertIs(ctx.sa, sa_mock.return_value)
+        sa_mock.assert_called_once_with(
+            "com.canonical:checkbox-cli", "0.99", "0.99", ["restartable"])
+        self.assertIs(Context(None, mock.sentinel.sa).sa, mock.sentinel.sa)
+
+
+@skipIf(sys.version_info < (3, 7), "-X importtime requires Python 3.7")
+class ImportTimeBudgetTests(TestCase):
+    """
+    Keep the start-up of the command line tools fast.
+
+    Importing an entry point should not pull in the modules that only some
+    of the subcommands need, those are imported when the subcommand is
+    dispatched.
+    """
+
+    # Modules that are slow to import (or that import a lot of other modules)
+    SLOW_MODULES = (
+        "checkbox_ng.launcher.agent",
+        "checkbox_ng.launcher.controller",
+        "checkbox_ng.launcher.merge_reports",
+        "checkbox_ng.launcher.subcommands",
+        "checkbox_ng.urwid_ui",
+        "pkg_resources",
+        "plainbox.impl.session.assistant",
+        "plainbox.vendor.rpyc",
+        "requests",
+        "urwid",
+    )
+
+    def get_import_times(self, module):
+        """Get the cumulative import time of the modules imported."""
+        output = subprocess.check_output(
+            [sys.executable, "-X", "importtime", "-c",
+             "import {}".format(module)],
+            stderr=subprocess.STDOUT, universal_newlines=True)
+        import_times = {}
+        for line in output.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _self, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                import_times[name.strip()] = int(cumulative)
+        return import_times
+
+    def assertNoSlowImports(self, module, allowed=()):
+        import_times = self.get_import_times(module)
+        self.assertIn(module, import_times)
+        slow = {
+            name: import_times[name]
+            for name in self.SLOW_MODULES
+            if name in import_times and name not in allowed}
+        self.assertEqual(
+            slow, {}, "importing {} took {}us".format(
+                module, import_times[module]))
+
+    def test_checkbox_cli(self):
+        self.assertNoSlowImports("checkbox_ng.launcher.checkbox_cli")
+
+    def test_provider_tools(self):
+        self.assertNoSlowImports("checkbox_ng.launcher.provider_tools")
+
+    def test_subcommands(self):
+        # The text UI and the remote code are only needed by some commands
+        self.assertNoSlowImports(
+            "checkbox_ng.launcher.subcommands",
+            allowed=("checkbox_ng.launcher.subcommands",
+                     "plainbox.impl.session.assistant"))
@@ -16,9 +16,12 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+from functools import partial
 from unittest import TestCase, mock
 
 from checkbox_ng.launcher.controller import RemoteController
+from plainbox.impl.session.remote_assistant import RemoteSessionAssistant
 
 
 class ControllerTests(TestCase):
@@ -192,3 +195,137 @@ class ControllerTests(TestCase):
                 )
 
         self.assertTrue(res_dia_mock.called)
+
+
+class ControllerWaitForJobTests(TestCase):
+    def test_wait_for_job(self):
+        self_mock = mock.MagicMock()
+
+        RemoteController.wait_for_job(self_mock)
+
+        self.assertTrue(self_mock._poll_job.called)
+        self.assertTrue(self_mock.finish_job.called)
+
+    def test_wait_for_job_dont_finish(self):
+        self_mock = mock.MagicMock()
+
+        RemoteController.wait_for_job(self_mock, dont_finish=True)
+
+        self.assertTrue(self_mock._poll_job.called)
+        self.assertFalse(self_mock.finish_job.called)
+
+    @mock.patch("time.sleep")
+    def test_poll_job_long_polling(self, sleep_mock):
+        self_mock = mock.MagicMock()
+        self_mock._is_bootstrapping = False
+        self_mock.sa.wait_job_output.side_effect = [
+            ("running", "stdoutfoo\n"),
+            ("done", ""),
+        ]
+        self_mock._read_job_input.return_value = ["input\n"]
+
+        RemoteController._poll_job(self_mock)
+
+        self_mock.sa.wait_job_output.assert_called_with(0.5)
+        self.assertEqual(self_mock.sa.wait_job_output.call_count, 2)
+        self_mock._print_job_output.assert_called_once_with("stdoutfoo\n")
+        self_mock.sa.transmit_input.assert_called_once_with("input\n")
+        self_mock.sa.monitor_job.assert_not_called()
+        sleep_mock.assert_not_called()
+
+    @mock.patch("time.sleep")
+    def test_poll_job(self, sleep_mock):
+        self_mock = mock.MagicMock()
+        self_mock.sa = mock.Mock(spec=["monitor_job", "transmit_input"])
+        self_mock.sa.monitor_job.side_effect = [
+            ("running", "stdoutfoo\n"),
+            ("done", ""),
+        ]
+        self_mock._read_job_input.return_value = ["input\n"]
+
+        RemoteController._poll_job(self_mock)
+
+        self.assertEqual(self_mock.sa.monitor_job.call_count, 2)
+        self_mock.sa.transmit_input.assert_called_once_with("input\n")
+        sleep_mock.assert_called_once_with(0.5)
+
+
+class ControllerLocalExportTests(TestCase):
+    def setUp(self):
+        self.report = b"report " * 1000
+        rsa = mock.MagicMock()
+        rsa._report_transfer = None
+        stream = io.BytesIO()
+        stream.write(self.report)
+        rsa.exposed_cache_report.return_value = stream
+        self.self_mock = mock.MagicMock()
+        self.self_mock.REPORT_FRAME_SIZE = 1000
+        self.self_mock.REPORT_TRANSFER_CODEC = "zlib"
+        self.self_mock.REPORT_TRANSFER_ATTEMPTS = 2
+        self.self_mock.sa.prepare_report_transfer = partial(
+            RemoteSessionAssistant.prepare_report_transfer, rsa
+        )
+        self.read_report_frame = partial(
+            RemoteSessionAssistant.read_report_frame, rsa
+        )
+        self.self_mock.sa.read_report_frame = self.read_report_frame
+
+    def _transfer(self):
+        return RemoteController._transfer_report(
+            self.self_mock,
+            self.self_mock.sa.prepare_report_transfer,
+            "exporter",
+            mock.Mock(),
+            [],
+        )
+
+    def test_transfer_report(self):
+        stream = self._transfer()
+
+        stream.seek(0)
+        self.assertEqual(stream.read(), self.report)
+
+    def test_transfer_report_resumes_after_timeout(self):
+        self.self_mock.sa.read_report_frame = self._flaky_read()
+
+        stream = self._transfer()
+
+        stream.seek(0)
+        self.assertEqual(stream.read(), self.report)
+
+    def _flaky_read(self):
+        failed = set()
+
+        def read(digest, offset, *args):
+            if offset not in failed:
+                failed.add(offset)
+                raise TimeoutError
+            return self.read_report_frame(digest, offset, *args)
+
+        return read
+
+    def test_transfer_report_gives_up(self):
+        self.self_mock.sa.read_report_frame = mock.Mock(
+            side_effect=TimeoutError
+        )
+
+        with self.assertRaises(TimeoutError):
+            self._transfer()
+
+    def test_transfer_report_corrupted(self):
+        def corrupted_read(*args):
+            codec, data, crc = self.read_report_frame(*args)
+            return codec, data, crc + 1
+
+        self.self_mock.sa.read_report_frame = corrupted_read
+
+        with self.assertRaises(SystemExit):
+            self._transfer()
+
+    def test_local_export_fallback(self):
+        self.self_mock.sa = mock.Mock(spec=["cache_report"])
+
+        RemoteController.local_export(self.self_mock, "exporter", mock.Mock())
+
+        self.assertTrue(self.self_mock._read_cached_report.called)
+        self.assertFalse(self.self_mock._transfer_report.called)
@@ -16,6 +16,11 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import json
+import os
+import tarfile
+from tempfile import TemporaryDirectory
 from unittest import TestCase, mock
 from functools import partial
 
@@ -23,14 +28,13 @@ from checkbox_ng.launcher.merge_reports import MergeReports
 
 
 class MergeReportsTests(TestCase):
-    @mock.patch("checkbox_ng.launcher.merge_reports.TemporaryDirectory")
     @mock.patch("checkbox_ng.launcher.merge_reports.SessionManager")
     @mock.patch("checkbox_ng.launcher.merge_reports.JobDefinition")
     @mock.patch("checkbox_ng.launcher.merge_reports.CategoryUnit")
     @mock.patch("builtins.print")
     @mock.patch("os.path.join")
     @mock.patch("tarfile.open")
-    @mock.patch("json.load")
+    @mock.patch("json.loads")
     # used to load an empty launcher with no error
     def test_invoked_ok(
         self,
@@ -41,7 +45,6 @@ class MergeReportsTests(TestCase):
         category_mock,
         job_definition_mock,
         session_manager_mock,
-        temp_dir_mock,
     ):
         ctx_mock = mock.MagicMock()
         ctx_mock.args.submission = ["submission"]
@@ -64,6 +67,10 @@ class MergeReportsTests(TestCase):
             "category_map": {"test_category": "test_name"},
         }
         json_mock.return_value = sub_to_read
+        member = mock.MagicMock()
+        member.name = "submission.json"
+        tar_mock = tarfile_mock.return_value.__enter__.return_value
+        tar_mock.__iter__.return_value = [member]
 
         with mock.patch("builtins.open"):
             MergeReports.invoked(self_mock, ctx_mock)
@@ -73,3 +80,57 @@ class MergeReportsTests(TestCase):
         exporter = self_mock._create_exporter.return_value
         # exporter was created and dumped
         self.assertTrue(exporter.dump_from_session_manager_list.called)
+
+    def make_tarball(self, path, member_dict):
+        with tarfile.open(path, "w:xz") as tar:
+            for name, data in member_dict.items():
+                tarinfo = tarfile.TarInfo(name)
+                tarinfo.size = len(data)
+                tar.addfile(tarinfo, io.BytesIO(data))
+
+    def test_load_submission_json(self):
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "submission.tar.xz")
+            self.make_tarball(path, {
+                "submission.html": b"<html/>",
+                "./submission.json": json.dumps({"title": "t"}).encode(),
+                "attachment_files/a": b"a",
+            })
+            self.assertEqual(
+                MergeReports._load_submission_json(path), {"title": "t"})
+            # nothing got extracted
+            self.assertEqual(os.listdir(tmpdir), ["submission.tar.xz"])
+
+    def test_load_submission_json_missing(self):
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "submission.tar.xz")
+            self.make_tarball(path, {"submission.html": b"<html/>"})
+            with self.assertRaises(SystemExit):
+                MergeReports._load_submission_json(path)
+
+    def test_parse_submission_not_a_tarball(self):
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "submission.tar.xz")
+            with open(path, "wb") as stream:
+                stream.write(b"garbage")
+            with self.assertRaises(SystemExit):
+                MergeReports()._parse_submission(path)
+
+    def test_populate_session_state(self):
+        job_list = [mock.MagicMock(plugin="shell"),
+                    mock.MagicMock(plugin="resource")]
+        state = mock.MagicMock()
+        self_mock = mock.MagicMock()
+        with mock.patch(
+            "checkbox_ng.launcher.merge_reports."
+            "gen_resource_data_from_io_log",
+            return_value=[],
+        ):
+            MergeReports._populate_session_state(self_mock, job_list, state)
+        # all the results are presented at once
+        state.update_job_result_list.assert_called_once_with([
+            (job, self_mock._get_job_result.return_value)
+            for job in job_list])
+        state.update_job_result.assert_not_called()
+        state.set_resource_list.assert_called_once_with(
+            job_list[1].id, mock.ANY)
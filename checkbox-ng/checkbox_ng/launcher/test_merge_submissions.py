@@ -16,6 +16,10 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import os
+import tarfile
+from tempfile import TemporaryDirectory
 from unittest import TestCase, mock
 from functools import partial
 
@@ -23,7 +27,6 @@ from checkbox_ng.launcher.merge_submissions import MergeSubmissions
 
 
 class MergeSubmissionsTests(TestCase):
-    @mock.patch("checkbox_ng.launcher.merge_submissions.TemporaryDirectory")
     @mock.patch("checkbox_ng.launcher.merge_submissions.SessionManager")
     @mock.patch("checkbox_ng.launcher.merge_submissions.MergeReports")
     @mock.patch("builtins.print")
@@ -37,7 +40,6 @@ class MergeSubmissionsTests(TestCase):
         print_mock,
         merge_reports_mock,
         session_manager_mock,
-        temporary_directory_mock,
     ):
         ctx_mock = mock.MagicMock()
         ctx_mock.args.submission = ["submission"]
@@ -50,3 +52,27 @@ class MergeSubmissionsTests(TestCase):
 
         # output path was printed
         print_mock.assert_any_call(ctx_mock.args.output_file)
+
+    def test_copy_members(self):
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "submission.tar.xz")
+            with tarfile.open(path, "w:xz") as tar:
+                for name, data in (("submission.json", b"old"),
+                                   ("./attachment_files/a", b"a" * 10000),
+                                   ("attachment_files/b", b"b")):
+                    tarinfo = tarfile.TarInfo(name)
+                    tarinfo.size = len(data)
+                    tar.addfile(tarinfo, io.BytesIO(data))
+            stream = io.BytesIO()
+            seen = {"submission.json", "attachment_files/b"}
+            with tarfile.open(fileobj=stream, mode="w") as tar:
+                MergeSubmissions()._copy_members(path, tar, seen)
+            stream.seek(0)
+            with tarfile.open(fileobj=stream) as tar:
+                self.assertEqual(tar.getnames(), ["./attachment_files/a"])
+                self.assertEqual(
+                    tar.extractfile("./attachment_files/a").read(),
+                    b"a" * 10000)
+            self.assertIn("attachment_files/a", seen)
+            # nothing got extracted
+            self.assertEqual(os.listdir(tmpdir), ["submission.tar.xz"])
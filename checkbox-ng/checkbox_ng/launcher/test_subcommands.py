@@ -113,3 +113,103 @@ class TestLauncherReturnCodes(TestCase):
         mock_results = {"fail": 6, "crash": 7, "pass": 8}
         self.ctx.sa.get_summary = Mock(return_value=mock_results)
         self.assertEqual(self.launcher.invoked(self.ctx), 1)
+
+
+class TestLauncherRunJobs(TestCase):
+    def setUp(self):
+        self.launcher = Launcher()
+        self.launcher.ctx = Mock()
+        self.launcher._C = Mock()
+        self.launcher._run_single_job_with_ui_loop = Mock()
+        self.launcher._get_ui_for_job = Mock()
+        self.sa = self.launcher.ctx.sa
+        self.sa.get_job.return_value = Mock(estimated_duration=1)
+
+    @patch("builtins.print")
+    def test_run_jobs_one_at_a_time(self, mock_print):
+        self.launcher._run_jobs(["a", "b"])
+        self.sa.run_jobs_in_parallel.assert_not_called()
+        self.assertEqual(
+            self.launcher._run_single_job_with_ui_loop.call_count, 2
+        )
+        self.assertEqual(
+            [call[0][0] for call in self.sa.use_job_result.call_args_list],
+            ["a", "b"],
+        )
+
+    @patch("builtins.print")
+    def test_run_jobs_in_parallel(self, mock_print):
+        builder = Mock()
+        self.sa.run_jobs_in_parallel.return_value = iter(
+            [("a", builder), ("b", None)]
+        )
+        self.launcher._run_jobs(["a", "b"], 4)
+        self.assertEqual(
+            self.sa.run_jobs_in_parallel.call_args[0][:2], (["a", "b"], 4)
+        )
+        # Only the job that was not run in parallel is run by the launcher
+        self.assertEqual(
+            self.launcher._run_single_job_with_ui_loop.call_count, 1
+        )
+        self.sa.use_job_result.assert_any_call("a", builder.get_result())
+        self.assertEqual(
+            [call[0][0] for call in self.sa.use_job_result.call_args_list],
+            ["a", "b"],
+        )
+
+    @patch("builtins.print")
+    def test_run_bootstrap_jobs_one_at_a_time(self, mock_print):
+        self.launcher._run_bootstrap_jobs(["a", "b"])
+        self.sa.run_bootstrap_jobs_in_parallel.assert_not_called()
+        self.assertEqual(
+            [call[0][0] for call in self.sa.run_job.call_args_list],
+            ["a", "b"],
+        )
+
+    @patch("builtins.print")
+    def test_run_bootstrap_jobs_in_parallel(self, mock_print):
+        builder = Mock()
+        self.sa.run_bootstrap_jobs_in_parallel.return_value = iter(
+            [("a", builder), ("b", None)]
+        )
+        self.launcher._run_bootstrap_jobs(["a", "b"], 4)
+        self.assertEqual(
+            self.sa.run_bootstrap_jobs_in_parallel.call_args[0][:2],
+            (["a", "b"], 4),
+        )
+        # Only the job that was not run in parallel is run by the launcher
+        self.sa.run_job.assert_called_once_with("b", "piano", False)
+        self.sa.use_job_result.assert_any_call("a", builder.get_result())
+        self.assertEqual(
+            [call[0][0] for call in self.sa.use_job_result.call_args_list],
+            ["a", "b"],
+        )
+
+
+class TestLauncherResumeSession(TestCase):
+    def setUp(self):
+        self.launcher = Launcher()
+        self.launcher.ctx = Mock()
+        self.launcher._handle_last_job_after_resume = Mock()
+        self.metadata = self.launcher.ctx.sa.resume_session.return_value
+        self.metadata.flags = ["testplanless"]
+
+    @patch("builtins.print")
+    def test_resume_session(self, mock_print):
+        self.metadata.running_job_name = "a"
+        self.metadata.running_job_list = []
+        self.launcher._resume_session(Mock())
+        self.launcher._handle_last_job_after_resume.assert_called_once_with(
+            "a"
+        )
+        mock_print.assert_not_called()
+
+    @patch("builtins.print")
+    def test_resume_session_concurrent_jobs(self, mock_print):
+        self.metadata.running_job_name = "a"
+        self.metadata.running_job_list = ["a", "b", "c"]
+        self.launcher._resume_session(Mock())
+        self.launcher._handle_last_job_after_resume.assert_called_once_with(
+            "a"
+        )
+        self.assertIn("b, c", mock_print.call_args[0][0])
@@ -0,0 +1,35 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""Configuration of the test suite."""
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def disable_unit_cache():
+    """
+    Keep the providers loaded by the tests out of the unit cache of the user.
+
+    Tests of the cache itself enable it, with a temporary cache directory.
+    """
+    old_value = os.environ.get("PLAINBOX_UNIT_CACHE")
+    os.environ["PLAINBOX_UNIT_CACHE"] = "0"
+    yield
+    if old_value is None:
+        del os.environ["PLAINBOX_UNIT_CACHE"]
+    else:
+        os.environ["PLAINBOX_UNIT_CACHE"] = old_value
@@ -71,9 +71,8 @@ class SessionInvocation:
             if self.ns.only_ids:
                 print(storage.id)
                 continue
-            data = storage.load_checkpoint()
-            if len(data) > 0:
-                metadata = SessionPeekHelper().peek(data)
+            metadata = SessionPeekHelper().peek_storage(storage)
+            if metadata is not None:
                 print(_("session {0} app:{1}, flags:{2!r}, title:{3!r}")
                       .format(storage.id, metadata.app_id,
                               sorted(metadata.flags), metadata.title))
@@ -102,7 +101,8 @@ class SessionInvocation:
                 data = storage.load_checkpoint()
                 if len(data) == 0:
                     continue
-                metadata = SessionPeekHelper().peek(data)
+                metadata = SessionPeekHelper().peek(
+                    data, storage.load_journal(data))
                 print(_("application ID: {0!r}").format(metadata.app_id))
                 print(_("application-specific blob: {0}").format(
                     b64encode(metadata.app_blob).decode('ASCII')
@@ -420,6 +420,16 @@ CONFIG_SPEC = [
                     "retrying failed jobs in auto-retry mode."
                 ),
             ),
+            "max_parallel_jobs": VarSpec(
+                int,
+                1,
+                "Number of parallel-safe jobs to run at the same time.",
+            ),
+            "max_parallel_bootstrap_jobs": VarSpec(
+                int,
+                1,
+                "Number of bootstrapping jobs to run at the same time.",
+            ),
         },
     ),
     (
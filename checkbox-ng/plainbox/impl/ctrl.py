@@ -64,9 +64,10 @@ from plainbox.impl.resource import Resource
 from plainbox.impl.secure.origin import JobOutputTextSource
 from plainbox.impl.secure.providers.v1 import Provider1
 from plainbox.impl.secure.rfc822 import RFC822SyntaxError
+from plainbox.impl.secure.rfc822 import gen_rfc822_data
 from plainbox.impl.secure.rfc822 import gen_rfc822_records
 from plainbox.impl.session.jobs import InhibitionCause
-from plainbox.impl.session.jobs import JobReadinessInhibitor
+from plainbox.impl.session.jobs import get_readiness_inhibitor
 from plainbox.impl.unit.job import JobDefinition
 from plainbox.impl.unit.template import TemplateUnit
 from plainbox.impl.unit.unit import MissingParam
@@ -171,7 +172,7 @@ class CheckBoxSessionStateController(ISessionStateController):
                     # (it can either be prevented from running by normal means
                     # or simply be on the run_list but just was not executed
                     # yet).
-                    inhibitor = JobReadinessInhibitor(
+                    inhibitor = get_readiness_inhibitor(
                         cause=InhibitionCause.PENDING_RESOURCE,
                         related_job=related_job,
                         related_expression=exc.expression,
@@ -189,7 +190,7 @@ class CheckBoxSessionStateController(ISessionStateController):
                     # to run the requirement program but it simply returns a
                     # non-True value. This typically indicates a missing
                     # software package or necessary hardware.
-                    inhibitor = JobReadinessInhibitor(
+                    inhibitor = get_readiness_inhibitor(
                         cause=InhibitionCause.FAILED_RESOURCE,
                         related_job=related_job,
                         related_expression=exc.expression,
@@ -201,7 +202,7 @@ class CheckBoxSessionStateController(ISessionStateController):
             # If the dependency did not have a chance to run yet add the
             # PENDING_DEP inhibitor.
             if dep_job_state.result.outcome == IJobResult.OUTCOME_NONE:
-                inhibitor = JobReadinessInhibitor(
+                inhibitor = get_readiness_inhibitor(
                     cause=InhibitionCause.PENDING_DEP,
                     related_job=dep_job_state.job,
                 )
@@ -212,7 +213,7 @@ class CheckBoxSessionStateController(ISessionStateController):
             # prevent the operator from actually understanding why a job
             # cannot run.
             elif dep_job_state.result.outcome != IJobResult.OUTCOME_PASS:
-                inhibitor = JobReadinessInhibitor(
+                inhibitor = get_readiness_inhibitor(
                     cause=InhibitionCause.FAILED_DEP,
                     related_job=dep_job_state.job,
                 )
@@ -223,7 +224,7 @@ class CheckBoxSessionStateController(ISessionStateController):
             # If the dependency did not have a chance to run yet add the
             # PENDING_DEP inhibitor.
             if dep_job_state.result.outcome == IJobResult.OUTCOME_NONE:
-                inhibitor = JobReadinessInhibitor(
+                inhibitor = get_readiness_inhibitor(
                     cause=InhibitionCause.PENDING_DEP,
                     related_job=dep_job_state.job,
                 )
@@ -231,7 +232,7 @@ class CheckBoxSessionStateController(ISessionStateController):
         for dep_id in sorted(job.get_salvage_dependencies()):
             dep_job_state = session_state.job_state_map[dep_id]
             if dep_job_state.result.outcome != IJobResult.OUTCOME_FAIL:
-                inhibitor = JobReadinessInhibitor(
+                inhibitor = get_readiness_inhibitor(
                     cause=InhibitionCause.NOT_FAILED_DEP,
                     related_job=dep_job_state.job,
                 )
@@ -299,13 +300,11 @@ class CheckBoxSessionStateController(ISessionStateController):
         # before it was suspended, so don't
         if result.outcome is IJobResult.OUTCOME_NONE:
             return
-        new_resource_list = []
-        for record in gen_rfc822_records_from_io_log(job, result):
-            # XXX: Consider forwarding the origin object here.  I guess we
-            # should have from_frc822_record as with JobDefinition
-            resource = Resource(record.data)
-            logger.debug(_("Storing resource record %r: %s"), job.id, resource)
-            new_resource_list.append(resource)
+        new_resource_list = [
+            Resource(data) for data in gen_resource_data_from_io_log(
+                job, result)]
+        logger.debug(_("Storing %d resource records of %r"),
+                     len(new_resource_list), job.id)
         # Create an empty resource object to properly fail __getattr__ calls
         if not new_resource_list:
             new_resource_list = [Resource({})]
@@ -352,7 +351,8 @@ class CheckBoxSessionStateController(ISessionStateController):
                         session_state.add_unit(
                             new_unit, via=job, recompute=False
                         )
-        session_state._recompute_job_readiness()
+        # Readiness is recomputed by the session state once the result has
+        # been observed (see SessionState.update_job_result())
 
 
 def gen_rfc822_records_from_io_log(job, result):
@@ -386,6 +386,32 @@ def gen_rfc822_records_from_io_log(job, result):
         )
 
 
+def gen_resource_data_from_io_log(job, result):
+    """
+    Convert io_log from a resource job result to a sequence of dictionaries
+
+    Resources don't need to be traced back to the output of the job, so this
+    uses :func:`gen_rfc822_data()` on the whole standard output at once,
+    which is much faster than :func:`gen_rfc822_records_from_io_log()` on
+    large outputs.
+    """
+    logger.debug(_("processing output from a job: %r"), job)
+    # Decode the whole output at once, the records may not be whole lines
+    text = b''.join(
+        record[2] for record in result.get_io_log() if record[1] == "stdout"
+    ).decode("UTF-8", errors="replace")
+    try:
+        yield from gen_rfc822_data(text)
+    except RFC822SyntaxError as exc:
+        logger.warning(
+            # TRANSLATORS: keep the word "local" untranslated. It is a
+            # special type of job that needs to be distinguished.
+            _("local script %s returned invalid RFC822 data: %s"),
+            job.id,
+            exc,
+        )
+
+
 checkbox_session_state_ctrl = CheckBoxSessionStateController()
 
 
@@ -31,6 +31,7 @@ Job Dependency Solver.
 from abc import ABCMeta
 from abc import abstractproperty
 from logging import getLogger
+import collections
 import enum
 
 from plainbox.i18n import gettext as _
@@ -307,6 +308,63 @@ class DependencySolver:
         """
         return cls(job_list)._solve(visit_list)
 
+    @classmethod
+    def resolve_dependencies_with_recovery(cls, job_list, visit_list=None):
+        """
+        Solve the dependency graph, recovering from any dependency errors.
+
+        :param list job_list: list of known jobs
+        :param list visit_list: (optional) list of jobs to solve
+        :returns tuple:
+            (solution, visit_list, problem_list) where solution is the list of
+            jobs to execute in order, visit_list is the list of jobs that were
+            solved (the original visit_list without the jobs that had to be
+            discarded) and problem_list is the list of all the
+            :class:`DependencyError` instances that were encountered.
+
+        Each job affected by a dependency error is discarded (along with the
+        jobs that depend on it) and solving continues. The result is the same
+        as calling :meth:`resolve_dependencies()` in a loop, removing the
+        affected job from both lists after each error, but the graph is only
+        traversed once.
+        """
+        if visit_list is None:
+            visit_list = job_list
+        # Jobs on the visit list that are shadowed by a different job with the
+        # same id would be visited again after each error. This can only
+        # happen with duplicate jobs, just solve the graph in a loop then.
+        job_map = {job.id: job for job in job_list}
+        if any(job_map.get(job.id, job) != job for job in visit_list):
+            return cls._resolve_dependencies_in_loop(job_list, visit_list)
+        return RecoveringDependencySolver(job_list, visit_list)._solve()
+
+    @classmethod
+    def _resolve_dependencies_in_loop(cls, job_list, visit_list):
+        """
+        Internal method of DependencySolver.
+
+        Slow version of :meth:`resolve_dependencies_with_recovery()` that
+        solves the whole graph again after each error.
+        """
+        job_list = job_list[:]
+        visit_list = visit_list[:]
+        solution = []
+        problem_list = []
+        while visit_list:
+            try:
+                solution = cls.resolve_dependencies(job_list, visit_list)
+            except DependencyError as exc:
+                # When a dependency error is detected remove the affected job
+                # from both lists and try again.
+                if exc.affected_job in visit_list:
+                    visit_list.remove(exc.affected_job)
+                if exc.affected_job in job_list:
+                    job_list.remove(exc.affected_job)
+                problem_list.append(exc)
+            else:
+                break
+        return solution, visit_list, problem_list
+
     def __init__(self, job_list):
         """
         Instantiate a new dependency solver with the specified list of jobs.
@@ -418,3 +476,162 @@ class DependencySolver:
             else:
                 job_map[job.id] = job
         return job_map
+
+
+class RecoveringDependencySolver(DependencySolver):
+
+    """
+    Dependency solver for Jobs that recovers from dependency errors.
+
+    This solver never raises :class:`DependencyError`. Instead it records the
+    problem, discards the affected job and carries on. Discarding a job makes
+    all the jobs that depend on it fail in turn, exactly as they would if the
+    graph was solved again without that job. Use the
+    :meth:`DependencySolver.resolve_dependencies_with_recovery()` class method
+    to get the solution.
+    """
+
+    def __init__(self, job_list, visit_list):
+        """
+        Instantiate a new solver with the specified lists of jobs.
+
+        Unlike in :class:`DependencySolver` duplicate jobs are not fatal, the
+        first of the two jobs is discarded and the problem is recorded.
+        """
+        self._job_list = job_list
+        self._visit_list = visit_list
+        self._problem_list = []
+        # Number of occurrences of each job on the (shrinking) visit list
+        self._visit_count = collections.Counter(visit_list)
+        self._visit_total = len(visit_list)
+        # Number of upcoming occurrences of each job on the visit list that
+        # were discarded before being visited
+        self._skip_count = collections.Counter()
+        # The job being visited from the visit list
+        self._root = None
+        # The job at the start of a dependency cycle that is being unwound
+        self._cycle_job = None
+        self._job_map = {}
+        self._job_color_map = {}
+        for job in job_list:
+            if job.id in self._job_map and self._visit_total:
+                problem = DependencyDuplicateError(self._job_map[job.id], job)
+                self._discard(problem)
+            self._job_map[job.id] = job
+        self._job_color_map = {
+            job_id: self.COLOR_WHITE for job_id in self._job_map}
+        self._solution = []
+
+    def _solve(self):
+        """
+        Internal method of RecoveringDependencySolver.
+
+        Solves the dependency graph and returns the solution, the list of
+        solved jobs and the list of problems.
+        """
+        logger.debug(_("Starting solve (with recovery)"))
+        solved_list = []
+        for job in self._visit_list:
+            if not self._visit_total:
+                break
+            if self._skip_count[job]:
+                self._skip_count[job] -= 1
+                continue
+            self._root = job
+            if job.id not in self._job_color_map:
+                logger.debug(
+                    _("Visiting job that's not on the job_list: %r"), job)
+                self._discard(DependencyUnknownError(job))
+            elif self._visit(job):
+                solved_list.append(job)
+        self._root = None
+        if not self._visit_total:
+            # Everything was discarded, there is nothing to run
+            return [], [], self._problem_list
+        # The order of the solution depends on the jobs that were visited and
+        # later discarded. Solve the graph again, without those jobs, to get
+        # the exact same solution as DependencySolver would compute.
+        solution = DependencySolver.resolve_dependencies(
+            list(self._job_map.values()), solved_list)
+        logger.debug(_("Done solving"))
+        return solution, solved_list, self._problem_list
+
+    def _visit(self, job, trail=None):
+        """
+        Internal method of RecoveringDependencySolver.
+
+        Visits a job like :meth:`DependencySolver._visit()` does. Returns True
+        if the job and all of its dependencies could be solved, False if the
+        job was discarded (or, when a cycle is being unwound, reset).
+        """
+        color = self._job_color_map[job.id]
+        if color == self.COLOR_WHITE:
+            self._job_color_map[job.id] = self.COLOR_GRAY
+            if trail is None:
+                trail = [job]
+            for dep_type, job_id in job.controller.get_dependency_set(job):
+                try:
+                    next_job = self._job_map[job_id]
+                except KeyError:
+                    logger.debug(_("Found missing dependency: %r from %r"),
+                                 job_id, job)
+                    self._discard(
+                        DependencyMissingError(job, job_id, dep_type))
+                    self._forget(job)
+                    return False
+                trail.append(next_job)
+                solved = self._visit(next_job, trail)
+                trail.pop()
+                if solved:
+                    continue
+                if self._cycle_job is None:
+                    # The dependency was discarded so this job is now
+                    # missing a dependency.
+                    self._discard(
+                        DependencyMissingError(job, job_id, dep_type))
+                elif self._cycle_job.id == job.id:
+                    # This job started the cycle and was already discarded
+                    self._cycle_job = None
+                # Jobs that are part of the cycle (other than the job that
+                # started it) are not discarded, they are merely unvisited.
+                self._forget(job)
+                return False
+            self._job_color_map[job.id] = self.COLOR_BLACK
+            self._solution.append(job)
+        elif color == self.COLOR_GRAY:
+            trail = trail[trail.index(job):]
+            logger.debug(_("Found dependency cycle: %r"), trail)
+            self._discard(DependencyCycleError(trail))
+            self._cycle_job = job
+            return False
+        return True
+
+    def _forget(self, job):
+        """
+        Internal method of RecoveringDependencySolver.
+
+        Marks a job that could not be solved as not visited, unless the job
+        was discarded.
+        """
+        if job.id in self._job_color_map:
+            self._job_color_map[job.id] = self.COLOR_WHITE
+
+    def _discard(self, problem):
+        """
+        Internal method of RecoveringDependencySolver.
+
+        Records the problem and discards the affected job from both the job
+        list and the visit list.
+        """
+        self._problem_list.append(problem)
+        job = problem.affected_job
+        if job.id in self._job_map and self._job_map[job.id] == job:
+            del self._job_map[job.id]
+            self._job_color_map.pop(job.id, None)
+        if self._visit_count[job]:
+            self._visit_count[job] -= 1
+            self._visit_total -= 1
+            # Unless this is the job we're visiting right now, the occurrence
+            # that got discarded is still ahead of us on the visit list.
+            if job != self._root:
+                self._skip_count[job] += 1
@@ -21,12 +21,13 @@ Definition for UnifiedRunner class.
 """
 
 import contextlib
+import copy
 import getpass
-import gzip
 import io
 import logging
 import os
 import select
+import selectors
 import subprocess
 import sys
 import tempfile
@@ -38,7 +39,7 @@ from plainbox.i18n import gettext as _
 from plainbox.impl.color import Colorizer
 from plainbox.impl.unit.job import supported_plugins
 from plainbox.impl.unit.unit import on_ubuntucore
-from plainbox.impl.result import IOLogRecordWriter
+from plainbox.impl.result import BinaryIOLogRecordWriter
 from plainbox.impl.result import JobResultBuilder
 from plainbox.impl.runner import CommandOutputWriter
 from plainbox.impl.runner import IOLogRecordGenerator
@@ -60,6 +61,11 @@ class UnifiedRunner(IJobRunner):
     environment for job's command can run in.
     """
 
+    # The standard streams of the jobs are pumped by a single thread with a
+    # selector. Setting this to True uses a thread for each stream instead,
+    # as older versions did.
+    threaded_io = False
+
     def __init__(self, session_id, provider_list, jobs_io_log_dir,
                  command_io_delegate=None, dry_run=False,
                  execution_ctrl_list=None, stdin=False,
@@ -80,7 +86,10 @@ class UnifiedRunner(IJobRunner):
         self._password_provider = password_provider
         self._stdin = stdin
         self._running_jobs_pid = None
+        self._running_jobs_user = None
         self._extra_env = extra_env
+        # Shared with the workers, see get_worker()
+        self._password_lock = threading.Lock()
 
     def run_job(self, job, job_state, environ=None, ui=None):
         logger.info(_("Running %r"), job)
@@ -105,7 +114,8 @@ class UnifiedRunner(IJobRunner):
         if job.plugin == 'resource' and 'cachable' in job.get_flag_set():
             from_cache, result = self._resource_cache.get(
                 job.checksum, lambda: self._run_command(
-                    job, environ).get_result())
+                    job, environ).get_result(),
+                self.get_record_path_for_job(job))
             if from_cache:
                 print(Colorizer().header(_("Using cached data!")))
                 jrud = self._job_runner_ui_delegate
@@ -140,6 +150,29 @@ class UnifiedRunner(IJobRunner):
         # to yield appropriate result
         return result_builder.get_result()
 
+    def get_worker(self):
+        """
+        Get a runner that can run a job at the same time as this one.
+
+        The worker shares the configuration and the resource job cache of
+        this runner but keeps track of its own running job and user interface.
+        The jobs it runs don't read the standard input of the application and
+        only one worker at a time can ask for the sudo password.
+        """
+        worker = copy.copy(self)
+        worker._job_runner_ui_delegate = JobRunnerUIDelegate()
+        worker._running_jobs_pid = None
+        worker._running_jobs_user = None
+        worker._stdin = io.StringIO()
+        worker.threaded_io = False
+
+        def password_provider():
+            with self._password_lock:
+                return self._password_provider()
+        if self._password_provider:
+            worker._password_provider = password_provider
+        return worker
+
     def get_warm_up_sequence(self, job_list):
         # we no longer need a warm-up sequence
         # this is left here to conform to the interface
@@ -154,10 +187,9 @@ class UnifiedRunner(IJobRunner):
             stderr_path=os.path.join(
                 self._jobs_io_log_dir, "{}.stderr".format(slug)))
         io_log_gen = IOLogRecordGenerator()
-        log = os.path.join(self._jobs_io_log_dir, "{}.record.gz".format(slug))
-        with gzip.open(log, mode='wb') as gzip_stream, io.TextIOWrapper(
-                gzip_stream, encoding='UTF-8') as record_stream:
-            writer = IOLogRecordWriter(record_stream)
+        log = os.path.join(self._jobs_io_log_dir, "{}.record.bin".format(slug))
+        with open(log, mode='wb') as record_stream:
+            writer = BinaryIOLogRecordWriter(record_stream)
             io_log_gen.on_new_record.connect(writer.write_record)
             delegate = extcmd.Chain([
                 self._job_runner_ui_delegate, io_log_gen,
@@ -165,6 +197,7 @@ class UnifiedRunner(IJobRunner):
             ecmd = extcmd.ExternalCommandWithDelegate(delegate)
             return_code = self.execute_job(job, environ, ecmd, self._stdin)
             io_log_gen.on_new_record.disconnect(writer.write_record)
+            writer.flush()
         if return_code == 0:
             outcome = IJobResult.OUTCOME_PASS
         elif return_code < 0:
@@ -185,7 +218,6 @@ class UnifiedRunner(IJobRunner):
 
         def call(extcmd_popen, *args, **kwargs):
             """Handle low-level subprocess stuff."""
-            is_alive = True
             # Notify that the process is about to start
             extcmd_popen._delegate.on_begin(args, kwargs)
             # Setup stdout/stderr redirection
@@ -202,69 +234,17 @@ class UnifiedRunner(IJobRunner):
                 password = self._password_provider()
                 if password:
                     os.write(in_w, password + b'\n')
-
-            def stdin_forwarder(stdin):
-                """Forward data from one pipe to the other."""
-                # use systems stdin if the stdin pipe wasn't provided
-                stdin = stdin or sys.stdin
-                try:
-                    while is_alive:
-                        if stdin in select.select([stdin], [], [], 0)[0]:
-                            buf = stdin.readline()
-                            if buf == '':
-                                break
-                            os.write(in_w, buf.encode(stdin.encoding))
-                        else:
-                            time.sleep(0.1)
-                except BrokenPipeError:
-                    pass
-                os.close(in_w)
-            forwarder_thread = threading.Thread(
-                target=stdin_forwarder, args=(stdin,))
-            forwarder_thread.start()
             kwargs['stdin'] = in_r
-
-            # Start the process
-            proc = extcmd_popen._popen(*args, **kwargs)
-            self._running_jobs_pid = proc.pid
-            # Setup all worker threads. By now the pipes have been created and
-            # proc.stdout/proc.stderr point to open pipe objects.
-            stdout_reader = threading.Thread(
-                target=extcmd_popen._read_stream, args=(proc.stdout, "stdout"))
-            stderr_reader = threading.Thread(
-                target=extcmd_popen._read_stream, args=(proc.stderr, "stderr"))
-            queue_worker = threading.Thread(target=extcmd_popen._drain_queue)
-            # Start all workers
-            queue_worker.start()
-            stdout_reader.start()
-            stderr_reader.start()
-            try:
-                while True:
-                    try:
-                        proc.wait()
-                        break
-                    except KeyboardInterrupt:
-                        is_alive = False
-                        import signal
-                        self.send_signal(signal.SIGKILL, target_user)
-                        # And send a notification about this
-                        extcmd_popen._delegate.on_interrupt()
-            finally:
-                self._running_jobs_pid = None
-                # Wait until all worker threads shut down
-                stdout_reader.join()
-                proc.stdout.close()
-                stderr_reader.join()
-                proc.stderr.close()
-                # Tell the queue worker to shut down
-                extcmd_popen._queue.put(None)
-                queue_worker.join()
-                os.close(in_r)
-                is_alive = False
-                forwarder_thread.join()
+            if self.threaded_io:
+                supervise = self._supervise_with_threads
+            else:
+                supervise = self._supervise_with_selector
+            return_code = supervise(
+                extcmd_popen, args, kwargs, in_r, in_w,
+                stdin or sys.stdin, target_user)
             # Notify that the process has finished
-            extcmd_popen._delegate.on_end(proc.returncode)
-            return proc.returncode
+            extcmd_popen._delegate.on_end(return_code)
+            return return_code
         # Setup the executable nest directory
         with self.configured_filesystem(job) as nest_dir:
             # Get the command and the environment.
@@ -295,6 +275,118 @@ class UnifiedRunner(IJobRunner):
                 signal.pause()
             return return_code
 
+    def _supervise_with_selector(self, extcmd_popen, args, kwargs, in_r,
+                                 in_w, stdin, target_user):
+        """
+        Run the process of a job, pumping its standard streams.
+
+        Everything is done in the calling thread, see :class:`ProcessIOPump`.
+
+        :returns:
+            The return code of the process
+        """
+        try:
+            proc = extcmd_popen._popen(*args, **kwargs)
+        except BaseException:
+            os.close(in_w)
+            raise
+        finally:
+            os.close(in_r)
+        self._running_jobs_pid = proc.pid
+        self._running_jobs_user = target_user
+        pump = ProcessIOPump(
+            proc, extcmd_popen._delegate, stdin, in_w,
+            chunked=extcmd_popen._flags & extcmd.CHUNKED_IO)
+        try:
+            while True:
+                try:
+                    pump.run()
+                    break
+                except KeyboardInterrupt:
+                    pump.stop_forwarding()
+                    import signal
+                    self.send_signal(signal.SIGKILL, target_user)
+                    # And send a notification about this
+                    extcmd_popen._delegate.on_interrupt()
+        finally:
+            self._running_jobs_pid = None
+            self._running_jobs_user = None
+            pump.close()
+        return proc.returncode
+
+    def _supervise_with_threads(self, extcmd_popen, args, kwargs, in_r,
+                                in_w, stdin, target_user):
+        """
+        Run the process of a job, pumping its standard streams.
+
+        Separate threads forward the input and read the output of the
+        process, this is what :attr:`threaded_io` selects.
+
+        :returns:
+            The return code of the process
+        """
+        is_alive = True
+
+        def stdin_forwarder(stdin):
+            """Forward data from one pipe to the other."""
+            try:
+                while is_alive:
+                    if stdin in select.select([stdin], [], [], 0)[0]:
+                        buf = stdin.readline()
+                        if buf == '':
+                            break
+                        os.write(in_w, buf.encode(stdin.encoding))
+                    else:
+                        time.sleep(0.1)
+            except BrokenPipeError:
+                pass
+            os.close(in_w)
+        forwarder_thread = threading.Thread(
+            target=stdin_forwarder, args=(stdin,))
+        forwarder_thread.start()
+
+        # Start the process
+        proc = extcmd_popen._popen(*args, **kwargs)
+        self._running_jobs_pid = proc.pid
+        self._running_jobs_user = target_user
+        # Setup all worker threads. By now the pipes have been created and
+        # proc.stdout/proc.stderr point to open pipe objects.
+        stdout_reader = threading.Thread(
+            target=extcmd_popen._read_stream, args=(proc.stdout, "stdout"))
+        stderr_reader = threading.Thread(
+            target=extcmd_popen._read_stream, args=(proc.stderr, "stderr"))
+        queue_worker = threading.Thread(target=extcmd_popen._drain_queue)
+        # Start all workers
+        queue_worker.start()
+        stdout_reader.start()
+        stderr_reader.start()
+        try:
+            while True:
+                try:
+                    proc.wait()
+                    break
+                except KeyboardInterrupt:
+                    is_alive = False
+                    import signal
+                    self.send_signal(signal.SIGKILL, target_user)
+                    # And send a notification about this
+                    extcmd_popen._delegate.on_interrupt()
+        finally:
+            self._running_jobs_pid = None
+            self._running_jobs_user = None
+            # Wait until all worker threads shut down
+            stdout_reader.join()
+            proc.stdout.close()
+            stderr_reader.join()
+            proc.stderr.close()
+            # Tell the queue worker to shut down
+            extcmd_popen._queue.put(None)
+            queue_worker.join()
+            os.close(in_r)
+            is_alive = False
+            forwarder_thread.join()
+        return proc.returncode
+
     @contextlib.contextmanager
     def configured_filesystem(self, job):
         """
@@ -370,7 +462,7 @@ class UnifiedRunner(IJobRunner):
 
     def get_record_path_for_job(self, job):
         return os.path.join(self._jobs_io_log_dir,
-                            "{}.record.gz".format(slugify(job.id)))
+                            "{}.record.bin".format(slugify(job.id)))
 
     def send_signal(self, signal, target_user):
         if not self._running_jobs_pid:
@@ -392,6 +484,27 @@ class UnifiedRunner(IJobRunner):
             except subprocess.CalledProcessError:
                 logger.warning("Failed to kill process")
 
+    def kill_running_job(self):
+        """
+        Kill the processes of the job that is running, if any.
+
+        Jobs run in their own process group, the whole group is killed so
+        that the processes started by the job don't keep its output open.
+        """
+        import signal
+        pid = self._running_jobs_pid
+        if not pid:
+            return
+        target_user = self._running_jobs_user
+        if target_user:
+            # kill is told to signal the process group, see send_signal()
+            self.send_signal(signal.SIGKILL, target_user)
+            return
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
 
 class FakeJobRunner(UnifiedRunner):
     """
@@ -420,6 +533,175 @@ class FakeJobRunner(UnifiedRunner):
         return builder.get_result()
 
 
+class ProcessIOPump:
+    """
+    Pump the standard streams of a process without extra threads.
+
+    The output of the process is read as soon as it is available and passed
+    to the (extcmd) delegate line by line, or chunk by chunk. Data read from
+    ``stdin`` is forwarded to the process through the ``in_w`` pipe.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, proc, delegate, stdin, in_w, chunked=False):
+        """
+        Initialize a new pump.
+
+        :param proc:
+            Popen object with stdout and stderr pipes
+        :param delegate:
+            extcmd delegate to send the output to
+        :param stdin:
+            File to forward to the process, it is not forwarded if it cannot
+            be waited on (has no file descriptor)
+        :param in_w:
+            Write end of the pipe the process reads its input from. The pump
+            takes care of closing it.
+        :param chunked:
+            If True the output is passed to ``delegate.on_chunk()`` as it
+            gets read, otherwise it is passed to ``delegate.on_line()``
+        """
+        self._proc = proc
+        self._delegate = delegate
+        self._chunked = chunked
+        # Unlike epoll, poll can also wait on regular files (e.g. when the
+        # input is redirected from a file) and there are few descriptors
+        self._selector = selectors.PollSelector()
+        # Pieces of the incomplete last line of each output stream that is
+        # still open
+        self._partial_lines = {}
+        for stream, name in ((proc.stdout, "stdout"),
+                             (proc.stderr, "stderr")):
+            self._selector.register(stream, selectors.EVENT_READ, name)
+            self._partial_lines[name] = []
+        self._in_w = in_w
+        os.set_blocking(in_w, False)
+        self._pending_input = b''
+        self._stdin = None
+        if stdin is not None:
+            try:
+                self._selector.register(stdin, selectors.EVENT_READ, "stdin")
+                self._stdin = stdin
+            except (OSError, ValueError):
+                pass
+        if self._stdin is None:
+            self._close_input()
+
+    def run(self):
+        """
+        Pump the streams until the process exits and its output is over.
+
+        This can be called again after being interrupted.
+        """
+        while True:
+            if self._partial_lines:
+                timeout = None
+            elif self._proc.poll() is not None or not self._forwarding:
+                break
+            else:
+                # The process closed its output but it may still be reading
+                # its input, there is nothing to wait on for it to exit.
+                # Usually it is just about to, so poll often at first.
+                timeout = min(timeout * 2, 0.1) if timeout else 0.001
+            for key, _events in self._selector.select(timeout):
+                if key.data == "stdin":
+                    self._read_input(key.fd)
+                elif key.data == "input":
+                    self._write_input()
+                else:
+                    self._read_output(key.fileobj, key.data)
+        self._proc.wait()
+
+    def stop_forwarding(self):
+        """Stop forwarding stdin to the process and close its input."""
+        if self._stdin is not None:
+            self._selector.unregister(self._stdin)
+            self._stdin = None
+        self._pending_input = b''
+        self._close_input()
+
+    def close(self):
+        """Release all the resources used by the pump."""
+        self.stop_forwarding()
+        self._selector.close()
+        self._proc.stdout.close()
+        self._proc.stderr.close()
+
+    @property
+    def _forwarding(self):
+        return self._stdin is not None or bool(self._pending_input)
+
+    def _read_output(self, stream, name):
+        data = os.read(stream.fileno(), self.CHUNK_SIZE)
+        if not data:
+            self._selector.unregister(stream)
+            rest = self._partial_lines.pop(name)
+            if rest:
+                self._delegate.on_line(name, b''.join(rest))
+        elif self._chunked:
+            self._delegate.on_chunk(name, data)
+        else:
+            # Only look for line breaks in the new data, the pieces of a long
+            # line are joined once it is complete
+            pending = self._partial_lines[name]
+            end = data.find(b'\n') + 1
+            if not end:
+                pending.append(data)
+                return
+            pending.append(data[:end])
+            self._delegate.on_line(name, b''.join(pending))
+            start = end
+            end = data.find(b'\n', start) + 1
+            while end:
+                self._delegate.on_line(name, data[start:end])
+                start = end
+                end = data.find(b'\n', start) + 1
+            self._partial_lines[name] = [data[start:]] if data[start:] else []
+
+    def _read_input(self, fd):
+        try:
+            data = os.read(fd, self.CHUNK_SIZE)
+        except OSError:
+            data = b''
+        if not data:
+            # End of the input, close the pipe once everything is written
+            self._selector.unregister(self._stdin)
+            self._stdin = None
+            if not self._pending_input:
+                self._close_input()
+            return
+        if not self._pending_input:
+            self._selector.register(
+                self._in_w, selectors.EVENT_WRITE, "input")
+        self._pending_input += data
+
+    def _write_input(self):
+        try:
+            written = os.write(self._in_w, self._pending_input)
+        except BlockingIOError:
+            return
+        except BrokenPipeError:
+            # The process doesn't read its input anymore
+            self.stop_forwarding()
+            return
+        self._pending_input = self._pending_input[written:]
+        if not self._pending_input:
+            self._selector.unregister(self._in_w)
+            if self._stdin is None:
+                self._close_input()
+
+    def _close_input(self):
+        if self._in_w is None:
+            return
+        try:
+            self._selector.unregister(self._in_w)
+        except KeyError:
+            pass
+        os.close(self._in_w)
+        self._in_w = None
+
+
 def get_execution_environment(job, environ, session_id, nest_dir):
     """
     Get the environment required to execute the specified job:
@@ -348,9 +348,8 @@ class SessionStateExporterBase(ISessionStateExporter):
                 jobs_to_remove.append(job_id)
                 continue
         for job_id in jobs_to_remove:
-            session_manager.state.run_list.remove(
+            session_manager.state.discard_job_state(
                 session_manager.state.job_state_map[job_id].job)
-            del session_manager.state.job_state_map[job_id]
         return session_manager
 
 
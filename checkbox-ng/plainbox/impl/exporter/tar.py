@@ -25,14 +25,17 @@
     THIS MODULE DOES NOT HAVE STABLE PUBLIC API
 """
 
+import concurrent.futures
 import os
 import tarfile
+import threading
 import time
 from tempfile import SpooledTemporaryFile
 
 from plainbox.impl.exporter import SessionStateExporterBase
 from plainbox.impl.exporter.jinja2 import Jinja2SessionStateExporter
 from plainbox.impl.providers import get_providers
+from plainbox.impl.result import get_io_log_stream_filename
 from plainbox.impl.unit.exporter import ExporterUnitSupport
 
 
@@ -41,6 +44,9 @@ class TARSessionStateExporter(SessionStateExporterBase):
 
     SUPPORTED_OPTION_LIST = ()
 
+    # Reports included in the tarball, rendered concurrently
+    SUBMISSION_FORMATS = ('html', 'json', 'junit')
+
     def dump_from_session_manager(self, manager, stream):
         """
         Extract data from session manager and dump it into the stream.
@@ -52,7 +58,18 @@ class TARSessionStateExporter(SessionStateExporterBase):
             Byte stream to write to.
 
         """
-        preset = None
+        with tarfile.TarFile.open(
+                None, 'w:xz', stream, preset=self.get_preset()) as tar:
+            self.dump_to_tarfile(manager, tar)
+
+    @staticmethod
+    def get_preset():
+        """
+        Get the LZMA preset to use when compressing submission tarballs.
+
+        :returns:
+            The preset or None to use the default one
+        """
         mem_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
         mem_mib = mem_bytes/(1024.**2)
         # On systems with less than 1GiB of RAM, create the submission tarball
@@ -61,42 +78,84 @@ class TARSessionStateExporter(SessionStateExporterBase):
         # With preset 9 for example, the overhead for an LZMACompressor object
         # can be as high as 800 MiB.
         if mem_mib < 1200:
-            preset = 0
+            return 0
+        return None
+
+    def dump_to_tarfile(self, manager, tar):
+        """
+        Extract data from session manager and add it to an open tarball.
 
+        :param manager:
+            SessionManager instance that manages session to be exported by
+            this exporter
+        :param tar:
+            TarFile opened for writing
+        """
+        exporter_map = self._get_all_exporter_units()
+        # Trim once up-front, the renders below would otherwise all try to
+        # trim the shared view again
+        self._trim_session_manager(manager)
+        view = _SessionManagerView(manager)
         job_state_map = manager.default_device_context.state.job_state_map
-        with tarfile.TarFile.open(None, 'w:xz', stream, preset=preset) as tar:
-            for fmt in ('html', 'json', 'junit'):
-                unit = self._get_all_exporter_units()[
-                    'com.canonical.plainbox::{}'.format(fmt)]
-                exporter = Jinja2SessionStateExporter(exporter_unit=unit)
-                with SpooledTemporaryFile(max_size=102400, mode='w+b') as _s:
-                    exporter.dump_from_session_manager(manager, _s)
-                    tarinfo = tarfile.TarInfo(name="submission.{}".format(fmt))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(self.SUBMISSION_FORMATS)) as executor:
+            future_list = [
+                executor.submit(
+                    self._render, exporter_map[
+                        'com.canonical.plainbox::{}'.format(fmt)], view)
+                for fmt in self.SUBMISSION_FORMATS]
+            # Add the reports in a stable order, re-raising any error
+            for fmt, future in zip(self.SUBMISSION_FORMATS, future_list):
+                with future.result() as _s:
+                    tarinfo = tarfile.TarInfo(
+                        name="submission.{}".format(fmt))
                     tarinfo.size = _s.tell()
                     tarinfo.mtime = time.time()
                     _s.seek(0)  # Need to rewind the file, puagh
                     tar.addfile(tarinfo, _s)
-            for job_id in manager.default_device_context.state.job_state_map:
-                job_state = job_state_map[job_id]
-                try:
-                    recordname = job_state.result.io_log_filename
-                except AttributeError:
-                    continue
-                for stdstream in ('stdout', 'stderr'):
-                    filename = recordname.replace('record.gz', stdstream)
-                    folder = 'test_output'
-                    if job_state.job.plugin == 'attachment':
-                        folder = 'attachment_files'
-                    if os.path.exists(filename) and os.path.getsize(filename):
-                        arcname = os.path.basename(filename)
-                        if stdstream == 'stdout':
-                            arcname = os.path.splitext(arcname)[0]
-                        tar.add(filename, os.path.join(folder, arcname),
-                                recursive=False)
+        for job_id in manager.default_device_context.state.job_state_map:
+            job_state = job_state_map[job_id]
+            try:
+                recordname = job_state.result.io_log_filename
+            except AttributeError:
+                continue
+            for stdstream in ('stdout', 'stderr'):
+                filename = get_io_log_stream_filename(
+                    recordname, stdstream)
+                folder = 'test_output'
+                if job_state.job.plugin == 'attachment':
+                    folder = 'attachment_files'
+                if os.path.exists(filename) and os.path.getsize(filename):
+                    arcname = os.path.basename(filename)
+                    if stdstream == 'stdout':
+                        arcname = os.path.splitext(arcname)[0]
+                    tar.add(filename, os.path.join(folder, arcname),
+                            recursive=False)
 
     def dump(self, session, stream):
         pass
 
+    @staticmethod
+    def _render(unit, manager):
+        """
+        Render one report into a new temporary file.
+
+        :param unit:
+            ExporterUnitSupport of the jinja2 exporter to use
+        :param manager:
+            SessionManager (or a view of it) to render
+        :returns:
+            SpooledTemporaryFile positioned at the end of the report
+        """
+        exporter = Jinja2SessionStateExporter(exporter_unit=unit)
+        stream = SpooledTemporaryFile(max_size=102400, mode='w+b')
+        try:
+            exporter.dump_from_session_manager(manager, stream)
+        except BaseException:
+            stream.close()
+            raise
+        return stream
+
     def _get_all_exporter_units(self):
         exporter_map = {}
         for provider in get_providers():
@@ -104,3 +163,94 @@ class TARSessionStateExporter(SessionStateExporterBase):
                 if unit.Meta.name == 'exporter':
                     exporter_map[unit.id] = ExporterUnitSupport(unit)
         return exporter_map
+
+
+class _MemoView:
+
+    """
+    Read-only view of an object that memoizes some of its attributes.
+
+    Attributes listed in ``memo_attrs`` are computed once and then shared by
+    every user of the view (including other threads), all other attributes
+    are looked up on the wrapped object.
+    """
+
+    memo_attrs = ()
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _get_memo(self, name, compute):
+        with self._lock:
+            try:
+                return self._memo[name]
+            except KeyError:
+                value = self._memo[name] = compute()
+                return value
+
+    def __getattr__(self, name):
+        if name in self.memo_attrs:
+            return self._get_memo(name, lambda: getattr(self._obj, name))
+        return getattr(self._obj, name)
+
+
+class _JobResultView(_MemoView):
+
+    """View of a job result that decodes the I/O log only once."""
+
+    memo_attrs = ('io_log_as_flat_text', 'io_log_as_text_attachment',
+                  'img_type', 'io_log_as_base64')
+
+
+class _JobStateView(_MemoView):
+
+    """View of a job state exposing a :class:`_JobResultView`."""
+
+    def __init__(self, job_state):
+        super().__init__(job_state)
+        self.result = _JobResultView(job_state.result)
+
+
+class _SessionStateView(_MemoView):
+
+    """View of a session state with memoized maps and statistics."""
+
+    memo_attrs = ('category_map', 'category_map_lite')
+
+    def __init__(self, state):
+        super().__init__(state)
+        self.job_state_map = {
+            job_id: _JobStateView(job_state)
+            for job_id, job_state in state.job_state_map.items()}
+
+    def get_test_outcome_stats(self):
+        return self._get_memo(
+            'get_test_outcome_stats', self._obj.get_test_outcome_stats)
+
+
+class _DeviceContextView(_MemoView):
+
+    """View of a session device context exposing a shared state view."""
+
+    def __init__(self, context, state):
+        super().__init__(context)
+        self.state = state
+
+
+class _SessionManagerView(_MemoView):
+
+    """
+    View of a session manager shared by all reports of the tarball.
+
+    Everything the report templates compute from the session that is costly
+    (decoded I/O logs, category maps, outcome statistics) is computed once
+    for all of them.
+    """
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.state = _SessionStateView(manager.default_device_context.state)
+        self.default_device_context = _DeviceContextView(
+            manager.default_device_context, self.state)
@@ -328,6 +328,28 @@ class SessionStateExporterBaseTests(TestCase):
             'com.canonical.plainbox::uncategorised': 'Uncategorised',
         })
 
+    def test_trim_session_manager(self):
+        # Skipped salvage jobs are left out of the reports
+        cat_foo = CategoryUnit({'id': 'foo', 'name': 'The foo category'})
+        cat_bar = CategoryUnit({'id': 'bar', 'name': 'The bar category'})
+        job_a = make_job('job_a', category_id='foo')
+        job_b = make_job('job_b', category_id='bar', salvages='job_a')
+        state = SessionState([cat_foo, cat_bar, job_a, job_b])
+        state.update_desired_job_list([job_a, job_b])
+        state.update_job_result(
+            job_a, make_job_result(outcome=IJobResult.OUTCOME_PASS))
+        state.update_job_result(
+            job_b, make_job_result(outcome=IJobResult.OUTCOME_NOT_SUPPORTED))
+        session_manager = mock.Mock(spec_set=SessionManager, state=state)
+        SessionStateExporterBase._trim_session_manager(session_manager)
+        self.assertEqual(list(state.job_state_map), ['job_a'])
+        self.assertEqual(state.run_list, [job_a])
+        self.assertEqual(dict(state.get_outcome_stats()), {'pass': 1})
+        self.assertEqual(dict(state.get_test_outcome_stats()), {'pass': 1})
+        self.assertEqual(state.category_map, {'foo': 'The foo category'})
+        self.assertEqual(state.category_map_lite, {'foo': 'The foo category'})
+        self.assertEqual(state.category_outcome_map, {'foo': 'pass'})
+
 
 class ByteStringStreamTranslatorTests(TestCase):
 
@@ -0,0 +1,121 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+plainbox.impl.exporter.test_tar
+===============================
+
+Test definitions for plainbox.impl.exporter.tar module
+"""
+from unittest import TestCase
+import io
+import json
+import tarfile
+
+from plainbox.abc import IJobResult
+from plainbox.impl.exporter.jinja2 import Jinja2SessionStateExporter
+from plainbox.impl.exporter.tar import TARSessionStateExporter
+from plainbox.impl.exporter.tar import _SessionManagerView
+from plainbox.impl.providers.special import get_categories
+from plainbox.impl.result import IOLogRecord
+from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.session import SessionManager
+from plainbox.impl.unit.job import JobDefinition
+from plainbox.vendor import mock
+
+
+class TARExporterTests(TestCase):
+
+    def setUp(self):
+        self.job1 = JobDefinition({'id': 'job_id1', '_summary': 'job 1'})
+        self.job2 = JobDefinition({'id': 'job_id2', '_summary': 'job 2'})
+        self.attachment = JobDefinition({
+            'id': 'dmesg_attachment', 'plugin': 'attachment'})
+        self.session_manager = SessionManager.create()
+        self.session_manager.add_local_device_context()
+        state = self.session_manager.default_device_context.state
+        for unit in (self.job1, self.job2, self.attachment):
+            state.add_unit(unit)
+        for unit in get_categories().unit_list:
+            state.add_unit(unit)
+        state.update_job_result(self.job1, MemoryJobResult({
+            'outcome': IJobResult.OUTCOME_FAIL, 'return_code': 1,
+            'io_log': [(0, 'stderr', b'FATAL ERROR\n')],
+        }))
+        state.update_job_result(self.job2, MemoryJobResult({
+            'outcome': IJobResult.OUTCOME_PASS, 'return_code': 0,
+            'io_log': [(0, 'stdout', b'foo\n')],
+        }))
+        state.update_job_result(self.attachment, MemoryJobResult({
+            'outcome': IJobResult.OUTCOME_PASS, 'return_code': 0,
+            'io_log': [(0, 'stdout', b'bar\n')],
+        }))
+
+    def tearDown(self):
+        self.session_manager.destroy()
+
+    def test_view_renders_like_manager(self):
+        exporter_map = TARSessionStateExporter()._get_all_exporter_units()
+        view = _SessionManagerView(self.session_manager)
+        for fmt in TARSessionStateExporter.SUBMISSION_FORMATS:
+            unit = exporter_map['com.canonical.plainbox::{}'.format(fmt)]
+            output_list = []
+            for manager in (self.session_manager, view):
+                exporter = Jinja2SessionStateExporter(
+                    timestamp="2012-12-21T12:00:00",
+                    client_version="Checkbox 1.0",
+                    exporter_unit=unit)
+                stream = io.BytesIO()
+                exporter.dump_from_session_manager(manager, stream)
+                output_list.append(stream.getvalue())
+            self.assertEqual(output_list[0], output_list[1])
+
+    def test_view_memoizes_io_log(self):
+        view = _SessionManagerView(self.session_manager)
+        result = view.state.job_state_map['job_id1'].result
+        with mock.patch.object(
+                MemoryJobResult, 'get_io_log',
+                autospec=True, side_effect=lambda self: iter(
+                    [IOLogRecord(0, 'stderr', b'FATAL ERROR\n')])
+        ) as mock_get_io_log:
+            self.assertEqual(result.io_log_as_flat_text, 'FATAL ERROR\n')
+            self.assertEqual(result.io_log_as_flat_text, 'FATAL ERROR\n')
+        self.assertEqual(mock_get_io_log.call_count, 1)
+        self.assertEqual(result.outcome, IJobResult.OUTCOME_FAIL)
+
+    def test_view_memoizes_state_data(self):
+        state = self.session_manager.default_device_context.state
+        view = _SessionManagerView(self.session_manager)
+        self.assertIs(view.state, view.default_device_context.state)
+        self.assertIs(view.state.category_map, view.state.category_map)
+        self.assertEqual(view.state.category_map, state.category_map)
+        self.assertIs(view.state.get_test_outcome_stats(),
+                      view.state.get_test_outcome_stats())
+        self.assertIs(view.state.metadata, state.metadata)
+
+    def test_dump_from_session_manager(self):
+        stream = io.BytesIO()
+        TARSessionStateExporter().dump_from_session_manager(
+            self.session_manager, stream)
+        stream.seek(0)
+        with tarfile.open(fileobj=stream, mode='r:xz') as tar:
+            self.assertEqual(tar.getnames(), [
+                'submission.html', 'submission.json', 'submission.junit'])
+            data = json.loads(
+                tar.extractfile('submission.json').read().decode('UTF-8'))
+        self.assertEqual(
+            [result['id'] for result in data['results']],
+            ['job_id1', 'job_id2'])
@@ -17,16 +17,21 @@
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 """
 :mod:`plainbox.impl.jobcache`  -- job result caching
-==============================================
+====================================================
 
 This module should reduce the time needed to bootstrap a session
 by reusing previously obtained results.
 """
 
+import hashlib
 import json
 import logging
 import os
+import platform
 import shutil
+import tempfile
+import time
+
 from plainbox.impl.result import DiskJobResult
 from plainbox.i18n import gettext as _
 
@@ -36,13 +41,42 @@ logger = logging.getLogger("plainbox.jobcache")
 class ResourceJobCache:
     """
     Cache storing results of previously run resource jobs
+
+    Entries are addressed by a key derived from the checksum of the job and
+    from a fingerprint of the system (kernel, boot and hardware, see
+    :meth:`get_system_fingerprint()`), so a result is only reused on the
+    system it was obtained on, until the next reboot. Each entry is a
+    directory named after its key, holding the result and a copy of its I/O
+    log. Entries are written to a temporary directory that is then renamed,
+    so sessions running at the same time never see partial entries.
+
+    Entries older than ``ttl`` seconds are not used. :meth:`load()` removes
+    them and evicts the least recently used entries until the cache takes
+    less than ``max_size`` bytes.
+
+    Entries are also looked up (but never stored or removed) in a shared,
+    read-only, cache directory, if one is given or set with the
+    ``PLAINBOX_SHARED_RESOURCE_CACHE`` environment variable. That directory
+    has the same layout, e.g. it is the cache of another user.
     """
 
-    def __init__(self):
-        """
-        Load existing entries from the filesystem
-        """
-        self._cache = {}
+    DEFAULT_TTL = 24 * 60 * 60
+
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+    # Interrupted writes leave temporary directories behind, those older than
+    # this (in seconds) are removed
+    STALE_TMP_AGE = 60 * 60
+
+    def __init__(self, cache_path=None, shared_path=None, ttl=DEFAULT_TTL,
+                 max_size=DEFAULT_MAX_SIZE):
+        self._cache_path = cache_path
+        if shared_path is None:
+            shared_path = os.environ.get('PLAINBOX_SHARED_RESOURCE_CACHE')
+        self._shared_path = shared_path
+        self._ttl = ttl
+        self._max_size = max_size
+        self._fingerprint = None
 
     def clear(self):
         logger.debug("Clearing cache")
@@ -54,45 +88,166 @@ class ResourceJobCache:
                     logger.warning("Failed to clear the cache. %s" % exc)
 
     def load(self):
-        for root, subdirs, files in os.walk(self._get_cache_path()):
-            for subdir in subdirs:
-                self._try_load_cache_entry(os.path.join(root, subdir))
+        """
+        Prune the cache.
 
-    def get(self, job_checksum, compute_fn):
+        Expired entries and leftovers of interrupted writes are removed, then
+        the least recently used entries are evicted until the size of the
+        cache is below the limit. Failures are logged and otherwise ignored.
+        """
+        now = time.time()
+        entry_list = []
+        try:
+            # os.scandir() is not a context manager before Python 3.6
+            for entry in os.scandir(self._get_cache_path()):
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    created = entry.stat().st_mtime
+                    if entry.name.endswith('.tmp'):
+                        if now - created > self.STALE_TMP_AGE:
+                            self._remove_entry(entry.path)
+                    elif now - created > self._ttl:
+                        logger.debug(_("Expiring cache entry %s"),
+                                     entry.name)
+                        self._remove_entry(entry.path)
+                    else:
+                        entry_list.append((
+                            self._get_last_use(entry.path),
+                            self._get_entry_size(entry.path),
+                            entry.path))
+                except OSError as exc:
+                    logger.warning(
+                        _("Error pruning cache entry %s. %s"),
+                        entry.name, exc)
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            logger.warning(_("Error pruning the cache. %s"), exc)
+            return
+        total_size = 0
+        for last_use, size, path in sorted(entry_list, reverse=True):
+            total_size += size
+            if total_size > self._max_size:
+                logger.debug(_("Evicting cache entry %s"),
+                             os.path.basename(path))
+                self._remove_entry(path)
+
+    def get(self, job_checksum, compute_fn, io_log_filename=None):
         """
         Get a result from cache or run compute_fn to acquire it.
         Return a pair containing:
             - a bool signifying whether the result was found in cache
             - a DiskJobResult object with the result
+
+        When io_log_filename is given, the I/O log of a cached result is
+        copied there, so that the result stays valid when the entry is
+        evicted.
         """
-        in_cache = job_checksum in self._cache.keys()
-        if not in_cache:
-            logger.debug(_("%s not found in cache"), job_checksum)
-            result = compute_fn().get_builder().as_dict()
-            self._store(job_checksum, result.copy())
-        else:
+        key = self.get_key(job_checksum)
+        for cache_path, shared in ((self._get_cache_path(), False),
+                                   (self._shared_path, True)):
+            if not cache_path:
+                continue
+            result = self._try_load_cache_entry(
+                os.path.join(cache_path, key), shared)
+            if result is None:
+                continue
             logger.info(_("%s found in cache"), job_checksum)
-            result = self._cache[job_checksum]
-        return in_cache, DiskJobResult(result)
+            if io_log_filename:
+                shutil.copyfile(result['io_log_filename'], io_log_filename)
+                result['io_log_filename'] = io_log_filename
+            return True, DiskJobResult(result)
+        logger.debug(_("%s not found in cache"), job_checksum)
+        result = compute_fn().get_builder().as_dict()
+        self._store(key, result.copy())
+        return False, DiskJobResult(result)
+
+    def get_key(self, job_checksum):
+        """Get the key of the cache entry of a job."""
+        if self._fingerprint is None:
+            self._fingerprint = self.get_system_fingerprint()
+        return hashlib.sha256("{}:{}".format(
+            job_checksum, self._fingerprint).encode("UTF-8")).hexdigest()
 
-    def _try_load_cache_entry(self, job_cache_path):
+    @staticmethod
+    def get_system_fingerprint():
+        """
+        Compute a string identifying the system, as resource jobs see it.
+
+        It changes with the kernel, on each boot and when the hardware
+        description (DMI) or the set of PCI and USB devices change.
+        """
+        hw_hash = hashlib.sha256()
+        for name in ('sys_vendor', 'product_name', 'product_version',
+                     'board_vendor', 'board_name', 'bios_version',
+                     'bios_date'):
+            try:
+                with open(os.path.join('/sys/class/dmi/id', name),
+                          'rb') as stream:
+                    hw_hash.update(stream.read())
+            except OSError:
+                pass
+            hw_hash.update(b'\0')
+        for bus in ('pci', 'usb'):
+            try:
+                devices = sorted(
+                    os.listdir(os.path.join('/sys/bus', bus, 'devices')))
+            except OSError:
+                devices = []
+            hw_hash.update(' '.join(devices).encode("UTF-8") + b'\0')
+        try:
+            with open('/proc/sys/kernel/random/boot_id') as stream:
+                boot_id = stream.read().strip()
+        except OSError:
+            boot_id = ''
+        return ':'.join((platform.machine(), platform.release(), boot_id,
+                         hw_hash.hexdigest()))
+
+    def _try_load_cache_entry(self, job_cache_path, shared=False):
         job_checksum = os.path.basename(job_cache_path)
+        try:
+            created = os.stat(job_cache_path).st_mtime
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning(_("Error loading cache entry. %s"), exc)
+            return None
+        if time.time() - created > self._ttl:
+            logger.debug(_("Cache entry %s expired"), job_checksum)
+            return None
         logger.debug(_("Loading cache entry %s"), job_checksum)
         try:
-            with open(os.path.join(job_cache_path, 'result.json'),
-                      'rb') as result_file:
+            result_path = os.path.join(job_cache_path, 'result.json')
+            with open(result_path, 'rb') as result_file:
+                info = os.fstat(result_file.fileno())
+                if info.st_mode & 0o002 or (
+                        not shared and info.st_uid != os.getuid()):
+                    logger.warning(
+                        _("Ignoring unsafe cache entry %s"), job_cache_path)
+                    return None
                 data = result_file.read()
-                cache_entry = json.loads(data.decode("UTF-8"))
-                if not os.path.exists(cache_entry['io_log_filename']):
-                    logger.warning(_("Error loading cache entry. Missing %s"),
-                                   cache_entry['io_log_filename'])
-                    return
-                logger.debug(_("Cache entry %s loaded"), job_checksum)
-                self._cache[job_checksum] = cache_entry
+            cache_entry = json.loads(data.decode("UTF-8"))
+            # The I/O log is kept next to the result, wherever the cache is
+            cache_entry['io_log_filename'] = os.path.join(
+                job_cache_path,
+                os.path.basename(cache_entry['io_log_filename']))
+            if not os.path.exists(cache_entry['io_log_filename']):
+                logger.warning(_("Error loading cache entry. Missing %s"),
+                               cache_entry['io_log_filename'])
+                return None
+            if not shared:
+                # Remember the last use, for evicting entries
+                os.utime(result_path)
+            logger.debug(_("Cache entry %s loaded"), job_checksum)
+            return cache_entry
         except Exception as exc:
-            logger.warrning(_("Error loading cache entry. %s"), exc)
+            logger.warning(_("Error loading cache entry. %s"), exc)
+            return None
 
     def _get_cache_path(self):
+        if self._cache_path:
+            return self._cache_path
         suc = os.environ.get('SNAP_USER_COMMON')
         if suc:
             return os.path.join(
@@ -104,35 +259,74 @@ class ResourceJobCache:
         return os.path.join(
             xdg_cache_home, 'plainbox', 'resource_job_cache')
 
-    def _store(self, job_checksum, result):
-        logger.info(_("Caching job result for job with checksum %s"),
-                    job_checksum)
-        job_cache_path = os.path.join(self._get_cache_path(), job_checksum)
-        if os.path.exists(job_cache_path):
-            # this can happen if the loading failed, so let's clear the path
+    @staticmethod
+    def _get_last_use(job_cache_path):
+        try:
+            return os.stat(
+                os.path.join(job_cache_path, 'result.json')).st_mtime
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _get_entry_size(job_cache_path):
+        return sum(entry.stat(follow_symlinks=False).st_size
+                   for entry in os.scandir(job_cache_path))
+
+    @staticmethod
+    def _remove_entry(job_cache_path):
+        try:
+            shutil.rmtree(job_cache_path)
+        except OSError as exc:
+            logger.warning(
+                _("Failed to remove path in Resource Cache: %s %s"),
+                job_cache_path, exc)
+
+    def _store(self, key, result):
+        """
+        Store a result in the cache.
+
+        Failures are logged and otherwise ignored, the cache is just an
+        optimization.
+        """
+        if not result.get('io_log_filename'):
+            return
+        logger.info(_("Caching job result with key %s"), key)
+        cache_path = self._get_cache_path()
+        job_cache_path = os.path.join(cache_path, key)
+        try:
+            os.makedirs(cache_path, mode=0o700, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(dir=cache_path, suffix='.tmp')
+        except OSError as exc:
+            logger.warning(_("Cannot store cache entry %s. %s"), key, exc)
+            return
+        try:
+            io_log_name = os.path.basename(result['io_log_filename'])
+            shutil.copyfile(result['io_log_filename'],
+                            os.path.join(tmp_path, io_log_name))
+            result['io_log_filename'] = io_log_name
+            data = json.dumps(
+                result,
+                ensure_ascii=False,
+                sort_keys=True,
+                indent=None,
+                separators=(',', ':')
+            ).encode("UTF-8")
+            with open(os.path.join(tmp_path, 'result.json'),
+                      'wb') as result_file:
+                result_file.write(data)
+            if os.path.exists(job_cache_path):
+                # This can happen if the entry expired or failed to load
+                self._remove_entry(job_cache_path)
             try:
-                shutil.rmtree(job_cache_path)
-            except Exception as exc:
-                logger.warning(
-                    _("Failed to remove path in Resource Cache: %s %s"),
-                    job_cache_path, exc)
+                os.rename(tmp_path, job_cache_path)
+            except OSError:
+                if not os.path.isdir(job_cache_path):
+                    raise
+                logger.debug(_("Cache entry %s stored by another session"),
+                             key)
+                shutil.rmtree(tmp_path, ignore_errors=True)
                 return
-        os.makedirs(job_cache_path)
-        cached_io_log_path = os.path.join(
-            job_cache_path, os.path.basename(result['io_log_filename']))
-        shutil.copyfile(result['io_log_filename'], cached_io_log_path)
-        result['io_log_filename'] = cached_io_log_path
-        data = json.dumps(
-            result,
-            ensure_ascii=False,
-            sort_keys=True,
-            indent=None,
-            separators=(',', ':')
-        ).encode("UTF-8")
-        with open(os.path.join(job_cache_path, 'result.json'),
-                  'wb') as result_file:
-            result_file.write(data)
-        logger.debug(
-            _("Wrote %s to %s"),
-            data, os.path.join(job_cache_path, 'result.json'))
-        self._cache[job_checksum] = result
+            logger.debug(_("Wrote %s to %s"), data, job_cache_path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.warning(_("Cannot store cache entry %s. %s"), key, exc)
+            shutil.rmtree(tmp_path, ignore_errors=True)
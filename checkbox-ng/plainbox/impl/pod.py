@@ -339,8 +339,18 @@ class Field:
         if self.notify and hasattr(instance, self.instance_attr):
             if new_value != old_value:
                 setattr(instance, self.instance_attr, new_value)
-                on_field_change = getattr(instance, self.signal_name)
-                on_field_change(old_value, new_value)
+                if (old_value is UNSET and self.signal_name not in getattr(
+                        instance, '__signals__', ())):
+                    # Nothing could be connected to the signal of this
+                    # object yet, call the first responder directly instead
+                    # of creating the (per-object) signal
+                    first_responder = (
+                        self.notify_fn if self.notify_fn is not None
+                        else self.on_changed)
+                    first_responder(instance, old_value, new_value)
+                else:
+                    on_field_change = getattr(instance, self.signal_name)
+                    on_field_change(old_value, new_value)
         else:
             # Or just fire away
             setattr(instance, self.instance_attr, new_value)
@@ -365,6 +375,9 @@ class PODBase:
 
     """Base class for POD-like classes."""
 
+    # Subclasses may use __slots__ for their fields
+    __slots__ = ()
+
     field_list = []
     namedtuple_cls = namedtuple('PODBase', '')
 
@@ -652,6 +665,8 @@ class POD(PODBase, metaclass=PODMeta):
     uses that type.
     """
 
+    __slots__ = ()
+
 
 def modify_field_docstring(field_docstring_ext: str):
     """
@@ -28,6 +28,7 @@
 """
 
 import ast
+import functools
 import itertools
 import logging
 
@@ -212,7 +213,8 @@ class ResourceProgram:
         for line in program_text.splitlines():
             if line.strip() != "":
                 self._expression_list.append(
-                    ResourceExpression(line, implicit_namespace, imports))
+                    get_resource_expression(
+                        line, implicit_namespace, imports))
 
     @property
     def expression_list(self):
@@ -556,6 +558,15 @@ class ResourceExpression:
         self._text = text
         self._lambda = eval("lambda {}: {}".format(
             ', '.join(self._resource_alias_list), self._text))
+        self._qualified_resource_id_list = [
+            "{}::{}".format(self._implicit_namespace, resource_id)
+            if "::" not in resource_id and self._implicit_namespace
+            else resource_id
+            for resource_id in self._resource_id_list
+        ]
+        # Compound expressions are split into sub-expressions once, the first
+        # time they are evaluated. See _split() for details.
+        self._split_expr = None
 
     def __str__(self):
         return self._text
@@ -589,12 +600,7 @@ class ResourceExpression:
         valid python identifier and it is always (ideally) a fully-qualified
         job identifier.
         """
-        return [
-            "{}::{}".format(self._implicit_namespace, resource_id)
-            if "::" not in resource_id and self._implicit_namespace
-            else resource_id
-            for resource_id in self._resource_id_list
-        ]
+        return list(self._qualified_resource_id_list)
 
     @property
     def manifest_id_list(self):
@@ -636,15 +642,17 @@ class ResourceExpression:
         # if parenthesis are used in the expression then there's a high chance
         # we'll break the syntax with a bruteforce split on operator. Let's
         # not do a split on exprs with parenthesis
-        if not '(' in self._text:
-            or_pos = self._text.rfind(' or ')
-            if or_pos > 0:
-                lhs, rhs = self._split_and_evaluate(' or ', resource_map)
-                return lhs or rhs
-            and_pos = self._text.rfind(' and ')
-            if and_pos > 0:
-                lhs, rhs = self._split_and_evaluate(' and ', resource_map)
-                return lhs and rhs
+        if self._split_expr is None:
+            self._split_expr = self._split()
+        if self._split_expr:
+            operator, head_expr, tail_expr = self._split_expr
+            head_result = head_expr._evaluate_with_map(resource_map)
+            # Sub-expressions have no side effects so we can short-circuit
+            if operator == ' or ' and head_result:
+                return True
+            if operator == ' and ' and not head_result:
+                return False
+            return tail_expr._evaluate_with_map(resource_map)
 
         # there are no conjuctions, so let's do a simple evaluation
         for resource_list in resource_list_list:
@@ -675,23 +683,34 @@ class ResourceExpression:
         # documentation side.
         return False
 
-    def _split_and_evaluate(self, operator, resource_map):
-        head, tail = self._text.rsplit(operator, 1)
-        head_expr = ResourceExpression(
-            head, self._implicit_namespace, self._imports)
-        new_res_list = [
-            resource_map[rid] for rid in head_expr.resource_id_list]
-        head_result = head_expr.evaluate(
-            *new_res_list, resource_map = resource_map)
-        tail = tail.strip()
-        tail_expr = ResourceExpression(
-            tail, self._implicit_namespace, self._imports)
-        new_res_list = [
-            resource_map[rid] for rid in tail_expr.resource_id_list]
-        tail_result = tail_expr.evaluate(
-            *new_res_list, resource_map = resource_map)
-        return (head_result, tail_result)
+    def _split(self):
+        """
+        Split a compound expression on the last 'or' (or 'and') operator.
+
+        :returns:
+            A tuple (operator, head_expr, tail_expr) or an empty tuple if the
+            expression should not be split.
 
+        The sub-expressions are obtained with :func:`get_resource_expression()`
+        so they are shared with any other expression using the same text.
+        """
+        if '(' in self._text:
+            return ()
+        for operator in (' or ', ' and '):
+            if self._text.rfind(operator) > 0:
+                head, tail = self._text.rsplit(operator, 1)
+                return (
+                    operator,
+                    get_resource_expression(
+                        head, self._implicit_namespace, self._imports),
+                    get_resource_expression(
+                        tail.strip(), self._implicit_namespace, self._imports))
+        return ()
+
+    def _evaluate_with_map(self, resource_map):
+        return self.evaluate(*[
+            resource_map[rid] for rid in self._qualified_resource_id_list
+        ], resource_map=resource_map)
 
     @classmethod
     def _analyze(cls, text):
@@ -744,6 +763,35 @@ class ResourceExpression:
             ]
 
 
+def get_resource_expression(text, implicit_namespace=None, imports=None):
+    """
+    Get a (possibly shared) ResourceExpression instance.
+
+    :param text:
+        The text of the expression
+    :param implicit_namespace:
+        (optional) implicit namespace for partial identifiers
+    :param imports:
+        (optional) a sequence of pairs (resource_id, alias), as returned by
+        :func:`parse_imports_stmt()`
+    :returns:
+        A ResourceExpression instance
+
+    Expressions are immutable so analyzing and compiling the same text over
+    and over (for each instantiated template and each sub-expression of a
+    compound expression) is wasteful. This function keeps a process-wide
+    cache of expressions keyed by all of the arguments.
+    """
+    if imports is not None:
+        imports = tuple(tuple(item) for item in imports)
+    return _get_resource_expression(text, implicit_namespace, imports)
+
+
+@functools.lru_cache(maxsize=16384)
+def _get_resource_expression(text, implicit_namespace, imports):
+    return ResourceExpression(text, implicit_namespace, imports)
+
+
 def parse_imports_stmt(imports):
     """
     Parse the 'imports' line and compute the imported symbols.
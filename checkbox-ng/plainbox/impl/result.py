@@ -35,7 +35,10 @@ import inspect
 import io
 import json
 import logging
+import mmap
 import re
+import struct
+import zlib
 from collections import namedtuple
 
 from plainbox.abc import IJobResult
@@ -78,6 +81,66 @@ ANSI_ESCAPE_SEQ_RE_STR = re.compile("(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]")
 IOLogRecord = namedtuple("IOLogRecord", "delay stream_name data".split())
 
 
+# Magic bytes that start every binary I/O log file (``.record.bin``)
+BINARY_IO_LOG_MAGIC = b'PBIOLOG\x02'
+
+# Block header: size of the frames, size of the compressed frames, elapsed
+# time before the block, lowest and highest elapsed time of its frames
+_BLOCK_HEADER = struct.Struct('<IIddd')
+
+# Frame header: delay, length of data, length of the stream name
+_FRAME_HEADER = struct.Struct('<dIB')
+
+# Suffixes of files holding serialized I/O log records, newest first
+IO_LOG_RECORD_SUFFIXES = ('.record.bin', '.record.gz')
+
+
+def get_io_log_stream_filename(io_log_filename, stream_name):
+    """
+    Get the pathname of the raw output file that accompanies an I/O log.
+
+    :param io_log_filename:
+        Pathname of the file with serialized I/O log records
+    :param stream_name:
+        Name of the stream, either 'stdout' or 'stderr'
+    :returns:
+        Pathname of the file with the raw output of that stream
+    """
+    for suffix in IO_LOG_RECORD_SUFFIXES:
+        if io_log_filename.endswith(suffix):
+            return "{}.{}".format(io_log_filename[:-len(suffix)], stream_name)
+    return io_log_filename.replace('record.gz', stream_name)
+
+
+def _slice_io_log(record_iter, stream_name=None, start=None, end=None):
+    """
+    Filter a stream of I/O log records by stream name and time.
+
+    :param record_iter:
+        Iterable of :class:`IOLogRecord`
+    :param stream_name:
+        If not None, only records of this stream are produced
+    :param start:
+        If not None, only records emitted at least this many seconds after
+        the command started are produced
+    :param end:
+        If not None, only records emitted less than this many seconds after
+        the command started are produced
+    :returns:
+        Generator of matching :class:`IOLogRecord`
+    """
+    elapsed = 0.0
+    for record in record_iter:
+        elapsed += record[0]
+        if start is not None and elapsed < start:
+            continue
+        if end is not None and elapsed >= end:
+            continue
+        if stream_name is not None and record[1] != stream_name:
+            continue
+        yield record
+
+
 # Tuple representing meta-data associated with each possible value of "outcome"
 #
 # This tuple replaces various ad-hoc mapping that keyed off the outcome field
@@ -424,11 +487,29 @@ class _JobResultBase(IJobResult):
             return ''.join(
                 CONTROL_CODE_RE_STR.sub('', text_chunk)
                 for text_chunk in codecs.iterdecode(
-                    (record.data for record in self.get_io_log()
-                        if record[1] == 'stdout'), 'UTF-8'))
+                    (record.data for record in self.get_io_log_slice(
+                        stream_name='stdout')), 'UTF-8'))
         except UnicodeDecodeError:
             return ''
 
+    def get_io_log_slice(self, stream_name=None, start=None, end=None):
+        """
+        Get a part of the I/O log selected by stream name and time.
+
+        :param stream_name:
+            If not None, only records of this stream are produced
+        :param start:
+            If not None, only records emitted at least this many seconds after
+            the command started are produced
+        :param end:
+            If not None, only records emitted less than this many seconds
+            after the command started are produced
+        :returns:
+            Generator of matching :class:`IOLogRecord`. The delay of each
+            record is still relative to the previous record of the whole log.
+        """
+        return _slice_io_log(self.get_io_log(), stream_name, start, end)
+
     @property
     def img_type(self):
         """
@@ -438,7 +519,7 @@ class _JobResultBase(IJobResult):
             io_log_filename = self.io_log_filename
         except AttributeError:
             return ''
-        filename = io_log_filename.replace('record.gz', 'stdout')
+        filename = get_io_log_stream_filename(io_log_filename, 'stdout')
         return imghdr.what(filename)
 
     @property
@@ -447,7 +528,7 @@ class _JobResultBase(IJobResult):
             io_log_filename = self.io_log_filename
         except AttributeError:
             return ''
-        filename = io_log_filename.replace('record.gz', 'stdout')
+        filename = get_io_log_stream_filename(io_log_filename, 'stdout')
         with open(filename, "rb") as image_file:
             encoded_string = base64.b64encode(image_file.read())
         return encoded_string.decode('ASCII')
@@ -508,16 +589,24 @@ class DiskJobResult(_JobResultBase):
         return self._data.get("io_log_filename")
 
     def get_io_log(self):
+        return self.get_io_log_slice()
+
+    def get_io_log_slice(self, stream_name=None, start=None, end=None):
         record_path = self.io_log_filename
-        if record_path:
-            with gzip.GzipFile(record_path, mode='rb') as gzip_stream, \
-                    io.TextIOWrapper(gzip_stream, encoding='UTF-8') as stream:
-                for record in IOLogRecordReader(stream):
-                    record = IOLogRecord(
-                        record[0],
-                        record[1],
-                        record.data)
-                    yield record
+        if not record_path:
+            return
+        with open(record_path, mode='rb') as stream:
+            magic = stream.read(len(BINARY_IO_LOG_MAGIC))
+            stream.seek(0)
+            if magic == BINARY_IO_LOG_MAGIC:
+                with BinaryIOLogRecordReader(stream) as reader:
+                    yield from reader.iter_records(stream_name, start, end)
+                return
+            # Sessions created before the binary format use gzipped JSON
+            with gzip.GzipFile(fileobj=stream, mode='rb') as gzip_stream, \
+                    io.TextIOWrapper(gzip_stream, encoding='UTF-8') as text:
+                yield from _slice_io_log(
+                    IOLogRecordReader(text), stream_name, start, end)
 
     @property
     def io_log(self):
@@ -591,3 +680,228 @@ class IOLogRecordReader:
             if record is None:
                 break
             yield record
+
+
+class BinaryIOLogRecordWriter:
+
+    """
+    Class for writing :class:`IOLogRecord` instances to a binary stream.
+
+    Each record is stored as a frame made of a fixed size header (the delay
+    as a double, the length of the data and the length of the stream name),
+    the stream name and the raw data. Frames are grouped in blocks of about
+    ``block_size`` bytes that are compressed with zlib. The header of each
+    block tells the range of time (since the command started) its records
+    were emitted in, so readers can skip the blocks they don't need without
+    decompressing them. Blocks are written once they are full and by
+    :meth:`flush()`. When the writer is interrupted, the log is readable up
+    to the last block that was written.
+    """
+
+    def __init__(self, stream, block_size=65536):
+        self.stream = stream
+        self.stream.write(BINARY_IO_LOG_MAGIC)
+        self._block_size = block_size
+        self._frame_list = []
+        self._frame_size = 0
+        self._elapsed = 0.0
+        self._block_elapsed = 0.0
+        self._lowest = self._highest = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Write the last block and close the stream."""
+        self.flush()
+        self.stream.close()
+
+    def write_record(self, record):
+        """Write an :class:`IOLogRecord` to the stream."""
+        delay, stream_name, data = record
+        name = stream_name.encode('UTF-8')
+        self._elapsed += delay
+        if not self._frame_list:
+            self._lowest = self._highest = self._elapsed
+        elif self._elapsed < self._lowest:
+            # Wall clock changes can produce negative delays
+            self._lowest = self._elapsed
+        elif self._elapsed > self._highest:
+            self._highest = self._elapsed
+        self._frame_list.append(
+            _FRAME_HEADER.pack(delay, len(data), len(name)) + name)
+        self._frame_list.append(data)
+        self._frame_size += _FRAME_HEADER.size + len(name) + len(data)
+        if self._frame_size >= self._block_size:
+            self._write_block()
+
+    def _write_block(self):
+        frames = b''.join(self._frame_list)
+        data = zlib.compress(frames)
+        self.stream.write(_BLOCK_HEADER.pack(
+            len(frames), len(data), self._block_elapsed,
+            self._lowest, self._highest))
+        self.stream.write(data)
+        self._frame_list = []
+        self._frame_size = 0
+        self._block_elapsed = self._elapsed
+
+    def flush(self):
+        """Write the records that are not written yet and flush the stream."""
+        if self._frame_list:
+            self._write_block()
+        self.stream.flush()
+
+
+class BinaryIOLogRecordReader:
+
+    """
+    Class for reading :class:`IOLogRecord` instances from a binary stream.
+
+    The stream is memory-mapped (when possible) and only the blocks that
+    hold matching records are decompressed. :meth:`iter_data()` exposes the
+    data of each record as a :class:`memoryview` of the decompressed block,
+    without copying it any further.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._mmap = None
+        try:
+            self._mmap = mmap.mmap(
+                stream.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = self._mmap
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # Empty files cannot be mapped and in-memory streams have no
+            # file descriptor, just read everything in that case
+            buf = stream.read()
+        self._view = memoryview(buf)
+        if bytes(self._view[:len(BINARY_IO_LOG_MAGIC)]) != BINARY_IO_LOG_MAGIC:
+            self._release()
+            raise ValueError(_("not a binary I/O log"))
+        self._block_list = self._load_block_list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def _release(self):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def close(self):
+        self._release()
+        self.stream.close()
+
+    def _load_block_list(self):
+        """
+        Locate the blocks of the log.
+
+        :returns:
+            List of tuples (data offset, frame size, compressed size,
+            elapsed time before the block, lowest and highest elapsed time)
+        """
+        block_list = []
+        size = len(self._view)
+        offset = len(BINARY_IO_LOG_MAGIC)
+        while offset + _BLOCK_HEADER.size <= size:
+            frame_size, data_size, elapsed, lowest, highest = (
+                _BLOCK_HEADER.unpack_from(self._view, offset))
+            offset += _BLOCK_HEADER.size
+            if offset + data_size > size:
+                # The writer was interrupted in the middle of a block
+                break
+            block_list.append(
+                (offset, frame_size, data_size, elapsed, lowest, highest))
+            offset += data_size
+        return block_list
+
+    def _iter_frames(self, stream_name=None, start=None, end=None):
+        """
+        Locate frames matching the given criteria.
+
+        :returns:
+            Generator of tuples (delay, stream_name, frames, data_start,
+            data_end) where frames is a memoryview of the decompressed block
+        """
+        header_size = _FRAME_HEADER.size
+        unpack_from = _FRAME_HEADER.unpack_from
+        name_map = {}
+        for (offset, frame_size, data_size, elapsed,
+                lowest, highest) in self._block_list:
+            if start is not None and highest < start:
+                continue
+            if end is not None and lowest >= end:
+                continue
+            try:
+                frames = zlib.decompress(
+                    self._view[offset:offset + data_size])
+            except zlib.error as exc:
+                logger.warning(_("Corrupted I/O log block: %s"), exc)
+                return
+            if len(frames) != frame_size:
+                logger.warning(
+                    _("Corrupted I/O log block: %s"), _("wrong size"))
+                return
+            frames = memoryview(frames)
+            frame_offset = 0
+            while frame_offset + header_size <= frame_size:
+                delay, size, name_len = unpack_from(frames, frame_offset)
+                name_start = frame_offset + header_size
+                data_start = name_start + name_len
+                frame_offset = data_start + size
+                elapsed += delay
+                if start is not None and elapsed < start:
+                    continue
+                if end is not None and elapsed >= end:
+                    continue
+                name = bytes(frames[name_start:data_start])
+                try:
+                    name = name_map[name]
+                except KeyError:
+                    name = name_map[name] = name.decode('UTF-8')
+                if stream_name is not None and name != stream_name:
+                    continue
+                yield delay, name, frames, data_start, frame_offset
+
+    def iter_records(self, stream_name=None, start=None, end=None):
+        """
+        Iterate over records matching the given criteria.
+
+        :param stream_name:
+            If not None, only records of this stream are produced
+        :param start:
+            If not None, only records emitted at least this many seconds after
+            the command started are produced
+        :param end:
+            If not None, only records emitted less than this many seconds
+            after the command started are produced
+        :returns:
+            Generator of :class:`IOLogRecord` with data copied to bytes
+        """
+        for delay, name, frames, data_start, data_end in self._iter_frames(
+                stream_name, start, end):
+            yield IOLogRecord(
+                delay, name, frames[data_start:data_end].tobytes())
+
+    def iter_data(self, stream_name=None, start=None, end=None):
+        """
+        Iterate over data of records matching the given criteria.
+
+        This is the same as :meth:`iter_records()` but only produces the
+        data, as :class:`memoryview` objects referencing the decompressed
+        block without making a copy.
+        """
+        for delay, name, frames, data_start, data_end in self._iter_frames(
+                stream_name, start, end):
+            yield frames[data_start:data_end]
@@ -22,6 +22,8 @@ plainbox.impl.secure.providers.test_v1
 Test definitions for plainbox.impl.secure.providers.v1 module
 """
 
+import os
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from plainbox.impl.job import JobDefinition
@@ -40,6 +42,7 @@ from plainbox.impl.secure.providers.v1 import VersionValidator
 from plainbox.impl.secure.rfc822 import FileTextSource
 from plainbox.impl.secure.rfc822 import Origin
 from plainbox.impl.unit.file import FileUnit
+from plainbox.impl.unitcache import UnitCache
 from plainbox.vendor import mock
 
 
@@ -556,6 +559,39 @@ class UnitPlugInTests(TestCase):
                 "command: true\n"),
             self.LOAD_TIME, self.provider)
 
+    def test_unit_cache(self):
+        """
+        verify that UnitPlugIn reuses parsed records when the file doesn't
+        change, but still checks the units
+        """
+        with TemporaryDirectory() as tmp, mock.patch.dict(
+                os.environ, {"PLAINBOX_UNIT_CACHE": "1"}):
+            filename = os.path.join(tmp, "jobs.pxu")
+            text = "id: test/job\nplugin: shell\ncommand: true\n"
+            with open(filename, "wt") as stream:
+                stream.write(text)
+            cache = UnitCache(os.path.join(tmp, "cache"))
+            with mock.patch(
+                "plainbox.impl.secure.providers.v1.unit_cache", cache
+            ):
+                plugin1 = UnitPlugIn(filename, text, 0, self.provider)
+                with mock.patch(
+                    "plainbox.impl.secure.providers.v1.load_rfc822_records"
+                ) as mock_load, mock.patch.object(
+                    JobDefinition, "check"
+                ) as mock_check, mock.patch.object(cache, "put") as mock_put:
+                    plugin2 = UnitPlugIn(filename, text, 0, self.provider)
+                    self.assertFalse(mock_load.called)
+                    # Entries are only stored when they are created
+                    self.assertFalse(mock_put.called)
+                    # Checks can depend on more than the file (executables,
+                    # data files...), they are always done
+                    self.assertTrue(mock_check.called)
+        unit1, unit2 = plugin1.unit_list[0], plugin2.unit_list[0]
+        self.assertEqual(unit2.partial_id, "test/job")
+        self.assertEqual(unit2._raw_data, unit1._raw_data)
+        self.assertEqual(unit2.origin, unit1.origin)
+
     def test_plugin_name(self):
         """
         verify that the UnitPlugIn.plugin_name property returns
@@ -51,6 +51,7 @@ from plainbox.impl.unit import all_units
 from plainbox.impl.unit.file import FileRole
 from plainbox.impl.unit.file import FileUnit
 from plainbox.impl.unit.testplan import TestPlanUnit
+from plainbox.impl.unitcache import unit_cache
 from plainbox.impl.validation import Severity
 from plainbox.impl.validation import ValidationError
 
@@ -172,13 +173,18 @@ class UnitPlugIn(ProviderContentPlugIn):
             If checking, use this validation context.
         """
         logger.debug(_("Loading units from %r..."), filename)
-        try:
-            records = load_rfc822_records(
-                text, source=FileTextSource(filename))
-        except RFC822SyntaxError as exc:
-            raise PlugInError(
-                _("Cannot load job definitions from {!r}: {}").format(
-                    filename, exc))
+        cache_entry = unit_cache.get(filename, text)
+        if cache_entry is not None:
+            records = cache_entry.records
+        else:
+            cache_entry = unit_cache.new_entry(filename, text)
+            try:
+                records = load_rfc822_records(
+                    text, source=FileTextSource(filename))
+            except RFC822SyntaxError as exc:
+                raise PlugInError(
+                    _("Cannot load job definitions from {!r}: {}").format(
+                        filename, exc))
         unit_list = []
         for record in records:
             unit_name = record.data.get('unit', 'job')
@@ -207,6 +213,9 @@ class UnitPlugIn(ProviderContentPlugIn):
                             exc.field, exc.problem))
             unit_list.append(unit)
             logger.debug(_("Loaded %r"), unit)
+        if cache_entry is not None and cache_entry.created:
+            cache_entry.records = records
+            unit_cache.put(filename, cache_entry)
         return unit_list
 
     def discover_units(
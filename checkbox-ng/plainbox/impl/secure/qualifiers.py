@@ -26,6 +26,7 @@ some set of rules.
 """
 
 import abc
+import bisect
 import functools
 import itertools
 import logging
@@ -285,9 +286,15 @@ class PatternMatcher(IMatcher):
     A matcher that compares values by regular expression pattern
     """
 
+    # Test plans use the same patterns over and over again, keep a cache of
+    # compiled re objects, see RegExpJobQualifier
+    re_cache = dict()
+
     def __init__(self, pattern):
         self._pattern_text = pattern
-        self._pattern = re.compile(pattern)
+        if pattern not in self.re_cache:
+            self.re_cache[pattern] = re.compile(pattern)
+        self._pattern = self.re_cache[pattern]
 
     @property
     def pattern_text(self):
@@ -425,6 +432,230 @@ def get_flat_primitive_qualifier_list(qualifier_list):
         for qual in qualifier_list]))
 
 
+# Characters with a special meaning in regular expressions
+_RE_META_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+
+@functools.lru_cache(maxsize=None)
+def get_pattern_prefix(pattern):
+    """
+    Get what all strings matched by a regular expression start with.
+
+    :param pattern:
+        Text of a regular expression, as used with ``re.match()``
+    :returns:
+        A pair (prefix, exact). The prefix is a tuple of the characters that
+        the strings start with, None standing for any character. When exact
+        is True the expression matches the prefix and nothing else (except
+        the prefix followed by a newline, as ``$`` matches before a trailing
+        newline).
+
+    Only the simple patterns found in test plans are analyzed (characters,
+    escaped punctuation, dots and anchors). For anything else the prefix is
+    shorter than it could be, down to nothing, which is always correct.
+    """
+    if '|' in pattern or re.compile(pattern).flags & re.IGNORECASE:
+        return (), False
+    text = pattern[1:] if pattern.startswith('^') else pattern
+    prefix = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        end = index + 1
+        if char == '\\':
+            if end == len(text) or text[end].isalnum():
+                break
+            char = text[end]
+            end += 1
+        elif char == '.':
+            char = None
+        elif char in _RE_META_CHARS:
+            break
+        if end < len(text) and text[end] in '*?{':
+            # The character is optional or repeated
+            break
+        prefix.append(char)
+        index = end
+    return tuple(prefix), text[index:] == '$'
+
+
+class JobIdIndex:
+    """
+    Index of a list of jobs by their identifier.
+
+    It finds the jobs a qualifier may designate without trying it on every
+    job. Jobs with a given identifier are found in a dictionary. Jobs with
+    identifiers starting with a given prefix, possibly with wildcards (as in
+    the unescaped dots of ``com.canonical.certification::usb/.*``) are found
+    in a sorted list of all of the identifiers, used as an implicit trie: the
+    range of identifiers starting with each character is found by bisecting
+    the range of the previous one.
+    """
+
+    def __init__(self, job_list):
+        self._index_map = {}
+        for index, job in enumerate(job_list):
+            self._index_map.setdefault(job.id, []).append(index)
+        self._sorted_id_list = None
+
+    def get_candidates(self, qualifier):
+        """
+        Get the jobs that a qualifier may designate.
+
+        :param qualifier:
+            A primitive IJobQualifier
+        :returns:
+            A sorted list of indices of jobs in the job list that the
+            qualifier has to be tried on or None if it has to be tried on all
+            of them.
+        """
+        if isinstance(qualifier, JobIdQualifier):
+            return self._index_map.get(qualifier.id, [])
+        if isinstance(qualifier, RegExpJobQualifier):
+            pattern = qualifier.pattern_text
+        elif isinstance(qualifier, FieldQualifier) and qualifier.field == 'id':
+            if isinstance(qualifier.matcher, PatternMatcher):
+                pattern = qualifier.matcher.pattern_text
+            elif (isinstance(qualifier.matcher, OperatorMatcher) and
+                    qualifier.matcher.op == operator.eq):
+                return self._index_map.get(qualifier.matcher.value, [])
+            else:
+                return None
+        else:
+            return None
+        prefix, exact = get_pattern_prefix(pattern)
+        if not prefix:
+            return None
+        if exact and None not in prefix:
+            job_id = ''.join(prefix)
+            return sorted(
+                self._index_map.get(job_id, []) +
+                self._index_map.get(job_id + '\n', []))
+        return sorted(itertools.chain.from_iterable(
+            self._index_map[job_id] for job_id in self._find_ids(prefix)))
+
+    def _find_ids(self, prefix):
+        if self._sorted_id_list is None:
+            self._sorted_id_list = sorted(self._index_map)
+        id_list = self._sorted_id_list
+        # Ranges of id_list with the identifiers that match the part of the
+        # prefix seen so far
+        range_list = [(0, len(id_list))]
+        for depth, char in enumerate(prefix):
+            next_range_list = []
+            for start, end in range_list:
+                head = id_list[start][:depth]
+                if len(id_list[start]) == depth:
+                    # Too short, this is the first one of the range
+                    start += 1
+                while start < end:
+                    if char is None:
+                        next_char = id_list[start][depth]
+                    else:
+                        next_char = char
+                        start = bisect.bisect_left(
+                            id_list, head + char, start, end)
+                    if next_char == '\U0010ffff':
+                        stop = end
+                    else:
+                        stop = bisect.bisect_left(
+                            id_list, head + chr(ord(next_char) + 1),
+                            start, end)
+                    if start < stop:
+                        next_range_list.append((start, stop))
+                    if char is not None:
+                        break
+                    start = stop
+            range_list = next_range_list
+        return [id_list[index]
+                for start, end in range_list for index in range(start, end)]
+
+
+class PatternSet:
+    """
+    Set of regular expressions tried all at once.
+
+    It tells which of many patterns (as used with ``re.match()``) match a
+    string, such as the patterns of the field overrides of test plans matched
+    against job identifiers. Patterns that match just one string are looked
+    up in a dictionary. Those that match strings differing only by some
+    characters (the unescaped dots of ``^com.canonical.certification::usb$``)
+    are looked up in dictionaries keyed by the other characters. The rest are
+    combined into one regular expression with an empty group for each, that
+    captures when the pattern matches.
+    """
+
+    def __init__(self, pattern_list):
+        self._pattern_list = list(pattern_list)
+        self._literal_map = {}
+        # Patterns with wildcards, by length and position of the wildcards
+        self._wildcard_map = {}
+        regex_list = []
+        self._regex_index_list = []
+        self._compiled_list = []
+        default_flags = re.compile('').flags
+        for index, pattern in enumerate(self._pattern_list):
+            compiled = re.compile(pattern)
+            prefix, exact = get_pattern_prefix(pattern)
+            if exact and None not in prefix:
+                self._literal_map.setdefault(
+                    ''.join(prefix), []).append(index)
+            elif exact and any(prefix):
+                self._add_wildcard_pattern(index, prefix)
+            elif compiled.groups == 0 and compiled.flags == default_flags:
+                # Each pattern is tried in a lookahead, from the start
+                self._regex_index_list.append(index)
+                regex_list.append('(?:(?=(?:{}))())?'.format(pattern))
+            else:
+                # Groups would shift the groups of the combined expression and
+                # flags would apply to all of it
+                self._compiled_list.append((index, compiled))
+        self._regex = re.compile(''.join(regex_list)) if regex_list else None
+
+    def _add_wildcard_pattern(self, index, prefix):
+        position_list = tuple(
+            pos for pos, char in enumerate(prefix) if char is not None)
+        getter, key_map = self._wildcard_map.setdefault(
+            len(prefix), {}).setdefault(
+                position_list, (operator.itemgetter(*position_list), {}))
+        key_map.setdefault(getter(prefix), []).append(index)
+
+    def __len__(self):
+        return len(self._pattern_list)
+
+    def find_matches(self, text):
+        """
+        Find the patterns matching a string.
+
+        :param text:
+            The string to match
+        :returns:
+            A sorted list of the indices of the matching patterns, in the
+            list the set was created with.
+        """
+        index_list = []
+        text_list = [text]
+        if text.endswith('\n'):
+            # $ matches before a trailing newline
+            text_list.append(text[:-1])
+        for candidate in text_list:
+            index_list.extend(self._literal_map.get(candidate, ()))
+            for getter, key_map in self._wildcard_map.get(
+                    len(candidate), {}).values():
+                index_list.extend(key_map.get(getter(candidate), ()))
+        if self._regex is not None:
+            match = self._regex.match(text)
+            index_list.extend(
+                self._regex_index_list[group]
+                for group, value in enumerate(match.groups())
+                if value is not None)
+        index_list.extend(
+            index for index, compiled in self._compiled_list
+            if compiled.match(text))
+        index_list.sort()
+        return index_list
+
+
 def select_jobs(job_list, qualifier_list):
     """
     Select desired jobs.
@@ -479,40 +710,29 @@ def select_jobs(job_list, qualifier_list):
     # selected job list. For extra efficiency the algorithm operates on
     # integers representing the index of a particular job in job_list.
     #
-    # The final complexity is O(N x M) + O(M), where N is the number of
-    # qualifiers (flattened) and M is the number of jobs. The algorithm assumes
-    # that set lookup is a O(1) operation which is true enough for python.
+    # Most rows of the matrix are almost empty: test plans mostly refer to
+    # jobs by their id or by patterns starting with a fixed text. Such
+    # qualifiers are only tried on the jobs that JobIdIndex finds for them,
+    # in the order of job_list, so the votes are the same as if all jobs
+    # were visited.
     #
-    # A possible optimization would differentiate qualifiers that may select
-    # more than one job and fall-back to the current implementation while
-    # short-circuiting qualifiers that may select at most one job with a
-    # separate set lookup. That would make the algorithm "mostly" linear in the
-    # common case.
+    # The final complexity is O(N x M) + O(M), where N is the number of
+    # qualifiers (flattened) and M is the number of jobs, but it is "mostly"
+    # linear in the common case. The algorithm assumes that set lookup is a
+    # O(1) operation which is true enough for python.
     #
     # As a separate feature, we might return a list of qualifiers that never
     # matched anything. That may be helpful for debugging.
     included_list = []
-    id_to_index_map = {job.id: index for index, job in enumerate(job_list)}
     included_set = set()
     excluded_set = set()
+    job_index = JobIdIndex(job_list)
     for qualifier in flat_qualifier_list:
-        if (isinstance(qualifier, FieldQualifier) and
-                qualifier.field == 'id' and
-                isinstance(qualifier.matcher, OperatorMatcher) and
-                qualifier.matcher.op == operator.eq):
-            # optimize the super-common case where a qualifier refers to
-            # a specific job by using the id_to_index_map to instantly
-            # perform the requested operation on a single job
-            try:
-                j_index = id_to_index_map[qualifier.matcher.value]
-            except KeyError:
-                # The lookup can fail if the pattern is a constant reference to
-                # a generated job that doens't exist yet. To maintain
-                # correctness we should just ignore it, as it would not
-                # match anything yet.
-                continue
-            job = job_list[j_index]
-            vote = qualifier.get_vote(job)
+        candidates = job_index.get_candidates(qualifier)
+        if candidates is None:
+            candidates = range(len(job_list))
+        for j_index in candidates:
+            vote = qualifier.get_vote(job_list[j_index])
             if vote == IJobQualifier.VOTE_INCLUDE:
                 if j_index in included_set:
                     continue
@@ -522,17 +742,5 @@ def select_jobs(job_list, qualifier_list):
                 excluded_set.add(j_index)
             elif vote == IJobQualifier.VOTE_IGNORE:
                 pass
-        else:
-            for j_index, job in enumerate(job_list):
-                vote = qualifier.get_vote(job)
-                if vote == IJobQualifier.VOTE_INCLUDE:
-                    if j_index in included_set:
-                        continue
-                    included_set.add(j_index)
-                    included_list.append(j_index)
-                elif vote == IJobQualifier.VOTE_EXCLUDE:
-                    excluded_set.add(j_index)
-                elif vote == IJobQualifier.VOTE_IGNORE:
-                    pass
     return [job_list[index] for index in included_list
             if index not in excluded_set]
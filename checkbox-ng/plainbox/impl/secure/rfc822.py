@@ -29,6 +29,7 @@ Implementation of rfc822 serializer and deserializer.
     THIS MODULE DOES NOT HAVE STABLE PUBLIC API
 """
 
+import io
 import logging
 import re
 import textwrap
@@ -418,3 +419,74 @@ def gen_rfc822_records(stream, data_cls=dict, source=None):
     if record.data:
         logger.debug(_("yielding record: %r"), record)
         yield record
+
+
+def gen_rfc822_data(text, data_cls=dict):
+    """
+    Load a sequence of rfc822-like records from a string, quickly.
+
+    :param text:
+        A string with the rfc822 data
+    :param data_cls:
+        The class of the dictionary-like type to hold the results.
+    :raises RFC822SyntaxError:
+        On malformed data, once the preceding records were produced.
+
+    This parses the same syntax as :func:`gen_rfc822_records()` but without
+    the bookkeeping that only unit definitions need: there is no origin, no
+    raw data and no field offset map and nothing is logged. It is meant for
+    large, machine generated, data such as the output of resource jobs.
+
+    Returns a generator of data_cls instances with the normalized value of
+    each key.
+    """
+    data = data_cls()
+    # Lists of the lines of the value of each key of the record
+    value_list_map = {}
+    key = None
+    value_list = None
+    # True if the value of the most recent key has more than one line and
+    # still has to be normalized
+    multi_line = False
+    for lineno, line in enumerate(io.StringIO(text), start=1):
+        first = line[0]
+        if first == "#":
+            continue
+        if first.isspace() and line.isspace():
+            if multi_line:
+                data[key] = normalize_rfc822_value(''.join(value_list))
+                multi_line = False
+            key = None
+            if data:
+                yield data
+                data = data_cls()
+                value_list_map = {}
+        elif first == " ":
+            if key is None:
+                raise RFC822SyntaxError(
+                    None, lineno, _("Unexpected multi-line value"))
+            value_list.append(line[1:])
+            multi_line = True
+        elif ":" in line:
+            if multi_line:
+                data[key] = normalize_rfc822_value(''.join(value_list))
+                multi_line = False
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.lstrip()
+            if key in data:
+                raise RFC822SyntaxError(None, lineno, _(
+                    "Job has a duplicate key {!r} "
+                    "with old value {!r} and new value {!r}"
+                ).format(key, ''.join(value_list_map[key]), value))
+            # The normalized value of a single line is just the line, stripped
+            data[key] = value.strip()
+            value_list = [value] if data[key] != "" else []
+            value_list_map[key] = value_list
+        else:
+            raise RFC822SyntaxError(None, lineno, _(
+                "Unexpected non-empty line: {!r}").format(line))
+    if multi_line:
+        data[key] = normalize_rfc822_value(''.join(value_list))
+    if data:
+        yield data
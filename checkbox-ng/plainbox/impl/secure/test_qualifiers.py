@@ -29,6 +29,7 @@ from io import TextIOWrapper
 from itertools import permutations
 from unittest import TestCase
 import operator
+import re
 
 from plainbox.abc import IJobQualifier
 from plainbox.impl.job import JobDefinition
@@ -37,11 +38,14 @@ from plainbox.impl.secure.origin import Origin
 from plainbox.impl.secure.origin import UnknownTextSource
 from plainbox.impl.secure.qualifiers import CompositeQualifier
 from plainbox.impl.secure.qualifiers import FieldQualifier
+from plainbox.impl.secure.qualifiers import get_pattern_prefix
 from plainbox.impl.secure.qualifiers import IMatcher
+from plainbox.impl.secure.qualifiers import JobIdIndex
 from plainbox.impl.secure.qualifiers import JobIdQualifier
 from plainbox.impl.secure.qualifiers import NonPrimitiveQualifierOrigin
 from plainbox.impl.secure.qualifiers import OperatorMatcher
 from plainbox.impl.secure.qualifiers import PatternMatcher
+from plainbox.impl.secure.qualifiers import PatternSet
 from plainbox.impl.secure.qualifiers import RegExpJobQualifier
 from plainbox.impl.secure.qualifiers import select_jobs
 from plainbox.impl.secure.qualifiers import SimpleQualifier
@@ -525,3 +529,127 @@ class FunctionTests(TestCase):
             self.assertEqual(
                 select_jobs(job_list, [qual_all, qual_not_c]),
                 [job_a, job_b])
+
+    def test_select_jobs__same_as_visiting_all_jobs(self):
+        """
+        verify that select_jobs() selects the jobs that all qualifiers vote
+        for, in order, whether or not their candidates are indexed
+        """
+        id_list = ['ns::a', 'ns::a\n', 'ns::ab', 'ns::b', 'ns::a', 'nsx:a',
+                   'ns::a.b', 'ns::axb', 'other::a', 'ns::']
+        job_list = [JobDefinition({'id': job_id}) for job_id in id_list]
+        qualifier_list = [
+            RegExpJobQualifier('^ns::a$', self.origin),
+            RegExpJobQualifier('^ns::a.b$', self.origin),
+            RegExpJobQualifier('^ns.:.*$', self.origin),
+            RegExpJobQualifier('^ns::b$', self.origin, inclusive=False),
+            RegExpJobQualifier('^(ns|other)::a$', self.origin),
+            FieldQualifier('id', OperatorMatcher(operator.eq, 'ns::'),
+                           self.origin),
+            FieldQualifier('id', PatternMatcher('^ns::a\\.b$'),
+                           self.origin, inclusive=False),
+            JobIdQualifier('nsx:a', self.origin),
+        ]
+        for qualifier in qualifier_list:
+            for other in qualifier_list:
+                expected = []
+                excluded = set()
+                for qual in (qualifier, other):
+                    for index, job in enumerate(job_list):
+                        vote = qual.get_vote(job)
+                        if vote == IJobQualifier.VOTE_INCLUDE:
+                            if index not in expected:
+                                expected.append(index)
+                        elif vote == IJobQualifier.VOTE_EXCLUDE:
+                            excluded.add(index)
+                self.assertEqual(
+                    select_jobs(job_list, [qualifier, other]),
+                    [job_list[index] for index in expected
+                     if index not in excluded])
+
+
+class GetPatternPrefixTests(TestCase):
+
+    def test_literal(self):
+        self.assertEqual(get_pattern_prefix('^ns::a\\.b$'),
+                         (tuple('ns::a.b'), True))
+        self.assertEqual(get_pattern_prefix('ns::a'), (tuple('ns::a'), False))
+
+    def test_any_character(self):
+        self.assertEqual(get_pattern_prefix('^com.ns::a/.*$'),
+                         (('c', 'o', 'm', None) + tuple('ns::a/'), False))
+
+    def test_repetitions(self):
+        self.assertEqual(get_pattern_prefix('^ab*$'), (('a',), False))
+        self.assertEqual(get_pattern_prefix('^ab?$'), (('a',), False))
+        self.assertEqual(get_pattern_prefix('^ab{2}$'), (('a',), False))
+        self.assertEqual(get_pattern_prefix('^ab+$'), (('a', 'b'), False))
+
+    def test_unsupported(self):
+        self.assertEqual(get_pattern_prefix('^a|b$'), ((), False))
+        self.assertEqual(get_pattern_prefix('(?i)ab'), ((), False))
+        self.assertEqual(get_pattern_prefix('^\\d'), ((), False))
+        self.assertEqual(get_pattern_prefix('^[ab]c$'), ((), False))
+
+
+class JobIdIndexTests(TestCase):
+
+    def setUp(self):
+        self.origin = mock.Mock(name='origin', spec_set=Origin)
+        self.id_list = ['a', 'ab', 'abc', 'abd', 'acc', 'b', 'bac', 'a.c',
+                        'axc', 'ax', 'ab']
+        self.index = JobIdIndex(
+            [JobDefinition({'id': job_id}) for job_id in self.id_list])
+
+    def get_candidates(self, qualifier):
+        return [self.id_list[index]
+                for index in self.index.get_candidates(qualifier)]
+
+    def test_job_id(self):
+        self.assertEqual(
+            self.index.get_candidates(JobIdQualifier('ab', self.origin)),
+            [1, 10])
+        self.assertEqual(
+            self.index.get_candidates(JobIdQualifier('x', self.origin)), [])
+
+    def test_pattern(self):
+        self.assertEqual(self.get_candidates(
+            RegExpJobQualifier('^ab$', self.origin)), ['ab', 'ab'])
+        self.assertEqual(self.get_candidates(
+            RegExpJobQualifier('^a.c$', self.origin)),
+            ['abc', 'acc', 'a.c', 'axc'])
+        self.assertEqual(self.get_candidates(
+            RegExpJobQualifier('^.b', self.origin)),
+            ['ab', 'abc', 'abd', 'ab'])
+        self.assertEqual(self.get_candidates(
+            FieldQualifier('id', PatternMatcher('^ab.'), self.origin)),
+            ['abc', 'abd'])
+
+    def test_not_indexed(self):
+        self.assertIsNone(self.index.get_candidates(
+            RegExpJobQualifier('.*a', self.origin)))
+        self.assertIsNone(self.index.get_candidates(
+            FieldQualifier('plugin', OperatorMatcher(operator.eq, 'shell'),
+                           self.origin)))
+
+
+class PatternSetTests(TestCase):
+
+    pattern_list = [
+        '^ns.a::job-a$', '^ns.a::job-[bc]$', '^ns.a::job.*$', '^ns.a::job-a$',
+        '^ns\\.a::job-d$', '^.$', '^(ns).a::job-a$', '(?i)^NS.a::JOB-A$',
+        'x|ns.*', '^$']
+
+    def test_find_matches(self):
+        pattern_set = PatternSet(self.pattern_list)
+        self.assertEqual(len(pattern_set), len(self.pattern_list))
+        for text in ('ns.a::job-a', 'nsxa::job-a', 'ns.a::job-b',
+                     'ns.a::job-d', 'nsxa::job-d', 'ns.a::job-a\n', 'x',
+                     'ns', '', 'other'):
+            self.assertEqual(
+                pattern_set.find_matches(text),
+                [index for index, pattern in enumerate(self.pattern_list)
+                 if re.match(pattern, text)], text)
+
+    def test_empty(self):
+        self.assertEqual(PatternSet([]).find_matches('job'), [])
@@ -32,6 +32,8 @@ from plainbox.impl.secure.origin import Origin
 from plainbox.impl.secure.origin import UnknownTextSource
 from plainbox.impl.secure.rfc822 import RFC822Record
 from plainbox.impl.secure.rfc822 import RFC822SyntaxError
+from plainbox.impl.secure.rfc822 import gen_rfc822_data
+from plainbox.impl.secure.rfc822 import gen_rfc822_records
 from plainbox.impl.secure.rfc822 import load_rfc822_records
 from plainbox.impl.secure.rfc822 import normalize_rfc822_value
 
@@ -569,6 +571,67 @@ class RFC822ParserTests(TestCase):
         })
 
 
+class RFC822DataParserTests(TestCase):
+    """
+    Tests for gen_rfc822_data(), it parses data like gen_rfc822_records()
+    """
+
+    def assertSameData(self, text):
+        expected = []
+        expected_exc = None
+        try:
+            for record in gen_rfc822_records(StringIO(text)):
+                expected.append(record.data)
+        except RFC822SyntaxError as exc:
+            expected_exc = exc
+        data_list = []
+        try:
+            for data in gen_rfc822_data(text):
+                data_list.append(data)
+        except RFC822SyntaxError as exc:
+            self.assertIsNotNone(expected_exc)
+            self.assertEqual((exc.lineno, exc.msg),
+                             (expected_exc.lineno, expected_exc.msg))
+        else:
+            self.assertIsNone(expected_exc)
+        self.assertEqual(data_list, expected)
+
+    def test_records(self):
+        self.assertSameData(
+            "# comment\n"
+            "\n\n"
+            "key: value\n"
+            "key2:  value2  \n"
+            "\n"
+            "   \n"
+            "key: other:value\n"
+            "\tkey2 : \n"
+            "\n")
+
+    def test_multi_line_values(self):
+        self.assertSameData(
+            "key:\n"
+            " line1\n"
+            " .\n"
+            "  line2\n"
+            "# comment\n"
+            "key2: value\n"
+            " continued\n"
+            "key3: last")
+
+    def test_crlf(self):
+        self.assertSameData("key: value\r\n\r\nkey: value2\r\n")
+
+    def test_empty(self):
+        self.assertSameData("")
+        self.assertSameData("\n\n# comment\n")
+
+    def test_syntax_errors(self):
+        self.assertSameData("key: value\n\nbarf\n")
+        self.assertSameData(" value\n")
+        self.assertSameData("key: value\n\nkey: 1\n other\nkey: 2\n")
+
+
 class NamedStringIO(StringIO):
     """
      Subclass of StringIO with a name attribute.
@@ -25,11 +25,13 @@ Session Assistant.
 """
 
 import collections
+import concurrent.futures
 import datetime
 import itertools
 import json
 import logging
 import os
+import queue
 import shlex
 import time
 from tempfile import SpooledTemporaryFile
@@ -423,11 +425,10 @@ class SessionAssistant:
         """
         UsageExpectation.of(self).enforce()
         for storage in WellKnownDirsHelper.get_storage_list():
-            data = storage.load_checkpoint()
-            if len(data) == 0:
-                continue
             try:
-                metadata = SessionPeekHelper().peek(data)
+                metadata = SessionPeekHelper().peek_storage(storage)
+                if metadata is None:
+                    continue
                 if metadata.app_id == self._app_id:
                     if (allow_not_flagged and not metadata.flags) or (
                         metadata.flags & flags
@@ -616,11 +617,10 @@ class SessionAssistant:
         # let's keep resume_candidates, so we don't have to load data again
         self._resume_candidates = {}
         for storage in WellKnownDirsHelper.get_storage_list():
-            data = storage.load_checkpoint()
-            if len(data) == 0:
-                continue
             try:
-                metadata = SessionPeekHelper().peek(data)
+                metadata = SessionPeekHelper().peek_storage(storage)
+                if metadata is None:
+                    continue
             except SessionResumeError:
                 _logger.info(
                     "Exception raised when trying to resume " "session: %s",
@@ -755,10 +755,14 @@ class SessionAssistant:
         }
 
     @raises(UnexpectedMethodCall)
-    def bootstrap(self):
+    def bootstrap(self, max_workers: "Optional[int]" = None):
         """
         Perform session bootstrap process to discover all content.
 
+        :param max_workers:
+            (optional) Maximum number of bootstrapping jobs to run at the same
+            time. By default, the ``max_parallel_bootstrap_jobs`` value of the
+            ``ui`` section of the configuration is used.
         :raises UnexpectedMethodCall:
             If the call is made at an unexpected time. Do not catch this error.
             It is a bug in your program. The error message will indicate what
@@ -777,6 +781,12 @@ class SessionAssistant:
         When this method returns (which can take a while) the session is now
         ready for running any jobs.
 
+        With ``max_workers`` greater than one, resource jobs whose
+        dependencies are satisfied are run concurrently. Their results are
+        still presented to the session one at a time, in the order of the run
+        list, so the outcome of bootstrapping is the same. Jobs that are not
+        resource jobs are run on their own.
+
         .. warning:
             This method will not return until the bootstrap process is
             finished. This can take any amount of time (easily over one minute)
@@ -796,14 +806,20 @@ class SessionAssistant:
         self._context.state.update_desired_job_list(
             desired_job_list, include_mandatory=False
         )
-        for job in self._context.state.run_list:
-            if self._context.state.job_state_map[job.id].result_history:
-                continue
-            UsageExpectation.of(self).allowed_calls[
-                self.run_job
-            ] = "to run bootstrapping job"
-            rb = self.run_job(job.id, "silent", False)
-            self.use_job_result(job.id, rb.get_result())
+        todo_list = [
+            job
+            for job in self._context.state.run_list
+            if not self._context.state.job_state_map[job.id].result_history
+        ]
+        if max_workers is None:
+            max_workers = self._config.get_value(
+                "ui", "max_parallel_bootstrap_jobs"
+            )
+        if max_workers > 1:
+            self._run_bootstrap_jobs_in_parallel(todo_list, max_workers)
+        else:
+            for job in todo_list:
+                self._run_bootstrap_job(job)
         # Perform initial selection -- we want to run everything that is
         # described by the test plan that was selected earlier.
         desired_job_list = select_jobs(
@@ -820,6 +836,168 @@ class SessionAssistant:
         self._metadata.flags = {SessionMetaData.FLAG_INCOMPLETE}
         self._manager.checkpoint()
 
+    def _run_bootstrap_job(self, job):
+        UsageExpectation.of(self).allowed_calls[
+            self.run_job
+        ] = "to run bootstrapping job"
+        rb = self.run_job(job.id, "silent", False)
+        self.use_job_result(job.id, rb.get_result())
+
+    def _run_bootstrap_jobs_in_parallel(self, job_list, max_workers):
+        """
+        Run bootstrapping jobs, using a pool of worker threads.
+
+        Job results are used in the order of job_list. Jobs that cannot be run
+        in the pool act as barriers: they are run by themselves with
+        :meth:`run_job()`. See :meth:`_run_jobs_in_pool()`.
+        """
+        for job, result in self._run_jobs_in_pool(
+            job_list, max_workers, self._can_run_bootstrap_job_in_pool
+        ):
+            if result is None:
+                self._run_bootstrap_job(job)
+                continue
+            UsageExpectation.of(self).allowed_calls[
+                self.use_job_result
+            ] = "to use bootstrapping job result"
+            # The runner measured the execution duration of the job
+            self._job_start_time = None
+            self.use_job_result(job.id, result)
+
+    def _can_run_bootstrap_job_in_pool(self, job):
+        if job.plugin != "resource":
+            return False
+        return not job.get_flag_set() & {"noreturn", "autorestart"}
+
+    def _run_jobs_in_pool(self, job_list, max_workers, can_run_in_pool):
+        """
+        Run the jobs of a list that can be run concurrently in a thread pool.
+
+        :param job_list:
+            List of jobs to run, in the order of the run list
+        :param max_workers:
+            Maximum number of jobs to run at the same time
+        :param can_run_in_pool:
+            Callable telling if a job can be run in the pool
+        :returns:
+            An iterator of (job, result) pairs, in the order of job_list. The
+            result is None for the jobs that the caller has to run.
+
+        The caller must use the result of each job before taking the next
+        pair. A job is submitted to the pool once the results of all of its
+        dependencies were used (so that its readiness is known) and it can
+        start. Jobs are run silently, each worker thread has its own runner
+        (see :meth:`UnifiedRunner.get_worker()`). When the iterator is closed
+        or interrupted, the jobs that didn't start are cancelled and the ones
+        that are running are killed.
+
+        Like :meth:`run_job()`, the session is checkpointed before jobs are
+        started, with the jobs that are running in the session meta-data (see
+        :attr:`SessionMetaData.running_job_list`).
+        """
+        state = self._context.state
+        position_map = {job.id: index for index, job in enumerate(job_list)}
+        # Index from which the results of all the dependencies of each job
+        # were used
+        ready_index_map = {}
+        for job in job_list:
+            dep_id_set = {
+                dep_id for dep_type, dep_id in
+                job.controller.get_dependency_set(job)
+            } | job.get_salvage_dependencies()
+            ready_index_map[job.id] = max((
+                position_map[dep_id] + 1 for dep_id in dep_id_set
+                if dep_id in position_map), default=0)
+        for warm_up_func in self._runner.get_warm_up_sequence(job_list):
+            warm_up_func()
+        worker_list = [
+            self._runner.get_worker() for _i in range(max_workers)]
+        worker_queue = queue.Queue()
+        for worker in worker_list:
+            worker_queue.put(worker)
+
+        def run_job(job, job_state):
+            worker = worker_queue.get()
+            try:
+                return worker.run_job(
+                    job, job_state, self._config.environment, _SilentUI()
+                )
+            finally:
+                worker_queue.put(worker)
+
+        # Futures of the submitted jobs whose results were not used yet, in
+        # the order they were submitted
+        future_map = collections.OrderedDict()
+        # Jobs that can be run in the pool but wait for the results of their
+        # dependencies, by the index from which they are ready
+        waiting_map = collections.defaultdict(list)
+        # Index of the first job that was not looked at yet
+        next_index = 0
+        # Running a job as another user may require asking for a password.
+        # Let the first such job run by itself so that the prompt is not
+        # garbled by concurrent jobs.
+        user_switch_seen = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            try:
+                for index, job in enumerate(job_list):
+                    ready_list = waiting_map.pop(index, [])
+                    next_index = max(next_index, index)
+                    while next_index < len(job_list):
+                        next_job = job_list[next_index]
+                        if not can_run_in_pool(next_job):
+                            break
+                        if next_job.user and not user_switch_seen:
+                            break
+                        ready_index = ready_index_map[next_job.id]
+                        if ready_index > index:
+                            waiting_map[ready_index].append(next_job)
+                        else:
+                            ready_list.append(next_job)
+                        next_index += 1
+                    batch = []
+                    for next_job in ready_list:
+                        if position_map[next_job.id] < index:
+                            # The caller already ran it
+                            continue
+                        job_state = state.job_state_map[next_job.id]
+                        if job_state.can_start():
+                            batch.append((next_job, job_state))
+                    if batch:
+                        running_job_list = list(future_map) + [
+                            next_job.id for next_job, _s in batch]
+                        state.metadata.running_job_name = running_job_list[0]
+                        state.metadata.running_job_list = running_job_list
+                        self._metadata.last_job_start_time = time.time()
+                        self._manager.checkpoint()
+                    for next_job, job_state in batch:
+                        _logger.debug("Submitting job %s", next_job.id)
+                        future_map[next_job.id] = executor.submit(
+                            run_job, next_job, job_state
+                        )
+                    future = future_map.pop(job.id, None)
+                    if future is None:
+                        yield job, None
+                        user_switch_seen |= bool(job.user)
+                    else:
+                        result = future.result()
+                        # The result of this job is used next, like after
+                        # run_job(). The other jobs may still be running.
+                        state.metadata.running_job_name = job.id
+                        state.metadata.running_job_list = list(future_map)
+                        yield job, result
+            finally:
+                # Don't start the jobs that were not used and kill the ones
+                # that are running, leaving the executor waits for them.
+                for future in future_map.values():
+                    future.cancel()
+                while not all(future.done() for future in future_map.values()):
+                    # A worker may have started a job after the others
+                    # were killed
+                    for worker in worker_list:
+                        worker.kill_running_job()
+                    concurrent.futures.wait(future_map.values(), timeout=0.1)
+                state.metadata.running_job_list = []
+
     @raises(UnexpectedMethodCall)
     def hand_pick_jobs(self, id_patterns: "Iterable[str]"):
         """
@@ -885,8 +1063,10 @@ class SessionAssistant:
         self._context.state.update_desired_job_list(
             desired_job_list, include_mandatory=False
         )
-        UsageExpectation.of(self).allowed_calls.update(
-            self._get_allowed_calls_in_normal_state()
+        allowed_calls = UsageExpectation.of(self).allowed_calls
+        allowed_calls.update(self._get_allowed_calls_in_normal_state())
+        allowed_calls[self.run_bootstrap_jobs_in_parallel] = (
+            "to run bootstrapping jobs, some of them in parallel"
         )
         return [job.id for job in self._context.state.run_list]
 
@@ -1393,17 +1573,7 @@ class SessionAssistant:
         to accomplish that.
         """
         UsageExpectation.of(self).enforce()
-        if isinstance(ui, IJobRunnerUI):
-            pass
-        elif isinstance(ui, str):
-            if ui == "silent":
-                ui = _SilentUI()
-            elif ui == "piano":
-                ui = _PianoUI()
-            else:
-                raise ValueError("unknown user interface: {!r}".format(ui))
-        else:
-            raise TypeError("incorrect UI type")
+        ui = self._get_job_runner_ui(ui)
         warm_up_list = self._runner.get_warm_up_sequence(
             self._context.state.run_list
         )
@@ -1524,6 +1694,154 @@ class SessionAssistant:
         allowed_calls[self.use_job_result] = "remember the result of last job"
         return builder
 
+    @staticmethod
+    def _get_job_runner_ui(ui):
+        if isinstance(ui, IJobRunnerUI):
+            return ui
+        elif isinstance(ui, str):
+            if ui == "silent":
+                return _SilentUI()
+            elif ui == "piano":
+                return _PianoUI()
+            else:
+                raise ValueError("unknown user interface: {!r}".format(ui))
+        else:
+            raise TypeError("incorrect UI type")
+
+    @raises(UnexpectedMethodCall)
+    def run_jobs_in_parallel(
+        self,
+        job_id_list: "List[str]",
+        max_workers: int,
+        get_ui: "Callable[[JobDefinition], Union[str, IJobRunnerUI]]" = None,
+    ) -> "Iterator[Tuple[str, Optional[JobResultBuilder]]]":
+        """
+        Run a list of jobs, running the parallel-safe ones concurrently.
+
+        :param job_id_list:
+            Identifiers of the jobs to run, in the order of the run list.
+        :param max_workers:
+            Maximum number of jobs to run at the same time.
+        :param get_ui:
+            (optional) Callable returning the user interface delegate for a
+            job that was run concurrently, as accepted by :meth:`run_job()`.
+            It is called when the turn of the job comes. By default the
+            'silent' user interface is used.
+        :raises KeyError:
+            If no such job exists
+        :raises UnexpectedMethodCall:
+            If the call is made at an unexpected time. Do not catch this error.
+            It is a bug in your program. The error message will indicate what
+            is the likely cause.
+        :returns:
+            An iterator of (job_id, builder) pairs, in the order of
+            job_id_list.
+
+        Jobs flagged ``parallel-safe`` that don't interact with the operator
+        (shell, attachment and resource jobs) are run by a pool of worker
+        threads as soon as the results of all of their dependencies were used
+        and they can start. When the turn of such a job comes, the user
+        interface is told about it (including its output) as if
+        :meth:`run_job()` was called and the result builder is returned.
+
+        The builder is None for all the other jobs: the caller has to run them
+        with :meth:`run_job()`, as usual. No job is run concurrently with them.
+
+        Either way, the result of each job must be fed back to the session
+        with :meth:`use_job_result()` before taking the next pair. Results
+        are thus used (and the session checkpointed) in the order of
+        job_id_list, like when jobs are run one at a time.
+        """
+        UsageExpectation.of(self).enforce()
+        job_list = [
+            self._context.state.job_state_map[job_id].job
+            for job_id in job_id_list
+        ]
+        return self._run_jobs_in_parallel(
+            job_list, max_workers, get_ui, self._can_run_job_in_pool
+        )
+
+    @raises(UnexpectedMethodCall)
+    def run_bootstrap_jobs_in_parallel(
+        self,
+        job_id_list: "List[str]",
+        max_workers: int,
+        get_ui: "Callable[[JobDefinition], Union[str, IJobRunnerUI]]" = None,
+    ) -> "Iterator[Tuple[str, Optional[JobResultBuilder]]]":
+        """
+        Run bootstrapping jobs, running the resource jobs concurrently.
+
+        :param job_id_list:
+            Identifiers of the jobs to run, as returned by
+            :meth:`get_bootstrap_todo_list()`.
+        :param max_workers:
+            Maximum number of jobs to run at the same time.
+        :param get_ui:
+            (optional) Callable returning the user interface delegate for a
+            job that was run concurrently. See :meth:`run_jobs_in_parallel()`.
+        :raises KeyError:
+            If no such job exists
+        :raises UnexpectedMethodCall:
+            If the call is made at an unexpected time. Do not catch this error.
+            It is a bug in your program. The error message will indicate what
+            is the likely cause.
+        :returns:
+            An iterator of (job_id, builder) pairs, in the order of
+            job_id_list.
+
+        This works like :meth:`run_jobs_in_parallel()`, except that resource
+        jobs don't have to be flagged ``parallel-safe`` to be run
+        concurrently, like in :meth:`bootstrap()`.
+        """
+        UsageExpectation.of(self).enforce()
+        job_list = [
+            self._context.state.job_state_map[job_id].job
+            for job_id in job_id_list
+        ]
+        return self._run_jobs_in_parallel(
+            job_list, max_workers, get_ui, self._can_run_bootstrap_job_in_pool
+        )
+
+    def _run_jobs_in_parallel(
+        self, job_list, max_workers, get_ui, can_run_in_pool
+    ):
+        state = self._context.state
+        for job, result in self._run_jobs_in_pool(
+            job_list, max_workers, can_run_in_pool
+        ):
+            if result is None:
+                yield job.id, None
+                continue
+            job_state = state.job_state_map[job.id]
+            ui = self._get_job_runner_ui(get_ui(job) if get_ui else "silent")
+            ui.considering_job(job, job_state)
+            ui.about_to_start_running(job, job_state)
+            ui.started_running(job, job_state)
+            delegate = JobRunnerUIDelegate(ui)
+            delegate.on_begin("", dict())
+            for record in result.io_log:
+                delegate.on_chunk(record.stream_name, record.data)
+            delegate.on_end(result.return_code)
+            ui.finished_running(job, job_state, result)
+            ui.finished(job, job_state, result)
+            # The runner measured the execution duration of the job
+            self._job_start_time = None
+            # Same expectations as after run_job()
+            allowed_calls = UsageExpectation.of(self).allowed_calls
+            del allowed_calls[self.run_job]
+            allowed_calls[self.use_job_result] = (
+                "remember the result of last job"
+            )
+            yield job.id, result.get_builder()
+
+    def _can_run_job_in_pool(self, job):
+        if job.plugin not in ("shell", "attachment", "resource"):
+            return False
+        flags = job.get_flag_set()
+        if "parallel-safe" not in flags:
+            return False
+        return not flags & {"noreturn", "autorestart"}
+
     @raises(UnexpectedMethodCall)
     def use_job_result(
         self, job_id: str, result: "IJobResult", override_last: bool = False
@@ -1893,6 +2211,7 @@ class SessionAssistant:
             self.get_dynamic_todo_list: "to see what is yet to be executed",
             self.get_manifest_repr: ("to get participating manifest units"),
             self.run_job: "to run a given job",
+            self.run_jobs_in_parallel: "to run jobs, some of them in parallel",
             self.use_alternate_selection: "to change the selection",
             self.hand_pick_jobs: "to generate new selection and use it",
             self.use_job_result: "to feed job result back to the session",
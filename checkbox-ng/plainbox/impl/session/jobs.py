@@ -29,6 +29,7 @@ that prevent the job from being runnable in a particular session.
 
 from enum import IntEnum
 import logging
+import weakref
 
 from plainbox.abc import IJobResult
 from plainbox.i18n import gettext as _
@@ -134,6 +135,9 @@ class JobReadinessInhibitor(pod.POD):
             resource expression.
     """
 
+    __slots__ = (
+        '_cause', '_related_job', '_related_expression', '__weakref__')
+
     # XXX: PENDING_RESOURCE is not strict, there are multiple states that are
     # clumped here which is something I don't like. A resource may be still
     # "pending" as in PENDING_DEP (it has not ran yet) or it could have ran but
@@ -223,6 +227,30 @@ class JobReadinessInhibitor(pod.POD):
 UndesiredJobReadinessInhibitor = JobReadinessInhibitor(
     InhibitionCause.UNDESIRED)
 
+# Inhibitors in use, by cause and identity of the related job and expression
+_inhibitor_cache = weakref.WeakValueDictionary({
+    (InhibitionCause.UNDESIRED, id(None), id(None)):
+    UndesiredJobReadinessInhibitor})
+
+
+def get_readiness_inhibitor(cause, related_job=None, related_expression=None):
+    """
+    Get a readiness inhibitor with the specified cause.
+
+    This takes the same arguments as :class:`JobReadinessInhibitor` but, as
+    inhibitors are read-only, the same object is returned for the same
+    arguments for as long as it is in use. Large sessions have many jobs
+    inhibited for the same reasons.
+    """
+    key = (cause, id(related_job), id(related_expression))
+    inhibitor = _inhibitor_cache.get(key)
+    if inhibitor is None:
+        inhibitor = JobReadinessInhibitor(
+            cause, related_job, related_expression)
+        # The inhibitor keeps the related objects, and their identity, alive
+        _inhibitor_cache[key] = inhibitor
+    return inhibitor
+
 
 JOB_VALUE = object()
 
@@ -286,6 +314,13 @@ class JobState(pod.POD):
     collaborate with the SessionState class and the UI layer.
     """
 
+    # There are as many job states as jobs, they have no __dict__
+    __slots__ = (
+        '_job', '_readiness_inhibitor_list', '_result', '_result_history',
+        '_effective_category_id', '_effective_certification_status',
+        '_effective_auto_retry', '_attempts', 'observer', '__signals__',
+        '__weakref__')
+
     job = pod.Field(
         doc="the job associated with this state",
         type=JobDefinition,
@@ -340,6 +375,13 @@ class JobState(pod.POD):
     # sequence-based API anymore. Otherwise each test will have two
     # result_history (more if you count things like resuming a session).
 
+    def __init__(self, *args, **kwargs):
+        """Initialize a new job state, see :class:`~plainbox.impl.pod.POD`."""
+        # Object told about changes of the result and of the effective
+        # category, see JobOutcomeAggregates in plainbox.impl.session.state
+        self.observer = None
+        super().__init__(*args, **kwargs)
+
     @result.change_notifier
     def _result_changed(self, old, new):
         # Don't track the initial assignment over UNSET
@@ -347,12 +389,19 @@ class JobState(pod.POD):
             return
         assert new != old
         assert isinstance(new, IJobResult)
+        if self.observer is not None:
+            self.observer.update(self)
         if new.is_hollow:
             return
         logger.debug(
             "Appending result %r to history: %r", new, self.result_history)
         self.result_history += (new,)
 
+    @effective_category_id.change_notifier
+    def _effective_category_id_changed(self, old, new):
+        if self.observer is not None:
+            self.observer.update(self)
+
     def can_start(self):
         """Quickly check if the associated job can run right now."""
         return len(self.readiness_inhibitor_list) == 0 and self.attempts > 0
@@ -43,6 +43,7 @@ from plainbox.impl.session.state import SessionDeviceContext
 from plainbox.impl.session.state import SessionState
 from plainbox.impl.session.storage import LockedStorageError
 from plainbox.impl.session.storage import SessionStorage
+from plainbox.impl.session.suspend import SessionJournalHelper
 from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.unit.testplan import TestPlanUnit
 from plainbox.vendor import morris
@@ -97,6 +98,9 @@ class SessionManager(pod.POD):
 
     _throwaway_managers = dict()
 
+    # SessionJournalHelper tracking changes since the last full checkpoint
+    _journal = None
+
     def _on_test_plans_changed(self, old: "Any", new: "Any") -> None:
         self._propagate_test_plans()
 
@@ -251,6 +255,7 @@ class SessionManager(pod.POD):
             Fresh instance of :class:`SessionManager`
         """
         logger.debug("SessionManager.load_session()")
+        journal = None
         try:
             data = storage.load_checkpoint()
         except IOError as exc:
@@ -259,11 +264,18 @@ class SessionManager(pod.POD):
             else:
                 raise
         else:
+            record_list = storage.load_journal(data)
             state = SessionResumeHelper(
                 unit_list, flags, storage.location
-            ).resume(data, early_cb)
+            ).resume(data, early_cb, record_list)
+            # Keep appending to the existing journal
+            journal = SessionJournalHelper()
+            journal.reset(state, len(data), sum(
+                len(record) + 1 for record in record_list))
         context = SessionDeviceContext(state)
-        return cls([context], storage)
+        manager = cls([context], storage)
+        manager._journal = journal
+        return manager
 
     def checkpoint(self):
         """
@@ -271,8 +283,27 @@ class SessionManager(pod.POD):
 
         After calling this method you can later reopen the same session with
         :meth:`SessionManager.load_session()`.
+
+        Most of the time only the changes made since the previous checkpoint
+        are appended to the session journal. A full snapshot of the session is
+        saved when the journal cannot represent the change (for instance, when
+        the desired job list was altered) or when it grew large enough to be
+        compacted. See :class:`SessionJournalHelper` for details.
         """
         logger.debug("SessionManager.checkpoint()")
+        if self._journal is not None and self._journal.can_append(self.state):
+            record = self._journal.suspend_delta(
+                self.state, self.storage.location)
+            if record is not None:
+                logger.debug(
+                    ngettext(
+                        "Appending %d byte of journal data to %r",
+                        "Appending %d bytes of journal data to %r",
+                        len(record)
+                    ), len(record), self.storage.location)
+                self.storage.append_journal(record)
+                self._save_metadata()
+            return
         data = SessionSuspendHelper().suspend(
             self.state, self.storage.location)
         logger.debug(
@@ -285,6 +316,22 @@ class SessionManager(pod.POD):
         except LockedStorageError:
             self.storage.break_lock()
             self.storage.save_checkpoint(data)
+        self.storage.reset_journal(data)
+        if self._journal is None:
+            self._journal = SessionJournalHelper()
+        self._journal.reset(self.state, len(data))
+        self._save_metadata()
+
+    def _save_metadata(self):
+        # The meta-data is saved on its own as well, so that sessions can be
+        # listed without loading their checkpoints. It's just a shortcut, see
+        # SessionPeekHelper.peek_storage()
+        data = SessionSuspendHelper().suspend_metadata(
+            self.state.metadata, self.storage.location)
+        try:
+            self.storage.save_metadata(data)
+        except OSError as exc:
+            logger.warning(_("Cannot save session meta-data: %s"), exc)
 
     def destroy(self):
         """
@@ -16,17 +16,21 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 import fnmatch
+import hashlib
 import io
 import json
 import gettext
 import logging
+import lzma
 import os
 import pwd
 import time
+import zlib
 from collections import namedtuple
 from contextlib import suppress
+from functools import partial
 from tempfile import SpooledTemporaryFile
-from threading import Thread, Lock
+from threading import Event, Thread, Lock
 from plainbox.impl.config import Configuration
 from plainbox.impl.execution import UnifiedRunner
 from plainbox.impl.session.assistant import SessionAssistant
@@ -60,6 +64,15 @@ class Interaction(namedtuple("Interaction", ["kind", "message", "extra"])):
         return super(Interaction, cls).__new__(cls, kind, message, extra)
 
 
+# Codecs that can be used to compress frames of a report transfer, as
+# (compress, decompress) pairs. See RemoteSessionAssistant.read_report_frame()
+REPORT_TRANSFER_CODECS = {
+    "none": (bytes, bytes),
+    "zlib": (zlib.compress, zlib.decompress),
+    "xz": (partial(lzma.compress, preset=1), lzma.decompress),
+}
+
+
 Idle = "idle"
 Started = "started"
 Bootstrapping = "bootstrapping"
@@ -73,10 +86,12 @@ Finalizing = "finalizing"
 class BufferedUI(SilentUI):
     """UI type that queues the output for later reading."""
 
-    def __init__(self):
+    def __init__(self, activity=None):
         super().__init__()
         self.lock = Lock()
         self._output = io.StringIO()
+        # Event set whenever there is new output to read
+        self._activity = activity or Event()
 
     def _ignore_program_output(self, stream_name, line):
         pass
@@ -89,6 +104,7 @@ class BufferedUI(SilentUI):
                 # Don't start a agent->controller transfer for binary attachments
                 self._output.write("hidden(Hiding binary test output)\n")
                 self.got_program_output = self._ignore_program_output
+        self._activity.set()
 
     def get_output(self):
         """Returns all the output queued up since previous call."""
@@ -133,7 +149,10 @@ class BackgroundExecutor(Thread):
 
     def run(self):
         self._started_real_run = True
-        self._builder = self._real_run(self._job_id, self._ui, False)
+        try:
+            self._builder = self._real_run(self._job_id, self._ui, False)
+        finally:
+            self._sa.notify_job_activity()
         _logger.debug("Finished running")
 
     def outcome(self):
@@ -150,7 +169,9 @@ class RemoteSessionAssistant:
         self._cmd_callback = cmd_callback
         self._session_change_lock = Lock()
         self._operator_lock = Lock()
-        self._ui = BufferedUI()
+        # Set when the running job produces output or finishes
+        self._job_activity = Event()
+        self._ui = BufferedUI(self._job_activity)
         self._input_piping = os.pipe()
         self._passwordless_sudo = is_passwordless_sudo()
         self.terminate_cb = None
@@ -172,6 +193,7 @@ class RemoteSessionAssistant:
         self._current_comments = ""
         self._last_response = None
         self._normal_user = ""
+        self._report_transfer = None
         self.session_change_lock.acquire(blocking=False)
         self.session_change_lock.release()
 
@@ -414,7 +436,7 @@ class RemoteSessionAssistant:
         if "suppress-output" in job.get_flag_set():
             show_out = False
         if show_out:
-            self._ui = BufferedUI()
+            self._ui = BufferedUI(self._job_activity)
         else:
             self._ui = RemoteSilentUI()
         return self._ui
@@ -543,6 +565,33 @@ class RemoteSessionAssistant:
         else:
             return ("done", self._ui.get_output())
 
+    def notify_job_activity(self):
+        """Wake up :meth:`wait_job_output()`, the job state changed."""
+        self._job_activity.set()
+
+    @allowed_when(Running, Bootstrapping, Interacting, TestsSelected)
+    def wait_job_output(self, timeout=0.5):
+        """
+        Wait for the currently running job to print something or finish.
+
+        This is a long-polling variant of :meth:`monitor_job()`: it returns
+        the same values as soon as the job prints something or finishes,
+        instead of whatever happened since the previous call. The controller
+        calls it in a loop, passing the input of the operator with
+        :meth:`transmit_input()` in between.
+
+        :param timeout:
+            Maximum number of seconds to wait, so that the controller gets a
+            chance to pass input to a silent job. This must stay well below
+            the RPC timeout of the controller.
+        :returns:
+            (state, payload) tuple, see :meth:`monitor_job()`
+        """
+        if self._be and self._be.is_alive():
+            self._job_activity.wait(timeout)
+        self._job_activity.clear()
+        return self.monitor_job()
+
     def get_remote_api_version(self):
         return self.REMOTE_API_VERSION
 
@@ -797,3 +846,62 @@ class RemoteSessionAssistant:
         exporter.dump_from_session_manager(self._sa._manager, exported_stream)
         exported_stream.flush()
         return exported_stream
+
+    def prepare_report_transfer(self, exporter_id, options):
+        """
+        Export a report and keep it around for :meth:`read_report_frame()`.
+
+        Unlike :meth:`exposed_cache_report()`, which hands out the file to be
+        read remotely in small pieces, this lets the controller pull the
+        report in large, optionally compressed frames. Only the most recently
+        prepared report is kept.
+
+        :returns:
+            (size, digest) tuple, the size of the report in bytes and the
+            hex SHA-256 digest of its content, which also identifies the
+            transfer.
+        """
+        stream = self.exposed_cache_report(exporter_id, options)
+        size = stream.tell()
+        stream.seek(0)
+        digest = hashlib.sha256()
+        for buf in iter(lambda: stream.read(1 << 20), b""):
+            digest.update(buf)
+        if self._report_transfer is not None:
+            self._report_transfer[1].close()
+        self._report_transfer = (digest.hexdigest(), stream)
+        return size, self._report_transfer[0]
+
+    def read_report_frame(self, digest, offset, length, codec="none"):
+        """
+        Read a frame of the report exported by prepare_report_transfer().
+
+        Frames can be requested in any order, so an interrupted transfer can
+        be resumed from the last offset that was received.
+
+        :param digest:
+            Digest returned by :meth:`prepare_report_transfer()`
+        :param offset:
+            Offset of the first byte of the frame
+        :param length:
+            Maximum number of bytes in the frame (before compression)
+        :param codec:
+            Name of the preferred codec, see ``REPORT_TRANSFER_CODECS``
+        :returns:
+            (codec, data, crc32) tuple. The codec is "none" when compression
+            doesn't make the frame smaller, the CRC32 is computed over the
+            uncompressed data. Empty data signals the end of the report.
+        :raises ValueError:
+            If the report is no longer available
+        """
+        if self._report_transfer is None or self._report_transfer[0] != digest:
+            raise ValueError("Report {} is not available".format(digest))
+        stream = self._report_transfer[1]
+        stream.seek(offset)
+        data = stream.read(length)
+        crc = zlib.crc32(data)
+        if codec != "none" and data:
+            compressed = REPORT_TRANSFER_CODECS[codec][0](data)
+            if len(compressed) < len(data):
+                return codec, compressed, crc
+        return "none", data, crc
@@ -63,6 +63,7 @@ from plainbox.impl.secure.origin import Origin
 from plainbox.impl.secure.qualifiers import SimpleQualifier
 from plainbox.impl.session.state import SessionMetaData
 from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.suspend import SessionSuspendHelper
 
 logger = logging.getLogger("plainbox.session.resume")
 
@@ -155,17 +156,68 @@ class EnvelopeUnpackMixIn:
         except ValueError:
             raise CorruptedSessionError(_("Cannot interpret session JSON"))
 
+    def replay_journal(self, json_repr, record_list):
+        """
+        Apply session journal records to the JSON representation of a session.
+
+        :param json_repr:
+            The JSON representation of a session, as returned by
+            :meth:`unpack_envelope()`. It is modified in place.
+        :param record_list:
+            A list of journal records (bytes), as returned by
+            :meth:`~plainbox.impl.session.storage.SessionStorage.
+            load_journal()`
+        :returns:
+            the JSON representation of a session with all of the records
+            applied
+        :raises CorruptedSessionError:
+            if any of the records is corrupted in any way
+        :raises IncompatibleSessionError:
+            if any of the records was created for a different serialization
+            format than the session
+
+        Each record replaces the meta-data and the jobs and results of
+        the jobs it mentions. Since records are not incremental on the level
+        of individual jobs, replaying the same record twice is harmless.
+        """
+        if not record_list:
+            return json_repr
+        _validate(json_repr, value_type=dict)
+        version = _validate(json_repr, key="version", value_type=int)
+        session_repr = _validate(json_repr, key='session', value_type=dict)
+        for record in record_list:
+            try:
+                record_repr = json.loads(record.decode("UTF-8"))
+            except (UnicodeDecodeError, ValueError):
+                raise CorruptedSessionError(
+                    _("Cannot interpret journal record"))
+            _validate(record_repr, value_type=dict)
+            if _validate(record_repr, key="version") != version:
+                raise IncompatibleSessionError(
+                    _("Journal record version does not match the session"))
+            if 'metadata' in record_repr:
+                session_repr['metadata'] = _validate(
+                    record_repr, key='metadata', value_type=dict)
+            for key in ('jobs', 'results'):
+                if key in record_repr:
+                    _validate(session_repr, key=key, value_type=dict).update(
+                        _validate(record_repr, key=key, value_type=dict))
+        return json_repr
+
 
 class SessionPeekHelper(EnvelopeUnpackMixIn):
 
     """A helper class to peek at session state meta-data quickly."""
 
-    def peek(self, data):
+    def peek(self, data, journal=None):
         """
         Peek at the meta-data of a dormant session.
 
         :param data:
             Bytes representing the dormant session
+        :param journal:
+            (optional) List of session journal records to replay on top of
+            the dormant session
         :returns:
             a SessionMetaData object
         :raises CorruptedSessionError:
@@ -173,9 +225,85 @@ class SessionPeekHelper(EnvelopeUnpackMixIn):
         :raises IncompatibleSessionError:
             if session serialization format is not supported
         """
-        json_repr = self.unpack_envelope(data)
+        json_repr = self.replay_journal(self.unpack_envelope(data), journal)
         return self._peek_json(json_repr)
 
+    def peek_metadata(self, data):
+        """
+        Peek at the meta-data of a session, saved on its own.
+
+        :param data:
+            Bytes representing the meta-data, as computed by
+            :meth:`~plainbox.impl.session.suspend.SessionSuspendHelper1.
+            suspend_metadata()`
+        :returns:
+            a SessionMetaData object
+        :raises CorruptedSessionError:
+            if the representation of the meta-data is corrupted in any way
+        :raises IncompatibleSessionError:
+            if session serialization format is not supported
+        """
+        try:
+            json_repr = json.loads(data.decode("UTF-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise CorruptedSessionError(
+                _("Cannot interpret session meta-data"))
+        _validate(json_repr, value_type=dict)
+        # Wrap it the way it is in a full session representation
+        return self._peek_json({
+            "version": _validate(json_repr, key="version"),
+            "session": {
+                "metadata": _validate(
+                    json_repr, key="metadata", value_type=dict),
+            },
+        })
+
+    def peek_storage(self, storage):
+        """
+        Peek at the meta-data of the session kept in a storage.
+
+        :param storage:
+            A SessionStorage instance
+        :returns:
+            a SessionMetaData object or None if no checkpoint was saved yet
+        :raises CorruptedSessionError:
+            if the representation of the session is corrupted in any way
+        :raises IncompatibleSessionError:
+            if session serialization format is not supported
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem
+
+        The meta-data saved next to the checkpoint (see
+        :meth:`~plainbox.impl.session.storage.SessionStorage.save_metadata()`)
+        is used if it is up to date. Otherwise the checkpoint and the journal
+        are loaded, as with :meth:`peek()`, and the meta-data is saved so that
+        the next peek is fast.
+        """
+        data = storage.load_metadata()
+        if data is not None:
+            try:
+                return self.peek_metadata(data)
+            except SessionResumeError as exc:
+                # Keep it, it would just be saved again the same way
+                logger.warning(_("Ignoring session meta-data in %r: %s"),
+                               storage.location, exc)
+        # Stamped before loading so that a checkpoint saved meanwhile makes
+        # the saved meta-data stale
+        stamp = storage.get_checkpoint_stamp()
+        checkpoint_data = storage.load_checkpoint()
+        if not checkpoint_data:
+            return None
+        metadata = self.peek(
+            checkpoint_data, storage.load_journal(checkpoint_data))
+        if data is None:
+            try:
+                storage.save_metadata(
+                    SessionSuspendHelper().suspend_metadata(metadata), stamp)
+            except OSError as exc:
+                logger.debug(_("Cannot save session meta-data in %r: %s"),
+                             storage.location, exc)
+        return metadata
+
     def _peek_json(self, json_repr):
         """
         Resume a SessionMetaData object from the JSON representation.
@@ -184,8 +312,9 @@ class SessionPeekHelper(EnvelopeUnpackMixIn):
         and parsing is done. The only error conditions that can happen
         are related to semantic incompatibilities or corrupted internal state.
         """
-        logger.debug(_("Peeking at json... (see below)"))
-        logger.debug(json.dumps(json_repr, indent=4))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(_("Peeking at json... (see below)"))
+            logger.debug(json.dumps(json_repr, indent=4))
         _validate(json_repr, value_type=dict)
         version = _validate(json_repr, key="version", choice=[1])
         if version == 1:
@@ -202,6 +331,8 @@ class SessionPeekHelper(EnvelopeUnpackMixIn):
             return SessionPeekHelper6().peek_json(json_repr)
         elif version == 7:
             return SessionPeekHelper7().peek_json(json_repr)
+        elif version == 8:
+            return SessionPeekHelper8().peek_json(json_repr)
         else:
             raise IncompatibleSessionError(
                 _("Unsupported version {}").format(version))
@@ -265,7 +396,7 @@ class SessionResumeHelper(EnvelopeUnpackMixIn):
         self.flags = flags
         self.location = location
 
-    def resume(self, data, early_cb=None):
+    def resume(self, data, early_cb=None, journal=None):
         """
         Resume a dormant session.
 
@@ -277,6 +408,9 @@ class SessionResumeHelper(EnvelopeUnpackMixIn):
             be used to register signal listeners on the new session before this
             method call returns. The callback accepts one argument, session,
             which is being resumed.
+        :param journal:
+            (optional) List of session journal records to replay on top of
+            the dormant session
         :returns:
             resumed session instance
         :rtype:
@@ -297,7 +431,7 @@ class SessionResumeHelper(EnvelopeUnpackMixIn):
         :raises IncompatibleJobError:
             if serialized jobs are not the same as current jobs
         """
-        json_repr = self.unpack_envelope(data)
+        json_repr = self.replay_journal(self.unpack_envelope(data), journal)
         return self._resume_json(json_repr, early_cb)
 
     def _resume_json(self, json_repr, early_cb=None):
@@ -308,8 +442,9 @@ class SessionResumeHelper(EnvelopeUnpackMixIn):
         and parsing is done. The only error conditions that can happen
         are related to semantic incompatibilities or corrupted internal state.
         """
-        logger.debug(_("Resuming from json... (see below)"))
-        logger.debug(json.dumps(json_repr, indent=4))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(_("Resuming from json... (see below)"))
+            logger.debug(json.dumps(json_repr, indent=4))
         _validate(json_repr, value_type=dict)
         version = _validate(json_repr, key="version", choice=[1])
         if version == 1:
@@ -333,6 +468,9 @@ class SessionResumeHelper(EnvelopeUnpackMixIn):
         elif version == 7:
             helper = SessionResumeHelper7(
                 self.job_list, self.flags, self.location)
+        elif version == 8:
+            helper = SessionResumeHelper8(
+                self.job_list, self.flags, self.location)
         else:
             raise IncompatibleSessionError(
                 _("Unsupported version {}").format(version))
@@ -466,6 +604,18 @@ class MetaDataHelper7MixIn(MetaDataHelper6MixIn):
             value_type=float)
 
 
+class MetaDataHelper8MixIn(MetaDataHelper7MixIn):
+    def _restore_SessionState_metadata(cls, metadata, session_repr):
+        super()._restore_SessionState_metadata(metadata, session_repr)
+        metadata.running_job_list = [
+            _validate(
+                job_id, value_type=str,
+                value_type_msg=_("Each job id must be a string"))
+            for job_id in _validate(
+                session_repr['metadata'], key='running_job_list',
+                value_type=list)]
+
+
 class SessionPeekHelper1(MetaDataHelper1MixIn):
 
     """
@@ -586,6 +736,20 @@ class SessionPeekHelper7(MetaDataHelper7MixIn, SessionPeekHelper6):
     The only goal of this class is to reconstruct session state meta-data.
     """
 
+
+class SessionPeekHelper8(MetaDataHelper8MixIn, SessionPeekHelper7):
+    """
+    Helper class for implementing session peek feature
+
+    This class works with data constructed by
+    :class:`~plainbox.impl.session.suspend.SessionSuspendHelper8` which has
+    been pre-processed by :class:`SessionPeekHelper` (to strip the initial
+    envelope).
+
+    The only goal of this class is to reconstruct session state meta-data.
+    """
+
+
 class SessionResumeHelper1(MetaDataHelper1MixIn):
 
     """
@@ -626,6 +790,13 @@ class SessionResumeHelper1(MetaDataHelper1MixIn):
     FLAG_IGNORE_JOB_CHECKSUMS_S = 'ignore-job-checksums'
     FLAG_IGNORE_JOB_CHECKSUMS_F = 0x04
 
+    # Jobs, results and resources (and the jobs generated from them) are
+    # restored without recomputing the readiness of the jobs, which is done
+    # once all of them are restored. Setting this to False recomputes it each
+    # time a job is added or a result is restored, which is quadratic in the
+    # number of jobs but useful to verify the bulk resume.
+    bulk_resume = True
+
     def __init__(
         self, job_list: 'List[JobDefinition]',
         flags: 'Optional[Iterable[str]]', location: 'Optional[str]'
@@ -725,7 +896,9 @@ class SessionResumeHelper1(MetaDataHelper1MixIn):
         # List of jobs (ids) that could not be processed on the first pass
         leftover_jobs = deque()
         # Ensure siblings are generated in the session
-        [session.add_unit(u) for u in self.job_list if u.Meta.name == 'job']
+        for unit in self.job_list:
+            if unit.Meta.name == 'job':
+                session.add_unit(unit, recompute=not self.bulk_resume)
         # Run a first pass through jobs and results. Anything that didn't
         # work (generated jobs) gets added to leftover_jobs list.
         # To make this bit deterministic (we like determinism) we're always
@@ -766,6 +939,8 @@ class SessionResumeHelper1(MetaDataHelper1MixIn):
                 raise CorruptedSessionError(
                     _("Unknown jobs remaining: {}").format(
                         ", ".join(leftover_jobs)))
+        if self.bulk_resume:
+            session._recompute_job_readiness()
 
     def _process_job(self, session, jobs_repr, results_repr, job_id):
         """
@@ -819,7 +994,8 @@ class SessionResumeHelper1(MetaDataHelper1MixIn):
         # Replay each result, one by one
         for result in result_list:
             logger.debug(_("calling update_job_result(%r, %r)"), job, result)
-            session.update_job_result(job, result)
+            session.update_job_result(
+                job, result, recompute=not self.bulk_resume)
 
     @classmethod
     def _restore_SessionState_desired_job_list(cls, session, session_repr):
@@ -1162,6 +1338,10 @@ class SessionResumeHelper7(MetaDataHelper7MixIn, SessionResumeHelper6):
     pass
 
 
+class SessionResumeHelper8(MetaDataHelper8MixIn, SessionResumeHelper7):
+    pass
+
+
 def _validate(obj, **flags):
     """Multi-purpose extraction and validation function."""
     # Fetch data from the container OR use json_repr directly
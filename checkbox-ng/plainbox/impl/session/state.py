@@ -24,14 +24,14 @@ Session State Handling.
 import collections
 import json
 import logging
-import re
 
 from plainbox.abc import IJobResult
 from plainbox.i18n import gettext as _
 from plainbox.impl import deprecated
 from plainbox.impl.depmgr import DependencyDuplicateError
-from plainbox.impl.depmgr import DependencyError
 from plainbox.impl.depmgr import DependencySolver
+from plainbox.impl.resource import ResourceProgramError
+from plainbox.impl.secure.qualifiers import PatternSet
 from plainbox.impl.secure.qualifiers import select_jobs
 from plainbox.impl.session.jobs import JobState
 from plainbox.impl.session.jobs import UndesiredJobReadinessInhibitor
@@ -87,6 +87,7 @@ class SessionMetaData:
         self._custom_joblist = custom_joblist
         self._rejected_jobs = []
         self._last_job_start_time = None
+        self._running_job_list = []
 
     def __repr__(self):
         """Get the representation of the session state meta-data."""
@@ -217,6 +218,21 @@ class SessionMetaData:
     def last_job_start_time(self, value):
         self._last_job_start_time = value
 
+    @property
+    def running_job_list(self):
+        """
+        ids of the jobs that are running concurrently.
+
+        This property is only updated when jobs are run concurrently, it is
+        empty otherwise. Before such jobs are started, :attr:`running_job_name`
+        is set to the first of them.
+        """
+        return self._running_job_list
+
+    @running_job_list.setter
+    def running_job_list(self, value):
+        self._running_job_list = value
+
 
 class SessionDeviceContext:
 
@@ -252,6 +268,10 @@ class SessionDeviceContext:
     # Cache key that stores the map of field overrides
     _CACHE_OVERRIDE_MAP = 'override_map'
 
+    # Cache key that stores the field overrides along with a set of their
+    # patterns
+    _CACHE_OVERRIDE_MATCHER = 'override_matcher'
+
     def __init__(self, state=None):
         """
         Initialize a new SessionDeviceContext.
@@ -539,26 +559,30 @@ class SessionDeviceContext:
                 override_map.setdefault(pattern, []).extend(override_list)
         return override_map
 
+    def _compute_override_matcher(self):
+        """Compute the field overrides matched by a set of patterns."""
+        return (PatternSet(self.override_map),
+                list(self.override_map.values()))
+
     def _invalidate_override_map(self, *args, **kwargs):
         """Invalidate the cached field override map."""
         self.invalidate_shared(self._CACHE_OVERRIDE_MAP)
+        self.invalidate_shared(self._CACHE_OVERRIDE_MATCHER)
 
     def _bulk_override_update(self):
-        # NOTE: there is an O(N) algorithm for that solves this but it is more
-        # complicated than I was able to write without a hard-copy reference
-        # that describes it. I will improve this method once I complete the
-        # required research.
         for job_state in self.state.job_state_map.values():
-            job = job_state.job
-            for pattern, override_list in self.override_map.items():
-                if re.match(pattern, job.id):
-                    job_state.apply_overrides(override_list)
+            self._apply_overrides(job_state)
 
     def _override_update(self, job):
-        job_state = self.state.job_state_map[job.id]
-        for pattern, override_list in self.override_map.items():
-            if re.match(pattern, job.id):
-                job_state.apply_overrides(override_list)
+        self._apply_overrides(self.state.job_state_map[job.id])
+
+    def _apply_overrides(self, job_state):
+        pattern_set, override_lists = self.compute_shared(
+            self._CACHE_OVERRIDE_MATCHER, self._compute_override_matcher)
+        if not override_lists:
+            return
+        for index in pattern_set.find_matches(job_state.job.id):
+            job_state.apply_overrides(override_lists[index])
 
     def _update_mandatory_job_list(self):
         qualifier_list = []
@@ -570,6 +594,136 @@ class SessionDeviceContext:
         self.state.update_desired_job_list(self.state.desired_job_list)
 
 
+class JobOutcomeAggregates:
+
+    """
+    Counts of the jobs of a session by category, kind and outcome.
+
+    The counts are updated when jobs are added to or removed from the session
+    and when their results or effective categories change (each
+    :class:`JobState` tells its observer), so that the statistics of a session
+    are computed without looking at each of its jobs. The kind of a job is its
+    plugin for resource and attachment jobs and None for the other ones.
+    """
+
+    SPECIAL_KINDS = ('resource', 'attachment')
+
+    def __init__(self):
+        # Job id -> (job state, key it is counted with), the key is a tuple
+        # (category_id, kind, outcome)
+        self._job_map = {}
+        # (kind, outcome) -> number of jobs
+        self._outcome_count_map = collections.Counter()
+        # category_id -> (kind, outcome) -> number of jobs
+        self._category_count_map = collections.defaultdict(
+            collections.Counter)
+
+    def add(self, job_state):
+        """Start counting a job."""
+        self.remove(job_state.job)
+        job_state.observer = self
+        key = self._get_key(job_state)
+        self._job_map[job_state.job.id] = (job_state, key)
+        self._count(key, 1)
+
+    def update(self, job_state):
+        """Count a job again, after its result or category changed."""
+        job_state_and_key = self._job_map.get(job_state.job.id)
+        if job_state_and_key is None or job_state_and_key[0] is not job_state:
+            # Not in the session anymore
+            return
+        key = self._get_key(job_state)
+        if key != job_state_and_key[1]:
+            self._count(job_state_and_key[1], -1)
+            self._job_map[job_state.job.id] = (job_state, key)
+            self._count(key, 1)
+
+    def remove(self, job):
+        """Stop counting a job."""
+        job_state_and_key = self._job_map.pop(job.id, None)
+        if job_state_and_key is not None:
+            self._count(job_state_and_key[1], -1)
+
+    def _get_key(self, job_state):
+        plugin = job_state.job.plugin
+        return (job_state.effective_category_id,
+                plugin if plugin in self.SPECIAL_KINDS else None,
+                job_state.result.outcome)
+
+    def _count(self, key, delta):
+        category_id, kind, outcome = key
+        for count_map in (self._outcome_count_map,
+                          self._category_count_map[category_id]):
+            count_map[kind, outcome] += delta
+            if not count_map[kind, outcome]:
+                del count_map[kind, outcome]
+        if not self._category_count_map[category_id]:
+            del self._category_count_map[category_id]
+
+    def get_outcome_stats(self, kind_list=(None,) + SPECIAL_KINDS):
+        """
+        Get the number of jobs with each outcome.
+
+        :param kind_list:
+            Kinds of jobs to count, all of them by default
+        :returns:
+            a mapping of "outcome": "total" key/value pairs, for the outcomes
+            seen during the session
+        """
+        stats = collections.defaultdict(int)
+        for (kind, outcome), count in self._outcome_count_map.items():
+            if outcome and kind in kind_list:
+                stats[outcome] += count
+        return stats
+
+    def get_global_outcome(self, kind):
+        """Get the outcome of all of the jobs of a kind taken together."""
+        return self._reduce_outcomes(
+            outcome for job_kind, outcome in self._outcome_count_map
+            if job_kind == kind)
+
+    def get_category_ids(self, kind_list=(None,) + SPECIAL_KINDS):
+        """
+        Get the categories of jobs with a result.
+
+        :param kind_list:
+            Kinds of jobs to consider, all of them by default
+        :returns:
+            A set of category identifiers
+        """
+        return frozenset(
+            category_id
+            for category_id, count_map in self._category_count_map.items()
+            if any(outcome is not None and kind in kind_list
+                   for kind, outcome in count_map))
+
+    def get_category_outcome_map(self):
+        """
+        Get the outcome of the jobs (other than resource and attachment jobs)
+        of each category with a result, taken together.
+        """
+        outcome_map = {}
+        for category_id, count_map in self._category_count_map.items():
+            if not any(outcome is not None for kind, outcome in count_map):
+                continue
+            outcome_list = [
+                outcome for kind, outcome in count_map if kind is None]
+            if outcome_list:
+                outcome_map[category_id] = self._reduce_outcomes(
+                    outcome_list)
+        return outcome_map
+
+    @staticmethod
+    def _reduce_outcomes(outcomes):
+        outcome_set = frozenset(outcomes)
+        if (IJobResult.OUTCOME_FAIL in outcome_set or
+                IJobResult.OUTCOME_CRASH in outcome_set):
+            return IJobResult.OUTCOME_FAIL
+        elif IJobResult.OUTCOME_PASS in outcome_set:
+            return IJobResult.OUTCOME_PASS
+        return IJobResult.OUTCOME_SKIP
+
+
 class SessionState:
 
     """
@@ -646,6 +800,12 @@ class SessionState:
     :ivar dict metadata: instance of :class:`SessionMetaData`
     """
 
+    # When a job result is presented to the session only the readiness of the
+    # jobs that depend on that job (directly or through a resource program)
+    # is recomputed. Setting this to False forces a full recompute of all the
+    # jobs instead, which is useful to verify the incremental updates.
+    incremental_readiness = True
+
     @morris.signal
     def on_job_state_map_changed(self):
         """
@@ -679,6 +839,7 @@ class SessionState:
 
         This signal is fired **after** :meth:`on_job_state_map_changed()`
         """
+        self._aggregates.add(self._job_state_map[job.id])
 
     @morris.signal
     def on_job_removed(self, job):
@@ -687,14 +848,25 @@ class SessionState:
 
         This signal is fired **after** :meth:`on_job_state_map_changed()`
         """
+        self._aggregates.remove(job)
 
     @morris.signal
     def on_unit_added(self, unit):
         """Signal sent whenever a unit is added to the session."""
+        if unit.Meta.name == 'category':
+            self._category_unit_map[unit.id] = unit
 
     @morris.signal
     def on_unit_removed(self, unit):
         """Signal sent whenever a unit is removed from the session."""
+        if (unit.Meta.name == 'category' and
+                self._category_unit_map.get(unit.id) is unit):
+            del self._category_unit_map[unit.id]
+            # Another unit with the same identifier may be left
+            for other_unit in self._unit_list:
+                if (other_unit.Meta.name == 'category' and
+                        other_unit.id == unit.id):
+                    self._category_unit_map[unit.id] = other_unit
 
     def __init__(self, unit_list):
         """
@@ -740,10 +912,18 @@ class SessionState:
         self._unit_list = unit_list
         self._job_state_map = {job.id: JobState(job)
                                for job in self._job_list}
+        self._aggregates = JobOutcomeAggregates()
+        for job_state in self._job_state_map.values():
+            self._aggregates.add(job_state)
+        # Category units by identifier, the last one wins
+        self._category_unit_map = {
+            unit.id: unit for unit in unit_list
+            if unit.Meta.name == 'category'}
         self._desired_job_list = []
         self._mandatory_job_list = []
         self._run_list = []
         self._resource_map = {}
+        self._reverse_dependency_map = None
         self._fake_resources = False
         self._metadata = SessionMetaData()
         super(SessionState, self).__init__()
@@ -807,6 +987,7 @@ class SessionState:
             if should_remove is True]
         # Replace job list with the filtered list
         self._job_list = retain_list
+        self._reverse_dependency_map = None
         if remove_list:
             # Notify that the job state map has changed
             self.on_job_state_map_changed()
@@ -815,6 +996,24 @@ class SessionState:
                 self.on_job_removed(job)
                 self.on_unit_removed(job)
 
+    def discard_job_state(self, job):
+        """
+        Forget the state of a job.
+
+        :param job:
+            A job that is known to the session
+
+        The job is removed from the run list and its state is removed from
+        the job state map and from the outcome statistics of the session. The
+        job itself is left on the job list. This is used to leave jobs out of
+        reports.
+        """
+        if job in self._run_list:
+            self._run_list.remove(job)
+        del self._job_state_map[job.id]
+        self._aggregates.remove(job)
+        self._reverse_dependency_map = None
+
     def update_mandatory_job_list(self, mandatory_job_list):
         """
         Update the set of mandatory jobs (that must run).
@@ -847,42 +1046,15 @@ class SessionState:
         if include_mandatory:
             self._desired_job_list += self._mandatory_job_list
         self._desired_job_list += list(desired_job_list)
-        # Reset run list just in case desired_job_list is empty
-        self._run_list = []
-        # Try to solve the dependency graph. This is done in a loop as may need
-        # to remove a problematic job and re-try. The loop provides a stop
-        # condition as we will eventually run out of jobs.
-        problems = []
-        # Get a copy of all the jobs as we'll be removing elements from this
-        # list to come to a stable set in the loop below.
-        job_list = self._job_list[:]
-        while self._desired_job_list:
-            # XXX: it might be more efficient to incorporate this 'recovery
-            # mode' right into the solver, this way we'd probably save some
-            # resources or runtime complexity.
-            try:
-                self._run_list = DependencySolver.resolve_dependencies(
-                    job_list, self._desired_job_list)
-            except DependencyError as exc:
-                # When a dependency error is detected remove the affected job
-                # form _desired_job_list and try again.
-                if exc.affected_job in self._desired_job_list:
-                    # The job may have been removed by now:
-                    # https://bugs.launchpad.net/plainbox/+bug/1444126
-                    self._desired_job_list.remove(exc.affected_job)
-                if exc.affected_job in job_list:
-                    # If the affected job is in the job list, remove it from
-                    # the job list we're going to consider in the next run.
-                    # This is done so that if a job depends on a broken but
-                    # existing job, it won't constantly re-add the same broken
-                    # job over and over (so that the algorithm can stop).
-                    job_list.remove(exc.affected_job)
-                # Remember each problem, this can be presented by the UI
-                problems.append(exc)
-                continue
-            else:
-                # Don't iterate the loop if there was no exception
-                break
+        self._reverse_dependency_map = None
+        # Try to solve the dependency graph. Each job affected by a dependency
+        # problem is removed from _desired_job_list (and from the list of jobs
+        # considered by the solver, so that if a job depends on a broken but
+        # existing job it gets removed as well). All the problems are
+        # remembered, they can be presented by the UI.
+        (self._run_list, self._desired_job_list, problems) = (
+            DependencySolver.resolve_dependencies_with_recovery(
+                self._job_list, self._desired_job_list))
         # Update all job readiness state
         self._recompute_job_readiness()
         # Return all dependency problems to the caller
@@ -925,10 +1097,21 @@ class SessionState:
                     estimate_manual = None
         return (estimate_automated, estimate_manual)
 
-    def update_job_result(self, job, result):
+    def update_job_result(self, job, result, recompute=True):
         """
         Notice the specified test result and update readiness state.
 
+        :param job:
+            The job the result is for
+        :param result:
+            The result
+        :param recompute:
+            If True, recompute readiness inhibitors of the jobs.
+            You should only set this to False if you're presenting
+            a number of results and will otherwise ensure that
+            :meth:`_recompute_job_readiness()` gets called before
+            session state users can see the state again.
+
         This function updates the internal result collection with the data from
         the specified test result. Results can safely override older results.
         Results also change the ready map (jobs that can run) because of
@@ -946,6 +1129,28 @@ class SessionState:
         """
         job.controller.observe_result(
             self, job, result, fake_resources=self._fake_resources)
+        if not recompute:
+            # Readiness is now out of date, it cannot be updated incrementally
+            self._reverse_dependency_map = None
+        elif self.incremental_readiness:
+            self._recompute_dependent_job_readiness(job)
+        else:
+            self._recompute_job_readiness()
+
+    def update_job_result_list(self, job_result_list):
+        """
+        Notice many test results at once and update readiness state.
+
+        :param job_result_list:
+            Iterable of (job, result) pairs
+
+        This is equivalent to calling :meth:`update_job_result()` for each
+        pair but readiness of the jobs is only recomputed once, after all the
+        results have been observed. This is useful when importing the results
+        of a whole session (e.g. when merging submissions).
+        """
+        for job, result in job_result_list:
+            self.update_job_result(job, result, recompute=False)
         self._recompute_job_readiness()
 
     @deprecated('0.9', 'use the add_unit() method instead')
@@ -1030,6 +1235,7 @@ class SessionState:
         return new_unit
 
     def _add_job_unit(self, new_job, recompute, via):
+        self._reverse_dependency_map = None
         # See if we have a job with the same id already
         try:
             existing_job = self.job_state_map[new_job.id].job
@@ -1152,6 +1358,7 @@ class SessionState:
         self._unit_list.remove(unit)
         self.on_unit_removed(unit)
         if unit.Meta.name == 'job':
+            self._reverse_dependency_map = None
             self._job_list.remove(unit)
             del self._job_state_map[unit.id]
             try:
@@ -1240,12 +1447,7 @@ class SessionState:
             Only the outcomes seen during this session are reported, not all
             possible values (such as crash, not implemented, ...).
         """
-        stats = collections.defaultdict(int)
-        for job_id, job_state in self.job_state_map.items():
-            if not job_state.result.outcome:
-                continue
-            stats[job_state.result.outcome] += 1
-        return stats
+        return self._aggregates.get_outcome_stats()
 
     def get_test_outcome_stats(self):
         """
@@ -1259,28 +1461,12 @@ class SessionState:
             Only the outcomes seen during this session are reported, not all
             possible values (such as crash, not implemented, ...).
         """
-        stats = collections.defaultdict(int)
-        for job_id, job_state in self.job_state_map.items():
-            if (not job_state.result.outcome or
-                    job_state.job.plugin in ("resource", "attachment")):
-                continue
-            stats[job_state.result.outcome] += 1
-        return stats
+        return self._aggregates.get_outcome_stats([None])
 
     @property
     def category_map(self):
         """Map from category id to their corresponding translated names."""
-        wanted_category_ids = frozenset({
-            job_state.effective_category_id
-            for job_state in self.job_state_map.values()
-            if job_state.result.outcome != None
-        })
-        return {
-            unit.id: unit.tr_name()
-            for unit in self.unit_list
-            if unit.Meta.name == 'category'
-            and unit.id in wanted_category_ids
-        }
+        return self._get_category_map(self._aggregates.get_category_ids())
 
     @property
     def category_map_lite(self):
@@ -1291,107 +1477,28 @@ class SessionState:
         Meant to be used to generate the HTML reports where resources and
         attachments are presented in different sections.
         """
-        wanted_category_ids = frozenset({
-            job_state.effective_category_id
-            for job_state in self.job_state_map.values()
-            if job_state.result.outcome != None and
-            job_state.job.plugin not in ("resource", "attachment")
-        })
+        return self._get_category_map(
+            self._aggregates.get_category_ids([None]))
+
+    def _get_category_map(self, wanted_category_ids):
         return {
-            unit.id: unit.tr_name()
-            for unit in self.unit_list
-            if unit.Meta.name == 'category'
-            and unit.id in wanted_category_ids
+            category_id: unit.tr_name()
+            for category_id, unit in self._category_unit_map.items()
+            if category_id in wanted_category_ids
         }
 
     @property
     def category_outcome_map(self):
         """Map from category id to their corresponding global outcome."""
-        wanted_category_ids = frozenset({
-            job_state.effective_category_id
-            for job_state in self.job_state_map.values()
-            if job_state.result.outcome != None
-        })
-        tmp_result_map = {}
-        for job_state in self.job_state_map.values():
-            if job_state.job.plugin in ("resource", "attachment"):
-                continue
-            category = job_state.effective_category_id
-            if category not in wanted_category_ids:
-                continue
-            # Generate categories status
-            child_status = job_state.result.outcome
-            if category not in tmp_result_map:
-                tmp_result_map[category] = IJobResult.OUTCOME_SKIP
-            if child_status in (
-                IJobResult.OUTCOME_FAIL, IJobResult.OUTCOME_CRASH
-            ):
-                tmp_result_map[category] = IJobResult.OUTCOME_FAIL
-            elif (
-                child_status == IJobResult.OUTCOME_PASS and
-                tmp_result_map[category] != IJobResult.OUTCOME_FAIL
-            ):
-                tmp_result_map[category] = IJobResult.OUTCOME_PASS
-            elif (
-                tmp_result_map[category] not in
-                (IJobResult.OUTCOME_PASS, IJobResult.OUTCOME_FAIL)
-            ):
-                tmp_result_map[category] = IJobResult.OUTCOME_SKIP
-        return tmp_result_map
+        return self._aggregates.get_category_outcome_map()
 
     @property
     def resource_global_outcome(self):
-        global_outcome = IJobResult.OUTCOME_SKIP
-        for job_state in self.job_state_map.values():
-            if (
-                job_state.job.plugin != "resource" or
-                not job_state.result.outcome
-            ):
-                continue
-            # Generate categories status
-            child_status = job_state.result.outcome
-            if child_status in (
-                IJobResult.OUTCOME_FAIL, IJobResult.OUTCOME_CRASH
-            ):
-                global_outcome = IJobResult.OUTCOME_FAIL
-            elif (
-                child_status == IJobResult.OUTCOME_PASS and
-                global_outcome != IJobResult.OUTCOME_FAIL
-            ):
-                global_outcome = IJobResult.OUTCOME_PASS
-            elif (
-                global_outcome not in
-                (IJobResult.OUTCOME_PASS, IJobResult.OUTCOME_FAIL)
-            ):
-                global_outcome = IJobResult.OUTCOME_SKIP
-        return global_outcome
+        return self._aggregates.get_global_outcome('resource')
 
     @property
     def attachment_global_outcome(self):
-        global_outcome = IJobResult.OUTCOME_SKIP
-        for job_state in self.job_state_map.values():
-            if (
-                job_state.job.plugin != "attachment" or
-                not job_state.result.outcome
-            ):
-                continue
-            # Generate categories status
-            child_status = job_state.result.outcome
-            if child_status in (
-                IJobResult.OUTCOME_FAIL, IJobResult.OUTCOME_CRASH
-            ):
-                global_outcome = IJobResult.OUTCOME_FAIL
-            elif (
-                child_status == IJobResult.OUTCOME_PASS and
-                global_outcome != IJobResult.OUTCOME_FAIL
-            ):
-                global_outcome = IJobResult.OUTCOME_PASS
-            elif (
-                global_outcome not in
-                (IJobResult.OUTCOME_PASS, IJobResult.OUTCOME_FAIL)
-            ):
-                global_outcome = IJobResult.OUTCOME_SKIP
-        return global_outcome
+        return self._aggregates.get_global_outcome('attachment')
 
     def get_certification_status_map(
             self, outcome_filter=(IJobResult.OUTCOME_FAIL,),
@@ -1431,24 +1538,74 @@ class SessionState:
         Re-computes [job_state.ready
                      for job_state in _job_state_map.values()]
         """
-        # Reset the state of all jobs to have the undesired inhibitor. Since
-        # we maintain a state object for _all_ jobs (including ones not in the
-        # _run_list this correctly updates all values in the _job_state_map
-        # (the UI can safely use the readiness state of all jobs)
-        for job_state in self._job_state_map.values():
-            job_state.readiness_inhibitor_list = [
-                UndesiredJobReadinessInhibitor]
         # Take advantage of the fact that run_list is topologically sorted and
         # do a single O(N) pass over _run_list. All "current/update" state is
         # computed before it needs to be observed (thanks to the ordering)
+        reverse_dependency_map = collections.defaultdict(list)
+        run_job_ids = set()
         for job in self._run_list:
-            job_state = self._job_state_map[job.id]
-            # Remove the undesired inhibitor as we want to run this job
-            try:
-                job_state.readiness_inhibitor_list.remove(
-                    UndesiredJobReadinessInhibitor)
-            except ValueError:
-                pass
+            # Remember which jobs need to be looked at again when the result
+            # of any of the jobs they depend on changes
+            for dep_id in self._get_readiness_dependencies(job):
+                reverse_dependency_map[dep_id].append(job)
+            run_job_ids.add(job.id)
             # Ask the job controller about inhibitors affecting this job
-            for inhibitor in job.controller.get_inhibitor_list(self, job):
-                job_state.readiness_inhibitor_list.append(inhibitor)
+            self._set_readiness_inhibitor_list(
+                self._job_state_map[job.id],
+                job.controller.get_inhibitor_list(self, job))
+        # All the other jobs have the undesired inhibitor. Since we maintain a
+        # state object for _all_ jobs (including ones not in the _run_list)
+        # this correctly updates all values in the _job_state_map (the UI can
+        # safely use the readiness state of all jobs)
+        undesired = [UndesiredJobReadinessInhibitor]
+        for job_id, job_state in self._job_state_map.items():
+            if job_id not in run_job_ids:
+                self._set_readiness_inhibitor_list(job_state, undesired)
+        self._reverse_dependency_map = reverse_dependency_map
+
+    def _recompute_dependent_job_readiness(self, job):
+        """
+        Internal method of SessionState.
+
+        Re-computes the readiness of the jobs on the run list that depend on
+        the given job, which just got a new result. The readiness of other
+        jobs cannot change because of that. If the session was modified since
+        the last full recompute this falls back to
+        :meth:`_recompute_job_readiness()`.
+        """
+        if self._reverse_dependency_map is None:
+            self._recompute_job_readiness()
+            return
+        for dependent_job in self._reverse_dependency_map.get(job.id, ()):
+            self._set_readiness_inhibitor_list(
+                self._job_state_map[dependent_job.id],
+                dependent_job.controller.get_inhibitor_list(
+                    self, dependent_job))
+
+    @staticmethod
+    def _set_readiness_inhibitor_list(job_state, inhibitor_list):
+        """
+        Internal method of SessionState.
+
+        Set the readiness inhibitors of a job, keeping the current list when
+        it is unchanged. Inhibitors are shared, so comparing them is cheap.
+        """
+        if job_state.readiness_inhibitor_list != inhibitor_list:
+            job_state.readiness_inhibitor_list = list(inhibitor_list)
+
+    def _get_readiness_dependencies(self, job):
+        """
+        Internal method of SessionState.
+
+        Compute the set of ids of jobs whose result (or resources) can affect
+        the readiness of the given job.
+        """
+        try:
+            resource_deps = job.get_resource_dependencies()
+        except ResourceProgramError:
+            resource_deps = ()
+        return (
+            job.get_direct_dependencies() |
+            job.get_after_dependencies() |
+            job.get_salvage_dependencies() |
+            set(resource_deps))
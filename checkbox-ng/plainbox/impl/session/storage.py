@@ -29,10 +29,12 @@ session.
 
 import datetime
 import errno
+import hashlib
 import logging
 import os
 import shutil
 import stat
+import tempfile
 
 from plainbox.i18n import gettext as _, ngettext
 from plainbox.impl.runner import slugify
@@ -176,6 +178,12 @@ class SessionStorage:
 
     _SESSION_FILE_NEXT = 'session.next'
 
+    _SESSION_JOURNAL = 'session.journal'
+
+    _SESSION_METADATA = 'session.metadata'
+
+    _JOURNAL_HEADER_PREFIX = b'checkpoint-sha1 '
+
     def __init__(self, id):
         """
         Initialize a :class:`SessionStorage` with the given location.
@@ -421,6 +429,218 @@ class SessionStorage:
             logger.debug(_("Closing descriptor %d"), location_fd)
             os.close(location_fd)
 
+    @property
+    def journal_file(self):
+        """
+        pathname of the session journal file
+        """
+        return os.path.join(self.location, self._SESSION_JOURNAL)
+
+    @classmethod
+    def _journal_header(cls, checkpoint_data):
+        return cls._JOURNAL_HEADER_PREFIX + hashlib.sha1(
+            checkpoint_data).hexdigest().encode("ASCII") + b"\n"
+
+    def reset_journal(self, checkpoint_data):
+        """
+        Start a new, empty journal bound to the given checkpoint data.
+
+        The journal is a sequence of records (see :meth:`append_journal()`)
+        that describe changes made to the session since the most recent
+        checkpoint was saved. The journal starts with a header that identifies
+        the checkpoint it applies to, so a journal left behind by an older
+        checkpoint (for example, when the machine crashed right after
+        :meth:`save_checkpoint()`) is never replayed on top of a newer one.
+
+        :param checkpoint_data:
+            The exact bytes that were passed to :meth:`save_checkpoint()`.
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem.
+        """
+        if not isinstance(checkpoint_data, bytes):
+            raise TypeError("checkpoint_data must be bytes")
+        self._write_journal(
+            self._journal_header(checkpoint_data),
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+
+    def append_journal(self, record):
+        """
+        Append a single record to the session journal.
+
+        :param record:
+            Bytes representing the record. The record must not contain any
+            newline characters as those are used to delimit records.
+        :raises TypeError:
+            if record is not a bytes object.
+        :raises ValueError:
+            if record contains a newline character
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem.
+
+        The record is appended with a single write(2) call and flushed to
+        disk before this method returns. A record that is only partially
+        written (because of a crash) is ignored by :meth:`load_journal()`.
+        """
+        if not isinstance(record, bytes):
+            raise TypeError("record must be bytes")
+        if b"\n" in record:
+            raise ValueError("record must not contain newlines")
+        self._write_journal(record + b"\n", os.O_WRONLY | os.O_APPEND)
+
+    def _write_journal(self, data, flags):
+        logger.debug(ngettext(
+            "Writing %d byte of journal data",
+            "Writing %d bytes of journal data",
+            len(data)), len(data))
+        location_fd = os.open(self.location, os.O_DIRECTORY)
+        try:
+            journal_fd = os.open(
+                self._SESSION_JOURNAL, flags, 0o644, dir_fd=location_fd)
+            try:
+                num_written = os.write(journal_fd, data)
+                if num_written != len(data):
+                    raise IOError(_("partial write?"))
+                try:
+                    os.fsync(journal_fd)
+                except OSError as exc:
+                    logger.warning(_("Cannot synchronize file %r: %s"),
+                                   self._SESSION_JOURNAL, exc)
+            finally:
+                os.close(journal_fd)
+            if flags & os.O_CREAT:
+                try:
+                    os.fsync(location_fd)
+                except OSError as exc:
+                    logger.warning(_("Cannot synchronize directory %r: %s"),
+                                   self.location, exc)
+        finally:
+            os.close(location_fd)
+
+    def load_journal(self, checkpoint_data):
+        """
+        Load journal records that apply to the given checkpoint data.
+
+        :param checkpoint_data:
+            Data returned by :meth:`load_checkpoint()`
+        :returns:
+            A list of records (bytes), in the order they were appended. The
+            list is empty if there is no journal or if the journal was started
+            for a different checkpoint.
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem
+        """
+        try:
+            with open(self.journal_file, 'rb') as stream:
+                header = stream.readline()
+                if header != self._journal_header(checkpoint_data):
+                    if header:
+                        logger.warning(
+                            _("Ignoring journal of a different checkpoint"
+                              " in %r"), self.location)
+                    return []
+                data = stream.read()
+        except IOError as exc:
+            if exc.errno == errno.ENOENT:
+                return []
+            raise
+        record_list = data.split(b"\n")
+        # The last element is either empty (all records are complete) or it
+        # is a record that was not fully written before a crash.
+        if record_list[-1]:
+            logger.warning(_("Ignoring incomplete journal record in %r"),
+                           self.location)
+        return record_list[:-1]
+
+    @property
+    def metadata_file(self):
+        """
+        pathname of the session meta-data file
+        """
+        return os.path.join(self.location, self._SESSION_METADATA)
+
+    def get_checkpoint_stamp(self):
+        """
+        Compute a string identifying the current checkpoint and journal.
+
+        :returns:
+            A string that changes each time a checkpoint is saved or the
+            journal is written to.
+
+        The stamp is made of the inode number, size and modification time of
+        the checkpoint and journal files, so it is cheap to compute.
+        """
+        part_list = []
+        for name in (self._SESSION_FILE, self._SESSION_JOURNAL):
+            try:
+                info = os.stat(os.path.join(self.location, name))
+            except FileNotFoundError:
+                part_list.append("-")
+            else:
+                part_list.append("{}:{}:{}".format(
+                    info.st_ino, info.st_size, info.st_mtime_ns))
+        return " ".join(part_list)
+
+    def save_metadata(self, data, stamp=None):
+        """
+        Save the meta-data of the session, next to the checkpoint.
+
+        :param data:
+            Bytes representing the meta-data of the session as of the current
+            checkpoint and journal.
+        :param stamp:
+            The checkpoint stamp (see :meth:`get_checkpoint_stamp()`) the
+            data corresponds to. It is computed if not given.
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem.
+
+        The meta-data is a summary of the checkpoint that can be loaded much
+        faster (see :meth:`load_metadata()`). It is written to a temporary
+        file that is then renamed, so it is never seen partially written.
+        Unlike checkpoints it is not synchronized to disk, it can always be
+        recomputed from the checkpoint.
+        """
+        if not isinstance(data, bytes):
+            raise TypeError("data must be bytes")
+        if stamp is None:
+            stamp = self.get_checkpoint_stamp()
+        logger.debug(ngettext(
+            "Saving %d byte of meta-data",
+            "Saving %d bytes of meta-data",
+            len(data)), len(data))
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=self._SESSION_METADATA + ".", dir=self.location)
+        try:
+            with open(fd, 'wb') as stream:
+                stream.write(stamp.encode("UTF-8") + b"\n")
+                stream.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.metadata_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_metadata(self):
+        """
+        Load the meta-data of the session saved by :meth:`save_metadata()`.
+
+        :returns:
+            The saved data or None if there is none or if it was saved for a
+            different checkpoint or journal (it is stale).
+        :raises IOError, OSError:
+            on various problems related to accessing the filesystem
+        """
+        try:
+            with open(self.metadata_file, 'rb') as stream:
+                header = stream.readline()
+                data = stream.read()
+        except FileNotFoundError:
+            return None
+        stamp = self.get_checkpoint_stamp().encode("UTF-8") + b"\n"
+        if header != stamp:
+            logger.debug(_("Ignoring stale meta-data in %r"), self.location)
+            return None
+        return data
+
     def break_lock(self):
         """
         Forcibly unlock the storage by removing a file created during
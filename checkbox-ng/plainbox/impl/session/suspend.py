@@ -83,6 +83,19 @@ Serialization format versions
 5) Same as '4' but DiskJobResult is stored with a relative pathname to the log
    file if session_dir is provided.
 6) Same as '5' plus store the list of mandatory jobs.
+7) Same as '6' plus store the start time of the last job.
+
+Session journal
+^^^^^^^^^^^^^^^
+Suspending the whole session after each job gets more expensive as the
+session grows. To keep checkpoints cheap
+:class:`~plainbox.impl.session.manager.SessionManager` saves a full snapshot
+only occasionally and, in between, appends small records computed by
+:class:`SessionJournalHelper` to the session journal. Each record is a JSON
+object with the same ``jobs`` and ``results`` keys as the snapshot (limited to
+the jobs whose results have changed) and, optionally, the ``metadata`` key.
+Records are replayed on top of the snapshot by
+:class:`~plainbox.impl.session.resume.SessionResumeHelper`.
 """
 
 import base64
@@ -139,6 +152,34 @@ class SessionSuspendHelper1:
         # NOTE: gzip.compress is not deterministic on python3.2
         return gzip.compress(data)
 
+    def suspend_metadata(self, metadata, session_dir=None):
+        """
+        Compute suspend representation of the meta-data of a session.
+
+        Compute the data that is saved by :class:`SessionStorage` as a
+        part of :meth:`SessionStorage.save_metadata()`.
+
+        :param metadata:
+            The SessionMetaData object to represent.
+        :param session_dir:
+            (optional) The base directory of the session.
+
+        :returns bytes: the serialized data, see
+            :meth:`SessionPeekHelper.peek_metadata()`
+        """
+        json_repr = {
+            "version": self.VERSION,
+            "metadata": self._repr_SessionMetaData(metadata, session_dir),
+        }
+        # Not compressed, it is small and meant to be loaded quickly
+        return json.dumps(
+            json_repr,
+            ensure_ascii=False,
+            sort_keys=True,
+            indent=None,
+            separators=(',', ':')
+        ).encode("UTF-8")
+
     def _json_repr(self, session, session_dir):
         """
         Compute the representation of all of the data that needs to be saved.
@@ -662,5 +703,205 @@ class SessionSuspendHelper7(SessionSuspendHelper6):
         return data
 
 
+class SessionSuspendHelper8(SessionSuspendHelper7):
+    VERSION = 8
+
+    def _repr_SessionMetaData(self, obj, session_dir):
+        data = super()._repr_SessionMetaData(obj, session_dir)
+        data['running_job_list'] = obj.running_job_list
+        return data
+
+
 # Alias for the most recent version
-SessionSuspendHelper = SessionSuspendHelper7
+SessionSuspendHelper = SessionSuspendHelper8
+
+
+class SessionJournalHelper:
+
+    """
+    Helper class for computing incremental representation of a session.
+
+    The helper observes a session (see :meth:`reset()`) and remembers which
+    jobs got new results since the most recent snapshot. The
+    :meth:`suspend_delta()` method computes a journal record with just those
+    changes. Actual saving should be performed using some other means,
+    preferably using :meth:`SessionStorage.append_journal()
+    <plainbox.impl.session.storage.SessionStorage.append_journal>`.
+
+    Changes that cannot be represented as a journal record (changes to the
+    desired or mandatory job list and removal of jobs) are detected by
+    :meth:`can_append()`. The journal should then be compacted by saving
+    a full snapshot and calling :meth:`reset()` again.
+    """
+
+    # The journal is compacted once it grows this many times larger than the
+    # snapshot it applies to. This keeps the amortized cost of a checkpoint
+    # constant regardless of the size of the session.
+    COMPACTION_RATIO = 4
+
+    # ...but tiny journals are never compacted
+    COMPACTION_MIN_SIZE = 64 * 1024
+
+    def __init__(self, suspend_helper=None):
+        """
+        Initialize the helper.
+
+        :param suspend_helper:
+            (optional) The suspend helper that is used to compute the
+            representation of results and meta-data. By default the most
+            recent :class:`SessionSuspendHelper` is used.
+        """
+        if suspend_helper is None:
+            suspend_helper = SessionSuspendHelper()
+        self._helper = suspend_helper
+        self._session = None
+        self._dirty_job_id_set = set()
+        self._needs_snapshot = True
+        self._snapshot_size = 0
+        self._journal_size = 0
+        self._metadata_repr = None
+        self._desired_job_list = None
+        self._mandatory_job_list = None
+        self._run_list = None
+
+    @property
+    def journal_size(self):
+        """number of bytes appended to the journal since the last reset."""
+        return self._journal_size
+
+    def reset(self, session, snapshot_size, journal_size=0):
+        """
+        Start tracking changes made to the session after a snapshot.
+
+        :param session:
+            The SessionState object that was just suspended (or resumed).
+        :param snapshot_size:
+            Size of the snapshot, in bytes.
+        :param journal_size:
+            (optional) Size of the journal that was already appended to the
+            snapshot, in bytes. This is only useful after resuming a session.
+        """
+        if session is not self._session:
+            if self._session is not None:
+                self._session.on_job_result_changed.disconnect(
+                    self._on_job_result_changed)
+                self._session.on_job_removed.disconnect(
+                    self._on_job_removed)
+            session.on_job_result_changed.connect(
+                self._on_job_result_changed)
+            session.on_job_removed.connect(self._on_job_removed)
+            self._session = session
+        self._dirty_job_id_set = set()
+        self._needs_snapshot = False
+        self._snapshot_size = snapshot_size
+        self._journal_size = journal_size
+        # The meta-data is always stored in the first record
+        self._metadata_repr = None
+        self._desired_job_list = session.desired_job_list
+        self._mandatory_job_list = session.mandatory_job_list
+        self._run_list = session.run_list
+
+    def can_append(self, session):
+        """
+        Check if changes to the session can be stored as a journal record.
+
+        :param session:
+            The SessionState object to represent.
+        :returns:
+            False if a full snapshot of the session must be saved instead.
+        """
+        return (
+            session is self._session
+            and not self._needs_snapshot
+            # update_desired_job_list() and update_mandatory_job_list()
+            # always assign fresh lists
+            and session.desired_job_list is self._desired_job_list
+            and session.mandatory_job_list is self._mandatory_job_list
+            and session.run_list is self._run_list
+            and self._journal_size <= max(
+                self.COMPACTION_MIN_SIZE,
+                self.COMPACTION_RATIO * self._snapshot_size))
+
+    def suspend_delta(self, session, session_dir=None):
+        """
+        Compute the journal record describing recent changes.
+
+        :param session:
+            The SessionState object to represent.
+        :param session_dir:
+            (optional) The base directory of the session. See
+            :meth:`SessionSuspendHelper1.suspend()` for details.
+        :returns:
+            The serialized record or None if nothing has changed since the
+            previous record.
+        """
+        json_repr = self._repr_SessionState_delta(session, session_dir)
+        if not json_repr:
+            return None
+        json_repr["version"] = self._helper.VERSION
+        data = json.dumps(
+            json_repr,
+            ensure_ascii=False,
+            sort_keys=True,
+            indent=None,
+            separators=(',', ':')
+        ).encode("UTF-8")
+        self._dirty_job_id_set = set()
+        self._journal_size += len(data) + 1
+        return data
+
+    def _repr_SessionState_delta(self, obj, session_dir):
+        """
+        Compute the representation of changes to :class:`SessionState`.
+
+        :returns:
+            JSON-friendly representation
+        :rtype:
+            dict
+
+        The result is a dictionary with the following items, each of them
+        is optional:
+
+            ``jobs``:
+                Dictionary mapping job id to job checksum, limited to jobs
+                that got a new result.
+
+            ``results``
+                Dictionary mapping job id to a list of results, limited to
+                jobs that got a new result. As in the snapshot, all of the
+                results of the job are stored.
+
+            ``metadata``:
+                The representation of meta-data associated with the session
+                state object. This is only present if the meta-data has
+                changed.
+        """
+        json_repr = {}
+        metadata_repr = self._helper._repr_SessionMetaData(
+            obj.metadata, session_dir)
+        if metadata_repr != self._metadata_repr:
+            json_repr["metadata"] = metadata_repr
+            self._metadata_repr = metadata_repr
+        state_list = [
+            obj.job_state_map[job_id]
+            for job_id in sorted(self._dirty_job_id_set)
+            if job_id in obj.job_state_map]
+        if state_list:
+            json_repr["jobs"] = {
+                state.job.id: state.job.checksum for state in state_list}
+            json_repr["results"] = {
+                state.job.id: [
+                    self._helper._repr_JobResult(result, session_dir)
+                    for result in state.result_history]
+                for state in state_list
+                if len(state.result_history) > 0
+            }
+        return json_repr
+
+    def _on_job_result_changed(self, job, result):
+        self._dirty_job_id_set.add(job.id)
+
+    def _on_job_removed(self, job):
+        # Records can only add or update jobs, the snapshot has to be
+        # re-created to forget about a job
+        self._needs_snapshot = True
@@ -19,9 +19,16 @@
 
 """Tests for the session assistant module class."""
 
+import threading
+import time
+
+from plainbox.abc import IJobRunnerUI
+from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.secure.providers.v1 import Provider1
 from plainbox.impl.session.assistant import SessionAssistant
 from plainbox.impl.session.assistant import UsageExpectation
+from plainbox.impl.session.state import SessionState
+from plainbox.impl.testing_utils import make_job
 from plainbox.vendor import mock
 from plainbox.vendor import morris
 
@@ -77,3 +84,269 @@ class SessionAssistantTests(morris.SignalTestCase):
         # Use the manager to tidy up after the tests when normally you wouldnt
         # be allowed to
         self.sa._manager.destroy()
+
+
+class ParallelBootstrapTests(morris.SignalTestCase):
+
+    """Tests for running bootstrapping jobs in parallel."""
+
+    def setUp(self):
+        self.job_list = [
+            make_job('R1', plugin='resource', command='true'),
+            make_job('R2', plugin='resource', command='true'),
+            make_job('R3', plugin='resource', command='true', depends='R1'),
+            make_job('S', plugin='shell', command='true'),
+            make_job('R4', plugin='resource', command='true',
+                     requires='R2.key == "value"'),
+            make_job('R5', plugin='resource', command='true',
+                     flags='autorestart'),
+        ]
+        self.state = SessionState(self.job_list)
+        self.state.update_desired_job_list(self.job_list)
+        self.sa = SessionAssistant('app-id', '1.0', '0.99', [])
+        self.sa._context = mock.Mock(state=self.state)
+        self.sa._context.get_unit.side_effect = (
+            lambda job_id, kind: self.state.job_state_map[job_id].job)
+        self.sa._manager = mock.Mock()
+        self.sa._config = mock.Mock(environment={})
+        self.sa._config.get_value.return_value = False
+        self.sa._metadata = mock.Mock()
+        self.sa._restart_strategy = None
+        self.sa._runner = mock.Mock()
+        self.sa._runner.get_warm_up_sequence.return_value = []
+        self.sa._runner.get_worker.return_value = self.sa._runner
+        self.sa._runner.run_job.side_effect = self._run_job
+        self.lock = threading.Lock()
+        self.running = set()
+        self.concurrent = []
+        self.applied = []
+        self.state.on_job_result_changed.connect(self._on_result)
+
+    def _run_job(self, job, job_state, environ, ui):
+        with self.lock:
+            self.running.add(job.id)
+            self.concurrent.append(frozenset(self.running))
+        time.sleep(0.05)
+        with self.lock:
+            self.running.remove(job.id)
+        return MemoryJobResult({
+            'outcome': 'pass',
+            'io_log': [(0, 'stdout', b'key: value\n')]})
+
+    def _on_result(self, job, result):
+        self.applied.append(job.id)
+
+    def test_results_are_used_in_order(self):
+        run_list = self.state.run_list
+        UsageExpectation.of(self.sa).allowed_calls = {}
+        self.sa._run_bootstrap_jobs_in_parallel(run_list, 4)
+        self.assertEqual(self.applied, [job.id for job in run_list])
+        for job in run_list:
+            self.assertEqual(
+                self.state.job_state_map[job.id].result.outcome, 'pass')
+
+    def test_jobs_run_concurrently(self):
+        UsageExpectation.of(self.sa).allowed_calls = {}
+        self.sa._run_bootstrap_jobs_in_parallel(self.state.run_list, 4)
+        self.assertIn(frozenset({'R1', 'R2'}), self.concurrent)
+
+    def test_dependencies_and_barriers(self):
+        UsageExpectation.of(self.sa).allowed_calls = {}
+        self.sa._run_bootstrap_jobs_in_parallel(self.state.run_list, 4)
+        for running in self.concurrent:
+            # R3 depends on R1
+            self.assertFalse({'R1', 'R3'} <= running)
+            # Shell and autorestart jobs run on their own
+            if 'S' in running or 'R5' in running:
+                self.assertEqual(len(running), 1)
+
+    def _run_bootstrap(self, job_id_list):
+        allowed_calls = self.sa._get_allowed_calls_in_normal_state()
+        allowed_calls[self.sa.run_bootstrap_jobs_in_parallel] = ''
+        UsageExpectation.of(self.sa).allowed_calls = allowed_calls
+        caller_run = []
+        for job_id, builder in self.sa.run_bootstrap_jobs_in_parallel(
+                job_id_list, 4):
+            if builder is None:
+                caller_run.append(job_id)
+                builder = self.sa.run_job(job_id, 'silent', False)
+            self.sa.use_job_result(job_id, builder.get_result())
+        return caller_run
+
+    def test_run_bootstrap_jobs_in_parallel(self):
+        job_id_list = [job.id for job in self.state.run_list]
+        caller_run = self._run_bootstrap(job_id_list)
+        self.assertEqual(self.applied, job_id_list)
+        self.assertEqual(caller_run, [
+            job.id for job in self.state.run_list
+            if not self.sa._can_run_bootstrap_job_in_pool(job)])
+
+    def test_workers_have_their_own_runner(self):
+        worker_list = []
+        shared_run = []
+
+        def get_worker():
+            worker = mock.Mock()
+            worker.run_job.side_effect = self._run_job
+            worker_list.append(worker)
+            return worker
+
+        def run_job(job, *args):
+            shared_run.append(job.id)
+            return self._run_job(job, *args)
+
+        self.sa._runner.get_worker.side_effect = get_worker
+        self.sa._runner.run_job.side_effect = run_job
+        caller_run = self._run_bootstrap(
+            [job.id for job in self.state.run_list])
+        self.assertEqual(len(worker_list), 4)
+        # The runner of the session only ran the jobs that were not pooled
+        self.assertEqual(shared_run, caller_run)
+
+    def test_bootstrap_max_workers_from_config(self):
+        self.sa._config.get_value.side_effect = lambda section, name: (
+            4 if name == 'max_parallel_bootstrap_jobs' else False)
+        self.sa._manager.test_plans = ()
+        UsageExpectation.of(self.sa).allowed_calls = {
+            self.sa.bootstrap: ''}
+        with mock.patch.object(
+                self.sa, '_run_bootstrap_jobs_in_parallel') as run_mock:
+            self.sa.bootstrap()
+        run_mock.assert_called_once_with(mock.ANY, 4)
+
+
+class ParallelJobsTests(ParallelBootstrapTests):
+
+    """Tests for running parallel-safe jobs in parallel."""
+
+    def setUp(self):
+        super().setUp()
+        self.job_list = [
+            make_job('A1', plugin='shell', command='true',
+                     flags='parallel-safe'),
+            make_job('A2', plugin='attachment', command='true',
+                     flags='parallel-safe'),
+            make_job('A3', plugin='shell', command='true',
+                     flags='parallel-safe', depends='A1'),
+            make_job('M', plugin='manual'),
+            make_job('A4', plugin='resource', command='true',
+                     flags='parallel-safe'),
+            make_job('A5', plugin='shell', command='true',
+                     flags='parallel-safe noreturn'),
+            make_job('S', plugin='shell', command='true'),
+        ]
+        self.state = SessionState(self.job_list)
+        self.state.update_desired_job_list(self.job_list)
+        self.state.on_job_result_changed.connect(self._on_result)
+        self.sa._context.state = self.state
+        UsageExpectation.of(self.sa).allowed_calls = (
+            self.sa._get_allowed_calls_in_normal_state())
+
+    def _run(self, job_id_list, max_workers=4, get_ui=None):
+        caller_run = []
+        for job_id, builder in self.sa.run_jobs_in_parallel(
+                job_id_list, max_workers, get_ui):
+            if builder is None:
+                caller_run.append(job_id)
+                builder = self.sa.run_job(job_id, 'silent', False)
+            self.sa.use_job_result(job_id, builder.get_result())
+        return caller_run
+
+    def test_results_are_used_in_order(self):
+        job_id_list = [job.id for job in self.state.run_list]
+        caller_run = self._run(job_id_list)
+        self.assertEqual(self.applied, job_id_list)
+        self.assertEqual(caller_run, ['M', 'A5', 'S'])
+        for job_id in job_id_list:
+            self.assertIsNotNone(
+                self.state.job_state_map[job_id].result.outcome)
+
+    def test_jobs_run_concurrently(self):
+        self._run([job.id for job in self.state.run_list])
+        self.assertIn(frozenset({'A1', 'A2'}), self.concurrent)
+
+    def test_dependencies_and_barriers(self):
+        self._run([job.id for job in self.state.run_list])
+        for running in self.concurrent:
+            self.assertFalse({'A1', 'A3'} <= running)
+            if 'A5' in running or 'S' in running:
+                self.assertEqual(len(running), 1)
+        # Nothing is run across the manual job either
+        self.assertFalse(any(
+            {'A4'} < running and running & {'A1', 'A2', 'A3'}
+            for running in self.concurrent))
+
+    def test_ui_is_told_about_jobs(self):
+        ui = mock.Mock(spec=IJobRunnerUI)
+        get_ui = mock.Mock(return_value=ui)
+        self._run(['A1', 'A2'], get_ui=get_ui)
+        self.assertEqual(
+            [call[0][0].id for call in get_ui.call_args_list], ['A1', 'A2'])
+        ui.got_program_output.assert_called_with('stdout', b'key: value\n')
+        self.assertEqual(ui.finished.call_count, 2)
+
+    def test_use_job_result_is_expected(self):
+        job_results = self.sa.run_jobs_in_parallel(['A1', 'A2'], 2)
+        job_id, builder = next(job_results)
+        self.assertNotIn(
+            self.sa.run_job, UsageExpectation.of(self.sa).allowed_calls)
+        self.sa.use_job_result(job_id, builder.get_result())
+        self.assertIn(
+            self.sa.run_job, UsageExpectation.of(self.sa).allowed_calls)
+        job_results.close()
+
+    def test_running_jobs_are_checkpointed(self):
+        events = []
+
+        def checkpoint():
+            with self.lock:
+                events.append((
+                    'checkpoint', self.state.metadata.running_job_name,
+                    list(self.state.metadata.running_job_list)))
+
+        def run_job(job, *args):
+            with self.lock:
+                events.append(('start', job.id))
+            return self._run_job(job, *args)
+
+        self.sa._manager.checkpoint.side_effect = checkpoint
+        self.sa._runner.run_job.side_effect = run_job
+        caller_run = self._run(['A1', 'A2', 'A3'], max_workers=2)
+        self.assertEqual(caller_run, [])
+        for index, event in enumerate(events):
+            if event[0] != 'start':
+                continue
+            # The job was recorded as running when the session was last
+            # checkpointed before it started
+            checkpoint = [
+                event for event in events[:index]
+                if event[0] == 'checkpoint'][-1]
+            self.assertIn(event[1], checkpoint[2])
+        self.assertIn(('checkpoint', 'A1', ['A1', 'A2']), events)
+        self.assertEqual(self.state.metadata.running_job_list, [])
+
+    def test_running_jobs_are_killed_when_closed(self):
+        killed = threading.Event()
+
+        def run_job(job, *args):
+            if job.id == 'A2':
+                # Hang until the job is killed
+                killed.wait(10)
+            return self._run_job(job, *args)
+
+        def get_worker():
+            worker = mock.Mock()
+            worker.run_job.side_effect = run_job
+            worker.kill_running_job.side_effect = killed.set
+            return worker
+
+        self.sa._runner.get_worker.side_effect = get_worker
+        job_results = self.sa.run_jobs_in_parallel(['A1', 'A2'], 2)
+        job_id, builder = next(job_results)
+        self.assertEqual(job_id, 'A1')
+        self.sa.use_job_result(job_id, builder.get_result())
+        start = time.time()
+        job_results.close()
+        self.assertTrue(killed.is_set())
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(self.state.metadata.running_job_list, [])
@@ -30,6 +30,7 @@ from plainbox.impl.session import InhibitionCause
 from plainbox.impl.session import JobReadinessInhibitor
 from plainbox.impl.session import JobState
 from plainbox.impl.session import UndesiredJobReadinessInhibitor
+from plainbox.impl.session.jobs import get_readiness_inhibitor
 from plainbox.impl.testing_utils import make_job, make_job_result
 
 
@@ -130,6 +131,23 @@ class JobReadinessInhibitorTests(TestCase):
         self.assertEqual(UndesiredJobReadinessInhibitor.cause,
                          InhibitionCause.UNDESIRED)
 
+    def test_get_readiness_inhibitor(self):
+        self.assertIs(get_readiness_inhibitor(InhibitionCause.UNDESIRED),
+                      UndesiredJobReadinessInhibitor)
+        job_a = make_job("A")
+        job_b = make_job("B")
+        obj = get_readiness_inhibitor(InhibitionCause.PENDING_DEP, job_a)
+        self.assertEqual(
+            obj, JobReadinessInhibitor(InhibitionCause.PENDING_DEP, job_a))
+        self.assertIs(
+            get_readiness_inhibitor(InhibitionCause.PENDING_DEP, job_a), obj)
+        self.assertIsNot(
+            get_readiness_inhibitor(InhibitionCause.FAILED_DEP, job_a), obj)
+        self.assertIsNot(
+            get_readiness_inhibitor(InhibitionCause.PENDING_DEP, job_b), obj)
+        self.assertRaises(ValueError, get_readiness_inhibitor,
+                          InhibitionCause.PENDING_DEP)
+
 
 class JobStateTests(TestCase):
 
@@ -150,6 +168,11 @@ class JobStateTests(TestCase):
         self.assertEqual(self.job_state.effective_auto_retry,
                          self.job.auto_retry)
 
+    def test_slots(self):
+        # There are as many job states as jobs, they are kept small
+        self.assertFalse(hasattr(self.job_state, '__dict__'))
+        self.assertIsNone(self.job_state.observer)
+
     def test_getting_job(self):
         self.assertIs(self.job_state.job, self.job)
 
@@ -26,11 +26,13 @@ Test definitions for plainbox.impl.session.manager module
 
 from unittest import expectedFailure
 
+from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.session import SessionManager
 from plainbox.impl.session import SessionState
 from plainbox.impl.session import SessionStorage
 from plainbox.impl.session.state import SessionDeviceContext
 from plainbox.impl.session.suspend import SessionSuspendHelper
+from plainbox.impl.testing_utils import make_job
 from plainbox.impl.unit.job import JobDefinition
 from plainbox.vendor import mock
 from plainbox.vendor.morris import SignalTestCase
@@ -100,6 +102,59 @@ class SessionManagerTests(SignalTestCase):
         self.storage.save_checkpoint.assert_called_with(
             helper_cls().suspend(self.context.state))
 
+    def test_checkpoint__journal(self):
+        """
+        verify that SessionManager.checkpoint() only appends the changes to
+        the session journal until a full snapshot is required
+        """
+        job_a = make_job('a')
+        job_b = make_job('b')
+        state = SessionState([job_a, job_b])
+        state.update_desired_job_list([job_a, job_b])
+        self.context.state = state
+        # The first checkpoint is always a full snapshot
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.save_checkpoint.call_count, 1)
+        data = self.storage.save_checkpoint.call_args[0][0]
+        self.storage.reset_journal.assert_called_once_with(data)
+        # Results are appended to the journal
+        state.update_job_result(job_a, MemoryJobResult({'outcome': 'pass'}))
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.save_checkpoint.call_count, 1)
+        self.assertEqual(self.storage.append_journal.call_count, 1)
+        record = self.storage.append_journal.call_args[0][0]
+        self.assertIn(b'"a":', record)
+        self.assertNotIn(b'"b":', record)
+        # Nothing is written if nothing has changed
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.append_journal.call_count, 1)
+        # Changing the selection requires a new snapshot
+        state.update_desired_job_list([job_a])
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.save_checkpoint.call_count, 2)
+        self.assertEqual(self.storage.append_journal.call_count, 1)
+
+    def test_checkpoint__metadata(self):
+        """
+        verify that SessionManager.checkpoint() saves the session meta-data
+        each time the checkpoint or the journal is written
+        """
+        job_a = make_job('a')
+        state = SessionState([job_a])
+        state.metadata.title = 'title'
+        self.context.state = state
+        self.manager.checkpoint()
+        self.storage.save_metadata.assert_called_once_with(
+            SessionSuspendHelper().suspend_metadata(state.metadata))
+        state.update_job_result(job_a, MemoryJobResult({'outcome': 'pass'}))
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.save_metadata.call_count, 2)
+        # Failing to save it is not a problem
+        self.storage.save_metadata.side_effect = OSError
+        state.metadata.title = 'new title'
+        self.manager.checkpoint()
+        self.assertEqual(self.storage.save_metadata.call_count, 3)
+
     def test_load_session(self):
         """
         verify that SessionManager.load_session() correctly delegates the task
@@ -108,6 +163,8 @@ class SessionManagerTests(SignalTestCase):
         job = mock.Mock(name='job', spec_set=JobDefinition)
         unit_list = [job]
         flags = None
+        self.storage.load_checkpoint.return_value = b'data'
+        self.storage.load_journal.return_value = [b'record']
         helper_name = "plainbox.impl.session.manager.SessionResumeHelper"
         with mock.patch(helper_name) as helper_cls:
             resumed_state = mock.Mock(spec_set=SessionState)
@@ -119,12 +176,13 @@ class SessionManagerTests(SignalTestCase):
                 manager = SessionManager.load_session(unit_list, self.storage)
         # Ensure that the storage object was used to load the session snapshot
         self.storage.load_checkpoint.assert_called_with()
+        # Ensure that the journal of that snapshot was loaded as well
+        self.storage.load_journal.assert_called_with(b'data')
         # Ensure that the helper was instantiated with the unit list, flags and
         # location
         helper_cls.assert_called_with(unit_list, flags, self.storage.location)
         # Ensure that the helper instance was asked to recreate session state
-        helper_cls().resume.assert_called_with(
-            self.storage.load_checkpoint(), None)
+        helper_cls().resume.assert_called_with(b'data', None, [b'record'])
         # Ensure that the resulting manager has correct data inside
         self.assertEqual(manager.state, helper_cls().resume())
         self.assertEqual(manager.storage, self.storage)
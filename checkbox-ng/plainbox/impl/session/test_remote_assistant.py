@@ -16,6 +16,10 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
+import io
+import os
+import zlib
 from unittest import TestCase, mock
 
 from plainbox.abc import IJobResult
@@ -103,3 +107,109 @@ class RemoteAssistantFinishJobTests(TestCase):
             outcome=IJobResult.OUTCOME_PASS,
             comments="Automatically passed while resuming",
         )
+
+
+class RemoteAssistantWaitJobOutputTests(TestCase):
+    def setUp(self):
+        self.rsa = mock.MagicMock()
+        self.rsa._state = remote_assistant.Running
+        self.rsa._be.is_alive.return_value = True
+
+    def test_waits_for_activity(self):
+        self.rsa.monitor_job.return_value = ("running", "stdoutfoo\n")
+
+        response = remote_assistant.RemoteSessionAssistant.wait_job_output(
+            self.rsa, 2
+        )
+
+        self.assertEqual(response, ("running", "stdoutfoo\n"))
+        self.rsa._job_activity.wait.assert_called_once_with(2)
+        self.rsa._job_activity.clear.assert_called_once_with()
+
+    def test_job_done(self):
+        self.rsa._be.is_alive.return_value = False
+        self.rsa.monitor_job.return_value = ("done", "")
+
+        response = remote_assistant.RemoteSessionAssistant.wait_job_output(
+            self.rsa
+        )
+
+        self.assertEqual(response, ("done", ""))
+        self.rsa._job_activity.wait.assert_not_called()
+
+    def test_buffered_ui_signals_activity(self):
+        activity = mock.Mock()
+        ui = remote_assistant.BufferedUI(activity)
+
+        ui.got_program_output("stdout", b"foo\n")
+
+        activity.set.assert_called_once_with()
+        self.assertEqual(ui.get_output(), "stdoutfoo\n")
+
+    def test_background_executor_signals_activity(self):
+        sa = mock.MagicMock()
+        be = remote_assistant.BackgroundExecutor(
+            sa, "job_id", mock.Mock(return_value=None)
+        )
+        be.join()
+
+        sa.notify_job_activity.assert_called_once_with()
+
+
+class RemoteAssistantReportTransferTests(TestCase):
+    def setUp(self):
+        self.rsa = mock.MagicMock()
+        self.rsa._report_transfer = None
+        self.report = b"report " * 1000
+        stream = io.BytesIO()
+        stream.write(self.report)
+        self.rsa.exposed_cache_report.return_value = stream
+
+    def _prepare(self):
+        return remote_assistant.RemoteSessionAssistant.prepare_report_transfer(
+            self.rsa, "exporter", []
+        )
+
+    def _read(self, *args):
+        return remote_assistant.RemoteSessionAssistant.read_report_frame(
+            self.rsa, *args
+        )
+
+    def test_prepare(self):
+        size, digest = self._prepare()
+
+        self.assertEqual(size, len(self.report))
+        self.assertEqual(digest, hashlib.sha256(self.report).hexdigest())
+
+    def test_read_frames(self):
+        size, digest = self._prepare()
+        for codec in remote_assistant.REPORT_TRANSFER_CODECS:
+            data = b""
+            while True:
+                frame_codec, frame, crc = self._read(
+                    digest, len(data), 4096, codec
+                )
+                frame = remote_assistant.REPORT_TRANSFER_CODECS[frame_codec][
+                    1
+                ](frame)
+                if not frame:
+                    break
+                self.assertEqual(zlib.crc32(frame), crc)
+                data += frame
+            self.assertEqual(data, self.report)
+
+    def test_read_incompressible_frame(self):
+        self.rsa.exposed_cache_report.return_value = io.BytesIO()
+        self.rsa.exposed_cache_report.return_value.write(os.urandom(1024))
+        size, digest = self._prepare()
+
+        codec, frame, crc = self._read(digest, 0, 4096, "xz")
+
+        self.assertEqual(codec, "none")
+        self.assertEqual(len(frame), 1024)
+
+    def test_read_unknown_report(self):
+        self._prepare()
+
+        with self.assertRaises(ValueError):
+            self._read("digest", 0, 4096)
@@ -50,6 +50,7 @@ from plainbox.impl.session.resume import SessionPeekHelper4
 from plainbox.impl.session.resume import SessionPeekHelper5
 from plainbox.impl.session.resume import SessionPeekHelper6
 from plainbox.impl.session.resume import SessionPeekHelper7
+from plainbox.impl.session.resume import SessionPeekHelper8
 from plainbox.impl.session.resume import SessionResumeError
 from plainbox.impl.session.resume import SessionResumeHelper
 from plainbox.impl.session.resume import SessionResumeHelper1
@@ -59,8 +60,13 @@ from plainbox.impl.session.resume import SessionResumeHelper4
 from plainbox.impl.session.resume import SessionResumeHelper5
 from plainbox.impl.session.resume import SessionResumeHelper6
 from plainbox.impl.session.resume import SessionResumeHelper7
+from plainbox.impl.session.resume import SessionResumeHelper8
+from plainbox.impl.session.state import SessionMetaData
 from plainbox.impl.session.state import SessionState
+from plainbox.impl.session.storage import SessionStorage
+from plainbox.impl.session.suspend import SessionSuspendHelper
 from plainbox.impl.testing_utils import make_job
+from plainbox.impl.unit.template import TemplateUnit
 from plainbox.testing_utils.testcases import TestCaseWithParameters
 from plainbox.vendor import mock
 
@@ -270,11 +276,37 @@ class SessionResumeHelperTests(TestCase):
                  'version': 7}, None)
 
     def test_resume_dispatch_v8(self):
+        helper8 = SessionResumeHelper8
+        with mock.patch.object(helper8, 'resume_json'):
+            data = gzip.compress(
+                b'{"session":{"desired_job_list":[],"jobs":{},"metadata":'
+                b'{"app_blob":null,"app_id":null,"custom_joblist":false,'
+                b'"flags":[],"rejected_jobs":[],"running_job_name":null,'
+                b'"title":null,"last_job_start_time":null,'
+                b'"running_job_list":[]'
+                b'},"results":{}},"version":8}')
+            SessionResumeHelper([], None, None).resume(data)
+            helper8.resume_json.assert_called_once_with(
+                {'session': {'jobs': {},
+                             'metadata': {'title': None,
+                                          'last_job_start_time': None,
+                                          'running_job_list': [],
+                                          'app_id': None,
+                                          'running_job_name': None,
+                                          'app_blob': None,
+                                          'flags': [],
+                                          'custom_joblist': False,
+                                          'rejected_jobs': []},
+                             'desired_job_list': [],
+                             'results': {}},
+                 'version': 8}, None)
+
+    def test_resume_dispatch_v9(self):
         data = gzip.compress(
-            b'{"version":8}')
+            b'{"version":9}')
         with self.assertRaises(IncompatibleSessionError) as boom:
             SessionResumeHelper([], None, None).resume(data)
-        self.assertEqual(str(boom.exception), "Unsupported version 8")
+        self.assertEqual(str(boom.exception), "Unsupported version 9")
 
 
 class SessionPeekHelperTests(TestCase):
@@ -407,6 +439,102 @@ class SessionPeekHelperTests(TestCase):
                              'results': {}},
                  'version': 7})
 
+    def test_peek_dispatch_v8(self):
+        helper8 = SessionPeekHelper8
+        with mock.patch.object(helper8, 'peek_json'):
+            data = gzip.compress(
+                b'{"session":{"desired_job_list":[],"jobs":{},"metadata":'
+                b'{"app_blob":null,"flags":[],"running_job_name":null,'
+                b'"title":null,"last_job_start_time":null,'
+                b'"running_job_list":[]},'
+                b'"results":{}},"version":8}')
+            SessionPeekHelper().peek(data)
+            helper8.peek_json.assert_called_once_with(
+                {'session': {'jobs': {},
+                             'metadata': {'title': None,
+                                          'last_job_start_time': None,
+                                          'running_job_list': [],
+                                          'running_job_name': None,
+                                          'app_blob': None,
+                                          'flags': []},
+                             'desired_job_list': [],
+                             'results': {}},
+                 'version': 8})
+
+    def make_metadata(self):
+        metadata = SessionMetaData(
+            title='title', flags=['incomplete'], running_job_name='job',
+            app_blob=b'blob', app_id='app')
+        metadata.last_job_start_time = 1.5
+        metadata.running_job_list = ['job', 'other-job']
+        return metadata
+
+    def assertMetadataEqual(self, metadata, expected):
+        for attr in ('title', 'flags', 'running_job_name', 'app_blob',
+                     'app_id', 'last_job_start_time', 'running_job_list'):
+            self.assertEqual(getattr(metadata, attr), getattr(expected, attr))
+
+    def test_peek_metadata(self):
+        metadata = self.make_metadata()
+        data = SessionSuspendHelper().suspend_metadata(metadata)
+        self.assertMetadataEqual(
+            SessionPeekHelper().peek_metadata(data), metadata)
+
+    def test_peek_metadata_corrupted(self):
+        with self.assertRaises(CorruptedSessionError):
+            SessionPeekHelper().peek_metadata(b'{"version":')
+        with self.assertRaises(CorruptedSessionError):
+            SessionPeekHelper().peek_metadata(b'{"version":7}')
+
+    def test_peek_storage_metadata(self):
+        metadata = self.make_metadata()
+        storage = mock.Mock(spec=SessionStorage)
+        storage.load_metadata.return_value = (
+            SessionSuspendHelper().suspend_metadata(metadata))
+        self.assertMetadataEqual(
+            SessionPeekHelper().peek_storage(storage), metadata)
+        # The checkpoint was not needed
+        storage.load_checkpoint.assert_not_called()
+
+    def test_peek_storage_checkpoint(self):
+        metadata = self.make_metadata()
+        session = SessionState([])
+        session.metadata.__dict__.update(metadata.__dict__)
+        data = SessionSuspendHelper().suspend(session)
+        storage = mock.Mock(spec=SessionStorage)
+        storage.load_metadata.return_value = None
+        storage.get_checkpoint_stamp.return_value = 'stamp'
+        storage.load_checkpoint.return_value = data
+        storage.load_journal.return_value = []
+        self.assertMetadataEqual(
+            SessionPeekHelper().peek_storage(storage), metadata)
+        storage.load_journal.assert_called_once_with(data)
+        # The meta-data is saved for the next time
+        storage.save_metadata.assert_called_once_with(
+            SessionSuspendHelper().suspend_metadata(metadata), 'stamp')
+        # Failing to do so doesn't matter
+        storage.save_metadata.side_effect = OSError
+        self.assertMetadataEqual(
+            SessionPeekHelper().peek_storage(storage), metadata)
+
+    def test_peek_storage_corrupted_metadata(self):
+        session = SessionState([])
+        session.metadata.__dict__.update(self.make_metadata().__dict__)
+        storage = mock.Mock(spec=SessionStorage)
+        storage.load_metadata.return_value = b'corrupted'
+        storage.load_checkpoint.return_value = (
+            SessionSuspendHelper().suspend(session))
+        storage.load_journal.return_value = []
+        self.assertIsNotNone(SessionPeekHelper().peek_storage(storage))
+        storage.save_metadata.assert_not_called()
+
+    def test_peek_storage_not_saved(self):
+        storage = mock.Mock(spec=SessionStorage)
+        storage.load_metadata.return_value = None
+        storage.load_checkpoint.return_value = b''
+        self.assertIsNone(SessionPeekHelper().peek_storage(storage))
+        storage.save_metadata.assert_not_called()
+
 
 class SessionResumeTests(TestCase):
 
@@ -451,6 +579,133 @@ class SessionResumeTests(TestCase):
             SessionResumeHelper([], None, None).resume(data)
         self.assertIsInstance(boom.exception.__context__, ValueError)
 
+    def make_suspended_session(self):
+        unit_list = [
+            make_job('resource', plugin='resource', command='true'),
+            make_job('devices', plugin='resource', command='true'),
+            TemplateUnit({
+                'template-resource': 'devices', 'id': 'device/{name}',
+                'plugin': 'shell', 'command': 'true', 'depends': 'a'}),
+            make_job('a', plugin='shell', command='true',
+                     requires='resource.state == "on"'),
+            make_job('b', plugin='shell', command='true', depends='a'),
+            make_job('c', plugin='shell', command='true',
+                     requires='resource.state == "off"'),
+            make_job('d', plugin='shell', command='true', after='b'),
+        ]
+        session = SessionState(unit_list)
+        io_log_map = {
+            'resource': b'state: on\n',
+            'devices': b'name: sda\n\nname: sdb\n',
+        }
+        for job_id in ('resource', 'devices', 'device/sda', 'a', 'c'):
+            session.update_job_result(
+                session.job_state_map[job_id].job,
+                MemoryJobResult({'outcome': 'pass', 'io_log': [
+                    (0.0, 'stdout', io_log_map.get(job_id, b''))]}))
+        session.update_desired_job_list(session.job_list)
+        session.metadata.last_job_start_time = 0.0
+        return unit_list, SessionSuspendHelper().suspend(session)
+
+    def get_state(self, session):
+        return (
+            [job.id for job in session.job_list],
+            [job.id for job in session.run_list],
+            {job_id: (job_state.result.outcome,
+                      job_state.readiness_inhibitor_list)
+             for job_id, job_state in session.job_state_map.items()},
+            session.resource_map)
+
+    def test_bulk_resume(self):
+        """
+        verify that a session resumed in bulk is the same as a session
+        resumed one job and one result at a time
+        """
+        unit_list, data = self.make_suspended_session()
+        with mock.patch.object(SessionResumeHelper1, 'bulk_resume', False):
+            expected = SessionResumeHelper(unit_list, None, None).resume(data)
+        with mock.patch.object(
+                SessionState, '_recompute_job_readiness', autospec=True,
+                side_effect=SessionState._recompute_job_readiness) as mocked:
+            session = SessionResumeHelper(unit_list, None, None).resume(data)
+        # Once after restoring the results, once for the desired jobs
+        self.assertEqual(mocked.call_count, 2)
+        self.assertEqual(
+            self.get_state(session), self.get_state(expected))
+        self.assertIn('device/sdb', session.job_state_map)
+        self.assertEqual(
+            session.job_state_map['b'].readiness_inhibitor_list, [])
+        self.assertNotEqual(
+            session.job_state_map['c'].readiness_inhibitor_list, [])
+
+
+class SessionJournalReplayTests(TestCase):
+
+    """
+    Tests for replaying the session journal on top of a snapshot
+    """
+
+    def setUp(self):
+        self.json_repr = {
+            'version': 7,
+            'session': {
+                'jobs': {'a': 'checksum-a'},
+                'results': {'a': ['result-a']},
+                'metadata': {'title': 'old'},
+            }
+        }
+        self.helper = SessionResumeHelper([], None, None)
+
+    def test_replay_nothing(self):
+        self.assertEqual(
+            self.helper.replay_journal(copy.deepcopy(self.json_repr), []),
+            self.json_repr)
+
+    def test_replay(self):
+        record_list = [
+            b'{"version":7,"metadata":{"title":"new"}}',
+            b'{"version":7,"jobs":{"a":"checksum-a","b":"checksum-b"},'
+            b'"results":{"a":["result-a","result-a2"],"b":["result-b"]}}',
+        ]
+        json_repr = self.helper.replay_journal(self.json_repr, record_list)
+        self.assertEqual(json_repr['session'], {
+            'jobs': {'a': 'checksum-a', 'b': 'checksum-b'},
+            'results': {'a': ['result-a', 'result-a2'], 'b': ['result-b']},
+            'metadata': {'title': 'new'},
+        })
+
+    def test_replay_is_idempotent(self):
+        record_list = [
+            b'{"version":7,"jobs":{"b":"checksum-b"},'
+            b'"results":{"b":["result-b"]}}',
+        ]
+        once = self.helper.replay_journal(
+            copy.deepcopy(self.json_repr), record_list)
+        twice = self.helper.replay_journal(
+            copy.deepcopy(self.json_repr), record_list * 2)
+        self.assertEqual(once, twice)
+
+    def test_replay_garbage(self):
+        with self.assertRaises(CorruptedSessionError):
+            self.helper.replay_journal(self.json_repr, [b'{'])
+
+    def test_replay_wrong_version(self):
+        with self.assertRaises(IncompatibleSessionError):
+            self.helper.replay_journal(self.json_repr, [b'{"version":6}'])
+
+    def test_peek_with_journal(self):
+        data = gzip.compress(
+            b'{"session":{"desired_job_list":[],"jobs":{},"metadata":'
+            b'{"app_blob":null,"flags":[],"running_job_name":null,'
+            b'"title":null},"results":{}},"version":3}')
+        record_list = [
+            b'{"version":3,"metadata":{"app_blob":null,"app_id":"app",'
+            b'"flags":["incomplete"],"running_job_name":"a","title":"t"}}'
+        ]
+        metadata = SessionPeekHelper().peek(data, record_list)
+        self.assertEqual(metadata.flags, {'incomplete'})
+        self.assertEqual(metadata.running_job_name, 'a')
+
 
 class SessionStateResumeTests(TestCaseWithParameters):
     """
@@ -41,7 +41,9 @@ from plainbox.impl.session import UndesiredJobReadinessInhibitor
 from plainbox.impl.session.state import SessionDeviceContext
 from plainbox.impl.session.state import SessionMetaData
 from plainbox.impl.testing_utils import make_job
+from plainbox.impl.unit.category import CategoryUnit
 from plainbox.impl.unit.job import JobDefinition
+from plainbox.impl.unit.testplan import TestPlanUnit
 from plainbox.impl.unit.unit import Unit
 from plainbox.impl.unit.unit_with_id import UnitWithId
 from plainbox.vendor import mock
@@ -535,6 +537,19 @@ class SessionStateReactionToJobResultTests(TestCase):
         self.assertEqual(self.job_inhibitor('Y', 0).cause,
                          InhibitionCause.UNDESIRED)
 
+    def test_recompute_keeps_unchanged_inhibitors(self):
+        self.session.update_desired_job_list([self.job_A])
+        inhibitor_list = self.job_state('A').readiness_inhibitor_list
+        undesired_list = self.job_state('X').readiness_inhibitor_list
+        self.session._recompute_job_readiness()
+        self.assertIs(
+            self.job_state('A').readiness_inhibitor_list, inhibitor_list)
+        self.assertIs(
+            self.job_state('X').readiness_inhibitor_list, undesired_list)
+        # Inhibitors are shared, not created again on each recompute
+        self.session.update_desired_job_list([self.job_A, self.job_X])
+        self.assertIs(self.job_inhibitor('A', 0), inhibitor_list[0])
+
     def test_desire_job_A_updates_state_map(self):
         # This function checks what happens when the job A becomes desired via
         # the update_desired_job_list() call.
@@ -775,6 +790,209 @@ class SessionStateReactionToJobResultTests(TestCase):
              self.job_Y.id: self.session.job_state_map[self.job_Y.id]})
 
 
+class SessionStateIncrementalReadinessTests(TestCase):
+
+    def setUp(self):
+        self.job_list = [
+            make_job("R", plugin="resource"),
+            make_job("A", requires="R.attr == 'value'"),
+            make_job("B", depends="A"),
+            make_job("C", after="B", requires="R.attr != 'value'"),
+            make_job("D", salvages="B"),
+            make_job("E", depends="C D"),
+            make_job("F"),
+        ]
+
+    def make_session(self, incremental_readiness):
+        session = SessionState(self.job_list)
+        session.incremental_readiness = incremental_readiness
+        session.update_desired_job_list(self.job_list)
+        return session
+
+    def readiness(self, session):
+        return {
+            job_id: [
+                (inhibitor.cause, inhibitor.related_job,
+                 inhibitor.related_expression)
+                for inhibitor in job_state.readiness_inhibitor_list]
+            for job_id, job_state in session.job_state_map.items()
+        }
+
+    def test_incremental_matches_full_recompute(self):
+        incremental = self.make_session(True)
+        full = self.make_session(False)
+        results = [
+            ("R", MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS,
+                'io_log': [(0, 'stdout', b'attr: value\n')]})),
+            ("A", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+            ("B", MemoryJobResult({'outcome': IJobResult.OUTCOME_FAIL})),
+            ("F", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+            ("D", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+            ("R", MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS,
+                'io_log': [(0, 'stdout', b'attr: other\n')]})),
+            ("C", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+            ("B", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+        ]
+        for job_id, result in results:
+            for session in (incremental, full):
+                job = session.job_state_map[job_id].job
+                session.update_job_result(job, result)
+            self.assertEqual(
+                self.readiness(incremental), self.readiness(full), job_id)
+
+    def test_only_dependent_jobs_are_recomputed(self):
+        session = self.make_session(True)
+        job_B = session.job_state_map["B"].job
+        with mock.patch.object(
+                job_B.controller, 'get_inhibitor_list',
+                return_value=[]) as mock_get:
+            session.update_job_result(job_B, MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS}))
+        self.assertEqual(
+            sorted(call[0][1].id for call in mock_get.call_args_list),
+            ["C", "D"])
+
+    def test_structural_change_falls_back_to_full_recompute(self):
+        session = self.make_session(True)
+        job_F = session.job_state_map["F"].job
+        with mock.patch.object(session, '_recompute_job_readiness') as mock_r:
+            session.update_job_result(job_F, MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS}))
+            mock_r.assert_not_called()
+            session.add_unit(make_job("G"), recompute=False)
+            session.update_job_result(job_F, MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS}))
+            mock_r.assert_called_once_with()
+
+    def test_update_job_result_list(self):
+        bulk = self.make_session(True)
+        single = self.make_session(True)
+        results = [
+            ("R", MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS,
+                'io_log': [(0, 'stdout', b'attr: value\n')]})),
+            ("A", MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})),
+            ("B", MemoryJobResult({'outcome': IJobResult.OUTCOME_FAIL})),
+        ]
+        for job_id, result in results:
+            single.update_job_result(
+                single.job_state_map[job_id].job, result)
+        with mock.patch.object(
+                bulk, '_recompute_job_readiness',
+                wraps=bulk._recompute_job_readiness) as mock_r:
+            bulk.update_job_result_list(
+                (bulk.job_state_map[job_id].job, result)
+                for job_id, result in results)
+        mock_r.assert_called_once_with()
+        self.assertEqual(self.readiness(bulk), self.readiness(single))
+        self.assertEqual(
+            bulk.job_state_map["B"].result.outcome, IJobResult.OUTCOME_FAIL)
+        self.assertEqual(bulk.resource_map["R"], single.resource_map["R"])
+
+    def test_update_job_result_without_recompute(self):
+        session = self.make_session(True)
+        job_R = session.job_state_map["R"].job
+        with mock.patch.object(session, '_recompute_job_readiness') as mock_r:
+            session.update_job_result(job_R, MemoryJobResult({
+                'outcome': IJobResult.OUTCOME_PASS,
+                'io_log': [(0, 'stdout', b'attr: value\n')]}), False)
+            mock_r.assert_not_called()
+            # The next result can't be handled incrementally
+            session.update_job_result(
+                session.job_state_map["F"].job,
+                MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS}))
+            mock_r.assert_called_once_with()
+
+
+class SessionStateAggregatesTests(TestCase):
+
+    def setUp(self):
+        self.job_list = [
+            make_job('a', category_id='cat-1'),
+            make_job('b', category_id='cat-1'),
+            make_job('c', category_id='cat-2'),
+            make_job('r', plugin='resource', category_id='cat-3'),
+            make_job('t', plugin='attachment', category_id='cat-2'),
+        ]
+        self.category_list = [
+            CategoryUnit({'id': 'cat-{}'.format(index),
+                          'name': 'Category {}'.format(index)})
+            for index in range(1, 4)]
+        self.session = SessionState(self.job_list + self.category_list)
+
+    def get_aggregates(self):
+        session = self.session
+        return (dict(session.get_outcome_stats()),
+                dict(session.get_test_outcome_stats()),
+                session.category_map, session.category_map_lite,
+                session.category_outcome_map,
+                session.resource_global_outcome,
+                session.attachment_global_outcome)
+
+    def set_outcome(self, job_id, outcome):
+        self.session.update_job_result(
+            self.session.job_state_map[job_id].job,
+            MemoryJobResult({'outcome': outcome}))
+
+    def test_initial(self):
+        self.assertEqual(self.get_aggregates(), (
+            {}, {}, {}, {}, {}, IJobResult.OUTCOME_SKIP,
+            IJobResult.OUTCOME_SKIP))
+
+    def test_results(self):
+        self.set_outcome('a', IJobResult.OUTCOME_PASS)
+        self.set_outcome('c', IJobResult.OUTCOME_SKIP)
+        self.set_outcome('r', IJobResult.OUTCOME_CRASH)
+        self.set_outcome('t', IJobResult.OUTCOME_PASS)
+        self.assertEqual(self.get_aggregates(), (
+            {'pass': 2, 'skip': 1, 'crash': 1}, {'pass': 1, 'skip': 1},
+            {'cat-1': 'Category 1', 'cat-2': 'Category 2',
+             'cat-3': 'Category 3'},
+            {'cat-1': 'Category 1', 'cat-2': 'Category 2'},
+            {'cat-1': 'pass', 'cat-2': 'skip'}, 'fail', 'pass'))
+        # Results are replaced, or reset to be run again
+        self.set_outcome('a', IJobResult.OUTCOME_FAIL)
+        self.session.job_state_map['c'].result = MemoryJobResult({})
+        self.assertEqual(self.get_aggregates(), (
+            {'fail': 1, 'crash': 1, 'pass': 1}, {'fail': 1},
+            {'cat-1': 'Category 1', 'cat-2': 'Category 2',
+             'cat-3': 'Category 3'},
+            {'cat-1': 'Category 1'},
+            {'cat-1': 'fail', 'cat-2': 'skip'}, 'fail', 'pass'))
+
+    def test_category_override(self):
+        self.set_outcome('a', IJobResult.OUTCOME_FAIL)
+        self.session.job_state_map['a'].apply_overrides(
+            [('category_id', 'cat-2')])
+        self.assertEqual(self.session.category_map, {'cat-2': 'Category 2'})
+        self.assertEqual(self.session.category_outcome_map, {'cat-2': 'fail'})
+
+    def test_add_remove_units(self):
+        self.set_outcome('a', IJobResult.OUTCOME_PASS)
+        job = make_job('d', category_id='cat-4')
+        category = CategoryUnit({'id': 'cat-4', 'name': 'Category 4'})
+        self.session.add_unit(job)
+        self.session.add_unit(category)
+        self.set_outcome('d', IJobResult.OUTCOME_FAIL)
+        self.assertEqual(self.session.category_map, {
+            'cat-1': 'Category 1', 'cat-4': 'Category 4'})
+        self.assertEqual(dict(self.session.get_outcome_stats()),
+                         {'pass': 1, 'fail': 1})
+        self.session.remove_unit(category)
+        self.session.remove_unit(job)
+        self.assertEqual(self.session.category_map, {'cat-1': 'Category 1'})
+        self.assertEqual(dict(self.session.get_outcome_stats()),
+                         {'pass': 1})
+        # The state of a removed job doesn't count anymore
+        self.session.job_state_map['b'].result = MemoryJobResult(
+            {'outcome': 'pass'})
+        self.session.trim_job_list(JobIdQualifier('b', None))
+        self.assertEqual(dict(self.session.get_outcome_stats()),
+                         {'pass': 1})
+
+
 class SessionMetadataTests(TestCase):
 
     def test_smoke(self):
@@ -1056,3 +1274,26 @@ class SessionDeviceContextTests(SignalTestCase):
         sig2 = self.assertSignalFired(self.ctx.state.on_unit_removed, self.job)
         sig3 = self.assertSignalFired(self.ctx.state.on_job_removed, self.job)
         self.assertSignalOrdering(sig1, sig2, sig3)
+
+    def test_set_test_plan_list__overrides(self):
+        """
+        Ensure that field overrides of test plans are applied to the jobs
+        in the context and to the jobs added later
+        """
+        job_a = make_job('job-a')
+        job_b = make_job('job-b')
+        self.ctx.add_unit(job_a)
+        test_plan = TestPlanUnit({
+            'include': 'job-a certification-status=blocker\njob-.*',
+            'category_overrides': 'apply cat to job-.*\napply other to job-b',
+            'certification_status_overrides': 'apply non-blocker to job-b',
+        }, provider=None)
+        self.ctx.set_test_plan_list([test_plan])
+        state_a = self.ctx.state.job_state_map['job-a']
+        self.assertEqual(state_a.effective_certification_status, 'blocker')
+        self.assertEqual(state_a.effective_category_id, 'cat')
+        self.ctx.add_unit(job_b)
+        state_b = self.ctx.state.job_state_map['job-b']
+        self.assertEqual(
+            state_b.effective_certification_status, 'non-blocker')
+        self.assertEqual(state_b.effective_category_id, 'other')
@@ -69,3 +69,72 @@ class SessionStorageTests(TestCase):
         self.assertEqual(data_out, data_in)
         # Remove the storage now
         storage.remove()
+
+    def test_journal(self):
+        storage = SessionStorage.create("test_storage-")
+        self.addCleanup(storage.remove)
+        storage.save_checkpoint(b'snapshot')
+        # There is no journal yet
+        self.assertEqual(storage.load_journal(b'snapshot'), [])
+        storage.reset_journal(b'snapshot')
+        storage.append_journal(b'record-1')
+        storage.append_journal(b'record-2')
+        self.assertEqual(
+            storage.load_journal(b'snapshot'), [b'record-1', b'record-2'])
+        # The journal doesn't apply to other snapshots
+        self.assertEqual(storage.load_journal(b'other snapshot'), [])
+        # Resetting the journal discards all records
+        storage.reset_journal(b'snapshot')
+        self.assertEqual(storage.load_journal(b'snapshot'), [])
+
+    def test_journal_incomplete_record(self):
+        storage = SessionStorage.create("test_storage-")
+        self.addCleanup(storage.remove)
+        storage.reset_journal(b'snapshot')
+        storage.append_journal(b'record-1')
+        with open(storage.journal_file, 'ab') as stream:
+            stream.write(b'record-')
+        self.assertEqual(storage.load_journal(b'snapshot'), [b'record-1'])
+
+    def test_append_journal_newline(self):
+        storage = SessionStorage("test_storage-")
+        with self.assertRaises(ValueError):
+            storage.append_journal(b'record\n')
+
+    def test_metadata(self):
+        storage = SessionStorage.create("test_storage-")
+        self.addCleanup(storage.remove)
+        # There is no meta-data yet
+        self.assertIsNone(storage.load_metadata())
+        storage.save_checkpoint(b'snapshot')
+        storage.reset_journal(b'snapshot')
+        storage.save_metadata(b'metadata')
+        self.assertEqual(storage.load_metadata(), b'metadata')
+        # No temporary file is left behind
+        self.assertEqual(
+            [name for name in os.listdir(storage.location)
+             if name.startswith('session.metadata')],
+            ['session.metadata'])
+
+    def test_metadata_stale(self):
+        storage = SessionStorage.create("test_storage-")
+        self.addCleanup(storage.remove)
+        storage.save_checkpoint(b'snapshot')
+        storage.reset_journal(b'snapshot')
+        storage.save_metadata(b'metadata')
+        # Recording changes in the journal makes the meta-data stale
+        storage.append_journal(b'record')
+        self.assertIsNone(storage.load_metadata())
+        storage.save_metadata(b'metadata')
+        # And so does saving a new checkpoint
+        storage.save_checkpoint(b'new snapshot')
+        self.assertIsNone(storage.load_metadata())
+
+    def test_metadata_stamp(self):
+        storage = SessionStorage.create("test_storage-")
+        self.addCleanup(storage.remove)
+        stamp = storage.get_checkpoint_stamp()
+        storage.save_checkpoint(b'snapshot')
+        # Saved for the checkpoint as it was before, so stale
+        storage.save_metadata(b'metadata', stamp)
+        self.assertIsNone(storage.load_metadata())
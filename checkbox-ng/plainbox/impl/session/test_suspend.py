@@ -27,6 +27,7 @@ Test definitions for :mod:`plainbox.impl.session.suspend` module
 from functools import partial
 from unittest import TestCase
 import gzip
+import json
 
 from plainbox.abc import IJobResult
 from plainbox.impl.job import JobDefinition
@@ -41,6 +42,7 @@ from plainbox.impl.session.suspend import SessionSuspendHelper3
 from plainbox.impl.session.suspend import SessionSuspendHelper4
 from plainbox.impl.session.suspend import SessionSuspendHelper5
 from plainbox.impl.session.suspend import SessionSuspendHelper6
+from plainbox.impl.session.suspend import SessionJournalHelper
 from plainbox.impl.testing_utils import make_job
 from plainbox.vendor import mock
 
@@ -817,6 +819,105 @@ class SessionSuspendHelper6Tests(SessionSuspendHelper5Tests):
         })
 
 
+class SessionJournalHelperTests(TestCase):
+
+    """
+    Tests for :class:`plainbox.impl.session.suspend.SessionJournalHelper`
+    """
+
+    def setUp(self):
+        self.job_a = make_job(id='a')
+        self.job_b = make_job(id='b')
+        self.state = SessionState([self.job_a, self.job_b])
+        self.state.update_desired_job_list([self.job_a, self.job_b])
+        self.helper = SessionJournalHelper()
+        self.helper.reset(self.state, 100)
+
+    def test_first_record_has_metadata(self):
+        """
+        verify that the first record after a reset carries the meta-data and
+        that it is not repeated when it doesn't change
+        """
+        record = json.loads(self.helper.suspend_delta(self.state).decode())
+        self.assertEqual(record['version'], 8)
+        self.assertIn('metadata', record)
+        self.assertNotIn('jobs', record)
+        self.assertIsNone(self.helper.suspend_delta(self.state))
+        self.state.metadata.running_job_name = 'a'
+        record = json.loads(self.helper.suspend_delta(self.state).decode())
+        self.assertEqual(record['metadata']['running_job_name'], 'a')
+
+    def test_only_changed_jobs_are_stored(self):
+        """
+        verify that a record only mentions the jobs that got new results
+        """
+        self.helper.suspend_delta(self.state)
+        result = MemoryJobResult({'outcome': IJobResult.OUTCOME_PASS})
+        self.state.update_job_result(self.job_b, result)
+        record = json.loads(self.helper.suspend_delta(self.state).decode())
+        self.assertEqual(record['jobs'], {'b': self.job_b.checksum})
+        self.assertEqual(list(record['results']), ['b'])
+        self.assertEqual(
+            record['results']['b'][0]['outcome'], IJobResult.OUTCOME_PASS)
+        self.assertNotIn('metadata', record)
+        # Once stored, the change is forgotten
+        self.assertIsNone(self.helper.suspend_delta(self.state))
+
+    def test_journal_size(self):
+        """
+        verify that the size of all the records is tracked
+        """
+        record = self.helper.suspend_delta(self.state)
+        self.assertEqual(self.helper.journal_size, len(record) + 1)
+
+    def test_can_append(self):
+        """
+        verify that records can be appended to a fresh snapshot
+        """
+        self.assertTrue(self.helper.can_append(self.state))
+
+    def test_can_append__other_session(self):
+        """
+        verify that records cannot be appended for a different session
+        """
+        self.assertFalse(self.helper.can_append(SessionState([])))
+
+    def test_can_append__desired_job_list_changed(self):
+        """
+        verify that changing the selection requires a new snapshot
+        """
+        self.state.update_desired_job_list([self.job_a])
+        self.assertFalse(self.helper.can_append(self.state))
+
+    def test_can_append__mandatory_job_list_changed(self):
+        """
+        verify that changing mandatory jobs requires a new snapshot
+        """
+        self.state.update_mandatory_job_list([self.job_a])
+        self.assertFalse(self.helper.can_append(self.state))
+
+    def test_can_append__job_removed(self):
+        """
+        verify that removing jobs requires a new snapshot
+        """
+        self.state.update_desired_job_list([self.job_a])
+        self.helper.reset(self.state, 100)
+        self.state.remove_unit(self.job_b)
+        self.assertFalse(self.helper.can_append(self.state))
+
+    def test_can_append__compaction(self):
+        """
+        verify that a large journal requires a new snapshot
+        """
+        self.helper.reset(
+            self.state, 100, SessionJournalHelper.COMPACTION_MIN_SIZE + 1)
+        self.assertFalse(self.helper.can_append(self.state))
+        self.helper.reset(
+            self.state, SessionJournalHelper.COMPACTION_MIN_SIZE,
+            SessionJournalHelper.COMPACTION_MIN_SIZE + 1)
+        self.assertTrue(self.helper.can_append(self.state))
+
+
 class RegressionTests(TestCase):
 
     def test_1388055(self):
@@ -34,6 +34,7 @@ from plainbox.abc import IProvider1
 from plainbox.abc import IProviderBackend1
 from plainbox.impl.ctrl import CheckBoxSessionStateController
 from plainbox.impl.ctrl import SymLinkNest
+from plainbox.impl.ctrl import gen_resource_data_from_io_log
 from plainbox.impl.ctrl import gen_rfc822_records_from_io_log
 from plainbox.impl.job import JobDefinition
 from plainbox.impl.resource import Resource
@@ -395,6 +396,35 @@ class FunctionTests(TestCase):
             job.id, RFC822SyntaxError(
                 None, 3, "Unexpected non-empty line: 'error\\n'"))
 
+    def test_parse_resource_data(self):
+        job = mock.Mock(spec=JobDefinition)
+        result = mock.Mock(spec=IJobResult)
+        # Records don't have to be whole lines
+        result.get_io_log.return_value = [
+            (0, 'stdout', b'attr: val'),
+            (0, 'stderr', b'ignored\n'),
+            (0, 'stdout', b'ue1\n\nattr: \xc3'),
+            (0, 'stdout', b'\xa9\n')]
+        self.assertEqual(
+            list(gen_resource_data_from_io_log(job, result)),
+            [{'attr': 'value1'}, {'attr': '\xe9'}])
+
+    @mock.patch('plainbox.impl.ctrl.logger')
+    def test_parse_resource_data_error(self, mock_logger):
+        job = mock.Mock(spec=JobDefinition)
+        result = mock.Mock(spec=IJobResult)
+        result.get_io_log.return_value = [
+            (0, 'stdout', b'attr: value1\n'),
+            (0, 'stdout', b'\n'),
+            (0, 'stdout', b'error\n')]
+        self.assertEqual(
+            list(gen_resource_data_from_io_log(job, result)),
+            [{'attr': 'value1'}])
+        mock_logger.warning.assert_called_once_with(
+            "local script %s returned invalid RFC822 data: %s",
+            job.id, RFC822SyntaxError(
+                None, 3, "Unexpected non-empty line: 'error\\n'"))
+
 
 class SymLinkNestTests(TestCase):
     """
@@ -25,11 +25,14 @@ Test definitions for plainbox.impl.depmgr module
 """
 
 from unittest import TestCase
+import random
 
 from plainbox.impl.depmgr import DependencyCycleError
 from plainbox.impl.depmgr import DependencyDuplicateError
+from plainbox.impl.depmgr import DependencyError
 from plainbox.impl.depmgr import DependencyMissingError
 from plainbox.impl.depmgr import DependencySolver
+from plainbox.impl.depmgr import DependencyUnknownError
 from plainbox.impl.testing_utils import make_job
 
 
@@ -292,3 +295,117 @@ class TestDependencySolver(TestCase):
         with self.assertRaises(DependencyCycleError) as call:
             DependencySolver.resolve_dependencies(job_list)
         self.assertEqual(call.exception.job_list, [A, R, A])
+
+
+class TestDependencySolverWithRecovery(TestCase):
+
+    def resolve_in_loop(self, job_list, visit_list):
+        # This is how the problems used to be recovered from: one at a time,
+        # solving the whole graph again after each problem.
+        job_list = job_list[:]
+        visit_list = visit_list[:]
+        solution = []
+        problems = []
+        while visit_list:
+            try:
+                solution = DependencySolver.resolve_dependencies(
+                    job_list, visit_list)
+            except DependencyError as exc:
+                if exc.affected_job in visit_list:
+                    visit_list.remove(exc.affected_job)
+                if exc.affected_job in job_list:
+                    job_list.remove(exc.affected_job)
+                problems.append(exc)
+                continue
+            else:
+                break
+        return solution, visit_list, problems
+
+    def assertSameAsLoop(self, job_list, visit_list):
+        expected = self.resolve_in_loop(job_list, visit_list)
+        observed = DependencySolver.resolve_dependencies_with_recovery(
+            job_list, visit_list)
+        self.assertEqual(observed[0], expected[0])
+        self.assertEqual(observed[1], expected[1])
+        # Not all errors implement __eq__
+        self.assertEqual(
+            [(type(p), p.affected_job, str(p)) for p in observed[2]],
+            [(type(p), p.affected_job, str(p)) for p in expected[2]])
+
+    def test_no_problems(self):
+        A = make_job(id='A', depends='B')
+        B = make_job(id='B')
+        C = make_job(id='C')
+        self.assertEqual(
+            DependencySolver.resolve_dependencies_with_recovery([A, B, C]),
+            ([B, A, C], [A, B, C], []))
+
+    def test_missing_dependency_is_propagated(self):
+        # A -> B -> C -> (missing) D, E is fine
+        A = make_job(id='A', depends='B')
+        B = make_job(id='B', depends='C')
+        C = make_job(id='C', depends='D')
+        E = make_job(id='E')
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_with_recovery(
+                [A, B, C, E], [A, E]))
+        self.assertEqual(solution, [E])
+        self.assertEqual(visit_list, [E])
+        self.assertEqual(problems, [
+            DependencyMissingError(C, 'D', 'direct'),
+            DependencyMissingError(B, 'C', 'direct'),
+            DependencyMissingError(A, 'B', 'direct')])
+
+    def test_dependency_cycle(self):
+        # A -> B -> C -> B, D -> C
+        A = make_job(id='A', depends='B')
+        B = make_job(id='B', depends='C')
+        C = make_job(id='C', depends='B')
+        D = make_job(id='D', depends='C')
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_with_recovery(
+                [A, B, C, D], [A, D]))
+        self.assertEqual(solution, [])
+        self.assertEqual(visit_list, [])
+        self.assertIsInstance(problems[0], DependencyCycleError)
+        self.assertEqual(problems[0].job_list, [B, C, B])
+        self.assertEqual(problems[1:], [
+            DependencyMissingError(A, 'B', 'direct'),
+            DependencyMissingError(C, 'B', 'direct'),
+            DependencyMissingError(D, 'C', 'direct')])
+
+    def test_unknown_and_duplicate(self):
+        A1 = make_job(id='A')
+        A2 = make_job(id='A', plugin='shell')
+        B = make_job(id='B', depends='A')
+        X = make_job(id='X')
+        solution, visit_list, problems = (
+            DependencySolver.resolve_dependencies_with_recovery(
+                [A1, B, A2], [X, B]))
+        self.assertEqual(solution, [A2, B])
+        self.assertEqual(visit_list, [B])
+        self.assertEqual(len(problems), 2)
+        self.assertIsInstance(problems[0], DependencyDuplicateError)
+        self.assertEqual(problems[1], DependencyUnknownError(X))
+
+    def test_same_as_loop(self):
+        rng = random.Random(1234)
+        for attempt in range(50):
+            size = rng.randint(1, 20)
+            job_list = []
+            for index in range(size):
+                depends = ' '.join(
+                    'J{}'.format(rng.randint(0, size + 2))
+                    for _ in range(rng.randint(0, 3)))
+                job_list.append(make_job(
+                    id='J{}'.format(index), depends=depends or None))
+            for _ in range(rng.randint(0, 2)):
+                job_list.insert(rng.randint(0, size), make_job(
+                    id='J{}'.format(rng.randint(0, size - 1)),
+                    plugin='resource'))
+            visit_list = [
+                rng.choice(job_list) for _ in range(rng.randint(0, size))]
+            if rng.random() < 0.3:
+                visit_list.append(make_job(id='unknown'))
+            with self.subTest(attempt=attempt):
+                self.assertSameAsLoop(job_list, visit_list)
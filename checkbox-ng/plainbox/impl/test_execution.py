@@ -0,0 +1,252 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+plainbox.impl.test_execution
+============================
+
+Test definitions for plainbox.impl.execution module
+"""
+
+import io
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from plainbox.impl.execution import ProcessIOPump
+from plainbox.impl.execution import UnifiedRunner
+from plainbox.vendor import extcmd
+from plainbox.vendor import mock
+
+
+class RecordingDelegate(extcmd.DelegateBase):
+
+    def __init__(self):
+        self.events = []
+
+    def on_begin(self, args, kwargs):
+        self.events.append(('begin',))
+
+    def on_line(self, stream_name, line):
+        self.events.append((stream_name, line))
+
+    def on_chunk(self, stream_name, chunk):
+        self.events.append(('chunk', stream_name, chunk))
+
+    def on_end(self, returncode):
+        self.events.append(('end', returncode))
+
+    def on_interrupt(self):
+        self.events.append(('interrupt',))
+
+    def lines(self, stream_name):
+        return [event[1] for event in self.events
+                if event[0] == stream_name]
+
+
+class ProcessIOPumpTests(TestCase):
+
+    def start(self, script):
+        in_r, in_w = os.pipe()
+        proc = subprocess.Popen(
+            ['sh', '-c', script], stdin=in_r, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+        os.close(in_r)
+        return proc, in_w
+
+    def run_pump(self, script, stdin=None, chunked=False):
+        proc, in_w = self.start(script)
+        delegate = RecordingDelegate()
+        pump = ProcessIOPump(proc, delegate, stdin, in_w, chunked)
+        try:
+            pump.run()
+        finally:
+            pump.close()
+        return proc, delegate
+
+    def test_lines(self):
+        proc, delegate = self.run_pump(
+            "printf 'a\\nb'; printf 'c\\nd\\n'; printf 'e\\n' >&2; "
+            "printf 'no newline'; exit 3")
+        self.assertEqual(proc.returncode, 3)
+        self.assertEqual(delegate.lines('stdout'), [
+            b'a\n', b'bc\n', b'd\n', b'no newline'])
+        self.assertEqual(delegate.lines('stderr'), [b'e\n'])
+
+    def test_chunks(self):
+        proc, delegate = self.run_pump("printf 'a\\nb'", chunked=True)
+        self.assertEqual(
+            b''.join(event[2] for event in delegate.events), b'a\nb')
+
+    def test_large_output(self):
+        proc, delegate = self.run_pump(
+            "i=0; while [ $i -lt 2000 ]; do echo line$i; echo err$i >&2; "
+            "i=$((i+1)); done")
+        self.assertEqual(len(delegate.lines('stdout')), 2000)
+        self.assertEqual(delegate.lines('stderr')[-1], b'err1999\n')
+
+    def test_long_lines(self):
+        # Output without line breaks is not rescanned as it grows
+        size = 32 << 20
+        start = time.monotonic()
+        proc, delegate = self.run_pump(
+            "head -c {} /dev/zero; echo; printf end".format(size))
+        self.assertLess(time.monotonic() - start, 3)
+        line_list = delegate.lines('stdout')
+        self.assertEqual(len(line_list), 2)
+        self.assertEqual(len(line_list[0]), size + 1)
+        self.assertEqual(line_list[0].count(b'\0'), size)
+        self.assertEqual(line_list[1], b'end')
+
+    def test_forward_stdin(self):
+        # More than what fits in the pipe to the process
+        with tempfile.TemporaryFile() as stdin:
+            stdin.write(b'x' * 200000 + b'\nhello\n')
+            stdin.seek(0)
+            proc, delegate = self.run_pump("wc -c", stdin=stdin)
+        self.assertEqual(
+            delegate.lines('stdout')[0].strip(), b'200007')
+
+    def test_unselectable_stdin(self):
+        # Input isn't forwarded, the process sees the end of its input
+        proc, delegate = self.run_pump(
+            "cat; echo done", stdin=io.StringIO("ignored"))
+        self.assertEqual(delegate.lines('stdout'), [b'done\n'])
+
+    def test_process_stops_reading_input(self):
+        stdin_r, stdin_w = os.pipe()
+        with open(stdin_r, 'rb') as stdin:
+            os.write(stdin_w, b'data\n')
+            proc, delegate = self.run_pump("exit 0", stdin=stdin)
+            os.close(stdin_w)
+        self.assertEqual(proc.returncode, 0)
+
+    def test_output_closed_early(self):
+        proc, delegate = self.run_pump(
+            "exec >&- 2>&-; sleep 0.2; exit 4", stdin=io.StringIO())
+        self.assertEqual(proc.returncode, 4)
+
+
+class UnifiedRunnerSuperviseTests(TestCase):
+
+    def setUp(self):
+        with mock.patch('plainbox.impl.execution.ResourceJobCache'):
+            self.runner = UnifiedRunner('session', [], '/nonexistent')
+
+    def supervise(self, threaded, script, stdin):
+        delegate = RecordingDelegate()
+        ecmd = extcmd.ExternalCommandWithDelegate(delegate)
+        in_r, in_w = os.pipe()
+        kwargs = {'stdin': in_r, 'stdout': subprocess.PIPE,
+                  'stderr': subprocess.PIPE, 'start_new_session': True}
+        if threaded:
+            supervise = self.runner._supervise_with_threads
+        else:
+            supervise = self.runner._supervise_with_selector
+        return_code = supervise(
+            ecmd, (['sh', '-c', script],), kwargs, in_r, in_w, stdin, None)
+        return return_code, delegate
+
+    def test_selector_matches_threads(self):
+        script = "read a; echo $a; echo oops >&2; exit 2"
+        results = []
+        for threaded in (True, False):
+            stdin_r, stdin_w = os.pipe()
+            os.write(stdin_w, b'input\n')
+            os.close(stdin_w)
+            with open(stdin_r) as stdin:
+                return_code, delegate = self.supervise(
+                    threaded, script, stdin)
+            results.append((return_code, delegate.lines('stdout'),
+                            delegate.lines('stderr')))
+        self.assertEqual(results[0], (2, [b'input\n'], [b'oops\n']))
+        self.assertEqual(results[0], results[1])
+        self.assertIsNone(self.runner._running_jobs_pid)
+
+    def test_interrupt(self):
+        delegate = RecordingDelegate()
+        ecmd = extcmd.ExternalCommandWithDelegate(delegate)
+        in_r, in_w = os.pipe()
+        kwargs = {'stdin': in_r, 'stdout': subprocess.PIPE,
+                  'stderr': subprocess.PIPE}
+        run = ProcessIOPump.run
+        calls = []
+
+        def interrupted_run(pump):
+            calls.append(pump)
+            if len(calls) == 1:
+                raise KeyboardInterrupt
+            return run(pump)
+
+        with mock.patch.object(ProcessIOPump, 'run', interrupted_run):
+            with mock.patch.object(self.runner, 'send_signal') as send:
+                return_code = self.runner._supervise_with_selector(
+                    ecmd, (['sh', '-c', 'exit 5'],), kwargs, in_r, in_w,
+                    io.StringIO(), None)
+        self.assertEqual(return_code, 5)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(send.call_count, 1)
+        self.assertIn(('interrupt',), delegate.events)
+
+    def test_kill_running_job(self):
+        # The job leaves a process behind that keeps its output open
+        script = "sleep 60 & echo started; wait"
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            self.supervise(False, script, io.StringIO())))
+        thread.start()
+        while self.runner._running_jobs_pid is None:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        self.runner.kill_running_job()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        return_code, delegate = results[0]
+        self.assertEqual(return_code, -9)
+        self.assertIsNone(self.runner._running_jobs_pid)
+
+
+class UnifiedRunnerWorkerTests(TestCase):
+
+    def setUp(self):
+        with mock.patch('plainbox.impl.execution.ResourceJobCache'):
+            self.runner = UnifiedRunner(
+                'session', [], '/nonexistent',
+                password_provider=lambda: b'password')
+
+    def test_get_worker(self):
+        worker = self.runner.get_worker()
+        self.assertIs(worker._resource_cache, self.runner._resource_cache)
+        self.assertIsNot(worker._job_runner_ui_delegate,
+                         self.runner._job_runner_ui_delegate)
+        self.assertFalse(worker.threaded_io)
+        self.assertEqual(worker._password_provider(), b'password')
+
+    def test_worker_does_not_forward_stdin(self):
+        worker = self.runner.get_worker()
+        delegate = RecordingDelegate()
+        ecmd = extcmd.ExternalCommandWithDelegate(delegate)
+        in_r, in_w = os.pipe()
+        kwargs = {'stdin': in_r, 'stdout': subprocess.PIPE,
+                  'stderr': subprocess.PIPE}
+        return_code = worker._supervise_with_selector(
+            ecmd, (['sh', '-c', 'cat; echo done'],), kwargs, in_r, in_w,
+            worker._stdin, None)
+        self.assertEqual(return_code, 0)
+        self.assertEqual(delegate.lines('stdout'), [b'done\n'])
@@ -0,0 +1,168 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+plainbox.impl.test_jobcache
+===========================
+
+Test definitions for plainbox.impl.jobcache module
+"""
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from plainbox.impl.jobcache import ResourceJobCache
+from plainbox.impl.result import MemoryJobResult
+from plainbox.vendor import mock
+
+
+class ResourceJobCacheTests(TestCase):
+
+    def setUp(self):
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.cache_path = os.path.join(self.tmpdir, 'cache')
+        self.io_log_filename = os.path.join(self.tmpdir, 'job.record.bin')
+        with open(self.io_log_filename, 'wb') as stream:
+            stream.write(b'record')
+        self.compute_fn = mock.Mock(return_value=MemoryJobResult({
+            'outcome': 'pass',
+            'io_log_filename': self.io_log_filename}))
+        fingerprint = mock.patch.object(
+            ResourceJobCache, 'get_system_fingerprint',
+            return_value='fingerprint')
+        self.get_system_fingerprint = fingerprint.start()
+        self.addCleanup(fingerprint.stop)
+
+    def make_cache(self, **kwargs):
+        kwargs.setdefault('shared_path', '')
+        return ResourceJobCache(self.cache_path, **kwargs)
+
+    def test_get_stores_and_reuses(self):
+        cache = self.make_cache()
+        in_cache, result = cache.get('checksum', self.compute_fn)
+        self.assertFalse(in_cache)
+        self.assertEqual(result.io_log_filename, self.io_log_filename)
+        in_cache, result = self.make_cache().get('checksum', self.compute_fn)
+        self.assertTrue(in_cache)
+        self.assertEqual(result.outcome, 'pass')
+        self.assertTrue(result.io_log_filename.startswith(self.cache_path))
+        self.assertEqual(self.compute_fn.call_count, 1)
+        # Nothing but the entry is left in the cache
+        self.assertEqual(os.listdir(self.cache_path),
+                         [cache.get_key('checksum')])
+
+    def test_get_copies_io_log(self):
+        self.make_cache().get('checksum', self.compute_fn)
+        session_io_log = os.path.join(self.tmpdir, 'session.record.bin')
+        in_cache, result = self.make_cache().get(
+            'checksum', self.compute_fn, session_io_log)
+        self.assertTrue(in_cache)
+        self.assertEqual(result.io_log_filename, session_io_log)
+        with open(session_io_log, 'rb') as stream:
+            self.assertEqual(stream.read(), b'record')
+
+    def test_key_depends_on_system(self):
+        self.make_cache().get('checksum', self.compute_fn)
+        self.get_system_fingerprint.return_value = 'after reboot'
+        in_cache, result = self.make_cache().get('checksum', self.compute_fn)
+        self.assertFalse(in_cache)
+        self.assertEqual(self.compute_fn.call_count, 2)
+
+    def test_expired_entries(self):
+        cache = self.make_cache(ttl=60)
+        cache.get('checksum', self.compute_fn)
+        entry_path = os.path.join(self.cache_path, cache.get_key('checksum'))
+        old = time.time() - 120
+        os.utime(entry_path, (old, old))
+        in_cache, result = cache.get('checksum', self.compute_fn)
+        self.assertFalse(in_cache)
+        # The stale entry was replaced
+        in_cache, result = cache.get('checksum', self.compute_fn)
+        self.assertTrue(in_cache)
+        os.utime(entry_path, (old, old))
+        cache.load()
+        self.assertEqual(os.listdir(self.cache_path), [])
+
+    def test_load_evicts_least_recently_used(self):
+        cache = self.make_cache()
+        for checksum in ('a', 'b', 'c'):
+            cache.get(checksum, self.compute_fn)
+        entry_size = cache._get_entry_size(
+            os.path.join(self.cache_path, cache.get_key('a')))
+        now = time.time()
+        for age, checksum in enumerate(('c', 'a', 'b')):
+            os.utime(os.path.join(
+                self.cache_path, cache.get_key(checksum), 'result.json'),
+                (now - age, now - age))
+        self.make_cache(max_size=entry_size * 2).load()
+        self.assertEqual(
+            sorted(os.listdir(self.cache_path)),
+            sorted([cache.get_key('c'), cache.get_key('a')]))
+
+    def test_load_removes_stale_temporary_directories(self):
+        os.makedirs(os.path.join(self.cache_path, 'stale.tmp'))
+        os.makedirs(os.path.join(self.cache_path, 'fresh.tmp'))
+        old = time.time() - ResourceJobCache.STALE_TMP_AGE - 1
+        os.utime(os.path.join(self.cache_path, 'stale.tmp'), (old, old))
+        self.make_cache().load()
+        self.assertEqual(os.listdir(self.cache_path), ['fresh.tmp'])
+
+    def test_load_without_cache(self):
+        self.make_cache().load()
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_shared_cache(self):
+        shared_path = os.path.join(self.tmpdir, 'shared')
+        ResourceJobCache(shared_path).get('checksum', self.compute_fn)
+        os.chmod(shared_path, 0o555)
+        self.addCleanup(os.chmod, shared_path, 0o755)
+        cache = self.make_cache(shared_path=shared_path)
+        in_cache, result = cache.get('checksum', self.compute_fn)
+        self.assertTrue(in_cache)
+        self.assertTrue(result.io_log_filename.startswith(shared_path))
+        # Nothing is stored in the private cache for shared entries
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_shared_cache_from_environment(self):
+        with mock.patch.dict(
+                os.environ, {'PLAINBOX_SHARED_RESOURCE_CACHE': '/shared'}):
+            cache = ResourceJobCache(self.cache_path)
+        self.assertEqual(cache._shared_path, '/shared')
+
+    def test_world_writable_entry_is_ignored(self):
+        cache = self.make_cache()
+        cache.get('checksum', self.compute_fn)
+        os.chmod(os.path.join(
+            self.cache_path, cache.get_key('checksum'), 'result.json'),
+            0o666)
+        in_cache, result = cache.get('checksum', self.compute_fn)
+        self.assertFalse(in_cache)
+
+    def test_concurrent_store(self):
+        cache = self.make_cache()
+        key = cache.get_key('checksum')
+
+        def compute_fn():
+            # Another session stores the entry while this one runs the job
+            self.make_cache()._store(key, {
+                'outcome': 'fail', 'io_log_filename': self.io_log_filename})
+            return self.compute_fn()
+        in_cache, result = cache.get('checksum', compute_fn)
+        self.assertFalse(in_cache)
+        self.assertEqual(result.outcome, 'pass')
+        self.assertEqual(os.listdir(self.cache_path), [key])
@@ -451,6 +451,27 @@ class PODTests(TestCase):
         # Ensure signals fired
         field_callback.assert_called_with(None, 1)
 
+    def test_initial_notification(self):
+        """The first responder sees the initial assignment."""
+        calls = []
+
+        class T(POD):
+            __slots__ = ('_f', '__signals__')
+            f = Field(initial=1, notify=True)
+
+            @f.change_notifier
+            def _f_changed(self, old, new):
+                calls.append((self, old, new))
+
+        pod = T()
+        self.assertEqual(calls, [(pod, UNSET, 1)])
+        # The signal of the object is only created when used
+        self.assertFalse(hasattr(pod, '__signals__'))
+        pod.f = 2
+        self.assertEqual(calls, [(pod, UNSET, 1), (pod, 1, 2)])
+        # Slots are enough to store the fields
+        self.assertFalse(hasattr(pod, '__dict__'))
+
     def test_pod_inheritance(self):
         """Check that PODs can be subclassed and new fields can be added."""
         class B(POD):
@@ -38,6 +38,7 @@ from plainbox.impl.resource import ResourceNodeVisitor
 from plainbox.impl.resource import ResourceProgram
 from plainbox.impl.resource import ResourceProgramError
 from plainbox.impl.resource import ResourceSyntaxError
+from plainbox.impl.resource import get_resource_expression
 
 
 class ExpressionFailedTests(TestCase):
@@ -390,6 +391,31 @@ class ResourceExpressionTests(TestCase):
             resource_map['b'],
             resource_map=resource_map))
 
+    def test_compound_expression_reuses_subexpressions(self):
+        resource_map = {
+            'a': [Resource({'foo': 1})],
+            'b': [Resource({'bar': 3})]
+        }
+        expr = ResourceExpression("a.foo == 2 or b.bar == 3")
+        self.assertTrue(expr.evaluate(
+            resource_map['a'],
+            resource_map['b'],
+            resource_map=resource_map))
+        operator, head, tail = expr._split_expr
+        self.assertEqual(operator, ' or ')
+        self.assertIs(head, get_resource_expression("a.foo == 2"))
+        self.assertIs(tail, get_resource_expression("b.bar == 3"))
+        # The split is computed only once
+        expr.evaluate(resource_map=resource_map)
+        self.assertIs(expr._split_expr[1], head)
+
+    def test_compound_expression_split_syntax_error(self):
+        # The whole text is valid but the naive split on ' or ' is not
+        expr = ResourceExpression("a.foo == 'x or y'")
+        with self.assertRaises(ResourceSyntaxError):
+            expr.evaluate([Resource({'foo': 'x or y'})], resource_map={
+                'a': [Resource({'foo': 'x or y'})]})
+
     def test_evaluate_no_namespaces(self):
         self.assertFalse(ResourceExpression("whatever").evaluate([]))
 
@@ -416,6 +442,35 @@ class ResourceExpressionTests(TestCase):
         self.assertRaises(TypeError, expr.evaluate, [{'a': 2}])
 
 
+class GetResourceExpressionTests(TestCase):
+
+    def test_cached(self):
+        expr1 = get_resource_expression("package.name == 'fwts'")
+        expr2 = get_resource_expression("package.name == 'fwts'")
+        self.assertIs(expr1, expr2)
+
+    def test_key_includes_namespace_and_imports(self):
+        text = "package.name == 'fwts'"
+        expr1 = get_resource_expression(text, "com.example")
+        expr2 = get_resource_expression(text, "com.canonical")
+        expr3 = get_resource_expression(
+            text, "com.example", [['com.canonical::package', 'package']])
+        expr4 = get_resource_expression(
+            text, "com.example", (('com.canonical::package', 'package'),))
+        self.assertIsNot(expr1, expr2)
+        self.assertIsNot(expr1, expr3)
+        self.assertIs(expr3, expr4)
+        self.assertEqual(expr1.resource_id_list, ["com.example::package"])
+        self.assertEqual(expr2.resource_id_list, ["com.canonical::package"])
+        self.assertEqual(expr3.resource_id_list, ["com.canonical::package"])
+
+    def test_errors_are_not_cached(self):
+        self.assertRaises(
+            ResourceSyntaxError, get_resource_expression, "barf'")
+        self.assertRaises(
+            ResourceSyntaxError, get_resource_expression, "barf'")
+
+
 class ResourceProgramTests(TestCase):
 
     def setUp(self):
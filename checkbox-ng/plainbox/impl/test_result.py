@@ -27,14 +27,18 @@ from tempfile import TemporaryDirectory
 from unittest import TestCase
 import doctest
 import io
+import zlib
 
 from plainbox.abc import IJobResult
+from plainbox.impl.result import BinaryIOLogRecordReader
+from plainbox.impl.result import BinaryIOLogRecordWriter
 from plainbox.impl.result import DiskJobResult
 from plainbox.impl.result import IOLogRecord
 from plainbox.impl.result import IOLogRecordReader
 from plainbox.impl.result import IOLogRecordWriter
 from plainbox.impl.result import JobResultBuilder
 from plainbox.impl.result import MemoryJobResult
+from plainbox.impl.result import get_io_log_stream_filename
 from plainbox.impl.testing_utils import make_io_log
 from plainbox.vendor import mock
 
@@ -101,6 +105,42 @@ class DiskJobResultTests(TestCase, CommonTestsMixIn):
         self.assertEqual(result.return_code, 0)
         self.assertFalse(result.is_hollow)
 
+    @mock.patch('plainbox.impl.result.logger')
+    def test_binary_io_log(self, mock_logger):
+        io_log = [
+            (0, 'stdout', b'blah\n'),
+            (0.5, 'stderr', b'oops\n'),
+            (1.0, 'stdout', b'done\n'),
+        ]
+        result = DiskJobResult({
+            'outcome': IJobResult.OUTCOME_PASS,
+            'io_log_filename': make_io_log(
+                io_log, self.scratch_dir.name, binary=True),
+        })
+        self.assertEqual(result.io_log, tuple(io_log))
+        self.assertEqual(result.io_log_as_flat_text, 'blah\noops\ndone\n')
+        self.assertEqual(result.io_log_as_text_attachment, 'blah\ndone\n')
+
+    def test_get_io_log_slice(self):
+        io_log = [
+            (0, 'stdout', b'blah\n'),
+            (0.5, 'stderr', b'oops\n'),
+            (1.0, 'stdout', b'done\n'),
+        ]
+        for binary in (False, True):
+            result = DiskJobResult({'io_log_filename': make_io_log(
+                io_log, self.scratch_dir.name, binary=binary)})
+            self.assertEqual(
+                list(result.get_io_log_slice(stream_name='stderr')),
+                [io_log[1]])
+            self.assertEqual(
+                list(result.get_io_log_slice(start=0.5)), io_log[1:])
+            self.assertEqual(
+                list(result.get_io_log_slice(end=1.5)), io_log[:2])
+            self.assertEqual(
+                list(result.get_io_log_slice(
+                    stream_name='stdout', start=0.1)), io_log[2:])
+
     def test_io_log_as_text_attachment(self):
         result = MemoryJobResult({
             'outcome': IJobResult.OUTCOME_PASS,
@@ -186,6 +226,140 @@ class IOLogRecordWriterTests(TestCase):
         self.assertEqual(record_list, [self._RECORD])
 
 
+class BinaryIOLogRecordTests(TestCase):
+
+    _RECORD_LIST = [
+        IOLogRecord(0.0, 'stdout', b'some\ndata'),
+        IOLogRecord(0.25, 'stderr', b''),
+        IOLogRecord(0.5, 'stdout', b'\x00\xff'),
+    ]
+
+    def _write(self, record_list, flush=True, **kwargs):
+        stream = io.BytesIO()
+        writer = BinaryIOLogRecordWriter(stream, **kwargs)
+        for record in record_list:
+            writer.write_record(record)
+        if flush:
+            writer.flush()
+        return stream.getvalue()
+
+    def _read(self, data):
+        return BinaryIOLogRecordReader(io.BytesIO(data))
+
+    def test_round_trip(self):
+        with self._read(self._write(self._RECORD_LIST)) as reader:
+            self.assertEqual(list(reader), self._RECORD_LIST)
+
+    def test_empty(self):
+        with self._read(self._write([])) as reader:
+            self.assertEqual(list(reader), [])
+
+    def test_flush_once(self):
+        stream = io.BytesIO()
+        writer = BinaryIOLogRecordWriter(stream)
+        writer.write_record(self._RECORD_LIST[0])
+        writer.flush()
+        size = len(stream.getvalue())
+        writer.flush()
+        self.assertEqual(len(stream.getvalue()), size)
+
+    def test_not_binary(self):
+        with self.assertRaises(ValueError):
+            self._read(b'[0.123,"stdout","c29tZQpkYXRh"]\n')
+
+    def test_compressed(self):
+        record_list = [
+            IOLogRecord(0.001, 'stdout', b'x' * 79 + b'\n')] * 1000
+        data = self._write(record_list)
+        self.assertLess(len(data), 80 * 1000 / 10)
+        with self._read(data) as reader:
+            self.assertEqual(list(reader), record_list)
+
+    def test_not_flushed(self):
+        # Full blocks were written, the last one is lost
+        with self._read(self._write(
+                self._RECORD_LIST, flush=False, block_size=1)) as reader:
+            self.assertEqual(list(reader), self._RECORD_LIST)
+        with self._read(self._write(
+                self._RECORD_LIST, flush=False)) as reader:
+            self.assertEqual(list(reader), [])
+
+    def test_truncated(self):
+        data = self._write(self._RECORD_LIST, block_size=1)
+        with self._read(data[:-1]) as reader:
+            self.assertEqual(list(reader), self._RECORD_LIST[:2])
+
+    def test_corrupted(self):
+        data = bytearray(self._write(self._RECORD_LIST, block_size=1))
+        data[-1] ^= 0xff
+        with self._read(bytes(data)) as reader:
+            self.assertEqual(list(reader), self._RECORD_LIST[:2])
+
+    def test_iter_data(self):
+        with self._read(self._write(self._RECORD_LIST)) as reader:
+            data_list = list(reader.iter_data(stream_name='stdout'))
+            self.assertIsInstance(data_list[0], memoryview)
+            self.assertEqual(
+                [bytes(data) for data in data_list],
+                [b'some\ndata', b'\x00\xff'])
+
+    def test_slice(self):
+        record_list = [
+            IOLogRecord(0.1, 'stdout' if i % 2 else 'stderr',
+                        str(i).encode('ASCII'))
+            for i in range(1000)]
+        data = self._write(record_list, block_size=64)
+        with self._read(data) as reader:
+            self.assertGreater(len(reader._block_list), 100)
+            for start, end in ((None, None), (0, 10), (10, 20.05),
+                               (50.01, None), (99.9, 1000), (200, None)):
+                for stream_name in (None, 'stdout'):
+                    expected = [
+                        record for i, record in enumerate(record_list)
+                        if (start is None or sum(
+                            r.delay for r in record_list[:i + 1]) >= start)
+                        and (end is None or sum(
+                            r.delay for r in record_list[:i + 1]) < end)
+                        and stream_name in (None, record.stream_name)]
+                    self.assertEqual(
+                        list(reader.iter_records(stream_name, start, end)),
+                        expected)
+
+    def test_slice_skips_blocks(self):
+        record_list = [IOLogRecord(0.1, 'stdout', b'x' * 10)] * 1000
+        data = self._write(record_list, block_size=64)
+        with self._read(data) as reader, mock.patch(
+                'plainbox.impl.result.zlib.decompress',
+                wraps=zlib.decompress) as decompress_mock:
+            self.assertEqual(len(list(reader.iter_records(start=99))), 10)
+            self.assertLess(decompress_mock.call_count, 5)
+
+    def test_slice_with_negative_delay(self):
+        record_list = [
+            IOLogRecord(1.0, 'stdout', b'a'),
+            IOLogRecord(5.0, 'stdout', b'b'),
+            IOLogRecord(-5.0, 'stdout', b'c'),
+            IOLogRecord(10.0, 'stdout', b'd'),
+        ]
+        for block_size in (1, 65536):
+            with self._read(self._write(
+                    record_list, block_size=block_size)) as reader:
+                self.assertEqual(
+                    list(reader.iter_records(start=0.5, end=2)),
+                    [record_list[0], record_list[2]])
+                self.assertEqual(
+                    list(reader.iter_records(start=5)),
+                    [record_list[1], record_list[3]])
+
+    def test_stream_filename(self):
+        self.assertEqual(
+            get_io_log_stream_filename('/a/job.record.bin', 'stdout'),
+            '/a/job.stdout')
+        self.assertEqual(
+            get_io_log_stream_filename('/a/job.record.gz', 'stderr'),
+            '/a/job.stderr')
+
+
 class JobResultBuildeTests(TestCase):
 
     def test_smoke_hollow(self):
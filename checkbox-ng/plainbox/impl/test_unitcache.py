@@ -0,0 +1,199 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+plainbox.impl.test_unitcache
+============================
+
+Test definitions for plainbox.impl.unitcache module
+"""
+import os
+import time
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from plainbox.impl.secure.rfc822 import FileTextSource
+from plainbox.impl.secure.rfc822 import load_rfc822_records
+from plainbox.impl.unitcache import UnitCache
+from plainbox.vendor import mock
+
+
+class UnitCacheTests(TestCase):
+
+    TEXT = (
+        "# comment\n"
+        "id: job\n"
+        "command:\n"
+        " echo foo\n"
+        " .\n"
+        " echo bar\n"
+        "\n"
+        "unit: template\n"
+        "id: other\n")
+
+    def setUp(self):
+        self.scratch_dir = TemporaryDirectory()
+        self.filename = os.path.join(self.scratch_dir.name, "units.pxu")
+        self._write(self.TEXT)
+        self.cache = UnitCache(os.path.join(self.scratch_dir.name, "cache"))
+        # The test suite disables the cache of the user
+        enabled = mock.patch.dict(os.environ, {"PLAINBOX_UNIT_CACHE": "1"})
+        enabled.start()
+        self.addCleanup(enabled.stop)
+
+    def tearDown(self):
+        self.scratch_dir.cleanup()
+
+    def _write(self, text):
+        with open(self.filename, "wt", encoding="UTF-8") as stream:
+            stream.write(text)
+
+    def _store(self, filename=None):
+        filename = filename or self.filename
+        entry = self.cache.new_entry(filename, self.TEXT)
+        entry.records = load_rfc822_records(
+            self.TEXT, source=FileTextSource(filename))
+        self.cache.put(filename, entry)
+        return entry.records
+
+    def _entry_names(self):
+        return sorted(
+            name for name in os.listdir(self.cache._get_cache_path())
+            if name.endswith(".json"))
+
+    def test_round_trip(self):
+        records = self._store()
+        entry = self.cache.get(self.filename, self.TEXT)
+        self.assertEqual(entry.records, records)
+        self.assertEqual(
+            [record.raw_data for record in entry.records],
+            [record.raw_data for record in records])
+        self.assertEqual(
+            [record.field_offset_map for record in entry.records],
+            [record.field_offset_map for record in records])
+        self.assertEqual(
+            [(record.origin.line_start, record.origin.line_end)
+             for record in entry.records], [(2, 6), (8, 9)])
+
+    def test_missing(self):
+        self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_text_changed(self):
+        self._store()
+        text = self.TEXT.replace("foo", "baz")
+        self._write(text)
+        self.assertIsNone(self.cache.get(self.filename, text))
+
+    def test_file_is_not_read(self):
+        # The entry is keyed on the text that is parsed, not on what the
+        # file contains when the cache is used
+        self._store()
+        self._write(self.TEXT.replace("foo", "baz"))
+        self.assertIsNotNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_only_new_entries_are_created(self):
+        self.assertTrue(
+            self.cache.new_entry(self.filename, self.TEXT).created)
+        self._store()
+        self.assertFalse(self.cache.get(self.filename, self.TEXT).created)
+
+    def test_stamp_changed(self):
+        self._store()
+        self.cache._stamp = "other"
+        self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_unsafe_entry(self):
+        self._store()
+        os.chmod(self.cache._get_entry_path(self.filename), 0o666)
+        with mock.patch("plainbox.impl.unitcache.logger"):
+            self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_corrupted_entry(self):
+        self._store()
+        with open(self.cache._get_entry_path(self.filename), "wb") as stream:
+            stream.write(b"{")
+        self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_disabled(self):
+        with mock.patch.dict(os.environ, {"PLAINBOX_UNIT_CACHE": "0"}):
+            self.assertIsNone(self.cache.new_entry(self.filename, self.TEXT))
+            self._write(self.TEXT)
+            self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_put_failure_is_ignored(self):
+        entry = self.cache.new_entry(self.filename, self.TEXT)
+        self.cache._cache_path = self.filename  # not a directory
+        self.cache.put(self.filename, entry)
+        self.assertIsNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_prune_removes_stale_entries(self):
+        other = os.path.join(self.scratch_dir.name, "other.pxu")
+        with open(other, "wt") as stream:
+            stream.write(self.TEXT)
+        self._store()
+        self._store(other)
+        old_stamp_file = os.path.join(self.scratch_dir.name, "old.pxu")
+        with open(old_stamp_file, "wt") as stream:
+            stream.write(self.TEXT)
+        self.cache._stamp = "older plainbox"
+        self._store(old_stamp_file)
+        self.cache._stamp = None
+        tmp_path = os.path.join(self.cache._get_cache_path(), "stale.tmp")
+        with open(tmp_path, "wb"):
+            pass
+        old = time.time() - UnitCache.STALE_TMP_AGE - 1
+        os.utime(tmp_path, (old, old))
+        os.unlink(other)
+        self.cache.prune()
+        self.assertEqual(
+            self._entry_names(),
+            [os.path.basename(self.cache._get_entry_path(self.filename))])
+        self.assertFalse(os.path.exists(tmp_path))
+        self.assertIsNotNone(self.cache.get(self.filename, self.TEXT))
+
+    def test_prune_evicts_least_recently_used(self):
+        filename_list = []
+        for index in range(3):
+            filename = os.path.join(
+                self.scratch_dir.name, "{}.pxu".format(index))
+            with open(filename, "wt") as stream:
+                stream.write(self.TEXT)
+            self._store(filename)
+            filename_list.append(filename)
+        now = time.time()
+        for age, filename in enumerate(filename_list):
+            entry_path = self.cache._get_entry_path(filename)
+            os.utime(entry_path, (now - 100 * age, now - 100 * age))
+        # Using an entry makes it recently used
+        self.assertIsNotNone(self.cache.get(filename_list[2], self.TEXT))
+        UnitCache(self.cache._get_cache_path(), max_entries=2).prune()
+        self.assertEqual(self._entry_names(), sorted(
+            os.path.basename(self.cache._get_entry_path(filename))
+            for filename in filename_list[::2]))
+
+    def test_put_prunes_once_a_day(self):
+        self._store()
+        marker_path = os.path.join(self.cache._get_cache_path(), "pruned")
+        self.assertTrue(os.path.exists(marker_path))
+        with mock.patch.object(UnitCache, "prune") as prune:
+            cache = UnitCache(self.cache._get_cache_path())
+            cache.put(self.filename, cache.new_entry(self.filename, self.TEXT))
+            self.assertFalse(prune.called)
+            old = time.time() - UnitCache.PRUNE_INTERVAL - 1
+            os.utime(marker_path, (old, old))
+            cache = UnitCache(self.cache._get_cache_path())
+            cache.put(self.filename, cache.new_entry(self.filename, self.TEXT))
+            cache.put(self.filename, cache.new_entry(self.filename, self.TEXT))
+            self.assertEqual(prune.call_count, 1)
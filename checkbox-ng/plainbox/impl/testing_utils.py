@@ -33,6 +33,7 @@ from tempfile import NamedTemporaryFile
 import warnings
 
 from plainbox.impl.job import JobDefinition
+from plainbox.impl.result import BinaryIOLogRecordWriter
 from plainbox.impl.result import IOLogRecordWriter
 from plainbox.impl.result import MemoryJobResult
 from plainbox.impl.secure.origin import Origin
@@ -49,11 +50,22 @@ def MockJobDefinition(id, *args, **kwargs):
     return job
 
 
-def make_io_log(io_log, io_log_dir):
+def make_io_log(io_log, io_log_dir, binary=False):
     """
     Make the io logs serialization to json and return the saved file pathname
     WARNING: The caller has to remove the file once done with it!
+
+    With binary set to True the binary (``.record.bin``) format is used.
     """
+    if binary:
+        with NamedTemporaryFile(
+                delete=False, suffix='.record.bin',
+                dir=io_log_dir) as byte_stream:
+            writer = BinaryIOLogRecordWriter(byte_stream)
+            for record in io_log:
+                writer.write_record(record)
+            writer.flush()
+        return byte_stream.name
     with NamedTemporaryFile(
         delete=False, suffix='.record.gz', dir=io_log_dir) as byte_stream, \
             GzipFile(fileobj=byte_stream, mode='wb') as gzip_stream, \
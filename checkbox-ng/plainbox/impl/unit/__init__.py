@@ -21,15 +21,17 @@
 ==========================================================
 """
 
+import functools
 import string
 
 from plainbox.impl.secure.plugins import PkgResourcesPlugInCollection
 
-from jinja2 import Environment, meta
+from jinja2 import Environment, Template, meta
 
-__all__ = ['get_accessed_parameters', 'all_unit']
+__all__ = ['get_accessed_parameters', 'get_jinja2_template', 'all_unit']
 
 
+@functools.lru_cache(maxsize=16384)
 def get_accessed_parameters(text, template_engine='default'):
     """
     Parse a new-style python string template and return parameter names
@@ -53,5 +55,22 @@ def get_accessed_parameters(text, template_engine='default'):
             if info[1] is not None)
 
 
+@functools.lru_cache(maxsize=16384)
+def get_jinja2_template(text):
+    """
+    Get a compiled jinja2 template
+
+    :param text:
+        Source of the template
+    :returns:
+        A jinja2.Template instance
+
+    Compiling a template is far more expensive than rendering it and the same
+    field text is typically shared by all of the units instantiated from a
+    template unit, so compiled templates are kept in a process-wide cache.
+    """
+    return Template(text)
+
+
 # Collection of all unit classes
 all_units = PkgResourcesPlugInCollection('plainbox.unit')
@@ -26,6 +26,7 @@ Test definitions for plainbox.impl.unit (package init file)
 from unittest import TestCase
 
 from plainbox.impl.unit import get_accessed_parameters
+from plainbox.impl.unit import get_jinja2_template
 
 
 class FunctionTests(TestCase):
@@ -42,3 +43,18 @@ class FunctionTests(TestCase):
         self.assertEqual(
             get_accessed_parameters("some {1} {2} {3} text"),
             frozenset(['1', '2', '3']))
+
+    def test_get_accessed_parameters_jinja2(self):
+        self.assertEqual(
+            get_accessed_parameters(
+                "{{ a }} {% if b %}{{ c }}{% endif %}",
+                template_engine='jinja2'),
+            frozenset(['a', 'b', 'c']))
+        # The default engine uses a different syntax
+        self.assertEqual(get_accessed_parameters("{{ a }}"), frozenset())
+
+    def test_get_jinja2_template(self):
+        template = get_jinja2_template("Hello {{ name }}")
+        self.assertIs(template, get_jinja2_template("Hello {{ name }}"))
+        self.assertEqual(template.render({'name': 'world'}), "Hello world")
+        self.assertEqual(template.render({'name': 'you'}), "Hello you")
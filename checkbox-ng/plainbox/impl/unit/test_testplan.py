@@ -365,6 +365,24 @@ class TestTestPlan(TestCase):
                 'apply "first::wireless" to "second::wireless/.*"'),
             [(0, "first::wireless", "^second::wireless/.*$")])
 
+    def test_get_effective_category(self):
+        unit = TestPlanUnit({
+            'category_overrides': (
+                'apply "first" to "job-a"\n'
+                'apply "second" to "job-.*"\n'
+                'apply "third" to "job-a"\n'),
+        }, provider=self.provider)
+        job_list = [mock.Mock(id=job_id, category_id='ns::default')
+                    for job_id in ('ns::job-a', 'ns::job-b', 'ns::other')]
+        # The last override wins in the map, the first one for a single job
+        self.assertEqual(unit.get_effective_category_map(job_list), {
+            'ns::job-a': 'ns::third',
+            'ns::job-b': 'ns::second',
+            'ns::other': 'ns::default'})
+        self.assertEqual(
+            [unit.get_effective_category(job) for job in job_list],
+            ['ns::first', 'ns::second', 'ns::default'])
+
     def test_parse_category_overrides__errors(self):
         unit = TestPlanUnit({}, provider=self.provider)
         with self.assertRaisesRegex(ValueError, "expected override value"):
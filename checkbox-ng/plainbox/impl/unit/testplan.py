@@ -33,6 +33,7 @@ from plainbox.impl.secure.qualifiers import CompositeQualifier
 from plainbox.impl.secure.qualifiers import FieldQualifier
 from plainbox.impl.secure.qualifiers import OperatorMatcher
 from plainbox.impl.secure.qualifiers import PatternMatcher
+from plainbox.impl.secure.qualifiers import PatternSet
 from plainbox.impl.symbol import SymbolDef
 from plainbox.impl.unit import concrete_validators
 from plainbox.impl.unit.unit_with_id import UnitWithId
@@ -503,12 +504,13 @@ class TestPlanUnit(UnitWithId):
         """
         effective_map = {job.id: job.category_id for job in job_list}
         if self.category_overrides is not None:
-            overrides_gen = self.parse_category_overrides(
+            pattern_set, category_id_list = self._get_category_matcher(
                 self.category_overrides)
-            for lineno_offset, category_id, pattern in overrides_gen:
-                for job in job_list:
-                    if re.match(pattern, job.id):
-                        effective_map[job.id] = category_id
+            for job in job_list:
+                index_list = pattern_set.find_matches(job.id)
+                if index_list:
+                    # The last override wins
+                    effective_map[job.id] = category_id_list[index_list[-1]]
         return effective_map
 
     @instance_method_lru_cache(maxsize=None)
@@ -522,13 +524,31 @@ class TestPlanUnit(UnitWithId):
             The effective category_id
         """
         if self.category_overrides is not None:
-            overrides_gen = self.parse_category_overrides(
+            pattern_set, category_id_list = self._get_category_matcher(
                 self.category_overrides)
-            for lineno_offset, category_id, pattern in overrides_gen:
-                if re.match(pattern, job.id):
-                    return category_id
+            index_list = pattern_set.find_matches(job.id)
+            if index_list:
+                return category_id_list[index_list[0]]
         return job.category_id
 
+    @instance_method_lru_cache(maxsize=None)
+    def _get_category_matcher(self, text):
+        """
+        Get the category overrides matched by a set of patterns.
+
+        :param text:
+            The category overrides, see :meth:`parse_category_overrides()`
+        :returns:
+            A pair (pattern_set, category_id_list) where the indices of the
+            patterns of pattern_set matching a job are the indices of the
+            categories overriding its category in category_id_list.
+        """
+        override_list = self.parse_category_overrides(text)
+        return (PatternSet(pattern for lineno_offset, category_id, pattern
+                           in override_list),
+                [category_id for lineno_offset, category_id, pattern
+                 in override_list])
+
     def qualify_pattern(self, pattern):
         """ qualify bare pattern (without ^ and $) """
         if pattern.startswith('^') and pattern.endswith('$'):
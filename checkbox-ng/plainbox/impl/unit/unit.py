@@ -31,8 +31,6 @@ import os
 import string
 from functools import lru_cache
 
-from jinja2 import Template
-
 from plainbox.i18n import gettext as _
 from plainbox.impl.decorators import cached_property
 from plainbox.impl.decorators import instance_method_lru_cache
@@ -44,6 +42,7 @@ from plainbox.impl.symbol import SymbolDefMeta
 from plainbox.impl.symbol import SymbolDefNs
 from plainbox.impl.unit import concrete_validators
 from plainbox.impl.unit import get_accessed_parameters
+from plainbox.impl.unit import get_jinja2_template
 from plainbox.impl.unit.validators import IFieldValidator
 from plainbox.impl.unit.validators import MultiUnitFieldIssue
 from plainbox.impl.unit.validators import PresentFieldValidator
@@ -674,6 +673,27 @@ class Unit(metaclass=UnitType):
         else:
             return {}
 
+    @instance_method_lru_cache(maxsize=None)
+    def _jinja2_context(self):
+        # Add the current system environment variables to the parameters so
+        # that they can be used in all fields (i.e. not just in the command
+        # shell). By adding here rather than in the template instantiation we
+        # avoid problems with creation of checkpoints
+        context = {}
+        if self.is_parametric:
+            context.update(self.parameters)
+        context.update(
+            {
+                "__checkbox_env__": self._checkbox_env(),
+                "__system_env__": os.environ,
+                "__on_ubuntucore__": on_ubuntucore(),
+            }
+        )
+        return context
+
+    def _render_jinja2(self, text):
+        return get_jinja2_template(text).render(self._jinja2_context())
+
     @instance_method_lru_cache(maxsize=None)
     def get_record_value(self, name, default=None):
         """
@@ -692,16 +712,7 @@ class Unit(metaclass=UnitType):
             value = self._data.get(name, default)
         if value is not None and self.is_parametric:
             if self.template_engine == "jinja2":
-                # Add the current system environment variables to the
-                # parameters so that they can be used in all fields (i.e. not
-                # just in the command shell). By adding here rather than in the
-                # template instantiation we avoid problems with creation of
-                # checkpoints
-                tmp_params = self.parameters.copy()
-                tmp_params.update({"__checkbox_env__": self._checkbox_env()})
-                tmp_params.update({"__system_env__": os.environ})
-                tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                value = Template(value).render(tmp_params)
+                value = self._render_jinja2(value)
             else:
                 try:
                     value = string.Formatter().vformat(
@@ -714,12 +725,7 @@ class Unit(metaclass=UnitType):
             and self.template_engine == "jinja2"
             and not self.is_parametric
         ):
-            tmp_params = {
-                "__checkbox_env__": self._checkbox_env(),
-                "__system_env__": os.environ,
-                "__on_ubuntucore__": on_ubuntucore(),
-            }
-            value = Template(value).render(tmp_params)
+            value = self._render_jinja2(value)
         return value
 
     @instance_method_lru_cache(maxsize=None)
@@ -744,11 +750,7 @@ class Unit(metaclass=UnitType):
             value = self._raw_data.get("{}".format(name), default)
         if value is not None and self.is_parametric:
             if self.template_engine == "jinja2":
-                tmp_params = self.parameters.copy()
-                tmp_params.update({"__checkbox_env__": self._checkbox_env()})
-                tmp_params.update({"__system_env__": os.environ})
-                tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                value = Template(value).render(tmp_params)
+                value = self._render_jinja2(value)
             else:
                 value = string.Formatter().vformat(value, (), self.parameters)
         elif (
@@ -756,12 +758,7 @@ class Unit(metaclass=UnitType):
             and self.template_engine == "jinja2"
             and not self.is_parametric
         ):
-            tmp_params = {
-                "__checkbox_env__": self._checkbox_env(),
-                "__system_env__": os.environ,
-                "__on_ubuntucore__": on_ubuntucore(),
-            }
-            value = Template(value).render(tmp_params)
+            value = self._render_jinja2(value)
         return value
 
     @instance_method_lru_cache(maxsize=None)
@@ -802,24 +799,13 @@ class Unit(metaclass=UnitType):
                 # handle exceptions here and hint that this might be the cause
                 # of the problem?
                 if self.template_engine == "jinja2":
-                    tmp_params = self.parameters.copy()
-                    tmp_params.update(
-                        {"__checkbox_env__": self._checkbox_env()}
-                    )
-                    tmp_params.update({"__system_env__": os.environ})
-                    tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                    msgstr = Template(msgstr).render(tmp_params)
+                    msgstr = self._render_jinja2(msgstr)
                 else:
                     msgstr = string.Formatter().vformat(
                         msgstr, (), self.parameters
                     )
             elif self.template_engine == "jinja2":
-                tmp_params = {
-                    "__checkbox_env__": self._checkbox_env(),
-                    "__system_env__": os.environ,
-                    "__on_ubuntucore__": on_ubuntucore(),
-                }
-                msgstr = Template(msgstr).render(tmp_params)
+                msgstr = self._render_jinja2(msgstr)
             return msgstr
         # If there was no marked-for-translation value then let's just return
         # the normal (untranslatable) version.
@@ -829,24 +815,13 @@ class Unit(metaclass=UnitType):
             # the non-raw value here.
             if self.is_parametric:
                 if self.template_engine == "jinja2":
-                    tmp_params = self.parameters.copy()
-                    tmp_params.update(
-                        {"__checkbox_env__": self._checkbox_env()}
-                    )
-                    tmp_params.update({"__system_env__": os.environ})
-                    tmp_params.update({"__on_ubuntucore__": on_ubuntucore()})
-                    msgstr = Template(msgstr).render(tmp_params)
+                    msgstr = self._render_jinja2(msgstr)
                 else:
                     msgstr = string.Formatter().vformat(
                         msgstr, (), self.parameters
                     )
             elif self.template_engine == "jinja2":
-                tmp_params = {
-                    "__checkbox_env__": self._checkbox_env(),
-                    "__system_env__": os.environ,
-                    "__on_ubuntucore__": on_ubuntucore(),
-                }
-                msgstr = Template(msgstr).render(tmp_params)
+                msgstr = self._render_jinja2(msgstr)
             return msgstr
         # If we have nothing better let's just return the default value
         return default
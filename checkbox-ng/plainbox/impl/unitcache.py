@@ -0,0 +1,347 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+:mod:`plainbox.impl.unitcache`  -- parsed unit definition caching
+=================================================================
+
+This module should reduce the time needed to load providers by reusing the
+records parsed from unit definition files as long as those files don't
+change.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+import plainbox
+from plainbox.i18n import gettext as _
+from plainbox.impl.secure.origin import FileTextSource
+from plainbox.impl.secure.origin import Origin
+from plainbox.impl.secure.rfc822 import RFC822Record
+
+logger = logging.getLogger("plainbox.unitcache")
+
+
+class UnitCacheEntry:
+    """
+    Records parsed from one unit definition file.
+
+    :attr records:
+        List of :class:`RFC822Record` parsed from the file
+    :attr file_key:
+        SHA-256 digest of the text the records were parsed from
+    :attr created:
+        True if the entry was created by :meth:`UnitCache.new_entry()` and
+        still has to be stored
+    """
+
+    def __init__(self, records, file_key, created=False):
+        self.records = records
+        self.file_key = file_key
+        self.created = created
+
+
+class UnitCache:
+    """
+    On-disk cache of records parsed from unit definition files.
+
+    Each file is cached separately, keyed by its path. An entry is only used
+    if the SHA-256 digest of the text of the file matches the one recorded
+    when it was stored, and if it was written by the same version of
+    plainbox. Entries are stored as JSON and are only read from
+    files owned by the current user that nobody else can write to.
+
+    Once a day, when an entry is stored, the cache is pruned (see
+    :meth:`prune()`): entries of files that don't exist anymore or that were
+    written by other code are removed and the least recently used entries
+    are evicted so that at most ``max_entries`` are kept.
+
+    Setting the ``PLAINBOX_UNIT_CACHE`` environment variable to ``0``
+    disables the cache.
+    """
+
+    # Bump this when the layout of the entries changes
+    FORMAT_VERSION = 3
+
+    DEFAULT_MAX_ENTRIES = 4096
+
+    # Minimum time between two prunes, in seconds
+    PRUNE_INTERVAL = 24 * 60 * 60
+
+    # Interrupted writes leave temporary files behind, those older than this
+    # (in seconds) are removed
+    STALE_TMP_AGE = 60 * 60
+
+    def __init__(self, cache_path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self._cache_path = cache_path
+        self._max_entries = max_entries
+        self._stamp = None
+        self._pruned = False
+
+    @property
+    def enabled(self):
+        return os.environ.get("PLAINBOX_UNIT_CACHE", "1") != "0"
+
+    @property
+    def stamp(self):
+        """
+        String identifying the code that parses and checks units.
+
+        Entries written by different code are never used. Besides the version
+        of plainbox this includes the modification time of the unit modules,
+        so that checks are redone when working on a development tree.
+        """
+        if self._stamp is None:
+            unit_dir = os.path.join(os.path.dirname(plainbox.__file__),
+                                    "impl", "unit")
+            try:
+                mtime_ns = max(
+                    entry.stat().st_mtime_ns
+                    for entry in os.scandir(unit_dir)
+                    if entry.name.endswith(".py"))
+            except (OSError, ValueError):
+                mtime_ns = 0
+            self._stamp = "{}:{}:{}".format(
+                self.FORMAT_VERSION, plainbox.__version__, mtime_ns)
+        return self._stamp
+
+    def get(self, filename, text):
+        """
+        Get the cached records of the given file.
+
+        :param filename:
+            Path of the unit definition file
+        :param text:
+            Text of the file, as it is going to be parsed
+        :returns:
+            :class:`UnitCacheEntry` or None if there is no valid entry
+        """
+        if not self.enabled:
+            return None
+        entry_path = self._get_entry_path(filename)
+        try:
+            entry = self._load_entry(entry_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.debug(_("Cannot load unit cache entry for %s: %s"),
+                         filename, exc)
+            return None
+        if entry is None:
+            logger.warning(
+                _("Ignoring unsafe unit cache entry for %s"), filename)
+            return None
+        try:
+            if entry["stamp"] != self.stamp or entry["path"] != filename:
+                return None
+            file_key = self._get_text_key(text)
+            if entry["file"] != file_key:
+                return None
+            source = FileTextSource(filename)
+            records = [
+                RFC822Record(
+                    data, Origin(source, line_start, line_end), raw_data,
+                    field_offset_map)
+                for line_start, line_end, field_offset_map, data, raw_data
+                in entry["records"]]
+            # Remember the last use, for evicting entries
+            os.utime(entry_path)
+            return UnitCacheEntry(records, file_key)
+        except (KeyError, TypeError, ValueError, OSError) as exc:
+            logger.debug(_("Cannot use unit cache entry for %s: %s"),
+                         filename, exc)
+            return None
+
+    def new_entry(self, filename, text):
+        """
+        Create an empty entry for the given text of a file.
+
+        :param filename:
+            Path of the unit definition file
+        :param text:
+            Text of the file, as it is going to be parsed
+        :returns:
+            :class:`UnitCacheEntry` without records or None if the cache is
+            disabled
+        """
+        if not self.enabled:
+            return None
+        return UnitCacheEntry([], self._get_text_key(text), created=True)
+
+    def put(self, filename, entry):
+        """
+        Store the records of the given file.
+
+        Failures are logged and otherwise ignored, the cache is just an
+        optimization.
+
+        :param filename:
+            Path of the unit definition file
+        :param entry:
+            :class:`UnitCacheEntry` to store
+        """
+        if not self.enabled:
+            return
+        try:
+            data = json.dumps({
+                "stamp": self.stamp,
+                "path": filename,
+                "file": entry.file_key,
+                "records": [
+                    (record.origin.line_start, record.origin.line_end,
+                     record.field_offset_map, record.data, record.raw_data)
+                    for record in entry.records],
+            }, ensure_ascii=False, separators=(",", ":")).encode("UTF-8")
+            cache_path = self._get_cache_path()
+            os.makedirs(cache_path, mode=0o700, exist_ok=True)
+            # Write the entry atomically, concurrent readers either see the
+            # old entry or the new one
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path, suffix=".tmp")
+            try:
+                with open(fd, "wb") as stream:
+                    stream.write(data)
+                os.replace(tmp_path, self._get_entry_path(filename))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug(_("Cannot store unit cache entry for %s: %s"),
+                         filename, exc)
+            return
+        self._maybe_prune()
+
+    def prune(self):
+        """
+        Prune the cache.
+
+        Leftovers of interrupted writes, entries of files that don't exist
+        anymore and entries written by other code are removed, then the least
+        recently used entries are evicted until at most ``max_entries`` are
+        left. Failures are logged and otherwise ignored.
+        """
+        now = time.time()
+        entry_list = []
+        try:
+            dir_entry_list = os.scandir(self._get_cache_path())
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            logger.warning(_("Error pruning the unit cache. %s"), exc)
+            return
+        for dir_entry in dir_entry_list:
+            try:
+                if dir_entry.name.endswith(".tmp"):
+                    if now - dir_entry.stat().st_mtime > self.STALE_TMP_AGE:
+                        os.unlink(dir_entry.path)
+                    continue
+                if not dir_entry.name.endswith(".json"):
+                    continue
+                try:
+                    entry = self._load_entry(dir_entry.path)
+                except ValueError:
+                    entry = None
+                if (not isinstance(entry, dict) or
+                        entry.get("stamp") != self.stamp or
+                        not os.path.isfile(str(entry.get("path")))):
+                    logger.debug(_("Removing unit cache entry %s"),
+                                 dir_entry.name)
+                    os.unlink(dir_entry.path)
+                    continue
+                entry_list.append((dir_entry.stat().st_mtime, dir_entry.path))
+            except OSError as exc:
+                logger.warning(_("Error pruning unit cache entry %s. %s"),
+                               dir_entry.name, exc)
+        entry_list.sort(reverse=True)
+        for last_use, path in entry_list[self._max_entries:]:
+            logger.debug(_("Evicting unit cache entry %s"),
+                         os.path.basename(path))
+            try:
+                os.unlink(path)
+            except OSError as exc:
+                logger.warning(_("Error pruning unit cache entry %s. %s"),
+                               os.path.basename(path), exc)
+
+    def _maybe_prune(self):
+        """Prune the cache if it was not done for a while."""
+        if self._pruned:
+            return
+        self._pruned = True
+        marker_path = os.path.join(self._get_cache_path(), "pruned")
+        try:
+            if time.time() - os.stat(marker_path).st_mtime < (
+                    self.PRUNE_INTERVAL):
+                return
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return
+        self.prune()
+        try:
+            with open(marker_path, "wb"):
+                pass
+            os.utime(marker_path)
+        except OSError as exc:
+            logger.debug(_("Cannot mark the unit cache as pruned: %s"), exc)
+
+    @staticmethod
+    def _load_entry(entry_path):
+        """
+        Load a cache entry.
+
+        :returns:
+            The decoded entry or None if it is unsafe to use it
+        :raises OSError:
+            If the entry cannot be read
+        :raises ValueError:
+            If the entry is corrupted
+        """
+        with open(entry_path, "rb") as stream:
+            info = os.fstat(stream.fileno())
+            if info.st_uid != os.getuid() or info.st_mode & 0o022:
+                return None
+            return json.loads(stream.read().decode("UTF-8"))
+
+    @staticmethod
+    def _get_text_key(text):
+        """
+        Compute the key identifying the text of a file.
+
+        :returns:
+            The SHA-256 digest of the text, encoded as UTF-8
+        """
+        return hashlib.sha256(str(text).encode("UTF-8")).hexdigest()
+
+    def _get_entry_path(self, filename):
+        name = hashlib.sha256(filename.encode("UTF-8")).hexdigest()
+        return os.path.join(self._get_cache_path(), name + ".json")
+
+    def _get_cache_path(self):
+        if self._cache_path:
+            return self._cache_path
+        suc = os.environ.get('SNAP_USER_COMMON')
+        if suc:
+            return os.path.join(suc, '.cache', 'plainbox', 'unit_cache')
+        xdg_cache_home = os.environ.get('XDG_CACHE_HOME')
+        if not xdg_cache_home:
+            xdg_cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(xdg_cache_home, 'plainbox', 'unit_cache')
+
+
+# Cache used when loading providers
+unit_cache = UnitCache()
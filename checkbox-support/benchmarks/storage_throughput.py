@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark writing and verifying a test file, as removable_storage_test does.
+
+The legacy mode generates a lorem ipsum file like the script used to do
+(checking its size after each ~100 bytes), reads it whole, writes it to the
+target and compares the MD5 digests. Otherwise the storage throughput engine
+is used.
+"""
+import argparse
+import collections
+import hashlib
+import os
+import tempfile
+import time
+
+from checkbox_support.helpers.human_readable_bytes import HumanReadableBytes
+from checkbox_support.storage_throughput import StorageThroughputTest
+
+
+def generate_legacy_data():
+    seed = "104872948765827105728492766217823438120"
+    words = (
+        "Lorem ipsum dolor sit amet, consectetuer adipiscing elit, sed diam "
+        "nonummy nibh euismod tincidunt ut laoreet dolore magna aliquam erat "
+        "volutpat.").split()
+    word_deque = collections.deque(words)
+    seed_deque = collections.deque(seed)
+    while True:
+        yield ' '.join(list(word_deque))
+        word_deque.rotate(int(seed_deque[0]))
+        seed_deque.rotate(1)
+
+
+def md5_file(path):
+    md5 = hashlib.md5()
+    with open(path, "rb") as stream:
+        for data in iter(lambda: stream.read(8192), b""):
+            md5.update(data)
+    return md5.hexdigest()
+
+
+def run_legacy(target_dir, size):
+    start = time.perf_counter()
+    with tempfile.NamedTemporaryFile(delete=False) as tfile:
+        data = generate_legacy_data()
+        while os.path.getsize(tfile.name) < size:
+            tfile.write(next(data).encode("UTF-8"))
+    generated = time.perf_counter()
+    target = os.path.join(target_dir, "legacy")
+    try:
+        with open(tfile.name, "rb") as stream:
+            content = stream.read()
+        with open(target, "wb", 0) as stream:
+            stream.write(content)
+            os.fsync(stream.fileno())
+        written = time.perf_counter()
+        ok = md5_file(tfile.name) == md5_file(target)
+    finally:
+        os.unlink(tfile.name)
+        os.unlink(target)
+    print("legacy: generate {:.3f}s, write {:.3f}s, verify {:.3f}s, "
+          "total {:.3f}s, ok={}".format(
+              generated - start, written - generated,
+              time.perf_counter() - written, time.perf_counter() - start, ok))
+
+
+def run_engine(target_dir, size, args):
+    start = time.perf_counter()
+    engine = StorageThroughputTest(
+        args.block_size, args.queue_depth, args.direct)
+    files = [
+        (os.path.join(target_dir, "test{}".format(index)), size)
+        for index in range(args.files)]
+    try:
+        written, _ = engine.write_files(files)
+        read, _ = engine.read_files(files)
+    finally:
+        for path, _ in files:
+            os.unlink(path)
+    print("engine: write {:.3f}s ({}), read+verify {:.3f}s ({}), "
+          "total {:.3f}s, ok={}".format(
+              written.elapsed, written, read.elapsed, read,
+              time.perf_counter() - start, not read.corrupted))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=tempfile.gettempdir(),
+                        help="directory to write to (default: %(default)s)")
+    parser.add_argument("--size", type=HumanReadableBytes, default="256MiB")
+    parser.add_argument("--block-size", type=HumanReadableBytes,
+                        default="1MiB")
+    parser.add_argument("--queue-depth", type=int, default=1)
+    parser.add_argument("--direct", action="store_true")
+    parser.add_argument("--files", type=int, default=1,
+                        help="number of files tested concurrently")
+    parser.add_argument("--legacy", action="store_true",
+                        help="also run the legacy implementation")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as target_dir:
+        if args.legacy:
+            run_legacy(target_dir, args.size)
+        run_engine(target_dir, args.size, args)
+
+
+if __name__ == "__main__":
+    main()
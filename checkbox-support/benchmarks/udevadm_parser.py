@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmark parsing the udev database of a server with many NVMe drives.
+
+The database of a sample server is extended with copies of one of its NVMe
+controllers (each with a namespace, two partitions and a character device)
+and parsed the same way the device and removable_partition resource jobs
+do it.
+"""
+import argparse
+import os
+import time
+
+from checkbox_support.parsers.udevadm import UdevadmParser
+
+SAMPLE = os.path.join(
+    os.path.dirname(__file__), "..", "checkbox_support", "parsers", "tests",
+    "udevadm_data", "DELL_POWEREDGE_R820_NVME.txt")
+CONTROLLER = "0000:46:00.0"
+
+
+def make_database(controllers):
+    with open(SAMPLE, encoding="UTF-8") as stream:
+        text = stream.read()
+    records = [
+        record for record in text.split("\n\n")
+        if record.startswith("P: ") and CONTROLLER in record.splitlines()[0]]
+    chunks = [text.rstrip("\n"), ""]
+    lsblk_lines = [
+        'KNAME="nvme0n1" TYPE="disk" MOUNTPOINT=""',
+        'KNAME="nvme0n1p1" TYPE="part" MOUNTPOINT="/"',
+        'KNAME="nvme0n1p2" TYPE="part" MOUNTPOINT="[SWAP]"']
+    for index in range(controllers):
+        nvme = "nvme{}".format(100 + index)
+        address = "0000:{:02x}:{:02x}.0".format(0x80 + index // 32, index % 32)
+        for record in records:
+            chunks.append(
+                record.replace(CONTROLLER, address).replace("nvme0", nvme))
+            chunks.append("")
+        for name in ("n1", "n1p1", "n1p2"):
+            lsblk_lines.append(
+                'KNAME="{}{}" TYPE="disk" MOUNTPOINT="/srv/{}{}"'.format(
+                    nvme, name, nvme, name))
+    return "\n".join(chunks) + "\n", "\n".join(lsblk_lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--controllers", type=int, default=2000)
+    args = parser.parse_args()
+    text, lsblk = make_database(args.controllers)
+    for list_partitions in (False, True):
+        start = time.perf_counter()
+        devices = UdevadmParser(text, lsblk, list_partitions, 64).run()
+        print("list_partitions={}: {} devices: {:.3f}s".format(
+            list_partitions, len(devices), time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,13 +14,21 @@
 # You should have received a copy of the GNU General Public License
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 
-from io import StringIO
+from io import BytesIO, StringIO
+from subprocess import CalledProcessError, PIPE
 from unittest import TestCase
+from unittest import mock
+from tempfile import TemporaryDirectory
 from textwrap import dedent
+import os
 
 from pkg_resources import resource_filename
 
 from checkbox_support.parsers.udevadm import UdevadmParser, decode_id
+from checkbox_support.parsers.udevadm import UdevadmDevice
+from checkbox_support.parsers.udevadm import UdevadmSnapshot
+from checkbox_support.parsers.udevadm import find_pkname_is_root_mountpoint
+from checkbox_support.parsers.udevadm import iter_udevadm_records
 from checkbox_support.parsers.udevadm import parse_udevadm_output
 
 
@@ -1094,6 +1102,141 @@ class TestUdevadmParser(TestCase, UdevadmDataMixIn):
                              "Bad product_id for {}".format(device[0]))
 
 
+class TestIterUdevadmRecords(TestCase):
+
+    TEXT = (
+        "\nP: /devices/a\r\nN: a\nS: disk/by-id/a\nS: disk/by-uuid/a\n"
+        "E: DEVPATH=/devices/a\nE: ID_MODEL=Long\n model\n\n\n"
+        "P:/devices/a/b\nE: SUBSYSTEM=block\n")
+
+    def test_records(self):
+        self.assertEqual(list(iter_udevadm_records(self.TEXT)), [
+            ("/devices/a", "a", ["disk/by-id/a", "disk/by-uuid/a"],
+             {"DEVPATH": "/devices/a", "ID_MODEL": "Long model"}),
+            ("/devices/a/b", None, [],
+             {"DEVPATH": "/devices/a/b", "SUBSYSTEM": "block"}),
+        ])
+
+    def test_stream(self):
+        self.assertEqual(
+            list(iter_udevadm_records(StringIO(self.TEXT))),
+            list(iter_udevadm_records(self.TEXT)))
+
+    def test_unsupported_property(self):
+        with self.assertRaises(Exception):
+            list(iter_udevadm_records("P: /devices/a\nE: FOO\n"))
+
+
+class TestFindPknameIsRootMountpoint(TestCase):
+
+    LSBLK = dedent("""
+        KNAME="sda" TYPE="disk" MOUNTPOINT=""
+        KNAME="sda1" TYPE="part" MOUNTPOINT="/"
+        KNAME="sdb" TYPE="disk" MOUNTPOINT=""
+        KNAME="sdb1" TYPE="part" MOUNTPOINT="/media/sdb1"
+        KNAME="mmcblk0p2" TYPE="part" MOUNTPOINT="/writable"
+        """)
+
+    def test_root_mountpoint(self):
+        self.assertTrue(find_pkname_is_root_mountpoint("sda", self.LSBLK))
+        self.assertTrue(find_pkname_is_root_mountpoint("sda1", self.LSBLK))
+        self.assertTrue(
+            find_pkname_is_root_mountpoint("mmcblk0", self.LSBLK))
+        self.assertFalse(find_pkname_is_root_mountpoint("sdb", self.LSBLK))
+        self.assertFalse(find_pkname_is_root_mountpoint("sdc", self.LSBLK))
+        self.assertFalse(find_pkname_is_root_mountpoint("sda", ""))
+        self.assertFalse(find_pkname_is_root_mountpoint("sda", None))
+
+    def test_parser_reads_stream_once(self):
+        stream = StringIO(dedent("""
+            P: /devices/platform/mmc/mmc_host/mmc0/mmc0:0001
+            E: DRIVER=mmcblk
+            E: MMC_TYPE=MMC
+            E: SUBSYSTEM=mmc
+
+            P: /devices/platform/mmc/mmc_host/mmc0/mmc0:0001/block/mmcblk0
+            N: mmcblk0
+            E: DEVNAME=/dev/mmcblk0
+            E: DEVTYPE=disk
+            E: ID_PART_TABLE_TYPE=gpt
+            E: SUBSYSTEM=block
+            """))
+        devices = UdevadmParser(stream, StringIO(self.LSBLK)).run()
+        self.assertEqual(devices[0].category, "DISK")
+        self.assertEqual(devices[0].category, "DISK")
+
+
+class TestUdevadmDevice(TestCase):
+
+    def test_set_property_updates_children(self):
+        parent = UdevadmDevice(
+            {"DEVPATH": "/devices/usb1", "SUBSYSTEM": "usb"}, None)
+        device = UdevadmDevice(
+            {"DEVPATH": "/devices/usb1/input1", "SUBSYSTEM": "input"}, None,
+            stack=[parent])
+        self.assertEqual(device.bus, "usb")
+        parent.bus = "pci"
+        self.assertEqual(device.bus, "input")
+
+
+class TestUdevadmSnapshot(TestCase, UdevadmDataMixIn):
+
+    def setUp(self):
+        self.scratch_dir = TemporaryDirectory()
+        self.addCleanup(self.scratch_dir.cleanup)
+        self.filename = os.path.join(self.scratch_dir.name, "snapshot.json")
+        self.stamp = "boot:1:udevadm"
+        patcher = mock.patch.object(
+            UdevadmSnapshot, "get_stamp", side_effect=lambda _: self.stamp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse(self):
+        text = self.get_text("DELL_POWEREDGE_R820_NVME")
+        snapshot = UdevadmSnapshot(list(iter_udevadm_records(text)))
+        for list_partitions in (False, True):
+            self.assertEqual(
+                [repr(d) for d in UdevadmParser(
+                    snapshot, list_partitions=list_partitions).run()],
+                [repr(d) for d in UdevadmParser(
+                    text, list_partitions=list_partitions).run()])
+
+    @mock.patch("checkbox_support.parsers.udevadm.Popen")
+    def test_capture(self, mock_popen):
+        mock_popen().stdout = BytesIO(b"P: /devices/a\nN: a\xff\n")
+        mock_popen().wait.return_value = 0
+        snapshot = UdevadmSnapshot.capture("udevadm info --export-db")
+        mock_popen.assert_called_with(
+            ["udevadm", "info", "--export-db"], stdout=PIPE)
+        self.assertEqual(snapshot.records, [
+            ("/devices/a", "a", [], {"DEVPATH": "/devices/a"})])
+        self.assertEqual(snapshot.stamp, self.stamp)
+
+    @mock.patch("checkbox_support.parsers.udevadm.Popen")
+    def test_capture_failure(self, mock_popen):
+        mock_popen().stdout = BytesIO(b"")
+        mock_popen().wait.return_value = 1
+        with self.assertRaises(CalledProcessError):
+            UdevadmSnapshot.capture("udevadm info --export-db")
+
+    def test_save_load(self):
+        snapshot = UdevadmSnapshot(
+            list(iter_udevadm_records(self.get_text("XEON"))), self.stamp)
+        snapshot.save(self.filename)
+        loaded = UdevadmSnapshot.load(self.filename, "udevadm")
+        self.assertEqual(loaded.records, snapshot.records)
+
+    def test_load_stale(self):
+        UdevadmSnapshot([], self.stamp).save(self.filename)
+        self.stamp = "boot:2:udevadm"
+        self.assertIsNone(UdevadmSnapshot.load(self.filename, "udevadm"))
+        self.stamp = None
+        self.assertIsNone(UdevadmSnapshot.load(self.filename, "udevadm"))
+
+    def test_load_missing(self):
+        self.assertIsNone(UdevadmSnapshot.load(self.filename, "udevadm"))
+
+
 class TestDecodeId(TestCase):
 
     def test_string(self):
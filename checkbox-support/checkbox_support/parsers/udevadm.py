@@ -22,10 +22,17 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
-from subprocess import check_output, CalledProcessError
+from subprocess import check_output, CalledProcessError, Popen, PIPE
+import bisect
+import functools
+import io
+import itertools
+import json
 import os
 import re
+import shlex
 import string
+import tempfile
 
 from checkbox_support.lib.bit import get_bitmask
 from checkbox_support.lib.bit import test_bit
@@ -98,6 +105,10 @@ MD_DEVICE_RE = re.compile(r"MD_DEVICE_\w+_DEV")
 ROOT_MOUNTPOINT = re.compile(
     r'MOUNTPOINT=.*/(writable|hostfs|'
     r'ubuntu-seed|ubuntu-boot|ubuntu-save|data|boot)')
+# Some attribute lines have a space character after the
+# ':', others don't have it (see udevadm-info.c).
+UDEVADM_LINE_RE = re.compile(r"(?P<key>[A-Z]):\s*(?P<value>.*)")
+UDEVADM_PROPERTY_RE = re.compile(r"(?P<key>[^=]+)=(?P<value>.*)")
 
 
 def slugify(_string):
@@ -110,22 +121,141 @@ def slugify(_string):
 def find_pkname_is_root_mountpoint(devname, lsblk=None):
     """Check for partition mounted as root for a DISK device."""
     if lsblk:
+        if not isinstance(lsblk, RootMountpointIndex):
+            lsblk = RootMountpointIndex(lsblk)
+        return lsblk.has_root_mountpoint(devname)
+    return False
+
+
+class RootMountpointIndex(object):
+    """
+    Index of the block devices mounted as (or as part of) the root filesystem.
+
+    The index is built once from the output of ``lsblk -i -n -P -o
+    KNAME,TYPE,MOUNTPOINT`` so that looking up a device is a binary search
+    instead of a scan of the whole output.
+    """
+
+    def __init__(self, lsblk):
         try:
             lsblk = lsblk.read()
         except AttributeError:
             pass
+        knames = []
         for line in lsblk.splitlines():
+            if not line.startswith('KNAME="'):
+                continue
             if (
-                line.endswith('MOUNTPOINT="/"') and
-                line.startswith('KNAME="{}'.format(devname))
-            ):
-                return True
-            if (
-                ROOT_MOUNTPOINT.search(line) and
-                line.startswith('KNAME="{}'.format(devname))
+                line.endswith('MOUNTPOINT="/"') or
+                ROOT_MOUNTPOINT.search(line)
             ):
-                return True
-    return False
+                knames.append(line[len('KNAME="'):])
+        knames.sort()
+        self._knames = knames
+
+    def has_root_mountpoint(self, devname):
+        """
+        Check if a device whose name starts with devname is mounted as root.
+
+        This matches partitions of the devname disk, as well as the disk
+        itself.
+        """
+        prefix = "{}".format(devname)
+        index = bisect.bisect_left(self._knames, prefix)
+        return (
+            index < len(self._knames) and
+            self._knames[index].startswith(prefix))
+
+
+def iter_udevadm_records(stream_or_string):
+    """
+    Parse the output of ``udevadm info --export-db`` record by record.
+
+    The output is read line by line, so that only one record is in memory at
+    a time when reading from a stream.
+
+    :param stream_or_string:
+        The output as a string or a text stream
+    :returns:
+        An iterator of (path, name, symlinks, environment) tuples
+    """
+    if isinstance(stream_or_string, type("")):
+        stream_or_string = io.StringIO(stream_or_string)
+    lines = []
+    for line in itertools.chain(stream_or_string, [""]):
+        line = line.replace('\r', '').rstrip('\n')  # Just in case...
+        if line:
+            lines.append(line)
+            continue
+        if not lines:
+            continue
+        record = "\n".join(lines).strip()
+        lines = []
+        if not record:
+            continue
+
+        # Determine path, name and environment
+        path = None
+        name = None
+        element = None
+        symlinks = []
+        environment = {}
+        for line in record.splitlines():
+            line_match = UDEVADM_LINE_RE.match(line)
+            if not line_match:
+                if environment:
+                    # Append to last environment element
+                    environment[element] += line
+                continue
+
+            key = line_match.group("key")
+            value = line_match.group("value")
+
+            if key == "P":
+                path = value
+            elif key == "N":
+                name = value
+            elif key == "S":
+                symlinks.append(value)
+            elif key == "E":
+                key_match = UDEVADM_PROPERTY_RE.match(value)
+                if not key_match:
+                    raise Exception(
+                        "Device property not supported: %s" % value)
+                element = key_match.group("key")
+                environment[element] = key_match.group("value")
+
+        # Set default DEVPATH
+        environment.setdefault("DEVPATH", path)
+        yield path, name, symlinks, environment
+
+
+def _memoized(getter):
+    """
+    Decorator memoizing the value computed by an UdevadmDevice property.
+
+    Properties are computed from the udev environment of the device and of
+    its parents, which doesn't change, and from the properties explicitly
+    set on those devices. Memoized values are thus discarded whenever a
+    property of any device is set.
+    """
+    name = getter.__name__
+
+    @functools.wraps(getter)
+    def wrapper(self):
+        generation = UdevadmDevice._generation
+        if self._memo_generation != generation:
+            self._memo = {}
+            self._memo_generation = generation
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        value = getter(self)
+        if UdevadmDevice._generation == generation:
+            self._memo[name] = value
+        return value
+    return wrapper
 
 
 class UdevadmDevice(object):
@@ -148,7 +278,13 @@ class UdevadmDevice(object):
         "_vendor_id",
         "_subvendor_id",
         "_vendor_slug",
-        "_symlinks")
+        "_symlinks",
+        "_memo",
+        "_memo_generation")
+
+    # Incremented whenever a property of any device is set, which invalidates
+    # the values memoized by all the devices (see _memoized())
+    _generation = 0
 
     def __init__(self, environment, name, lsblk=None, list_partitions=False,
                  bits=None, stack=[], symlinks=None):
@@ -173,6 +309,11 @@ class UdevadmDevice(object):
         self._symlinks = []
         if symlinks:
             self._symlinks = symlinks
+        self._memo = {}
+        self._memo_generation = UdevadmDevice._generation
+
+    def _changed(self):
+        UdevadmDevice._generation += 1
 
     def __repr__(self):
         vid = int(self.vendor_id) if self.vendor_id else 0
@@ -187,6 +328,7 @@ class UdevadmDevice(object):
             return self._name
 
     @property
+    @_memoized
     def bus(self):
         if self._bus is not None:
             return self._bus
@@ -236,8 +378,10 @@ class UdevadmDevice(object):
     @bus.setter
     def bus(self, value):
         self._bus = value
+        self._changed()
 
     @property
+    @_memoized
     def category(self):
         if self._category is not None:
             return self._category
@@ -598,6 +742,7 @@ class UdevadmDevice(object):
     @category.setter
     def category(self, value):
         self._category = value
+        self._changed()
 
     @property
     def major(self):
@@ -607,6 +752,7 @@ class UdevadmDevice(object):
             return self._environment["MAJOR"]
 
     @property
+    @_memoized
     def driver(self):
         if "DRIVER" in self._environment:
             return self._environment["DRIVER"]
@@ -655,6 +801,7 @@ class UdevadmDevice(object):
         return None
 
     @property
+    @_memoized
     def product_id(self):
         if self._product_id is not None:
             return self._product_id
@@ -713,8 +860,10 @@ class UdevadmDevice(object):
     @product_id.setter
     def product_id(self, value):
         self._product_id = value
+        self._changed()
 
     @property
+    @_memoized
     def vendor_id(self):
         if self._vendor_id is not None:
             return self._vendor_id
@@ -772,6 +921,7 @@ class UdevadmDevice(object):
     @vendor_id.setter
     def vendor_id(self, value):
         self._vendor_id = value
+        self._changed()
 
     @property
     def subproduct_id(self):
@@ -793,6 +943,7 @@ class UdevadmDevice(object):
     @subproduct_id.setter
     def subproduct_id(self, value):
         self._subproduct_id = value
+        self._changed()
 
     @property
     def subvendor_id(self):
@@ -814,6 +965,7 @@ class UdevadmDevice(object):
     @subvendor_id.setter
     def subvendor_id(self, value):
         self._subvendor_id = value
+        self._changed()
 
     @property
     def product_slug(self):
@@ -836,6 +988,7 @@ class UdevadmDevice(object):
         return None
 
     @property
+    @_memoized
     def product(self):
         if self._product is not None:
             return self._product
@@ -952,8 +1105,10 @@ class UdevadmDevice(object):
     @product.setter
     def product(self, value):
         self._product = value
+        self._changed()
 
     @property
+    @_memoized
     def vendor(self):
         if self._vendor is not None:
             return self._vendor
@@ -1031,6 +1186,7 @@ class UdevadmDevice(object):
     @vendor.setter
     def vendor(self, value):
         self._vendor = value
+        self._changed()
 
     @property
     def interface(self):
@@ -1061,10 +1217,12 @@ class UdevadmDevice(object):
     @mac.setter
     def mac(self, value):
         self._mac = value
+        self._changed()
 
     @interface.setter
     def interface(self, value):
         self._interface = value
+        self._changed()
 
     def as_json(self):
         attributes = ("path", "bus", "category", "driver", "product_id",
@@ -1092,7 +1250,12 @@ class UdevadmDevice(object):
 
 
 class UdevadmParser(object):
-    """Parser for the udevadm command."""
+    """
+    Parser for the udevadm command.
+
+    The output of ``udevadm info --export-db`` can be given as a string, a
+    text stream (read line by line) or an :class:`UdevadmSnapshot`.
+    """
 
     device_factory = UdevadmDevice
 
@@ -1207,65 +1370,25 @@ class UdevadmParser(object):
     def getAttributes(self, path):
         return {}
 
-    def run(self):
-        # Some attribute lines have a space character after the
-        # ':', others don't have it (see udevadm-info.c).
-        line_pattern = re.compile(r"(?P<key>[A-Z]):\s*(?P<value>.*)")
-        multi_pattern = re.compile(r"(?P<key>[^=]+)=(?P<value>.*)")
+    def _iter_records(self):
+        if isinstance(self.stream_or_string, UdevadmSnapshot):
+            return iter(self.stream_or_string.records)
+        return iter_udevadm_records(self.stream_or_string)
 
+    def run(self):
         stack = []
-        if isinstance(self.stream_or_string, type("")):
-            output = self.stream_or_string
-        else:
-            output = self.stream_or_string.read()
-        output = output.replace('\r', '')  # Just in case...
-        for record in re.split("\n{2,}", output):
-            record = record.strip()
-            if not record:
-                continue
-
-            # Determine path, name and environment
-            path = None
-            name = None
-            element = None
-            symlinks = []
-            environment = {}
-            for line in record.splitlines():
-                line_match = line_pattern.match(line)
-                if not line_match:
-                    if environment:
-                        # Append to last environment element
-                        environment[element] += line
-                    continue
-
-                key = line_match.group("key")
-                value = line_match.group("value")
-
-                if key == "P":
-                    path = value
-                elif key == "N":
-                    name = value
-                elif key == "S":
-                    symlinks.append(value)
-                elif key == "E":
-                    key_match = multi_pattern.match(value)
-                    if not key_match:
-                        raise Exception(
-                            "Device property not supported: %s" % value)
-                    element = key_match.group("key")
-                    environment[element] = key_match.group("value")
-
+        lsblk = self.lsblk
+        if lsblk:
+            lsblk = RootMountpointIndex(lsblk)
+        for path, name, symlinks, environment in self._iter_records():
             # Update stack
             while stack:
                 if stack[-1]._raw_path + "/" in path:
                     break
                 stack.pop()
 
-            # Set default DEVPATH
-            environment.setdefault("DEVPATH", path)
-
             device = self.device_factory(
-                environment, name, self.lsblk, self.list_partitions, self.bits,
+                environment, name, lsblk, self.list_partitions, self.bits,
                 list(stack), symlinks)
             if not self._ignoreDevice(device):
                 if device._raw_path in self.devices:
@@ -1309,12 +1432,12 @@ class UdevadmParser(object):
                     [v.replace('/dev/', '') for k, v in d._environment.items()
                      if MD_DEVICE_RE.match(k)])
 
-        HID_devices_path_list = []
+        HID_devices_path_list = set()
         for d in self.devices.values():
             if d._environment.get("SUBSYSTEM") == 'input':
                 if d._stack:
                     parent = d._stack[-1]
-                    HID_devices_path_list.append(parent._raw_path)
+                    HID_devices_path_list.add(parent._raw_path)
 
         video_devices = list(self.devices.values())
         for device in video_devices:
@@ -1328,17 +1451,26 @@ class UdevadmParser(object):
                 if d.category == "DRI":
                     d.category = "VIDEO"
 
+        network_categories = (
+            "INFINIBAND", "NETWORK", "SOCKETCAN", "WIRELESS", "WWAN")
+        network_devices = []
+        network_generation = None
         for device in list(self.devices.values()):
             if device.category == 'HIDRAW' and device._stack:
                 for parent in (device._stack[-1], device._stack[-2]):
                     if parent._raw_path in HID_devices_path_list:
                         self.devices.pop(device._raw_path, None)
-            elif device.category in ("INFINIBAND", "NETWORK", "SOCKETCAN",
-                                     "WIRELESS", "WWAN", "OTHER"):
+            elif device.category in network_categories + ("OTHER",):
+                # Only look through the network devices, collected again
+                # whenever a device is changed as it may change categories
+                if network_generation != UdevadmDevice._generation:
+                    network_generation = UdevadmDevice._generation
+                    network_devices = [
+                        d for d in self.devices.values()
+                        if d.category in network_categories]
                 dev_interface = [
-                    d for d in self.devices.values()
-                    if d.category in ("INFINIBAND", "NETWORK", "SOCKETCAN",
-                                      "WIRELESS", "WWAN") and
+                    d for d in network_devices
+                    if self.devices.get(d._raw_path) is d and
                     device._raw_path != d._raw_path and
                     device._raw_path + '/' in d._raw_path
                 ]
@@ -1406,6 +1538,104 @@ class UdevadmParser(object):
         [result.addDevice(device) for device in self.devices.values()]
 
 
+class UdevadmSnapshot(object):
+    """
+    Parsed udev database that can be shared by several parsers.
+
+    The records of ``udevadm info --export-db`` don't depend on the options
+    of :class:`UdevadmParser`, so they can be captured once, saved (e.g. in
+    the session share directory) and given to each parser in place of the
+    command output. A saved snapshot is only loaded again if it was captured
+    with the same command, during the same boot, and if the udev database
+    didn't change since then.
+    """
+
+    BOOT_ID = "/proc/sys/kernel/random/boot_id"
+    UDEV_DATA_DIR = "/run/udev/data"
+
+    def __init__(self, records, stamp=None):
+        self.records = records
+        self.stamp = stamp
+
+    @classmethod
+    def get_stamp(cls, command):
+        """
+        Get a string identifying the current state of the udev database.
+
+        udev creates, replaces or removes a file of its data directory each
+        time a device is added, changed or removed, updating its
+        modification time.
+
+        :returns: The stamp, or None if the state cannot be determined
+        """
+        try:
+            with open(cls.BOOT_ID, "rt") as stream:
+                boot_id = stream.read().strip()
+            mtime_ns = os.stat(cls.UDEV_DATA_DIR).st_mtime_ns
+        except OSError:
+            return None
+        return "{}:{}:{}".format(boot_id, mtime_ns, command)
+
+    @classmethod
+    def capture(cls, command="udevadm info --export-db"):
+        """
+        Run the given command and parse its output.
+
+        :raises CalledProcessError: if the command fails
+        """
+        # Get the stamp first so that changes done while the command runs
+        # make the snapshot stale
+        stamp = cls.get_stamp(command)
+        process = Popen(shlex.split(command), stdout=PIPE)
+        # Set the error policy to 'ignore' in order to let tests depending
+        # on udev resources to properly match udev properties
+        with io.TextIOWrapper(
+            process.stdout, encoding="UTF-8", errors="ignore", newline="\n"
+        ) as stream:
+            records = list(iter_udevadm_records(stream))
+        if process.wait() != 0:
+            raise CalledProcessError(process.returncode, command)
+        return cls(records, stamp)
+
+    @classmethod
+    def load(cls, filename, command="udevadm info --export-db"):
+        """
+        Load a snapshot saved by :meth:`save()`.
+
+        :returns:
+            The snapshot, or None if it cannot be loaded or is stale
+        """
+        try:
+            with open(filename, "rt", encoding="UTF-8") as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        stamp = cls.get_stamp(command)
+        if stamp is None or data.get("stamp") != stamp:
+            return None
+        records = [
+            (path, name, symlinks, environment)
+            for path, name, symlinks, environment in data["records"]]
+        return cls(records, stamp)
+
+    def save(self, filename):
+        """
+        Save the snapshot, atomically replacing any existing one.
+
+        :raises OSError: if the snapshot cannot be written
+        """
+        fd, tmp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(filename) or ".", suffix=".tmp")
+        try:
+            with open(fd, "wt", encoding="UTF-8") as stream:
+                json.dump({"stamp": self.stamp, "records": self.records},
+                          stream)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+
 def decode_id(id):
     encoded_id = id.encode("utf-8")
     decoded_id = encoded_id.decode("unicode-escape")
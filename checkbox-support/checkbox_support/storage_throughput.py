@@ -0,0 +1,425 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+"""
+checkbox_support.storage_throughput
+===================================
+
+Engine measuring the throughput of storage devices.
+
+Test files are written (and read back) block by block from a few reusable
+buffers of pseudo-random data, by several threads per file to keep more than
+one request in flight (the queue depth). The page cache can be bypassed with
+O_DIRECT. Several files, for instance one per device, can be tested
+concurrently.
+"""
+import concurrent.futures
+import errno
+import hashlib
+import logging
+import mmap
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# O_DIRECT needs buffers, offsets and sizes aligned on the logical block size
+# of the device, 4KiB is a multiple of all of them in practice
+DIRECT_IO_ALIGNMENT = 4096
+
+
+class PatternBuffers(object):
+    """
+    Reusable blocks of pseudo-random test data.
+
+    Block ``n`` of a test file is a copy of buffer ``n % count``, so that the
+    data never needs to be generated again and the digest of each block can
+    be computed once. Buffers are page-aligned, as O_DIRECT requires.
+    """
+
+    def __init__(self, block_size, count=8, seed=0):
+        if block_size <= 0:
+            raise ValueError("block size must be positive")
+        if count <= 0:
+            raise ValueError("count must be positive")
+        self.block_size = block_size
+        rng = random.Random(seed)
+        self._buffers = []
+        for _ in range(count):
+            buf = mmap.mmap(-1, block_size)
+            buf.write(rng.getrandbits(block_size * 8).to_bytes(
+                block_size, "little"))
+            self._buffers.append(buf)
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def get(self, index, length=None):
+        """
+        Get the data of a block.
+
+        :param index:
+            Index of the block in the file
+        :param length:
+            Length of the block, if shorter than the block size
+        :returns:
+            A read-only memoryview of the data
+        """
+        view = memoryview(self._buffers[index % len(self._buffers)])
+        if length is not None:
+            view = view[:length]
+        return view.toreadonly() if hasattr(view, "toreadonly") else view
+
+    def digest(self, index, length=None):
+        """Get the MD5 digest of the data of a block."""
+        key = (index % len(self._buffers), length or self.block_size)
+        try:
+            return self._digests[key]
+        except KeyError:
+            pass
+        digest = hashlib.md5(self.get(index, length)).digest()
+        with self._lock:
+            self._digests[key] = digest
+        return digest
+
+
+class IOStats(object):
+    """
+    Statistics of a test run.
+
+    :attr size:
+        Number of bytes transferred
+    :attr elapsed:
+        Duration of the run, in seconds
+    :attr latencies:
+        Sorted durations of the I/O requests, in seconds
+    :attr corrupted:
+        Offsets of the blocks read back with unexpected data
+    """
+
+    MB = 1024 * 1024
+
+    def __init__(self, size=0, elapsed=0.0, latencies=(), corrupted=()):
+        self.size = size
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.corrupted = sorted(corrupted)
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, self)
+
+    def __str__(self):
+        return (
+            "{:0.4f} MB/s, {:0.1f} IOPS, latency p50 {:0.2f} ms, "
+            "p90 {:0.2f} ms, p99 {:0.2f} ms, max {:0.2f} ms").format(
+                self.mb_per_second, self.iops,
+                self.percentile(50) * 1000, self.percentile(90) * 1000,
+                self.percentile(99) * 1000, self.percentile(100) * 1000)
+
+    @classmethod
+    def combine(cls, stats_list, elapsed):
+        """
+        Combine the statistics of concurrent runs.
+
+        :param stats_list:
+            The statistics of each run
+        :param elapsed:
+            Duration of all the runs, in seconds
+        """
+        latencies = []
+        corrupted = []
+        for stats in stats_list:
+            latencies.extend(stats.latencies)
+            corrupted.extend(stats.corrupted)
+        return cls(
+            sum(stats.size for stats in stats_list), elapsed, latencies,
+            corrupted)
+
+    @property
+    def ops(self):
+        """Number of I/O requests."""
+        return len(self.latencies)
+
+    @property
+    def mb_per_second(self):
+        """Throughput, in MB (MiB) per second."""
+        try:
+            return self.size / self.elapsed / self.MB
+        except ZeroDivisionError:
+            return 0.0
+
+    @property
+    def iops(self):
+        """I/O requests per second."""
+        try:
+            return self.ops / self.elapsed
+        except ZeroDivisionError:
+            return 0.0
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the latencies (using the nearest rank).
+
+        :returns:
+            The latency, in seconds, or 0 without any request
+        """
+        if not self.latencies:
+            return 0.0
+        rank = -(-len(self.latencies) * percent // 100)  # ceil
+        return self.latencies[max(int(rank), 1) - 1]
+
+
+class StorageThroughputTest(object):
+    """
+    Write and read back test files, measuring the throughput.
+
+    :param block_size:
+        Size of each I/O request
+    :param queue_depth:
+        Number of concurrent requests for each file
+    :param direct:
+        Bypass the page cache with O_DIRECT, when the filesystem supports it
+        (the block size then needs to be a multiple of 4KiB)
+    :param patterns:
+        :class:`PatternBuffers` to use, by default new ones of the block size
+    """
+
+    def __init__(self, block_size=1024 * 1024, queue_depth=1, direct=False,
+                 patterns=None):
+        if queue_depth < 1:
+            raise ValueError("queue depth must be at least 1")
+        if direct and block_size % DIRECT_IO_ALIGNMENT:
+            raise ValueError(
+                "block size must be a multiple of {} with O_DIRECT".format(
+                    DIRECT_IO_ALIGNMENT))
+        if patterns is None:
+            patterns = PatternBuffers(block_size)
+        elif patterns.block_size != block_size:
+            raise ValueError("patterns don't match the block size")
+        self.block_size = block_size
+        self.queue_depth = queue_depth
+        self.direct = direct
+        self.patterns = patterns
+
+    def write_file(self, path, size):
+        """
+        Write a test file and flush it to the device.
+
+        :returns:
+            :class:`IOStats` of the run (which includes the final fsync)
+        :raises OSError:
+            if the file cannot be written
+        """
+        fd, direct = self._open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            start = time.perf_counter()
+            # Unaligned data at the end of the file has to be written without
+            # O_DIRECT
+            end = size - size % DIRECT_IO_ALIGNMENT if direct else size
+            latencies = self._run(self._write_blocks, fd, 0, end)[0]
+            if end < size:
+                tail_fd = os.open(path, os.O_WRONLY)
+                try:
+                    latencies += self._write_blocks(
+                        tail_fd, range(end, size, self.block_size), size)[0]
+                    os.fsync(tail_fd)
+                finally:
+                    os.close(tail_fd)
+            os.fsync(fd)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.close(fd)
+        return IOStats(size, elapsed, latencies)
+
+    def read_file(self, path, size, verify=True):
+        """
+        Read back a test file, from the device rather than the page cache.
+
+        :param verify:
+            Check that each block has the data written by :meth:`write_file()`
+        :returns:
+            :class:`IOStats` of the run
+        :raises OSError:
+            if the file cannot be read
+        """
+        # Reading into aligned buffers, as O_DIRECT requires, needs preadv()
+        direct = self.direct and hasattr(os, "preadv")
+        fd, direct = self._open(path, os.O_RDONLY, direct)
+        try:
+            if not direct and hasattr(os, "posix_fadvise"):
+                # Drop the (clean) pages of the file cached when writing it
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            start = time.perf_counter()
+            end = size - size % DIRECT_IO_ALIGNMENT if direct else size
+            latencies, corrupted = self._run(
+                self._read_blocks, fd, 0, end, verify)
+            if end < size:
+                tail_fd = os.open(path, os.O_RDONLY)
+                try:
+                    tail = self._read_blocks(
+                        tail_fd, range(end, size, self.block_size), size,
+                        verify)
+                finally:
+                    os.close(tail_fd)
+                latencies += tail[0]
+                corrupted += tail[1]
+            elapsed = time.perf_counter() - start
+        finally:
+            os.close(fd)
+        return IOStats(size, elapsed, latencies, corrupted)
+
+    def write_files(self, files):
+        """
+        Write several test files concurrently.
+
+        :param files:
+            List of (path, size) tuples
+        :returns:
+            A tuple with the combined :class:`IOStats` and a list of those
+            of each file
+        """
+        return self._run_concurrently(self.write_file, files)
+
+    def read_files(self, files, verify=True):
+        """
+        Read back several test files concurrently.
+
+        :param files:
+            List of (path, size) tuples
+        :returns:
+            A tuple with the combined :class:`IOStats` and a list of those
+            of each file
+        """
+        return self._run_concurrently(
+            lambda path, size: self.read_file(path, size, verify), files)
+
+    def _run_concurrently(self, function, files):
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(
+            max(len(files), 1)
+        ) as executor:
+            futures = [
+                executor.submit(function, path, size) for path, size in files]
+            stats_list = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        return IOStats.combine(stats_list, elapsed), stats_list
+
+    def _open(self, path, flags, direct=None):
+        if direct is None:
+            direct = self.direct
+        o_direct = getattr(os, "O_DIRECT", 0)
+        if direct and o_direct:
+            try:
+                return os.open(path, flags | o_direct, 0o644), True
+            except OSError as exc:
+                if exc.errno != errno.EINVAL:
+                    raise
+                logger.warning(
+                    "O_DIRECT is not supported for %s, using the page cache",
+                    path)
+        return os.open(path, flags, 0o644), False
+
+    def _run(self, function, fd, start, end, *args):
+        """
+        Transfer the blocks from start to end with queue_depth threads.
+
+        Each thread handles every queue_depth-th block, so that they all
+        move forward through the file together.
+
+        :returns:
+            The concatenated lists returned by each thread
+        """
+        offsets = range(start, end, self.block_size)
+        if self.queue_depth == 1 or len(offsets) <= 1:
+            return function(fd, offsets, end, *args)
+        with concurrent.futures.ThreadPoolExecutor(
+            self.queue_depth
+        ) as executor:
+            futures = [
+                executor.submit(
+                    function, fd, offsets[index::self.queue_depth], end,
+                    *args)
+                for index in range(self.queue_depth)]
+            results = [future.result() for future in futures]
+        return tuple(sum(lists, []) for lists in zip(*results))
+
+    def _write_blocks(self, fd, offsets, end):
+        latencies = []
+        for offset in offsets:
+            length = min(self.block_size, end - offset)
+            data = self.patterns.get(offset // self.block_size, length)
+            started = time.perf_counter()
+            while data:
+                data = data[os.pwrite(fd, data, offset):]
+                offset += length - len(data)
+                length = len(data)
+            latencies.append(time.perf_counter() - started)
+        return latencies, []
+
+    def _read_blocks(self, fd, offsets, end, verify):
+        latencies = []
+        corrupted = []
+        buf = mmap.mmap(-1, self.block_size)
+        try:
+            for offset in offsets:
+                length = min(self.block_size, end - offset)
+                started = time.perf_counter()
+                data = self._read_block(fd, buf, offset, length)
+                latencies.append(time.perf_counter() - started)
+                index = offset // self.block_size
+                if verify and (
+                    len(data) != length or
+                    hashlib.md5(data).digest() !=
+                    self.patterns.digest(index, length)
+                ):
+                    corrupted.append(offset)
+                if isinstance(data, memoryview):
+                    data.release()
+        finally:
+            buf.close()
+        return latencies, corrupted
+
+    @staticmethod
+    def _read_block(fd, buf, offset, length):
+        """
+        Read a block, stopping short at the end of the file.
+
+        :returns:
+            The data, as a view of buf when preadv() is available
+        """
+        if not hasattr(os, "preadv"):
+            chunks = []
+            while length:
+                chunk = os.pread(fd, length, offset)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                offset += len(chunk)
+                length -= len(chunk)
+            return b"".join(chunks)
+        view = memoryview(buf)
+        done = 0
+        while done < length:
+            count = os.preadv(fd, [view[done:length]], offset + done)
+            if not count:
+                break
+            done += count
+        data = view[:done]
+        view.release()
+        return data
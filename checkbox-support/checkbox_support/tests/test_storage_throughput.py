@@ -0,0 +1,189 @@
+# This file is part of Checkbox.
+#
+# Copyright 2026 Canonical Ltd.
+#
+# Checkbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3,
+# as published by the Free Software Foundation.
+#
+# Checkbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+checkbox_support.tests.test_storage_throughput
+==============================================
+
+Tests for checkbox_support.storage_throughput module
+"""
+
+import errno
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from checkbox_support.storage_throughput import IOStats
+from checkbox_support.storage_throughput import PatternBuffers
+from checkbox_support.storage_throughput import StorageThroughputTest
+
+
+class PatternBuffersTests(unittest.TestCase):
+
+    def test_blocks(self):
+        patterns = PatternBuffers(4096, count=3)
+        self.assertEqual(len(patterns), 3)
+        self.assertEqual(len(patterns.get(0)), 4096)
+        self.assertEqual(bytes(patterns.get(1)), bytes(patterns.get(4)))
+        self.assertNotEqual(bytes(patterns.get(0)), bytes(patterns.get(1)))
+        self.assertEqual(
+            bytes(patterns.get(2, 100)), bytes(patterns.get(2))[:100])
+
+    def test_seed(self):
+        self.assertEqual(
+            bytes(PatternBuffers(4096, seed=1).get(0)),
+            bytes(PatternBuffers(4096, seed=1).get(0)))
+        self.assertNotEqual(
+            bytes(PatternBuffers(4096, seed=1).get(0)),
+            bytes(PatternBuffers(4096, seed=2).get(0)))
+
+    def test_digest(self):
+        patterns = PatternBuffers(4096, count=2)
+        self.assertEqual(patterns.digest(0), patterns.digest(2))
+        self.assertNotEqual(patterns.digest(0), patterns.digest(0, 100))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            PatternBuffers(0)
+        with self.assertRaises(ValueError):
+            PatternBuffers(4096, count=0)
+
+
+class IOStatsTests(unittest.TestCase):
+
+    def test_rates(self):
+        stats = IOStats(8 * 1024 * 1024, 2.0, [0.5] * 4)
+        self.assertEqual(stats.ops, 4)
+        self.assertEqual(stats.mb_per_second, 4.0)
+        self.assertEqual(stats.iops, 2.0)
+        self.assertEqual(IOStats().mb_per_second, 0.0)
+        self.assertEqual(IOStats().iops, 0.0)
+
+    def test_percentile(self):
+        stats = IOStats(latencies=[i / 100 for i in range(100, 0, -1)])
+        self.assertEqual(stats.percentile(50), 0.5)
+        self.assertEqual(stats.percentile(99), 0.99)
+        self.assertEqual(stats.percentile(100), 1.0)
+        self.assertEqual(stats.percentile(0), 0.01)
+        self.assertEqual(IOStats().percentile(50), 0.0)
+
+    def test_combine(self):
+        stats = IOStats.combine(
+            [IOStats(10, 1.0, [0.3], [4096]), IOStats(20, 2.0, [0.1])], 2.0)
+        self.assertEqual(stats.size, 30)
+        self.assertEqual(stats.elapsed, 2.0)
+        self.assertEqual(stats.latencies, [0.1, 0.3])
+        self.assertEqual(stats.corrupted, [4096])
+
+
+class StorageThroughputTestTests(unittest.TestCase):
+
+    def setUp(self):
+        self.scratch_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.scratch_dir.cleanup)
+        self.path = os.path.join(self.scratch_dir.name, "test")
+        self.patterns = PatternBuffers(8192, count=3)
+
+    def get_expected(self, size):
+        return b"".join(
+            bytes(self.patterns.get(index))
+            for index in range(-(-size // 8192)))[:size]
+
+    def test_write_read(self):
+        size = 10 * 8192 + 100
+        for queue_depth in (1, 3):
+            engine = StorageThroughputTest(
+                8192, queue_depth, patterns=self.patterns)
+            stats = engine.write_file(self.path, size)
+            self.assertEqual(stats.size, size)
+            self.assertEqual(stats.ops, 11)
+            with open(self.path, "rb") as stream:
+                self.assertEqual(stream.read(), self.get_expected(size))
+            stats = engine.read_file(self.path, size)
+            self.assertEqual(stats.ops, 11)
+            self.assertEqual(stats.corrupted, [])
+
+    def test_direct(self):
+        size = 4 * 8192 + 100
+        engine = StorageThroughputTest(
+            8192, 2, direct=True, patterns=self.patterns)
+        # O_DIRECT isn't supported everywhere (e.g. on tmpfs), which is
+        # handled by using the page cache
+        with mock.patch("checkbox_support.storage_throughput.logger"):
+            engine.write_file(self.path, size)
+            stats = engine.read_file(self.path, size)
+        self.assertEqual(stats.corrupted, [])
+        with open(self.path, "rb") as stream:
+            self.assertEqual(stream.read(), self.get_expected(size))
+
+    def test_direct_unsupported(self):
+        engine = StorageThroughputTest(
+            8192, direct=True, patterns=self.patterns)
+        real_open = os.open
+
+        def fake_open(path, flags, mode=0o777):
+            if flags & getattr(os, "O_DIRECT", 0):
+                raise OSError(errno.EINVAL, "Invalid argument")
+            return real_open(path, flags, mode)
+
+        with mock.patch("os.open", side_effect=fake_open), \
+                mock.patch("checkbox_support.storage_throughput.logger"):
+            engine.write_file(self.path, 8192)
+            self.assertEqual(engine.read_file(self.path, 8192).corrupted, [])
+
+    def test_corrupted(self):
+        engine = StorageThroughputTest(8192, patterns=self.patterns)
+        engine.write_file(self.path, 3 * 8192)
+        with open(self.path, "r+b") as stream:
+            stream.seek(8192 + 10)
+            stream.write(b"\0")
+        self.assertEqual(
+            engine.read_file(self.path, 3 * 8192).corrupted, [8192])
+        self.assertEqual(
+            engine.read_file(self.path, 3 * 8192, verify=False).corrupted,
+            [])
+
+    def test_truncated(self):
+        engine = StorageThroughputTest(8192, patterns=self.patterns)
+        engine.write_file(self.path, 3 * 8192)
+        os.truncate(self.path, 2 * 8192 + 1)
+        self.assertEqual(
+            engine.read_file(self.path, 3 * 8192).corrupted, [2 * 8192])
+
+    def test_concurrent_files(self):
+        engine = StorageThroughputTest(8192, 2, patterns=self.patterns)
+        files = [(self.path + str(index), 5 * 8192) for index in range(3)]
+        stats, stats_list = engine.write_files(files)
+        self.assertEqual(stats.size, 15 * 8192)
+        self.assertEqual(stats.ops, 15)
+        self.assertEqual(len(stats_list), 3)
+        stats, stats_list = engine.read_files(files)
+        self.assertEqual(stats.corrupted, [])
+        self.assertEqual([item.size for item in stats_list], [5 * 8192] * 3)
+
+    def test_write_error(self):
+        engine = StorageThroughputTest(8192, patterns=self.patterns)
+        with self.assertRaises(OSError):
+            engine.write_file(os.path.join(self.path, "missing"), 8192)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            StorageThroughputTest(8192, queue_depth=0)
+        with self.assertRaises(ValueError):
+            StorageThroughputTest(1000, direct=True)
+        with self.assertRaises(ValueError):
+            StorageThroughputTest(4096, patterns=self.patterns)
@@ -1,9 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
-import collections
 import dbus
-import hashlib
 import logging
 import os
 import platform
@@ -12,7 +10,6 @@ import shlex
 import subprocess
 import sys
 import tempfile
-import time
 
 import gi
 gi.require_version('GUdev', '1.0')
@@ -37,74 +34,115 @@ from checkbox_support.parsers.udevadm import (                  # noqa: E402
     GENERIC_RE,
     FLASH_RE,
     find_pkname_is_root_mountpoint)                             # noqa: E402
+from checkbox_support.storage_throughput import (               # noqa: E402
+    DIRECT_IO_ALIGNMENT,
+    IOStats,
+    StorageThroughputTest)
 from checkbox_support.udev import get_interconnect_speed        # noqa: E402
 from checkbox_support.udev import get_udev_block_devices        # noqa: E402
 from checkbox_support.udev import get_udev_xhci_devices         # noqa: E402
 
 
-class ActionTimer():
-    '''Class to implement a simple timer'''
-
-    def __enter__(self):
-        self.start = time.time()
-        return self
-
-    def __exit__(self, *args):
-        self.stop = time.time()
-        self.interval = self.stop - self.start
-
-
-class RandomData():
-    '''Class to create data files'''
-
-    def __init__(self, size):
-        self.tfile = tempfile.NamedTemporaryFile(delete=False)
-        self.path = ''
-        self.name = ''
-        self.path, self.name = os.path.split(self.tfile.name)
-        self._write_test_data_file(size)
-
-    def _generate_test_data(self):
-        seed = "104872948765827105728492766217823438120"
-        phrase = '''
-        Lorem ipsum dolor sit amet, consectetuer adipiscing elit, sed diam
-        nonummy nibh euismod tincidunt ut laoreet dolore magna aliquam erat
-        volutpat. Ut wisi enim ad minim veniam, quis nostrud exerci tation
-        ullamcorper suscipit lobortis nisl ut aliquip ex ea commodo consequat.
-        Duis autem vel eum iriure dolor in hendrerit in vulputate velit esse
-        molestie consequat, vel illum dolore eu feugiat nulla facilisis at vero
-        eros et accumsan et iusto odio dignissim qui blandit praesent luptatum
-        zzril delenit augue duis dolore te feugait nulla facilisi.
-        '''
-        words = phrase.replace('\n', '').split()
-        word_deque = collections.deque(words)
-        seed_deque = collections.deque(seed)
-        while True:
-            yield ' '.join(list(word_deque))
-            word_deque.rotate(int(seed_deque[0]))
-            seed_deque.rotate(1)
-
-    def _write_test_data_file(self, size):
-        data = self._generate_test_data()
-        while os.path.getsize(self.tfile.name) < size:
-            self.tfile.write(next(data).encode('UTF-8'))
-        return self
-
+def run_iteration(engine, disks, size, count, iteration, concurrent):
+    """
+    Write test files to the given disks and read them back.
+
+    :param disks:
+        List of (disk, mount point) tuples
+    :param concurrent:
+        Test all the files at the same time rather than one after the other
+    :returns:
+        A tuple with a dictionary mapping each disk to the (write, read)
+        IOStats of the iteration, and the number of errors
+    """
+    targets = [
+        (disk, (os.path.join(
+            mount_point, "removable_storage_test.{}.{}".format(
+                index, iteration)), size))
+        for disk, mount_point in disks for index in range(count)]
+    files = [target for disk, target in targets]
+    errors = 0
+    try:
+        if concurrent:
+            write_stats = engine.write_files(files)[1]
+            read_stats = engine.read_files(files)[1]
+        else:
+            write_stats = [engine.write_file(*file) for file in files]
+            read_stats = [engine.read_file(*file) for file in files]
+    except OSError as exc:
+        logging.error("[Iteration %s] Failed to write and read back data "
+                      "on %s: %s", iteration,
+                      ', '.join(disk for disk, _ in disks), exc)
+        return {}, 1
+    finally:
+        for path, _ in files:
+            if os.path.exists(path):
+                os.unlink(path)
+    results = {}
+    for (disk, (path, _)), written, read in zip(
+            targets, write_stats, read_stats):
+        if read.corrupted:
+            logging.warning(
+                "[Iteration %s] Data read back from %s doesn't match what "
+                "was written (%d corrupted block(s), first at offset %d)!",
+                iteration, path, len(read.corrupted), read.corrupted[0])
+            errors += 1
+        results.setdefault(disk, ([], []))
+        results[disk][0].append(written)
+        results[disk][1].append(read)
+    # Files of a disk tested at the same time take as long as the slowest
+    # one, otherwise they take as long as all of them together
+    combine_time = max if concurrent else sum
+    return {
+        disk: tuple(
+            IOStats.combine(
+                stats, combine_time(item.elapsed for item in stats))
+            for stats in (written, read))
+        for disk, (written, read) in results.items()}, errors
+
+
+def report_disk(disk, results, total_write_size, iterations):
+    """
+    Print the results of a disk.
 
-def md5_hash_file(path):
-    md5 = hashlib.md5()
+    :param results:
+        The (write, read) IOStats of each successful iteration
+    :returns:
+        The average write speed, in MB/s
+    """
+    print("%s (Total Data Size / iteration: %0.4f MB):" %
+          (disk, (total_write_size / 1024 / 1024)))
+    iteration_write_size = (total_write_size * iterations) / 1024 / 1024
+    for iteration, (written, read) in enumerate(results):
+        print("\t[Iteration %s] Average Speed: %0.4f"
+              % (iteration, written.mb_per_second))
+    written = IOStats.combine(
+        [write for write, _ in results],
+        sum(write.elapsed for write, _ in results))
+    read = IOStats.combine(
+        [read for _, read in results],
+        sum(read.elapsed for _, read in results))
+    iteration_write_time = written.elapsed
+    print("\tSummary:")
+    print("\t\tTotal Data Attempted: %0.4f MB" % iteration_write_size)
+    print("\t\tTotal Time to write: %0.4f secs" % iteration_write_time)
+    print("\t\tAverage Write Time: %0.4f secs" %
+          (iteration_write_time / iterations))
     try:
-        with open(path, 'rb') as stream:
-            while True:
-                data = stream.read(8192)
-                if not data:
-                    break
-                md5.update(data)
-    except IOError as exc:
-        logging.error("unable to checksum %s: %s", path, exc)
-        return None
-    else:
-        return md5.hexdigest()
+        avg_write_speed = iteration_write_size / iteration_write_time
+    except ZeroDivisionError:
+        avg_write_speed = 0.00
+    print("\t\tAverage Write Speed: %0.4f MB/s" % avg_write_speed)
+    print("\t\tWrite IOPS: %0.1f" % written.iops)
+    print("\t\tWrite Latency: p50 %0.2f ms, p90 %0.2f ms, p99 %0.2f ms" % (
+        written.percentile(50) * 1000, written.percentile(90) * 1000,
+        written.percentile(99) * 1000))
+    print("\t\tAverage Read Speed: %0.4f MB/s" % read.mb_per_second)
+    print("\t\tRead IOPS: %0.1f" % read.iops)
+    print("\t\tRead Latency: p50 %0.2f ms, p90 %0.2f ms, p99 %0.2f ms" % (
+        read.percentile(50) * 1000, read.percentile(90) * 1000,
+        read.percentile(99) * 1000))
+    return avg_write_speed
 
 
 def on_ubuntucore():
@@ -132,41 +170,12 @@ class DiskTest():
         self.rem_disks_speed = {}
         # LP: #1313581, TODO: extend to be rem_disks_driver
         self.rem_disks_xhci = {}
-        self.data = ''
         self.lsblk = ''
         self.device = device
         self.memorycard = memorycard
         self._run_lsblk(lsblkcommand)
         self._probe_disks()
 
-    def read_file(self, source):
-        with open(source, 'rb') as infile:
-            try:
-                self.data = infile.read()
-            except IOError as exc:
-                logging.error("Unable to read data from %s: %s", source, exc)
-                return False
-            else:
-                return True
-
-    def write_file(self, data, dest):
-        try:
-            outfile = open(dest, 'wb', 0)
-        except OSError as exc:
-            logging.error("Unable to open %s for writing.", dest)
-            logging.error("  %s", exc)
-            return False
-        with outfile:
-            try:
-                outfile.write(self.data)
-            except IOError as exc:
-                logging.error("Unable to write data to %s: %s", dest, exc)
-                return False
-            else:
-                outfile.flush()
-                os.fsync(outfile.fileno())
-                return True
-
     def clean_up(self, target):
         try:
             os.unlink(target)
@@ -606,6 +615,28 @@ def main():
                               "You may use SI or IEC suffixes like: 'K', 'M',"
                               "'G', 'T', 'Ki', 'Mi', 'Gi', 'Ti', etc. Default"
                               " is %(default)s"))
+    parser.add_argument('-b', '--block-size',
+                        action='store',
+                        type=HumanReadableBytes,
+                        default='1MiB',
+                        help=("The size of each write and read request. "
+                              "Default is %(default)s"))
+    parser.add_argument('-q', '--queue-depth',
+                        action='store',
+                        type=int,
+                        default=1,
+                        help=("The number of concurrent requests for each "
+                              "data file. Default is %(default)s"))
+    parser.add_argument('--direct',
+                        action='store_true',
+                        default=False,
+                        help=("Bypass the page cache (O_DIRECT). The block "
+                              "size must then be a multiple of 4KiB"))
+    parser.add_argument('--concurrent',
+                        action='store_true',
+                        default=False,
+                        help=("Test all the data files, on all the eligible "
+                              "devices, at the same time"))
     parser.add_argument('--auto-reduce-size',
                         action='store_true',
                         default=False,
@@ -630,6 +661,10 @@ def main():
                               "Only change it if you know what you're doing."))
 
     args = parser.parse_args()
+    if args.queue_depth < 1:
+        parser.error("the queue depth must be at least 1")
+    if args.direct and args.block_size % DIRECT_IO_ALIGNMENT:
+        parser.error("the block size must be a multiple of 4KiB with --direct")
 
     test = DiskTest(args.device, args.memorycard, args.lsblkcommand)
 
@@ -717,8 +752,6 @@ def main():
                         "No %s disks with speed higher than %s bits/s",
                         args.device, args.min_speed)
                     return 1
-                write_sizes = []
-                test_files = {}
                 disks_freespace = {}
                 for disk, path in disks_eligible.items():
                     stat = os.statvfs(path)
@@ -742,90 +775,31 @@ def main():
                     else:
                         sys.exit("Not enough space. {} is required on {}"
                                  .format(desired_size, smallest_partition))
-                # Generate our data file(s)
-                for count in range(args.count):
-                    test_files[count] = RandomData(desired_size)
-                    write_sizes.append(os.path.getsize(
-                        test_files[count].tfile.name))
-                    total_write_size = sum(write_sizes)
-
+                engine = StorageThroughputTest(
+                    args.block_size, args.queue_depth, args.direct)
+                total_write_size = desired_size * args.count
+                if args.concurrent:
+                    batches = [list(disks_eligible.items())]
+                else:
+                    batches = [[item] for item in disks_eligible.items()]
+                disk_results = {disk: [] for disk in disks_eligible}
                 try:
                     # Clear dmesg so we can check for I/O errors later
                     subprocess.check_output(['dmesg', '-C'])
-                    for disk, mount_point in disks_eligible.items():
-                        print("%s (Total Data Size / iteration: %0.4f MB):" %
-                              (disk, (total_write_size / 1024 / 1024)))
-                        iteration_write_size = (
-                            total_write_size * args.iterations) / 1024 / 1024
-                        iteration_write_times = []
+                    for batch in batches:
                         for iteration in range(args.iterations):
-                            target_file_list = []
-                            write_times = []
-                            for file_index in range(args.count):
-                                parent_file = test_files[file_index].tfile.name
-                                parent_hash = md5_hash_file(parent_file)
-                                target_filename = (
-                                    test_files[file_index].name +
-                                    '.%s' % iteration)
-                                target_path = mount_point
-                                target_file = os.path.join(target_path,
-                                                           target_filename)
-                                target_file_list.append(target_file)
-                                test.read_file(parent_file)
-                                with ActionTimer() as timer:
-                                    if not test.write_file(test.data,
-                                                           target_file):
-                                        logging.error(
-                                            "Failed to copy %s to %s",
-                                            parent_file, target_file)
-                                        errors += 1
-                                        continue
-                                write_times.append(timer.interval)
-                                child_hash = md5_hash_file(target_file)
-                                if parent_hash != child_hash:
-                                    logging.warning(
-                                        "[Iteration %s] Parent and Child"
-                                        " copy hashes mismatch on %s!",
-                                        iteration, target_file)
-                                    logging.warning(
-                                        "\tParent hash: %s", parent_hash)
-                                    logging.warning(
-                                        "\tChild hash: %s", child_hash)
-                                    errors += 1
-                            for file in target_file_list:
-                                test.clean_up(file)
-                            total_write_time = sum(write_times)
-                            # avg_write_time = total_write_time / args.count
-                            try:
-                                avg_write_speed = ((
-                                    total_write_size / total_write_time) /
-                                    1024 / 1024)
-                            except ZeroDivisionError:
-                                avg_write_speed = 0.00
-                            finally:
-                                iteration_write_times.append(total_write_time)
-                                print("\t[Iteration %s] Average Speed: %0.4f"
-                                      % (iteration, avg_write_speed))
-                        for iteration in range(args.iterations):
-                            iteration_write_time = sum(iteration_write_times)
-                        print("\tSummary:")
-                        print("\t\tTotal Data Attempted: %0.4f MB"
-                              % iteration_write_size)
-                        print("\t\tTotal Time to write: %0.4f secs"
-                              % iteration_write_time)
-                        print("\t\tAverage Write Time: %0.4f secs" %
-                              (iteration_write_time / args.iterations))
-                        try:
-                            avg_write_speed = (iteration_write_size /
-                                               iteration_write_time)
-                        except ZeroDivisionError:
-                            avg_write_speed = 0.00
-                        finally:
-                            print("\t\tAverage Write Speed: %0.4f MB/s" %
-                                  avg_write_speed)
+                            iteration_results, iteration_errors = (
+                                run_iteration(
+                                    engine, batch, desired_size, args.count,
+                                    iteration, args.concurrent))
+                            errors += iteration_errors
+                            for disk, results in iteration_results.items():
+                                disk_results[disk].append(results)
+                    for disk, mount_point in disks_eligible.items():
+                        avg_write_speed = report_disk(
+                            disk, disk_results[disk], total_write_size,
+                            args.iterations)
                 finally:
-                    for key in range(args.count):
-                        test.clean_up(test_files[key].tfile.name)
                     if (len(test.rem_disks_nm) > 0):
                         if test.umount() != 0:
                             errors += 1
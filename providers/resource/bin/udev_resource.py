@@ -18,12 +18,14 @@
 # along with Checkbox.  If not, see <http://www.gnu.org/licenses/>.
 #
 import argparse
+import os
 import shlex
 
 from collections import OrderedDict
 from subprocess import check_output, CalledProcessError
 
 from checkbox_support.parsers.udevadm import UdevadmParser
+from checkbox_support.parsers.udevadm import UdevadmSnapshot
 
 categories = ("ACCELEROMETER", "AUDIO", "BLUETOOTH", "CAPTURE", "CARDREADER",
               "CDROM", "DISK", "KEYBOARD", "INFINIBAND", "MMAL", "MOUSE",
@@ -36,6 +38,28 @@ attributes = ("path", "name", "bus", "category", "driver", "product_id",
               "symlink_uuid")
 
 
+def get_udev_snapshot(command):
+    """
+    Get the parsed udev database.
+
+    Within a session, the database is parsed once and shared by all the
+    invocations of this script (as long as it doesn't change).
+    """
+    session_share = os.environ.get("PLAINBOX_SESSION_SHARE")
+    if not session_share:
+        return UdevadmSnapshot.capture(command)
+    filename = os.path.join(session_share, "udev_snapshot.json")
+    snapshot = UdevadmSnapshot.load(filename, command)
+    if snapshot is None:
+        snapshot = UdevadmSnapshot.capture(command)
+        if snapshot.stamp is not None:
+            try:
+                snapshot.save(filename)
+            except OSError:
+                pass
+    return snapshot
+
+
 def dump_udev_db(udev):
     for device in udev.run():
         for attribute in attributes:
@@ -114,18 +138,18 @@ def main():
     parser.add_argument('-s', '--short', action='store_true')
     args = parser.parse_args()
     try:
-        output = check_output(shlex.split(args.command))
+        snapshot = get_udev_snapshot(args.command)
         lsblk = check_output(shlex.split(args.lsblkcommand))
     except CalledProcessError as exc:
         raise SystemExit(exc)
     # Set the error policy to 'ignore' in order to let tests depending on this
     # resource to properly match udev properties
-    output = output.decode("UTF-8", errors='ignore')
     lsblk = lsblk.decode("UTF-8", errors='ignore')
     list_partitions = False
     if 'PARTITION' in args.list or 'PARTITION' in args.filter:
         list_partitions = True
-    udev = UdevadmParser(output, lsblk=lsblk, list_partitions=list_partitions)
+    udev = UdevadmParser(
+        snapshot, lsblk=lsblk, list_partitions=list_partitions)
     if args.list:
         if display_by_categories(udev, args.list, args.short) == 0:
             raise SystemExit("No devices found")